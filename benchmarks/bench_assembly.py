@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Benchmark: montagem colunar (question_assembly) vs loop iterrows original do v3.
+
+A referência é o loop original de reference_impl.assembly com os deltas
+revisados aplicados por fora dele (nomes comparados sem acento, ids de
+colunas com célula vazia). Falha (exit 1) se o JSON divergir;
+tests/test_question_assembly.py usa a mesma referência numa planilha pequena.
+
+Uso: python benchmarks/bench_assembly.py [num_questoes]
+"""
+import argparse
+import json
+import sys
+import time
+
+sys.path.append('.')
+from question_assembly import assemble_questions
+from reference_impl.assembly import ACCENT_DELTA, build_frame, complete, legacy_process_rows, reviewed_process_rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_questions', nargs='?', type=int, default=12000)
+    args = parser.parse_args()
+
+    num_questions = args.num_questions
+    df = build_frame(num_questions)
+    print(f"📊 Planilha sintética: {len(df)} linhas, {num_questions} questões")
+
+    start = time.perf_counter()
+    legacy = complete(reviewed_process_rows(df))
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columnar = [q.to_dict() for q in complete(assemble_questions(df))]
+    columnar_time = time.perf_counter() - start
+
+    legacy_json = json.dumps(legacy, indent=2, ensure_ascii=False)
+    columnar_json = json.dumps(columnar, indent=2, ensure_ascii=False)
+    identical = legacy_json == columnar_json
+
+    print(f"  iterrows (original): {legacy_time:.3f}s")
+    print(f"  colunar:             {columnar_time:.3f}s ({legacy_time / columnar_time:.1f}x)")
+    original = {q['id']: q['category'] for q in legacy_process_rows(df)}
+    changed = sum(q['category'] != original[q['id']] for q in legacy)
+    print(f"  JSON idêntico: {'✅ sim' if identical else '❌ não'} "
+          f"(delta de acentos revisado: {changed} questões de {', '.join(ACCENT_DELTA)})")
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
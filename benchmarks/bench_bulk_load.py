@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Benchmark: carga via COPY + upsert transacional vs INSERT em lotes de 100 (migrate_to_database.ts).
+
+Precisa de um PostgreSQL descartável (ex.: docker run -e POSTGRES_PASSWORD=x -p 5432:5432 postgres).
+Tudo roda num schema temporário (bench_bulk_load) que é removido no final.
+
+Confere que a tabela fica idêntica às questões carregadas (carga completa e
+delta) e que um leitor concorrente nunca vê a tabela vazia ou pela metade;
+falha (exit 1) se alguma verificação divergir.
+
+Uso: python benchmarks/bench_bulk_load.py --dsn postgresql://... [num_questoes]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.append('.')
+from bulk_load_questions import COLUMN_LIST, COLUMNS, connect, load_questions, loader_available
+
+SCHEMA = 'bench_bulk_load'
+# Mesma tabela de shared/schema.ts
+CREATE_TABLE = """
+CREATE TABLE questions (
+    id varchar PRIMARY KEY DEFAULT gen_random_uuid(),
+    text text NOT NULL,
+    options text[] NOT NULL,
+    correct_answer_index integer NOT NULL,
+    difficulty integer NOT NULL DEFAULT 1,
+    category text NOT NULL DEFAULT 'Processo Civil',
+    challenge_type text NOT NULL DEFAULT 'OAB_1_FASE',
+    explanation text
+)
+"""
+
+
+def build_questions(num_questions, seed=4, prefix='Q'):
+    rng = random.Random(seed)
+    return [{
+        'id': f"{prefix}{i + 1:06d}",
+        'text': f"Enunciado {i} sobre o art. {rng.randint(1, 2000)} do Código Civil, com aspas \" e barra \\ e tab\t.",
+        'options': [f"Alternativa {letter} {rng.random():.6f}" for letter in 'ABCD'],
+        'correctAnswerIndex': rng.randrange(4),
+        'difficulty': rng.randint(1, 5),
+        'category': rng.choice(['Direito Civil', 'Direito Penal', 'Ética Profissional']),
+        'challengeType': rng.choice(['OAB_1_FASE', 'CONCURSOS_MPSP']),
+        'explanation': None if i % 7 == 0 else f"Questão {i}",
+    } for i in range(num_questions)]
+
+
+def batched_insert(conn, questions, batch_size=100):
+    """Caminho de migrate_to_database.ts: DELETE, INSERT ... RETURNING em lotes, SELECT de tudo para contar"""
+    placeholders = '(' + ', '.join(['%s'] * len(COLUMNS)) + ')'
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute("DELETE FROM questions")
+        for i in range(0, len(questions), batch_size):
+            batch = questions[i:i + batch_size]
+            values = [value for q in batch for value in (q.get(field) for _, field in COLUMNS)]
+            cur.execute(f"INSERT INTO questions ({COLUMN_LIST}) VALUES "
+                        + ', '.join([placeholders] * len(batch)) + " RETURNING *", values)
+            cur.fetchall()
+    with conn.cursor() as cur:
+        cur.execute("SELECT * FROM questions")
+        return len(cur.fetchall())
+
+
+def table_as_questions(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {COLUMN_LIST} FROM questions ORDER BY id")
+        return [dict(zip((field for _, field in COLUMNS), row)) for row in cur.fetchall()]
+
+
+def watch_counts(dsn, stop, seen):
+    """Leitor concorrente: registra cada count(*) observado durante a carga"""
+    with connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute(f"SET search_path TO {SCHEMA}")
+        while not stop.is_set():
+            cur.execute("SELECT count(*) FROM questions")
+            seen.add(cur.fetchone()[0])
+            conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_questions', nargs='?', type=int, default=50000)
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    args = parser.parse_args()
+    if not loader_available() or not args.dsn:
+        print("❌ Precisa de psycopg e de --dsn/DATABASE_URL apontando para um PostgreSQL descartável")
+        sys.exit(1)
+
+    questions = build_questions(args.num_questions)
+    failures = []
+    dsn = f"{args.dsn}{'&' if '?' in args.dsn else '?'}options=-csearch_path%3D{SCHEMA}"
+
+    with connect(args.dsn) as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.commit()
+    try:
+        with connect(dsn) as conn:
+            conn.execute(CREATE_TABLE)
+            conn.commit()
+
+            start = time.perf_counter()
+            load_questions(conn, questions)
+            initial_time = time.perf_counter() - start
+
+            # Os dois caminhos substituindo uma tabela já cheia, como numa recarga real
+            start = time.perf_counter()
+            batched_insert(conn, questions)
+            batched_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            load_questions(conn, questions)
+            reload_time = time.perf_counter() - start
+
+            # Carga com 90% das questões, todas alteradas, com um leitor concorrente
+            replacement = build_questions(args.num_questions, seed=8)[: args.num_questions * 9 // 10]
+            stop, seen = threading.Event(), set()
+            reader = threading.Thread(target=watch_counts, args=(args.dsn, stop, seen))
+            reader.start()
+            time.sleep(0.2)
+            start = time.perf_counter()
+            upserted, deleted = load_questions(conn, replacement)
+            copy_time = time.perf_counter() - start
+            time.sleep(0.2)
+            stop.set()
+            reader.join()
+
+            if table_as_questions(conn) != replacement:
+                failures.append("carga completa: tabela difere das questões carregadas")
+            if not seen <= {len(questions), len(replacement)}:
+                failures.append(f"leitor viu contagens intermediárias: {sorted(seen)}")
+
+            # Delta: 1% novas, 1% alteradas, 1% removidas
+            step = max(1, len(replacement) // 100)
+            added = build_questions(step, seed=9, prefix='N')
+            changed = [dict(q, text=q['text'] + ' (revisada)') for q in replacement[::100][:step]]
+            deleted_ids = [q['id'] for q in replacement[50::100][:step]]
+            load_questions(conn, added + changed, replace=False, deleted_ids=deleted_ids)
+            expected = {q['id']: q for q in replacement}
+            expected.update((q['id'], q) for q in added + changed)
+            for qid in deleted_ids:
+                expected.pop(qid, None)
+            if table_as_questions(conn) != [expected[qid] for qid in sorted(expected)]:
+                failures.append("delta: tabela difere do esperado")
+    finally:
+        with connect(args.dsn) as conn:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+    print(f"📊 {args.num_questions} questões")
+    print(f"  COPY em tabela vazia:     {initial_time:6.2f}s ({len(questions) / initial_time:10,.0f} linhas/s)")
+    print(f"  INSERT em lotes de 100:   {batched_time:6.2f}s ({len(questions) / batched_time:10,.0f} linhas/s)")
+    print(f"  COPY + upsert (recarga):  {reload_time:6.2f}s ({len(questions) / reload_time:10,.0f} linhas/s)")
+    print(f"  COPY + upsert, 100% alteradas, com leitor concorrente:")
+    print(f"                            {copy_time:6.2f}s ({upserted / copy_time:10,.0f} linhas/s, {deleted} removidas)")
+    print(f"  leitor concorrente viu:   {sorted(seen)}")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("  ✅ carga completa, delta e leitura concorrente conferidos")
+
+
+if __name__ == "__main__":
+    main()
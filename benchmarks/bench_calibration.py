@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Benchmark: calibração de dificuldade (difficulty_calibration) em respostas sintéticas.
+
+Sorteia usuários (theta), questões (b, a) e respostas de um 2PL conhecido,
+grava o export em CSV (e Parquet, com pyarrow) em blocos, e mede leitura,
+ajuste 1PL/2PL e pico de memória do script num subprocesso. Confere a
+recuperação dos parâmetros (correlação com os verdadeiros), que o resultado
+não depende do tamanho do bloco e que CSV e Parquet dão o mesmo resultado;
+falha (exit 1) se algo divergir.
+
+Uso: python benchmarks/bench_calibration.py [num_respostas] [--users 20000] [--questions 3000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from difficulty_calibration import calibrate, difficulty_stars, pq
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WRITE_CHUNK = 500_000
+
+
+def simulate(path, num_answers, num_users, num_questions, seed=5):
+    """Write a synthetic user_answers export; returns the true (b, a) per question id"""
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(0, 1, num_users)
+    b = rng.normal(0, 1.2, num_questions)
+    a = np.exp(rng.normal(0, 0.3, num_questions))
+    # Popularidade desigual: algumas questões aparecem muito mais que outras
+    popularity = rng.pareto(2.0, num_questions) + 1
+    popularity /= popularity.sum()
+    question_ids = np.array([f"Q{i:06d}" for i in range(num_questions)], dtype=object)
+    user_ids = np.array([f"u{i:07d}" for i in range(num_users)], dtype=object)
+    for start in range(0, num_answers, WRITE_CHUNK):
+        size = min(WRITE_CHUNK, num_answers - start)
+        users = rng.integers(0, num_users, size)
+        questions = rng.choice(num_questions, size, p=popularity)
+        p = 1 / (1 + np.exp(-a[questions] * (theta[users] - b[questions])))
+        chunk = pd.DataFrame({
+            'id': np.arange(start, start + size),
+            'user_id': user_ids[users],
+            'question_id': question_ids[questions],
+            'is_correct': np.where(rng.random(size) < p, 't', 'f'),
+            'time_spent': rng.integers(5, 120, size),
+        })
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return pd.DataFrame({'id': question_ids, 'b_true': b, 'a_true': a})
+
+
+def peak_rss_mb(argv, workdir):
+    """Run the calibration script and return (seconds, peak RSS in MB of the child)"""
+    env = dict(os.environ, PYTHONPATH=REPO + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(REPO, 'difficulty_calibration.py')] + argv, cwd=workdir,
+                            env=env, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    if os.waitstatus_to_exitcode(status):
+        raise RuntimeError(f"difficulty_calibration.py {' '.join(argv)} falhou")
+    return time.perf_counter() - start, usage.ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('answers', nargs='?', type=int, default=2_000_000)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--questions', type=int, default=3000)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'user_answers.csv')
+        start = time.perf_counter()
+        truth = simulate(csv_path, args.answers, args.users, args.questions)
+        print(f"🛠️  {args.answers:,} respostas sintéticas ({os.path.getsize(csv_path) / 1e6:.0f} MB CSV) "
+              f"em {time.perf_counter() - start:.1f}s")
+
+        if hasattr(os, 'wait4'):
+            print("💾 Pico de memória do script (2PL, subprocesso; o filho herda o pico atual deste processo):")
+            for chunk_size in (100_000, 1_000_000):
+                seconds, peak = peak_rss_mb([csv_path, '--chunk-size', str(chunk_size)], tmp)
+                print(f"  bloco {chunk_size:>9,}: {peak:6.0f} MB, {seconds:.1f}s")
+
+        results = {}
+        for model in ('pvalue', '1pl', '2pl'):
+            updates, summary = calibrate(csv_path, model, chunk_size=250_000)
+            results[model] = updates.merge(truth, on='id')
+            print(f"  {model:6s} {summary['seconds']:6.1f}s (leitura {summary['read_seconds']:.1f}s, "
+                  f"{summary['iterations']} iterações, {summary['rows'] / summary['seconds']:,.0f} respostas/s)")
+
+        print("📐 Recuperação (correlação com os parâmetros verdadeiros):")
+        for model, merged in results.items():
+            corr_b = np.corrcoef(merged['b'], merged['b_true'])[0, 1]
+            stars = (merged['difficulty'] == difficulty_stars(merged['b_true'])).mean()
+            line = f"  {model:6s} b: {corr_b:.3f}  estrelas iguais às verdadeiras: {stars:.1%}"
+            if model == '2pl':
+                corr_a = np.corrcoef(merged['a'], merged['a_true'])[0, 1]
+                line += f"  a: {corr_a:.3f}"
+                if corr_a < 0.5:
+                    failures.append(f"2PL: correlação de a {corr_a:.3f} < 0.5")
+            print(line)
+            if model != 'pvalue' and corr_b < 0.95:
+                failures.append(f"{model}: correlação de b {corr_b:.3f} < 0.95")
+
+        # Mesmo resultado com outro tamanho de bloco (só muda a ordem das somas)
+        small, _ = calibrate(csv_path, '2pl', chunk_size=77_777)
+        if not np.allclose(small['b'], results['2pl']['b'], atol=2e-4) or \
+                not (small['difficulty'] == results['2pl']['difficulty']).all():
+            failures.append("2PL depende do tamanho do bloco")
+
+        if pq is not None:
+            parquet_path = os.path.join(tmp, 'user_answers.parquet')
+            pd.read_csv(csv_path, dtype={'is_correct': str}).assign(
+                is_correct=lambda df: df['is_correct'] == 't').to_parquet(parquet_path, index=False)
+            from_parquet, _ = calibrate(parquet_path, '2pl', chunk_size=250_000)
+            if not np.allclose(from_parquet['b'], results['2pl']['b'], atol=2e-4) or \
+                    not (from_parquet['difficulty'] == results['2pl']['difficulty']).all():
+                failures.append("Parquet e CSV divergem")
+
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("  ✅ parâmetros recuperados, resultado independente do bloco e do formato")
+
+
+if __name__ == "__main__":
+    main()
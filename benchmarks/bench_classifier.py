@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Microbenchmark e checagem golden: classificador compilado vs cadeias if/elif originais.
+
+As cadeias de reference_impl.classifier são as originais de cada extrator,
+sem alteração (as mesmas de tests/test_question_classifier.py). O
+classificador também casa, sem acento, palavras inteiras, então a referência
+é a mesma cadeia rodando sobre MatchText, cujo `in` implementa essa regra de
+forma direta; o delta para a cadeia original nos JSONs versionados é listado
+por completo (tests/test_question_classifier.py fixa esse delta). Falha
+(exit 1) se algum rótulo divergir da referência ou se variantes com e sem
+acento de um mesmo texto derem rótulos diferentes.
+
+Os tempos comparam a cadeia v2 com o classificador na primeira passada
+(cada chunk novo é varrido pelas regexes combinadas) e com os chunks já
+vistos, nos JSONs versionados e em enunciados do generate_workbook (o
+tamanho de uma planilha real); e a cadeia v3 com os nomes de curso. Nos
+JSONs versionados, pequenos e com quase toda palavra nova, a primeira
+passada custa mais que a cadeia; numa planilha inteira e com os chunks já
+vistos o classificador ganha.
+
+Uso: python benchmarks/bench_classifier.py [num_sinteticos] [--stems 20000] [--repeat 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append('.')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from generate_workbook import _stem
+from html_cleaning import clean_html_text
+from question_classifier import (
+    NAME_RULES, TEXT_CATEGORY_RULES, TEXT_CHALLENGE_RULES, KeywordClassifier, classify_clean_question,
+    classify_course, classify_name, classify_text,
+)
+from reference_impl.classifier import (
+    COURSE_NAMES, legacy_clean, legacy_course, legacy_name, legacy_text, load_samples, reference, synthetic_texts,
+)
+
+
+def workbook_stems(count, seed=7):
+    """Enunciados limpos como os de uma planilha do generate_workbook"""
+    rng = random.Random(seed)
+    return [clean_html_text(_stem(rng)) for _ in range(count)]
+
+
+def text_classifier():
+    """Classificador novo (tabela de chunks vazia) com as regras do TEXT_CLASSIFIER"""
+    return KeywordClassifier({'category': TEXT_CATEGORY_RULES, 'challenge': TEXT_CHALLENGE_RULES})
+
+
+def timed(label, func, items, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:42s} {best * 1000:8.1f} ms  ({len(items) / best:,.0f}/s)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_synthetic', nargs='?', type=int, default=2000)
+    parser.add_argument('--stems', type=int, default=20000, help="enunciados do generate_workbook")
+    parser.add_argument('--repeat', type=int, default=4, help="cópias de cada texto no classify_many")
+    args = parser.parse_args()
+
+    samples = load_samples()
+    synthetic = synthetic_texts(args.num_synthetic)
+    texts = samples + synthetic
+    courses = COURSE_NAMES + synthetic
+
+    def effective(classify):
+        # O extrator parte de challengeType OAB_1_FASE; None significa "não altera"
+        def wrapped(item):
+            category, challenge_type = classify(item)
+            return category, challenge_type or "OAB_1_FASE"
+        return wrapped
+
+    mismatches = 0
+    # delta vs cadeia original: só nos nomes de curso fixos e nos JSONs versionados
+    checks = [
+        ('v3 Name', legacy_name, classify_name, courses, COURSE_NAMES),
+        ('extract_questions curso', effective(legacy_course), effective(classify_course), courses, COURSE_NAMES),
+        ('extract_questions_v2 enunciado', legacy_text, classify_text, texts, samples),
+    ]
+    for label, legacy, compiled, items, real in checks:
+        bad = [item for item in items if reference(legacy)(item) != compiled(item)]
+        delta = [item for item in dict.fromkeys(real) if legacy(item) != compiled(item)]
+        mismatches += len(bad)
+        print(f"{'✅' if not bad else '❌'} {label}: {len(items) - len(bad)}/{len(items)} rótulos iguais "
+              f"(delta vs cadeia original: {len(delta)})")
+        for item in bad[:5]:
+            print(f"     {item[:60]!r}: {reference(legacy)(item)} != {compiled(item)}")
+        for item in delta:
+            print(f"     Δ {item[:60]!r}: {legacy(item)} -> {compiled(item)}")
+
+    def compiled_clean(pair):
+        category, challenge_type = classify_clean_question(*pair)
+        return category or pair[0], challenge_type or "OAB_1_FASE"
+
+    pairs = [(course, text) for course, text in zip(courses * 50, texts)]
+    bad = [pair for pair in pairs if reference(legacy_clean)(*pair) != compiled_clean(pair)]
+    delta = [pair for pair in pairs[:len(samples)] if legacy_clean(*pair) != compiled_clean(pair)]
+    mismatches += len(bad)
+    print(f"{'✅' if not bad else '❌'} clean_questions: {len(pairs) - len(bad)}/{len(pairs)} rótulos iguais "
+          f"(delta vs cadeia original: {len(delta)})")
+    for pair in delta:
+        print(f"     Δ {pair[0]!r}, {pair[1][:40]!r}: {legacy_clean(*pair)} -> {compiled_clean(pair)}")
+
+    variants = [('Direito Tributário', 'DIREITO TRIBUTARIO', classify_name),
+                ('Constituição Federal', 'CONSTITUICAO FEDERAL', classify_name),
+                ('Ética Profissional', 'etica profissional', classify_name),
+                ('Questão sobre a constituição', 'questao sobre a constituicao', classify_text),
+                ('Ministério Público estadual', 'ministerio publico estadual', classify_text),
+                ('Homicídio qualificado', 'HOMICIDIO QUALIFICADO', classify_text)]
+    bad = [(a, b) for a, b, classify in variants if classify(a) != classify(b) or classify(a) == (None, None)]
+    mismatches += len(bad)
+    print(f"{'✅' if not bad else '❌'} acentos: {len(variants) - len(bad)}/{len(variants)} pares com o mesmo rótulo")
+    for a, b in bad:
+        print(f"     {a!r} vs {b!r}")
+
+    print(f"\n⏱️  {len(texts)} textos (enunciados + alternativas):")
+    timed('cadeia v2 (if/elif)', legacy_text, texts)
+    classifier = text_classifier()
+    timed('classificador, 1ª passada', classifier.classify, texts, repeat=1)
+    timed('classificador, chunks já vistos', classifier.classify, texts)
+    repeated = texts * args.repeat
+    timed(f'cadeia v2, {args.repeat}x repetidos', legacy_text, repeated, repeat=1)
+    start = time.perf_counter()
+    text_classifier().classify_many(repeated)
+    elapsed = time.perf_counter() - start
+    print(f"  {f'classify_many, {args.repeat}x repetidos':42s} {elapsed * 1000:8.1f} ms  ({len(repeated) / elapsed:,.0f}/s)")
+
+    stems = workbook_stems(args.stems)
+    print(f"\n⏱️  {len(stems)} enunciados do generate_workbook:")
+    timed('cadeia v2 (if/elif)', legacy_text, stems)
+    timed('classificador, 1ª passada', text_classifier().classify, stems, repeat=1)
+
+    print(f"\n⏱️  {len(courses)} nomes de curso:")
+    timed('cadeia v3 Name (if/elif)', legacy_name, courses)
+    name_classifier = KeywordClassifier({'category': NAME_RULES})
+    timed('classificador, 1ª passada', name_classifier.classify, courses, repeat=1)
+    timed('classificador, chunks já vistos', name_classifier.classify, courses)
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Benchmark: detecção de quase-duplicatas (MinHash LSH) em N questões sintéticas.
+
+Planta ~5% de cópias com pequenas alterações de redação e confere o recall
+dessas cópias; numa amostra pequena compara com a busca exaustiva O(n²)
+(exit 1 se o LSH perder algum par acima do limiar). tests/test_question_dedup.py
+confere o recall e a busca exaustiva numa base pequena, com o mesmo gerador e
+a mesma referência de reference_impl.dedup.
+
+Uso: python benchmarks/bench_dedup.py [num_questoes] [limiar]
+"""
+import argparse
+import sys
+import time
+
+sys.path.append('.')
+from question_dedup import find_near_duplicates
+from reference_impl.dedup import brute_force_pairs, build_questions, clustered
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_questions', nargs='?', type=int, default=100000)
+    parser.add_argument('threshold', nargs='?', type=float, default=0.8)
+    args = parser.parse_args()
+
+    num_questions, threshold = args.num_questions, args.threshold
+    questions, planted = build_questions(num_questions)
+
+    start = time.perf_counter()
+    clusters = find_near_duplicates(questions, threshold)
+    elapsed = time.perf_counter() - start
+
+    group = clustered(clusters)
+    found = sum(1 for a, b in planted if a in group and group.get(a) == group.get(b))
+    print(f"📊 {num_questions} questões, limiar {threshold}")
+    print(f"  tempo: {elapsed:.2f}s ({num_questions / elapsed:,.0f} questões/s)")
+    print(f"  clusters: {len(clusters)}, questões duplicadas: {sum(len(c) - 1 for c in clusters)}")
+    print(f"  recall das cópias plantadas: {found}/{len(planted)}")
+
+    small, _ = build_questions(min(num_questions, 1500))
+    small_group = clustered(find_near_duplicates(small, threshold))
+    missed = [(i, j) for i, j in brute_force_pairs(small, threshold)
+              if i not in small_group or small_group.get(i) != small_group.get(j)]
+    if missed:
+        print(f"  ❌ {len(missed)} pares acima do limiar perdidos vs busca exaustiva ({len(small)} questões)")
+        sys.exit(1)
+    print(f"  ✅ nenhum par perdido vs busca exaustiva em {len(small)} questões")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Benchmark: exportação .xlsx em streaming (question_export) do banco colunar e, opcionalmente, do PostgreSQL.
+
+Gera um banco sintético, grava o .arrow e exporta nos dois layouts, medindo
+tempo e pico de memória (tracemalloc) com 1/10 e com o banco inteiro: o pico
+não pode crescer com o número de questões. Lê as planilhas de volta
+(xlsx_stream + assemble_questions_stream para o layout original) e confere
+enunciado, alternativas e resposta de cada questão. Com --dsn, carrega o
+banco num schema temporário e exporta pelo cursor do servidor também.
+Falha (exit 1) se algo divergir.
+
+Uso: python benchmarks/bench_export.py [num_questoes] [--dsn postgresql://...]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append('.')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from generate_workbook import COURSES, _options, _stem
+from question_assembly import assemble_questions_stream
+from question_columnar import columnar_available, write_question_bank
+from question_export import BATCH_SIZE, LETTERS, bank_questions, db_questions, export_questions
+from xlsx_stream import XlsxRowStream
+
+SCHEMA = 'bench_export'
+
+
+def build_questions(num_questions, seed=25):
+    rng = random.Random(seed)
+    categories = [course for course, _ in COURSES if course]
+    return [{
+        'id': f"Q{i + 1:06d}",
+        'text': _stem(rng) + (' \x0b' if i % 997 == 0 else ''),
+        'options': _options(rng),
+        'correctAnswerIndex': rng.randrange(4),
+        'difficulty': rng.randint(1, 5),
+        'category': rng.choice(categories),
+        'challengeType': rng.choice(['OAB_1_FASE', 'CONCURSOS_MPSP']),
+        'explanation': f"Questão {i}",
+    } for i in range(num_questions)]
+
+
+def expected(q):
+    # O exportador remove os caracteres de controle que o Excel rejeita
+    return q['id'], q['text'].replace('\x0b', ''), list(q['options']), q['correctAnswerIndex']
+
+
+def check_options_layout(path, questions):
+    stream = XlsxRowStream(path)
+    read = {q.id: (q.id, q.text, list(q.options), q.correct_answer_index)
+            for q in assemble_questions_stream(stream.groups())}
+    return [q['id'] for q in questions if read.get(q['id']) != expected(q)]
+
+
+def check_questions_layout(path, questions):
+    read = {}
+    for row in XlsxRowStream(path).records():
+        options = [row[f"Alternativa{letter}"] for letter in LETTERS]
+        read[row['ID']] = (row['ID'], row['Questao'], options, LETTERS.index(row['RespostaCorreta']))
+    return [q['id'] for q in questions if read.get(q['id']) != expected(q)]
+
+
+def traced_export(questions, path, layout):
+    """(summary, pico de memória em MB) de uma exportação"""
+    tracemalloc.start()
+    summary = export_questions(questions, path, layout)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return summary, peak
+
+
+def export_from_db(dsn, questions, tmp, failures):
+    from bench_bulk_load import CREATE_TABLE
+    from bulk_load_questions import connect, load_questions
+
+    with connect(dsn) as conn:
+        conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    scoped = f"{dsn}{'&' if '?' in dsn else '?'}options=-csearch_path%3D{SCHEMA}"
+    try:
+        with connect(scoped) as conn:
+            conn.execute(CREATE_TABLE)
+            load_questions(conn, questions)
+            path = os.path.join(tmp, 'db.xlsx')
+            summary, peak = traced_export(db_questions(conn), path, 'opcoes')
+            summary['seconds'] = export_questions(db_questions(conn), path, 'opcoes')['seconds']
+            bad = check_options_layout(path, questions)
+            if bad:
+                failures.append(f"banco: {len(bad)} questões diferentes na planilha (ex.: {bad[:3]})")
+            filtered = export_questions(db_questions(conn, 'CONCURSOS_MPSP'), path, 'questoes')
+            if filtered['questions'] != sum(q['challengeType'] == 'CONCURSOS_MPSP' for q in questions):
+                failures.append("banco: filtro por challengeType errado")
+        return summary, peak
+    finally:
+        with connect(dsn) as conn:
+            conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('questions', nargs='?', type=int, default=100000)
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'))
+    args = parser.parse_args()
+    if not columnar_available():
+        print("❌ Precisa de pyarrow (pip install '.[columnar]') para o banco colunar")
+        sys.exit(1)
+
+    questions = build_questions(args.questions)
+    small = questions[:max(1, len(questions) // 10)]
+    batch_size = min(BATCH_SIZE, len(small))
+    failures = []
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        arrow_path, small_arrow = os.path.join(tmp, 'bank.arrow'), os.path.join(tmp, 'small.arrow')
+        write_question_bank(questions, arrow_path)
+        write_question_bank(small, small_arrow)
+
+        for layout, check in (('opcoes', check_options_layout), ('questoes', check_questions_layout)):
+            path = os.path.join(tmp, f"{layout}.xlsx")
+            summary = export_questions(bank_questions(arrow_path), path, layout)
+            # Mesmo lote nas duas medidas: com lotes maiores que 1/10 do banco o pico seria só o lote
+            _, peak = traced_export(bank_questions(arrow_path, batch_size=batch_size), path, layout)
+            _, small_peak = traced_export(bank_questions(small_arrow, batch_size=batch_size),
+                                          os.path.join(tmp, 'small.xlsx'), layout)
+            results[layout] = (summary, peak, small_peak)
+            # Pico com o banco inteiro até 1.5x o de 1/10 (folga para buffers do zip e do lote)
+            if peak > 1.5 * small_peak + 1:
+                failures.append(f"{layout}: memória cresce com o banco ({small_peak:.1f} -> {peak:.1f} MB)")
+            start = time.perf_counter()
+            bad = check(path, questions)
+            results[layout] += (time.perf_counter() - start,)
+            if bad:
+                failures.append(f"{layout}: {len(bad)} questões diferentes na planilha (ex.: {bad[:3]})")
+
+        filtered = export_questions(bank_questions(arrow_path, 'OAB_1_FASE', questions[0]['category']),
+                                    os.path.join(tmp, 'filtered.xlsx'), 'questoes')
+        wanted = sum(q['challengeType'] == 'OAB_1_FASE' and q['category'] == questions[0]['category']
+                     for q in questions)
+        if filtered['questions'] != wanted:
+            failures.append(f"filtro: {filtered['questions']} questões exportadas, esperado {wanted}")
+
+        tiny = export_questions(bank_questions(small_arrow), os.path.join(tmp, 'split.xlsx'), 'opcoes',
+                                max_sheet_rows=1001)
+        if tiny['sheets'] != -(-len(small) * 4 // 1000) or tiny['rows'] != len(small) * 4:
+            failures.append(f"divisão em planilhas: {tiny['sheets']} planilhas, {tiny['rows']} linhas")
+
+        database = export_from_db(args.dsn, questions, tmp, failures) if args.dsn else None
+
+    print(f"📊 {len(questions):,} questões do banco colunar")
+    for layout, (summary, peak, small_peak, read_time) in results.items():
+        print(f"  {layout:9s} {summary['rows']:>9,} linhas  {summary['seconds']:6.2f}s "
+              f"({summary['questions'] / summary['seconds']:,.0f} questões/s)  {summary['bytes'] / 1e6:5.1f} MB  "
+              f"pico {small_peak:.1f} MB com 1/10, {peak:.1f} MB com tudo  (leitura de volta {read_time:.1f}s)")
+    if database:
+        summary, peak = database
+        print(f"  banco     {summary['rows']:>9,} linhas  {summary['seconds']:6.2f}s  pico {peak:.1f} MB "
+              f"(cursor no servidor)")
+    else:
+        print("  ⏭️  sem --dsn/DATABASE_URL: exportação pelo banco não medida")
+
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("  ✅ planilhas lidas de volta iguais ao banco, filtros e divisão em planilhas certos, memória constante")
+
+
+if __name__ == "__main__":
+    main()
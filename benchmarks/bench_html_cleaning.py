@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Benchmark: html_cleaning vs clean_html_text original (unescape + 2x re.sub), em MB/s.
+
+Confere também que as saídas são idênticas; falha (exit 1) se alguma divergir
+(tests/test_html_cleaning.py faz a mesma checagem, com a mesma referência
+de reference_impl.html_cleaning).
+
+Uso: python benchmarks/bench_html_cleaning.py [arquivo.json]
+"""
+import argparse
+import sys
+import time
+
+sys.path.append('.')
+from html_cleaning import clean_html_text, clean_many
+from reference_impl.html_cleaning import EDGE_CASES, legacy_clean_html_text, load_strings
+
+
+def measure(label, func, strings, nbytes, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(strings)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:34s} {nbytes / best / 1e6:8.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path', nargs='?', default='questions_diverse_sample.json')
+    args = parser.parse_args()
+
+    path = args.path
+    plain, wrapped = load_strings(path)
+
+    corpus = EDGE_CASES + plain + wrapped
+    bad = [s for s in corpus if legacy_clean_html_text(s) != clean_html_text(s)]
+    print(f"{'✅' if not bad else '❌'} {len(corpus) - len(bad)}/{len(corpus)} saídas idênticas")
+    for s in bad[:5]:
+        print(f"     {s[:60]!r}")
+
+    for label, strings in (('texto limpo', plain), ('texto com HTML/entidades', wrapped)):
+        nbytes = sum(len(s.encode('utf-8')) for s in strings)
+        print(f"\n⏱️  {path} — {label} ({nbytes / 1e6:.2f} MB, {len(strings)} strings):")
+        measure('original (unescape + 2x re.sub)', lambda xs: [legacy_clean_html_text(x) for x in xs], strings, nbytes)
+        measure('clean_html_text', lambda xs: [clean_html_text(x) for x in xs], strings, nbytes)
+        measure('clean_many (memo 4096)', clean_many, strings, nbytes)
+
+    if bad:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
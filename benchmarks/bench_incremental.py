@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Benchmark: limpeza completa vs modo incremental (manifesto por hash) com 1% de alterações.
+
+Roda em um diretório temporário; não toca nos JSONs do repositório. Depois
+remove uma questão (renumerando os Qxxxx), roda o modo completo e confere que
+um --incremental em seguida não vê delta e mantém a mesma saída, inclusive
+com o manifesto antigo no lugar; falha (exit 1) se divergir. As mesmas
+checagens, numa base pequena, estão em tests/test_incremental_import.py.
+
+Uso: python benchmarks/bench_incremental.py [num_questoes]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migrate_all_questions import load_and_clean_questions, load_and_clean_questions_incremental
+
+
+def build_raw_questions(num_questions, seed=3):
+    """Questões no formato de questions_from_new_excel.json, com HTML no enunciado"""
+    rng = random.Random(seed)
+    questions = []
+    for i in range(num_questions):
+        qid = str(40000 + i)
+        questions.append({
+            'id': qid,
+            'name': 'Direito Civil',
+            'text': f"<p>Enunciado {qid}&nbsp;sobre contratos e <b>responsabilidade</b> civil.</p>" * 3,
+            'options': [f"<span>Alternativa {letter} da questão {qid}</span>" for letter in 'ABCD'],
+            'correctAnswerIndex': rng.randrange(4),
+            'difficulty': 3,
+            'category': 'Direito Civil',
+            'challengeType': 'OAB_1_FASE',
+            'explanation': f"Questão {qid}"
+        })
+    return questions
+
+
+def run(func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    return time.perf_counter() - start, len(result)
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_full_then_incremental(raw):
+    """Divergências entre o modo completo e um --incremental logo depois (no diretório atual)"""
+    failures = []
+    stale = read_json('questions_manifest.json')
+    with open('questions_from_new_excel.json', 'w', encoding='utf-8') as f:
+        json.dump(raw[1:], f, ensure_ascii=False)
+    for label, manifest in (('manifesto do modo completo', None), ('manifesto antigo', stale)):
+        run(load_and_clean_questions)
+        full = read_json('questions_cleaned.json')
+        if manifest is not None:
+            with open('questions_manifest.json', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+        run(load_and_clean_questions_incremental)
+        if read_json('questions_cleaned.json') != full:
+            failures.append(f"{label}: --incremental depois do modo completo mudou questions_cleaned.json")
+        if manifest is None:
+            delta = read_json('questions_delta.json')
+            if any(delta.values()):
+                failures.append(f"{label}: delta não vazio sem alterações ({ {k: len(v) for k, v in delta.items()} })")
+        elif os.path.exists('questions_delta.json'):
+            # Manifesto antigo: volta ao modo completo, e um delta velho não pode ir para o banco
+            failures.append(f"{label}: questions_delta.json ficou no lugar depois do modo completo")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_questions', nargs='?', type=int, default=12000)
+    args = parser.parse_args()
+
+    num_questions = args.num_questions
+    raw = build_raw_questions(num_questions)
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with open('questions_from_new_excel.json', 'w', encoding='utf-8') as f:
+                json.dump(raw, f, ensure_ascii=False)
+
+            full_time, full_count = run(load_and_clean_questions)
+            os.remove('questions_manifest.json')
+            first_time, _ = run(load_and_clean_questions_incremental)
+
+            # 1% alteradas: metade editadas, metade trocadas por questões novas
+            rng = random.Random(11)
+            changes = max(2, num_questions // 100)
+            for i in rng.sample(range(num_questions), changes):
+                if i % 2:
+                    raw[i]['options'][0] += ' (revisada)'
+                else:
+                    raw[i] = dict(raw[i], id=f"N{i}")
+            with open('questions_from_new_excel.json', 'w', encoding='utf-8') as f:
+                json.dump(raw, f, ensure_ascii=False)
+
+            delta_time, delta_count = run(load_and_clean_questions_incremental)
+            delta = read_json('questions_delta.json')
+            failures = check_full_then_incremental(raw)
+        finally:
+            os.chdir(cwd)
+
+    print(f"📊 {num_questions} questões, {changes} alteradas (1%)")
+    print(f"  limpeza completa:             {full_time:.2f}s ({full_count} válidas)")
+    print(f"  incremental, primeira rodada: {first_time:.2f}s")
+    print(f"  incremental, 1% alterado:     {delta_time:.2f}s ({delta_count} válidas)")
+    print(f"  delta: {len(delta['added'])} inserir, {len(delta['changed'])} atualizar, {len(delta['deleted'])} remover")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("  ✅ --incremental depois do modo completo: sem delta e mesma saída (também com o manifesto antigo)")
+
+
+if __name__ == "__main__":
+    main()
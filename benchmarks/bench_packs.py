@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Benchmark: pacotes de sessão pré-calculados (session_packs) vs filtrar e embaralhar a cada partida.
+
+Monta um banco sintético com estratos desbalanceados e dificuldades de 1 a 5,
+gera ~10k pacotes (num processo e no pool) e mede a geração e a leitura de
+um pacote, contra o caminho de storage.getRandomQuestions (filtrar o banco
+inteiro e embaralhar). Confere que os pacotes não repetem questões, respeitam
+o filtro do estrato e as cotas por dificuldade, que a rotação usa cada
+questão antes de repetir, que um único pread devolve o pacote e que o
+arquivo independe do número de processos; falha (exit 1) se algo divergir.
+
+Uso: python benchmarks/bench_packs.py [num_questoes] [--packs 256] [--workers N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append('.')
+from question_model import Question
+from question_sampler import allocate_quotas
+from session_packs import ANY, MISSING, PackFile, build_packs
+
+CATEGORIES = ['Direito Civil', 'Direito Penal', 'Direito Constitucional', 'Direito Administrativo',
+              'Direito do Trabalho', 'Direito Tributário', 'Direito Empresarial', 'Ética Profissional',
+              'Direitos Humanos', 'Direito Ambiental', 'Direito do Consumidor', 'Direito Processual Civil']
+
+
+def build_questions(num_questions, seed=22):
+    """Banco com CONCURSOS ~5%, categorias com pesos decrescentes e dificuldade concentrada no meio"""
+    rng = random.Random(seed)
+    weights = [len(CATEGORIES) - i for i in range(len(CATEGORIES))]
+    return [Question.create(
+        f"Q{i + 1:06d}", f"Enunciado {i}", ('A', 'B', 'C', 'D'), i % 4,
+        rng.choices([1, 2, 3, 4, 5], [1, 3, 5, 3, 1])[0],
+        rng.choices(CATEGORIES, weights)[0],
+        'CONCURSOS_MPSP' if rng.random() < 0.05 else 'OAB_1_FASE',
+        f"Questão {i}",
+    ) for i in range(num_questions)]
+
+
+def random_questions(questions, count, challenge_type=None, category=None):
+    """storage.getRandomQuestions: filtra tudo e embaralha o resultado inteiro"""
+    found = [q for q in questions if (not challenge_type or q.challenge_type == challenge_type)
+             and (not category or q.category == category)]
+    random.shuffle(found)
+    return found[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('questions', nargs='?', type=int, default=50000)
+    parser.add_argument('--packs', type=int, default=256, help="pacotes por estrato")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    questions = build_questions(args.questions)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        serial_path, parallel_path = os.path.join(tmp, 'serial.bin'), os.path.join(tmp, 'parallel.bin')
+        serial = build_packs(questions, serial_path, args.packs, workers=1)
+        parallel = build_packs(questions, parallel_path, args.packs, workers=args.workers)
+        with open(serial_path, 'rb') as a, open(parallel_path, 'rb') as b:
+            if a.read() != b.read():
+                failures.append("arquivo muda com o número de processos")
+
+        packs = PackFile(serial_path)
+        difficulty = np.array([q.difficulty for q in questions])
+        labels = [(q.challenge_type, q.category) for q in questions]
+        for key, (first, count) in packs.strata.items():
+            challenge_type, category = [None if part == ANY else part for part in key.split('/')]
+            pool = [i for i, (t, c) in enumerate(labels) if (challenge_type in (None, t)) and (category in (None, c))]
+            levels, sizes = np.unique(difficulty[pool], return_counts=True)
+            size = min(packs.pack_size, len(pool))
+            low = [1] * len(sizes) if len(sizes) <= size else [0] * len(sizes)
+            quotas = allocate_quotas(size, sizes.tolist(), low, sizes.tolist())
+            rows = packs.packs[first * packs.pack_size:(first + count) * packs.pack_size].reshape(count, -1)
+            allowed = np.zeros(len(questions), dtype=bool)
+            allowed[pool] = True
+            if (rows[:, size:] != MISSING).any() or (rows[:, :size] == MISSING).any():
+                failures.append(f"{key}: tamanho de pacote errado")
+                continue
+            rows = rows[:, :size]
+            if not allowed[rows].all():
+                failures.append(f"{key}: pacote com questão fora do filtro")
+            if (np.diff(np.sort(rows, axis=1), axis=1) == 0).any():
+                failures.append(f"{key}: questão repetida num pacote")
+            for level, level_size, quota in zip(levels, sizes, quotas):
+                per_pack = (difficulty[rows] == level).sum(axis=1)
+                if (per_pack != quota).any():
+                    failures.append(f"{key}: dificuldade {level} fora da cota {quota}")
+                if quota:
+                    # Rotação: as primeiras level_size // quota cópias não repetem questões deste nível
+                    window = rows[:level_size // quota]
+                    drawn = window[difficulty[window] == level]
+                    if len(np.unique(drawn)) != len(drawn):
+                        failures.append(f"{key}: nível {level} repete antes de usar todas as questões")
+
+        # Leitura de um pacote: um pread no arquivo, ou a view do memory-map
+        keys = [(None, None), ('CONCURSOS_MPSP', None), ('OAB_1_FASE', 'Direito Ambiental'),
+                (None, 'Direito Civil')]
+        fd = os.open(serial_path, os.O_RDONLY)
+        try:
+            for challenge_type, category in keys:
+                for number in (0, 7, args.packs + 3):
+                    offset, length = packs.pack_range(challenge_type, category, number)
+                    read = np.frombuffer(os.pread(fd, length, offset), dtype=np.uint32)
+                    if read[read != MISSING].tolist() != packs.positions(challenge_type, category, number).tolist():
+                        failures.append(f"pread difere do pacote {number} de {challenge_type}/{category}")
+        finally:
+            os.close(fd)
+        if packs.pack('OAB_1_FASE', 'Estrato inexistente') != []:
+            failures.append("estrato inexistente devolveu questões")
+
+        picks = [keys[i % len(keys)] for i in range(2000)]
+        rng = random.Random(5)
+        start = time.perf_counter()
+        for challenge_type, category in picks:
+            packs.pack(challenge_type, category, rng=rng)
+        pack_time = (time.perf_counter() - start) / len(picks)
+        start = time.perf_counter()
+        for challenge_type, category in picks[:200]:
+            random_questions(questions, 20, challenge_type, category)
+        shuffle_time = (time.perf_counter() - start) / 200
+        file_size = os.path.getsize(serial_path)
+
+    print(f"📊 {args.questions:,} questões, {serial['strata']} estratos, {serial['packs']:,} pacotes de "
+          f"{packs.pack_size} ({file_size / 1e6:.1f} MB)")
+    print(f"  geração, 1 processo:          {serial['seconds']:6.2f}s")
+    print(f"  geração, pool ({args.workers or os.cpu_count()} processos):   {parallel['seconds']:6.2f}s")
+    print(f"  um pacote (memory-map):       {pack_time * 1e6:8.1f} µs")
+    print(f"  filtrar e embaralhar tudo:    {shuffle_time * 1e6:8.1f} µs ({shuffle_time / pack_time:,.0f}x)")
+
+    for failure in failures[:20]:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"  ✅ sem repetição, filtro e cotas por dificuldade respeitados, rotação completa, pread = pacote, "
+          f"arquivo igual com 1 ou N processos")
+
+
+if __name__ == "__main__":
+    main()
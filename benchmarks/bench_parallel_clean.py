@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark: limpeza (migrate_all_questions) e classificação (extract_questions_v3) em blocos paralelos.
+
+Gera questões brutas com o HTML do generate_workbook e nomes de curso
+distintos, roda as etapas clean e classify com 1, 2, ..., N processos
+(chunk_pool, blocos contíguos) e desenha a escala de cada etapa. Confere que
+o resultado e a ordem são os mesmos do processo único; falha (exit 1) se
+algum número de processos divergir.
+
+Uso: python benchmarks/bench_parallel_clean.py [num_questoes] [--max-workers N] [--names 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append('.')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from generate_workbook import COURSES, _options, _stem
+from migrate_all_questions import clean_questions
+from question_assembly import classify_names
+from question_model import Question
+
+BAR_WIDTH = 40
+
+
+def build_raw_questions(num_questions, seed=23):
+    rng = random.Random(seed)
+    return [Question.create(str(100000 + i), _stem(rng), _options(rng), rng.randrange(4), 3, 'Direito Geral',
+                            'OAB_1_FASE', f"Questão {100000 + i}", name=None) for i in range(num_questions)]
+
+
+def build_names(num_names, seed=24):
+    """Nomes distintos no estilo da coluna Name (curso + turma)"""
+    rng = random.Random(seed)
+    courses = [course for course, _ in COURSES if course]
+    return [f"{rng.choice(courses)} - Turma {i:05d} ({rng.choice(['noturno', 'intensivo', 'EAD'])})"
+            for i in range(num_names)]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def chart(title, timings):
+    """Barras de speedup em relação a 1 processo"""
+    base = timings[1]
+    best = max(base / seconds for seconds in timings.values())
+    print(f"\n📈 {title}")
+    for workers, seconds in timings.items():
+        speedup = base / seconds
+        bar = '█' * max(1, round(BAR_WIDTH * speedup / max(best, 1)))
+        print(f"  {workers:>2} proc {seconds:7.2f}s  {speedup:4.2f}x  {bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('questions', nargs='?', type=int, default=100000)
+    parser.add_argument('--max-workers', type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument('--names', type=int, default=20000)
+    args = parser.parse_args()
+
+    raw = build_raw_questions(args.questions)
+    names = build_names(args.names)
+    numbers = range(1, len(raw) + 1)
+    print(f"📊 {len(raw):,} questões brutas, {len(names):,} nomes distintos, {os.cpu_count()} núcleo(s) na máquina")
+
+    failures = []
+    clean_times, classify_times = {}, {}
+    expected_clean = expected_labels = None
+    for workers in range(1, args.max_workers + 1):
+        (cleaned, errors), clean_times[workers] = timed(clean_questions, raw, numbers, workers)
+        labels, classify_times[workers] = timed(classify_names, names, workers)
+        if workers == 1:
+            expected_clean, expected_labels = (cleaned, errors), labels
+            continue
+        if (cleaned, errors) != expected_clean:
+            failures.append(f"clean com {workers} processos difere de 1 processo")
+        if list(labels.items()) != list(expected_labels.items()):
+            failures.append(f"classify com {workers} processos difere de 1 processo")
+
+    chart(f"clean (HTML de texto, alternativas e explicação), {len(raw):,} questões", clean_times)
+    chart(f"classify (regras de nome), {len(names):,} nomes", classify_times)
+
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"\n  ✅ mesmo resultado, na mesma ordem, com 1 a {args.max_workers} processos")
+
+
+if __name__ == "__main__":
+    main()
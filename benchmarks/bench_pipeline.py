@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Benchmark: todos os extratores e as etapas de limpeza/amostra em planilhas sintéticas.
+
+As planilhas vêm de generate_workbook.py (10k, 100k, 1M linhas...) e ficam em
+cache em --data-dir. Cada script roda num subprocesso próprio, num diretório
+de trabalho temporário onde attached_assets/ aponta para a planilha, então o
+tempo e o pico de memória (RSS do filho, via wait4) de um não contaminam os
+do outro. Os scripts com --profile (v3, migrate_all_questions,
+create_better_sample) também contribuem com o tempo por etapa.
+
+Cada execução acrescenta uma linha JSON a --output com o commit, a máquina e
+os resultados; a tabela impressa compara com a última execução de outro
+commit no mesmo arquivo. Falha (exit 1) se o v3 em streaming não gerar o mesmo
+JSON que o v3 com pandas.
+
+Uso: python benchmarks/bench_pipeline.py [10k 100k 1M] [--only v3,clean] [--timeout 1800]
+                                         [--data-dir DIR] [--output bench_pipeline_results.jsonl]
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append('.')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from generate_workbook import DEFAULT_SEED, generate_workbook, parse_size
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = 'bench_pipeline_results.jsonl'
+DEFAULT_TIMEOUT = 1800
+# Nomes de arquivo fixos nos scripts
+WORKBOOK_V1 = 'Questões MC 1ª FASE e Concursos_1753714117406.xlsx'
+WORKBOOK_V3 = 'Questões MC 1ª FASE e Concursos_1753717156491.xlsx'
+V3_OUTPUT = 'questions_from_new_excel.json'
+PROFILE_PATH = 'profile.json'
+
+# (nome, script e argumentos); a ordem importa: clean usa a saída do v3, sample a do clean
+RUNS = [
+    ('extract_questions', ['extract_questions.py']),
+    ('extract_questions --stream', ['extract_questions.py', '--stream']),
+    ('extract_questions_v2', ['extract_questions_v2.py']),
+    ('extract_questions_v2 --stream', ['extract_questions_v2.py', '--stream']),
+    ('extract_questions_new', ['extract_questions_new.py']),
+    ('clean_questions', ['clean_questions.py']),
+    ('clean_questions --stream', ['clean_questions.py', '--stream']),
+    ('ingest_workbooks', ['ingest_workbooks.py', os.path.join('attached_assets', WORKBOOK_V3)]),
+    ('extract_questions_v3 --stream', ['extract_questions_v3.py', '--stream', '--profile', PROFILE_PATH]),
+    ('extract_questions_v3', ['extract_questions_v3.py', '--profile', PROFILE_PATH]),
+    ('clean', ['migrate_all_questions.py', '--profile', PROFILE_PATH]),
+    ('sample', ['create_better_sample.py', '--profile', PROFILE_PATH]),
+]
+
+
+def workbook_path(data_dir, size, seed):
+    """Cached synthetic workbook for this size/seed, generated on first use"""
+    path = os.path.join(data_dir, f"synthetic_{size}_seed{seed}.xlsx")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"🛠️  Gerando {path}...")
+        stats = generate_workbook(path + '.tmp', parse_size(size), seed)
+        os.replace(path + '.tmp', path)
+        print(f"   {stats['rows']} linhas, {stats['questions']} questões em {stats['seconds']:.1f}s")
+    return path
+
+
+def run_script(argv, workdir, timeout):
+    """Run one repo script in workdir; returns (status, seconds, peak_mb)"""
+    env = dict(os.environ, PYTHONPATH=REPO + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    with open(os.path.join(workdir, 'output.log'), 'a', encoding='utf-8') as log:
+        log.write(f"\n$ {' '.join(argv)}\n")
+        log.flush()
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, os.path.join(REPO, argv[0])] + argv[1:], cwd=workdir, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        if not hasattr(os, 'wait4'):  # Windows: sem rusage por filho
+            try:
+                returncode = proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+                return 'timeout', time.perf_counter() - start, None
+            return ('ok' if returncode == 0 else 'error'), time.perf_counter() - start, None
+
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() - start > timeout:
+                os.kill(proc.pid, signal.SIGKILL)
+                os.wait4(proc.pid, 0)
+                proc.returncode = -signal.SIGKILL
+                return 'timeout', time.perf_counter() - start, None
+            time.sleep(0.02)
+    seconds = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return ('ok' if proc.returncode == 0 else 'error'), seconds, usage.ru_maxrss / 1024
+
+
+def file_digest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def bench_size(size, workbook, selected, timeout):
+    """All selected runs against one workbook; returns (results, failures)"""
+    rows = parse_size(size)
+    results, failures, digests = [], [], {}
+    workdir = tempfile.mkdtemp(prefix=f"bench_pipeline_{size}_")
+    try:
+        os.makedirs(os.path.join(workdir, 'attached_assets'))
+        for name in (WORKBOOK_V1, WORKBOOK_V3):
+            os.symlink(os.path.abspath(workbook), os.path.join(workdir, 'attached_assets', name))
+
+        for name, argv in RUNS:
+            if not selected(name):
+                continue
+            profile_path = os.path.join(workdir, PROFILE_PATH)
+            if os.path.exists(profile_path):
+                os.remove(profile_path)
+            status, seconds, peak_mb = run_script(argv, workdir, timeout)
+            result = {'run': name, 'rows': rows, 'status': status, 'seconds': round(seconds, 3),
+                      'rows_per_second': round(rows / seconds, 1) if status == 'ok' else None,
+                      'peak_mb': round(peak_mb, 1) if peak_mb is not None else None}
+            if os.path.exists(profile_path):
+                with open(profile_path, 'r', encoding='utf-8') as f:
+                    result['stages'] = json.load(f)['stages']
+            if name.startswith('extract_questions_v3'):
+                digests[name] = file_digest(os.path.join(workdir, V3_OUTPUT))
+            results.append(result)
+            print(f"  {name:32s} {status:8s} {seconds:8.2f}s  "
+                  f"{result['peak_mb'] if result['peak_mb'] is not None else float('nan'):8.1f} MB")
+            if status != 'ok':
+                print(f"    (saída em {os.path.join(workdir, 'output.log')})")
+
+        if len(digests) == 2 and len(set(digests.values())) != 1:
+            failures.append(f"{size}: v3 --stream e v3 (pandas) geraram {V3_OUTPUT} diferentes")
+    finally:
+        if not any(r['status'] != 'ok' for r in results):
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results, failures
+
+
+def git_revision():
+    """(short commit, dirty flag) of the repo, or (None, None) outside git"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def previous_record(output, commit):
+    """Last record in the results file from another commit (None if there is none)"""
+    if not os.path.exists(output):
+        return None
+    previous = None
+    with open(output, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get('commit') != commit:
+                    previous = record
+    return previous
+
+
+def print_comparison(record, previous):
+    before = {(r['run'], r['rows']): r for r in previous['results']}
+    print(f"\n📈 Comparação com {previous['commit']} ({previous['date']}):")
+    for r in record['results']:
+        old = before.get((r['run'], r['rows']))
+        if not old or r['status'] != 'ok' or old['status'] != 'ok':
+            continue
+        memory = ''
+        if r['peak_mb'] and old['peak_mb']:
+            memory = f"  memória {r['peak_mb'] - old['peak_mb']:+8.1f} MB"
+        print(f"  {r['run']:32s} {r['rows']:>9,} linhas  tempo {old['seconds'] / r['seconds']:5.2f}x{memory}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('sizes', nargs='*', default=['10k', '100k'], help="tamanhos das planilhas (10k, 100k, 1M)")
+    parser.add_argument('--only', help="execuções cujo nome contém um destes termos (separados por vírgula)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="segundos por execução")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'bench_pipeline_workbooks'))
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    terms = [t.strip() for t in args.only.split(',')] if args.only else None
+    selected = lambda name: terms is None or any(t in name for t in terms)
+    commit, dirty = git_revision()
+    record = {
+        'commit': commit, 'dirty': dirty,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+        'seed': args.seed, 'results': [],
+    }
+
+    failures = []
+    for size in args.sizes:
+        workbook = workbook_path(args.data_dir, size, args.seed)
+        print(f"\n📊 {size} linhas ({os.path.getsize(workbook) / 1e6:.1f} MB)")
+        results, size_failures = bench_size(size, workbook, selected, args.timeout)
+        record['results'].extend(results)
+        failures.extend(size_failures)
+
+    previous = previous_record(args.output, commit)
+    with open(args.output, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    print(f"\n💾 Resultados acrescentados a {args.output} (commit {commit}{' + alterações' if dirty else ''})")
+    if previous:
+        print_comparison(record, previous)
+
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Benchmark: memória por etapa do StageProfiler (pipeline_profile) e custo da amostragem de RSS.
+
+Roda uma etapa que aloca e libera um bloco grande e depois uma etapa leve:
+o pico da etapa leve (peak_rss_mb) não pode herdar o da etapa pesada, que
+precisa ver o bloco; process_peak_rss_mb (ru_maxrss) continua cumulativo.
+Mede também quanto a amostragem custa numa etapa só de CPU. Falha (exit 1)
+se os picos não forem por etapa; tests/test_pipeline_profile.py confere o
+mesmo com um bloco menor.
+
+Uso: python benchmarks/bench_profiler.py [mb_alocados]
+"""
+import argparse
+import sys
+import time
+
+sys.path.append('.')
+from pipeline_profile import StageProfiler, current_rss_mb
+
+
+def busy(seconds):
+    """Laço em Python puro (cede o GIL ao amostrador como o código das etapas)"""
+    end = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < end:
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('size_mb', nargs='?', type=int, default=200, help="MB alocados na etapa pesada")
+    args = parser.parse_args()
+
+    size_mb = args.size_mb
+    if current_rss_mb() is None:
+        print("⏭️  Sem /proc/self/statm: pico por etapa indisponível nesta plataforma")
+        return
+
+    profiler = StageProfiler('bench_profiler', report_path='/dev/null')
+    with profiler.stage('heavy'):
+        block = bytearray(size_mb * 1024 * 1024)
+        busy(0.05)
+        del block
+    with profiler.stage('light'):
+        busy(0.05)
+    heavy, light = (record.to_dict() for record in profiler.records)
+
+    disabled = StageProfiler.disabled('bench_profiler')
+    with disabled.stage('cpu'):
+        plain = busy(0.5)
+    with profiler.stage('cpu'):
+        sampled = busy(0.5)
+
+    print(f"📊 Etapa que aloca {size_mb} MB e libera, seguida de uma etapa leve")
+    for stage in (heavy, light):
+        print(f"  {stage['stage']:6s} fim {stage['rss_mb']:7.1f} MB  pico da etapa {stage['peak_rss_mb']:7.1f} MB  "
+              f"pico do processo {stage['process_peak_rss_mb']:7.1f} MB")
+    print(f"  amostragem: {sampled / plain:.1%} das iterações de uma etapa sem profiler")
+
+    failures = []
+    if heavy['peak_rss_mb'] < heavy['rss_mb'] + 0.75 * size_mb:
+        failures.append(f"etapa pesada não viu o bloco de {size_mb} MB")
+    if light['peak_rss_mb'] > light['rss_mb'] + 0.25 * size_mb:
+        failures.append("etapa leve herdou o pico da etapa pesada")
+    if light['process_peak_rss_mb'] < heavy['peak_rss_mb']:
+        failures.append("process_peak_rss_mb deixou de ser cumulativo")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("  ✅ pico por etapa, pico do processo cumulativo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Benchmark: sorteios por segundo no QuestionBank (índices por filtro) vs filtrar + embaralhar tudo.
+
+O caminho antigo reproduz getRandomQuestions: filtra todas as questões,
+ordena com chave aleatória e pega as 20 primeiras. Com pyarrow instalado o
+banco é montado sobre uma tabela Arrow (como QuestionBank.load()). Confere
+também que QuestionBank.load() só usa o .arrow quando ele foi gravado a
+partir do JSON atual (digest nos metadados) e volta para o JSON quando os
+dois divergem; falha (exit 1) se não. tests/test_question_bank.py confere
+sorteios e a escolha entre .arrow e JSON numa base pequena.
+
+Uso: python benchmarks/bench_question_bank.py [tamanhos...]   (padrão: 10000 100000 1000000)
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append('.')
+from question_bank import QuestionBank
+from question_columnar import bank_is_current, columnar_available, questions_to_table, write_question_bank
+
+CATEGORIES = ['Direito Civil', 'Direito Penal', 'Direito Constitucional', 'Direito Administrativo',
+              'Direito do Trabalho', 'Direito Tributário', 'Direito Empresarial', 'Ética Profissional']
+SESSION_SIZE = 20
+
+
+def build_questions(num_questions, seed=2):
+    rng = random.Random(seed)
+    options = ['Alternativa A', 'Alternativa B', 'Alternativa C', 'Alternativa D']
+    return [{
+        'id': f"Q{i + 1:04d}",
+        'text': f"Enunciado {i}",
+        'options': options,
+        'correctAnswerIndex': i % 4,
+        'difficulty': 1 + i % 5,
+        'category': rng.choice(CATEGORIES),
+        'challengeType': 'CONCURSOS_MPSP' if rng.random() < 0.1 else 'OAB_1_FASE',
+        'explanation': '',
+    } for i in range(num_questions)]
+
+
+def legacy_random_questions(questions, count, challenge_type, category):
+    """Filtra tudo e embaralha por ordenação com chave aleatória (como sort(() => Math.random() - 0.5))"""
+    matching = [q for q in questions if q['challengeType'] == challenge_type and q['category'] == category]
+    matching.sort(key=lambda _: random.random())
+    return matching[:count]
+
+
+def draws_per_second(func, min_seconds=0.5, max_draws=100000):
+    draws = 0
+    start = time.perf_counter()
+    while draws < max_draws:
+        func()
+        draws += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+    return draws / elapsed
+
+
+def check_stale_bank(questions):
+    """Divergências de QuestionBank.load() com o .arrow em dia, desatualizado e sem digest"""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, arrow_path = os.path.join(tmp, 'questions_cleaned.json'), os.path.join(tmp, 'questions_cleaned.arrow')
+
+        def write_json(items):
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(items, f, ensure_ascii=False)
+
+        def loads_json(items):
+            bank = QuestionBank.load(json_path, arrow_path)
+            return bank.question_count() == len(items) and bank.get(questions[0]['id']) is None
+
+        write_json(questions)
+        write_question_bank(questions, arrow_path, json_path)
+        start = time.perf_counter()
+        current = bank_is_current(json_path, arrow_path)
+        elapsed = time.perf_counter() - start
+        if not current:
+            failures.append("banco recém-gravado visto como desatualizado")
+        # JSON regravado sem o .arrow (ex.: sem pyarrow naquela execução)
+        write_json(questions[1:])
+        if bank_is_current(json_path, arrow_path) or not loads_json(questions[1:]):
+            failures.append("JSON alterado depois do .arrow: load() não voltou para o JSON")
+        write_question_bank(questions[1:], arrow_path)
+        if bank_is_current(json_path, arrow_path):
+            failures.append(".arrow sem digest do JSON aceito")
+    return failures, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('sizes', nargs='*', type=int, default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    sizes = args.sizes
+    backend = 'Arrow' if columnar_available() else 'dicts'
+    print(f"📊 Sessões de {SESSION_SIZE} questões, banco sobre {backend}")
+    print(f"  {'questões':>10s} {'índice':>10s} {'só posições':>14s} {'tipo+categoria':>16s} {'só tipo':>12s} {'legado':>12s}")
+
+    for size in sizes:
+        questions = build_questions(size)
+        table = questions_to_table(questions) if columnar_available() else None
+        start = time.perf_counter()
+        bank = QuestionBank.from_table(table) if table is not None else QuestionBank.from_questions(questions)
+        build = time.perf_counter() - start
+
+        positions = draws_per_second(lambda: bank.random_positions(SESSION_SIZE, 'OAB_1_FASE', 'Direito Civil'))
+        filtered = draws_per_second(lambda: bank.random_questions(SESSION_SIZE, 'OAB_1_FASE', 'Direito Civil'))
+        by_type = draws_per_second(lambda: bank.random_questions(SESSION_SIZE, 'OAB_1_FASE'))
+        legacy = draws_per_second(lambda: legacy_random_questions(questions, SESSION_SIZE, 'OAB_1_FASE', 'Direito Civil'),
+                                  max_draws=200)
+
+        print(f"  {size:>10,d} {build:>9.2f}s {positions:>12,.0f}/s {filtered:>12,.0f}/s {by_type:>10,.0f}/s {legacy:>10,.1f}/s")
+
+    if columnar_available():
+        failures, elapsed = check_stale_bank(questions)
+        print(f"  conferência .arrow x JSON ({len(questions):,} questões): {elapsed * 1000:.0f} ms")
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        if failures:
+            sys.exit(1)
+        print("  ✅ load() usa o .arrow só quando corresponde ao JSON")
+
+
+if __name__ == "__main__":
+    main()
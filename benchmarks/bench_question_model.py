@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark: memória de dicts vs Question (question_model) para o banco de questões.
+
+Mede com tracemalloc o que fica retido depois de carregar
+questions_diverse_sample.json como lista de dicts (json.load) e como lista de
+Question (questions_from_dicts), e o mesmo para um banco sintético maior,
+feito replicando a amostra com ids novos. Confere que to_dict regrava o
+arquivo byte a byte, que pickle preserva as questões e que o acesso por campo
+do JSON (q['challengeType']) devolve o mesmo que o dict; falha (exit 1) se
+algo divergir.
+
+Uso: python benchmarks/bench_question_model.py [num_questoes] [--sample questions_diverse_sample.json]
+"""
+import argparse
+import gc
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append('.')
+from question_model import JSON_FIELDS, question_dicts, questions_from_dicts
+from ts_emitter import write_json_file
+
+
+def retained_bytes(load):
+    """Bytes still allocated after load() returns (its result kept alive)"""
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def replicate(records, num_questions):
+    """JSON text of num_questions records cycling through the sample, each with its own id"""
+    return json.dumps([dict(records[i % len(records)], id=f"S{i:07d}") for i in range(num_questions)],
+                      ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('questions', nargs='?', type=int, default=100000)
+    parser.add_argument('--sample', default='questions_diverse_sample.json')
+    args = parser.parse_args()
+
+    with open(args.sample, 'r', encoding='utf-8') as f:
+        sample_bytes = f.read()
+    bank = replicate(json.loads(sample_bytes), args.questions)
+
+    rows = []
+    failures = []
+    for label, payload in ((os.path.basename(args.sample), sample_bytes), (f"sintético {args.questions:,}", bank)):
+        dicts, dict_bytes = retained_bytes(lambda: json.loads(payload))
+        start = time.perf_counter()
+        questions, question_bytes = retained_bytes(lambda: questions_from_dicts(json.loads(payload)))
+        convert_time = time.perf_counter() - start
+        rows.append((label, len(dicts), dict_bytes, question_bytes, convert_time))
+
+        for record, question in zip(dicts, questions):
+            by_field = {field: question.get(field) for field in JSON_FIELDS if field != 'options'}
+            if question.to_dict() != record or by_field != {field: record.get(field) for field in by_field}:
+                failures.append(f"{label}: {record['id']} difere do dict")
+                break
+        if pickle.loads(pickle.dumps(questions)) != questions:
+            failures.append(f"{label}: pickle alterou as questões")
+        del dicts, questions
+
+    # Ida e volta pelo arquivo: Question -> to_dict -> write_json_file = arquivo original
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'roundtrip.json')
+        write_json_file(path, question_dicts(questions_from_dicts(json.loads(sample_bytes))))
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() != sample_bytes.rstrip('\n'):
+                failures.append(f"{args.sample} regravado difere do original")
+
+    print(f"📊 Memória retida (tracemalloc): lista de dicts vs lista de Question")
+    for label, count, dict_bytes, question_bytes, convert_time in rows:
+        print(f"  {label:<32} {count:>8,} questões: dicts {dict_bytes / 1e6:7.1f} MB "
+              f"({dict_bytes / count:,.0f} B/questão), Question {question_bytes / 1e6:7.1f} MB "
+              f"({question_bytes / count:,.0f} B/questão), -{1 - question_bytes / dict_bytes:.0%}; "
+              f"carga {convert_time:.2f}s")
+
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"  ✅ to_dict = registro original, {args.sample} regravado byte a byte, pickle preserva as questões")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Benchmark: rollup incremental de estatísticas por usuário (user_stats_rollup) vs recálculo completo.
+
+Gera um histórico sintético de user_answers dividido em lotes (CSV e, com
+pyarrow, Parquet), aplica os lotes um a um como um job periódico e mede a
+vazão. Confere o snapshot contra um groupby sobre todas as respostas de uma
+vez, as respostas de stats_from_rows contra uma versão em Python de
+getUserStats (server/storage.ts) e que reaplicar os lotes não conta nada em
+dobro; falha (exit 1) se algo divergir.
+
+Uso: python benchmarks/bench_rollup.py [num_respostas] [--batches 10] [--users 50000]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from difficulty_calibration import pq
+from user_stats_rollup import KEY_COLUMNS, StatsRollup, stats_from_rows, update_snapshot, user_rows
+
+CATEGORIES = ['Direito Civil', 'Direito Penal', 'Direito Constitucional', 'Direito Administrativo',
+              'Direito do Trabalho', 'Direito Tributário', 'Direito Empresarial', 'Ética Profissional',
+              'Direitos Humanos', 'Direito Ambiental', 'Direito do Consumidor', 'Direito Processual Civil']
+
+
+def write_batches(directory, num_answers, num_batches, num_users, seed=11):
+    """Synthetic user_answers split into batch files; returns their paths"""
+    rng = np.random.default_rng(seed)
+    weights = np.arange(len(CATEGORIES), 0, -1, dtype=float)
+    weights /= weights.sum()
+    user_ids = np.array([f"user-{i:06d}" for i in range(num_users)], dtype=object)
+    categories = np.array(CATEGORIES, dtype=object)
+    paths, per_batch = [], math.ceil(num_answers / num_batches)
+    for batch, start in enumerate(range(0, num_answers, per_batch)):
+        size = min(per_batch, num_answers - start)
+        # Usuários ativos com frequências bem diferentes (poucos respondem muito)
+        users = np.minimum(rng.zipf(1.3, size) - 1, num_users - 1)
+        frame = pd.DataFrame({
+            'id': [f"a{i}" for i in range(start, start + size)],
+            'user_id': user_ids[rng.permutation(num_users)[users] if batch % 2 else users],
+            'question_id': [f"Q{i:06d}" for i in rng.integers(0, 20000, size)],
+            'is_correct': rng.random(size) < 0.6,
+            'time_spent': rng.integers(3, 90, size),
+            'challenge_type': np.where(rng.random(size) < 0.1, 'CONCURSOS_MPSP', 'OAB_1_FASE'),
+            'category': categories[rng.choice(len(CATEGORIES), size, p=weights)],
+        })
+        if pq is not None and batch % 2:
+            path = os.path.join(directory, f"user_answers_{batch:04d}.parquet")
+            frame.to_parquet(path, index=False)
+        else:
+            path = os.path.join(directory, f"user_answers_{batch:04d}.csv")
+            frame.assign(is_correct=np.where(frame['is_correct'], 't', 'f')).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def read_all(paths):
+    frames = [pd.read_parquet(p) if p.endswith('.parquet') else
+              pd.read_csv(p).assign(is_correct=lambda df: df['is_correct'] == 't') for p in paths]
+    return pd.concat(frames, ignore_index=True)
+
+
+def reference_stats(answers, challenge_type=None):
+    """getUserStats linha a linha (categorias empatadas em total: ordem alfabética, como no rollup)"""
+    if challenge_type:
+        answers = [a for a in answers if a['challenge_type'] == challenge_type]
+    total = len(answers)
+    correct = sum(1 for a in answers if a['is_correct'])
+    categories = {}
+    for answer in answers:
+        current = categories.setdefault(answer['category'], {'total': 0, 'correct': 0})
+        current['total'] += 1
+        if answer['is_correct']:
+            current['correct'] += 1
+    category_stats = [{'category': category, 'total': s['total'], 'correct': s['correct'],
+                       'percentage': math.floor(s['correct'] / s['total'] * 100 + 0.5)}
+                      for category, s in sorted(categories.items())]
+    category_stats.sort(key=lambda s: -s['total'])
+    return {
+        'totalAnswered': total,
+        'correctAnswers': correct,
+        'incorrectAnswers': total - correct,
+        'averageTimeSpent': math.floor(sum(a['time_spent'] for a in answers) / total + 0.5) if total else 0,
+        'categoryStats': category_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('answers', nargs='?', type=int, default=2_000_000)
+    parser.add_argument('--batches', type=int, default=10)
+    parser.add_argument('--users', type=int, default=50000)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_batches(tmp, args.answers, args.batches, args.users)
+        snapshot_path = os.path.join(tmp, 'user_stats_snapshot.csv')
+        manifest_path = os.path.join(tmp, 'user_stats_rollup.json')
+
+        start = time.perf_counter()
+        for path in paths:
+            update_snapshot([path], snapshot_path, manifest_path)
+        incremental_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        in_memory = StatsRollup()
+        for path in paths:
+            in_memory.apply_batch(path)
+        fold_time = time.perf_counter() - start
+
+        applied, skipped, _ = update_snapshot(paths, snapshot_path, manifest_path)
+        if applied or len(skipped) != len(paths):
+            failures.append("lotes reaplicados")
+
+        start = time.perf_counter()
+        answers = read_all(paths)
+        expected = (answers.assign(correct=answers['is_correct'].astype(np.int64))
+                    .groupby(KEY_COLUMNS, as_index=False)
+                    .agg(total=('correct', 'size'), correct=('correct', 'sum'), time_sum=('time_spent', 'sum')))
+        recompute_time = time.perf_counter() - start
+
+        snapshot = pd.read_csv(snapshot_path, dtype={column: str for column in KEY_COLUMNS}, keep_default_na=False)
+        if not snapshot.equals(expected.astype(snapshot.dtypes.to_dict())):
+            failures.append("snapshot difere do recálculo completo")
+        if not in_memory.snapshot().equals(snapshot):
+            failures.append("snapshot em memória difere do gravado")
+
+        rng = random.Random(3)
+        users = sorted(answers['user_id'].unique())
+        sample = rng.sample(users, min(200, len(users)))
+        by_user = {user: group.to_dict('records') for user, group in answers[answers['user_id'].isin(sample)]
+                   .groupby('user_id')}
+        lookup, scan = [], []
+        for user in sample:
+            for challenge_type in (None, 'OAB_1_FASE', 'CONCURSOS_MPSP'):
+                begin = time.perf_counter()
+                stats = stats_from_rows(user_rows(snapshot, user), challenge_type)
+                lookup.append(time.perf_counter() - begin)
+                if stats != reference_stats(by_user[user], challenge_type):
+                    failures.append(f"getUserStats diverge para {user} ({challenge_type})")
+            begin = time.perf_counter()
+            answers[answers['user_id'] == user]
+            scan.append(time.perf_counter() - begin)
+        lookup.sort()
+        scan.sort()
+
+    print(f"📊 {args.answers:,} respostas em {len(paths)} lotes, {len(snapshot):,} linhas no snapshot "
+          f"({answers['user_id'].nunique():,} usuários)")
+    print(f"  rollup incremental (lote a lote, com snapshot): {incremental_time:6.2f}s "
+          f"({args.answers / incremental_time:,.0f} respostas/s)")
+    print(f"  só acumular (sem gravar):                        {fold_time:6.2f}s "
+          f"({args.answers / fold_time:,.0f} respostas/s)")
+    print(f"  recálculo completo (groupby de tudo):            {recompute_time:6.2f}s")
+    print(f"  estatísticas de um usuário: snapshot p50 {lookup[len(lookup) // 2] * 1000:.2f} ms, "
+          f"varrer respostas p50 {scan[len(scan) // 2] * 1000:.2f} ms")
+
+    for failure in failures[:20]:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"  ✅ snapshot idêntico ao recálculo completo; getUserStats igual em {len(lookup)} consultas; lotes não reaplicados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark: amostragem estratificada (índice challengeType × categoria) vs varreduras completas.
+
+Confere reprodutibilidade por semente, soma/limites das cotas e ausência de
+repetição; falha (exit 1) se alguma verificação divergir. As verificações
+também rodam no pytest (tests/test_question_sampler.py).
+
+Uso: python benchmarks/bench_sampler.py [num_questoes] [num_coortes]
+"""
+import argparse
+import random
+import sys
+import time
+
+sys.path.append('.')
+from question_sampler import StratifiedSampler
+
+CATEGORIES = ['Direito Civil', 'Direito Penal', 'Direito Constitucional', 'Direito Administrativo',
+              'Direito do Trabalho', 'Direito Tributário', 'Direito Empresarial', 'Ética Profissional',
+              'Direitos Humanos', 'Direito Ambiental', 'Direito do Consumidor', 'Direito Processual Civil']
+
+
+def build_labels(num_questions, seed=5):
+    """Rótulos com estratos desbalanceados (CONCURSOS ~3%, categorias com pesos decrescentes)"""
+    rng = random.Random(seed)
+    weights = [len(CATEGORIES) - i for i in range(len(CATEGORIES))]
+    labels = []
+    for _ in range(num_questions):
+        challenge_type = 'CONCURSOS_MPSP' if rng.random() < 0.03 else 'OAB_1_FASE'
+        labels.append({'challengeType': challenge_type, 'category': rng.choices(CATEGORIES, weights)[0]})
+    return labels
+
+
+def full_scan_sample(labels, sample_size, rng):
+    """Estilo anterior: filtra a lista inteira por estrato e embaralha cada filtro"""
+    drawn = []
+    strata = {(q['challengeType'], q['category']) for q in labels}
+    per_stratum = max(1, sample_size // len(strata))
+    for challenge_type, category in sorted(strata):
+        pool = [i for i, q in enumerate(labels) if q['challengeType'] == challenge_type and q['category'] == category]
+        rng.shuffle(pool)
+        drawn.extend(pool[:per_stratum])
+    return drawn
+
+
+def check(condition, message, failures):
+    if not condition:
+        failures.append(message)
+        print(f"  ❌ {message}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_questions', nargs='?', type=int, default=100000)
+    parser.add_argument('num_cohorts', nargs='?', type=int, default=1000)
+    args = parser.parse_args()
+
+    num_questions, num_cohorts = args.num_questions, args.num_cohorts
+    labels = build_labels(num_questions)
+    failures = []
+
+    start = time.perf_counter()
+    sampler = StratifiedSampler(labels)
+    index_time = time.perf_counter() - start
+    sizes = sampler.sizes()
+
+    for mode in ('proportional', 'equal'):
+        quotas = sampler.quotas(200, mode=mode, min_per_stratum=2, max_per_stratum=30)
+        check(sum(quotas.values()) == 200, f"{mode}: cotas somam {sum(quotas.values())}", failures)
+        check(all(min(2, sizes[s]) <= c <= min(30, sizes[s]) for s, c in quotas.items()), f"{mode}: cota fora de [min, max]", failures)
+        first = sampler.sample(quotas, seed=7)
+        check(first == sampler.sample(quotas, seed=7), f"{mode}: mesma semente, amostras diferentes", failures)
+        check(len(set(first)) == len(first) == 200, f"{mode}: posições repetidas", failures)
+        check(all((labels[i]['challengeType'], labels[i]['category']) in quotas for i in first),
+              f"{mode}: posição fora dos estratos", failures)
+
+    exact = sampler.quotas(100, mode='proportional')
+    expected = {s: 100 * n / num_questions for s, n in sizes.items()}
+    check(all(abs(exact[s] - expected[s]) < 1 for s in sizes), "proporcional: desvio maior que o arredondamento", failures)
+
+    quotas = sampler.quotas(100, mode='proportional', min_per_stratum=1)
+
+    start = time.perf_counter()
+    cohorts = sampler.sample_cohorts([f"coorte{i}" for i in range(num_cohorts)], quotas, seed=42)
+    cohort_time = time.perf_counter() - start
+    check(len({tuple(v) for v in cohorts.values()}) > 1, "coortes idênticas", failures)
+
+    scans = max(1, min(num_cohorts, 20))
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(scans):
+        full_scan_sample(labels, 100, rng)
+    scan_time = (time.perf_counter() - start) / scans
+
+    per_draw = cohort_time / num_cohorts
+    print(f"📊 {num_questions} questões, {len(sizes)} estratos, amostras de {sum(quotas.values())}")
+    print(f"  índice (uma vez):           {index_time * 1000:8.1f} ms")
+    print(f"  amostra via índice:         {per_draw * 1e6:8.1f} µs ({num_cohorts} coortes em {cohort_time * 1000:.1f} ms)")
+    print(f"  varredura completa/amostra: {scan_time * 1e6:8.1f} µs ({scan_time / per_draw:.0f}x)")
+
+    if failures:
+        sys.exit(1)
+    print("  ✅ cotas, sementes e unicidade conferidas")
+
+
+if __name__ == "__main__":
+    main()
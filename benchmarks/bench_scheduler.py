@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Benchmark: agendador SM-2 (review_scheduler) com 100k usuários num processo.
+
+Gera um histórico sintético de user_answers (usuários com categorias fracas,
+questões repetidas ao longo do tempo), monta o estado, mede seleções e
+respostas por segundo, tamanho do estado e ida e volta pelo .npz. Confere o
+replay vetorizado contra um SM-2 resposta a resposta, que a seleção traz
+primeiro as revisões vencidas na ordem do heap, sem repetir questões nem
+alterar o estado, e que o estado carregado seleciona o mesmo; falha (exit 1)
+se algo divergir.
+
+Uso: python benchmarks/bench_scheduler.py [num_usuarios] [--answers-per-user 30] [--questions 10000]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('.')
+from review_scheduler import (INITIAL_EASE, ITEM_BITS, ITEM_MASK, MIN_EASE, MINUTES_PER_DAY, ReviewScheduler,
+                              answer_quality)
+
+CATEGORIES = ['Direito Civil', 'Direito Penal', 'Direito Constitucional', 'Direito Administrativo',
+              'Direito do Trabalho', 'Direito Tributário', 'Direito Empresarial', 'Ética Profissional',
+              'Direitos Humanos', 'Direito Ambiental', 'Direito do Consumidor', 'Direito Processual Civil']
+NOW = pd.Timestamp('2025-06-01', tz='UTC').timestamp()
+
+
+def write_answers(path, num_users, per_user, num_questions, seed=21):
+    """Synthetic export: each user has one weak category; ~15% of answers repeat an earlier question"""
+    rng = np.random.default_rng(seed)
+    question_category = rng.integers(0, len(CATEGORIES), num_questions)
+    weak = rng.integers(0, len(CATEGORIES), num_users)
+    num_answers = num_users * per_user
+    user = np.repeat(np.arange(num_users), per_user)
+    question = rng.integers(0, num_questions, num_answers)
+    repeat = rng.random(num_answers) < 0.15
+    previous = np.r_[question[0], question[:-1]]
+    question = np.where(repeat & (np.r_[-1, user[:-1]] == user), previous, question)
+    accuracy = np.where(question_category[question] == weak[user], 0.35, 0.75)
+    start = pd.Timestamp('2025-01-01', tz='UTC').value // 10 ** 9
+    seconds = np.sort(rng.integers(start, int(NOW), num_answers).reshape(num_users, per_user), axis=1).ravel()
+    frame = pd.DataFrame({
+        'id': np.arange(num_answers),
+        'user_id': np.char.add('user-', np.arange(num_users).astype(str))[user],
+        'question_id': np.char.add('Q', np.arange(num_questions).astype(str))[question],
+        'is_correct': np.where(rng.random(num_answers) < accuracy, 't', 'f'),
+        'time_spent': rng.integers(5, 100, num_answers),
+        'challenge_type': np.where(question % 10 == 0, 'CONCURSOS_MPSP', 'OAB_1_FASE'),
+        'category': np.array(CATEGORIES)[question_category[question]],
+        'created_at': pd.to_datetime(seconds, unit='s', utc=True).strftime('%Y-%m-%d %H:%M:%S+00'),
+    })
+    frame.to_csv(path, index=False)
+    return frame, weak
+
+
+def reference_states(answers):
+    """SM-2 resposta a resposta em Python: {(user, question): (reps, interval, ease, lapses, due)}"""
+    states = {}
+    for row in answers.sort_values('created_at', kind='stable').itertuples(index=False):
+        reps, interval, ease, lapses, _ = states.get((row.user_id, row.question_id), (0, 0.0, INITIAL_EASE, 0, 0))
+        quality = int(answer_quality(np.array([row.is_correct == 't']), np.array([row.time_spent]))[0])
+        if quality < 3:
+            reps, interval, lapses = 0, 1.0, lapses + 1
+        else:
+            reps += 1
+            interval = 1.0 if reps == 1 else 6.0 if reps == 2 else float(np.float32(interval) * np.float32(ease))
+        ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        minute = pd.Timestamp(row.created_at).value // (60 * 10 ** 9)
+        states[(row.user_id, row.question_id)] = (reps, float(np.float32(interval)), float(np.float32(ease)),
+                                                 lapses, minute + round(float(np.float32(interval)) * MINUTES_PER_DAY))
+    return states
+
+
+def valid_keys(scheduler, user):
+    heap = scheduler.heaps[user]
+    return sorted(key for key in heap if scheduler.items['item_key'][key & ITEM_MASK] == key)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('users', nargs='?', type=int, default=100000)
+    parser.add_argument('--answers-per-user', type=int, default=30)
+    parser.add_argument('--questions', type=int, default=10000)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'user_answers.csv')
+        start = time.perf_counter()
+        answers, weak = write_answers(csv_path, args.users, args.answers_per_user, args.questions)
+        print(f"🛠️  {len(answers):,} respostas sintéticas em {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        scheduler = ReviewScheduler.from_answers([csv_path])
+        build_time = time.perf_counter() - start
+
+        # Replay vetorizado vs SM-2 sequencial, numa amostra de usuários
+        rng = random.Random(4)
+        sample_users = [f"user-{i}" for i in rng.sample(range(args.users), min(300, args.users))]
+        expected = reference_states(answers[answers['user_id'].isin(sample_users)])
+        items = scheduler.items
+        for (user_id, question_id), (reps, interval, ease, lapses, due) in expected.items():
+            user, question = scheduler.users.index[user_id], scheduler.questions.index[question_id]
+            item = int(scheduler.seen_items[user][np.searchsorted(scheduler.seen[user], question)])
+            got = (int(items['reps'][item]), float(items['interval'][item]), float(items['ease'][item]),
+                   int(items['lapses'][item]), int(items['due'][item]))
+            if got[0] != reps or got[3] != lapses or not math.isclose(got[1], interval, rel_tol=1e-5) or \
+                    not math.isclose(got[2], ease, rel_tol=1e-5) or abs(got[4] - due) > 1:
+                failures.append(f"estado SM-2 diverge em {user_id}/{question_id}: {got} != "
+                                f"{(reps, interval, ease, lapses, due)}")
+
+        # Seleção: vencidas primeiro, na ordem das chaves; sem repetição; estado intacto
+        now_minute = int(NOW // 60)
+        for user_id in sample_users:
+            user = scheduler.users.index[user_id]
+            before = valid_keys(scheduler, user)
+            picked = scheduler.next_questions(user_id, 20, now=NOW, rng=random.Random(1))
+            due = [scheduler.questions.labels[scheduler.items['item_question'][key & ITEM_MASK]]
+                   for key in before if key >> ITEM_BITS <= now_minute][:20]
+            if picked[:len(due)] != due or len(set(picked)) != len(picked) or len(picked) != 20:
+                failures.append(f"seleção de {user_id} fora de ordem ou repetida")
+            if valid_keys(scheduler, user) != before:
+                failures.append(f"seleção alterou o heap de {user_id}")
+
+        # Vazão: seleções e respostas
+        selection_users = [f"user-{i}" for i in np.random.default_rng(2).integers(0, args.users, 20000)]
+        start = time.perf_counter()
+        picks = [scheduler.next_questions(user_id, 20, now=NOW) for user_id in selection_users]
+        select_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for user_id, picked in zip(selection_users[:5000], picks):
+            for question_id in picked[:4]:
+                scheduler.record_answer(user_id, question_id, True, 15, now=NOW)
+        record_time = time.perf_counter() - start
+        # Lazy deletion: a chave nova do par vale, a antiga é descartada quando sai do heap
+        user = scheduler.users.index[selection_users[0]]
+        for question_id in picks[0][:4]:
+            question = scheduler.questions.index[question_id]
+            item = scheduler.seen_items[user][np.searchsorted(scheduler.seen[user], question)]
+            if scheduler.items['due'][item] <= now_minute:
+                failures.append(f"{question_id} respondida continua vencida")
+        after = scheduler.next_questions(selection_users[0], 20, now=NOW)
+        if len(set(after)) != len(after):
+            failures.append("seleção repetida depois de respostas")
+
+        # Viés para a categoria fraca nas questões novas
+        weak_share, new_total = 0, 0
+        for user_id in sample_users:
+            user = scheduler.users.index[user_id]
+            picked = scheduler.next_questions(user_id, 60, now=NOW, rng=random.Random(7))
+            seen = set(scheduler.seen[user].tolist())
+            for question_id in picked:
+                question = scheduler.questions.index[question_id]
+                if question not in seen:
+                    new_total += 1
+                    weak_share += CATEGORIES.index(scheduler.categories.labels[scheduler.question_category[question]]) \
+                        == weak[int(user_id.split('-')[1])]
+
+        state_path = os.path.join(tmp, 'review_state.npz')
+        start = time.perf_counter()
+        scheduler.save(state_path)
+        save_time = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = ReviewScheduler.load(state_path)
+        load_time = time.perf_counter() - start
+        # Ida e volta: em todo usuário o heap carregado é um heap, com as mesmas chaves válidas e o mesmo topo
+        broken = []
+        for user, user_id in enumerate(scheduler.users.labels):
+            heap, keys = np.asarray(loaded.heaps[user]), valid_keys(scheduler, user)
+            if (heap[1:] < heap[(np.arange(1, len(heap)) - 1) // 2]).any() or valid_keys(loaded, user) != keys \
+                    or (keys and heap[0] != keys[0]):
+                broken.append(user_id)
+        if broken:
+            failures.append(f"estado carregado com heap diferente em {len(broken)} usuários (ex.: {broken[:3]})")
+        for user_id in sample_users[:100]:
+            if loaded.next_questions(user_id, 20, now=NOW, rng=random.Random(3)) != \
+                    scheduler.next_questions(user_id, 20, now=NOW, rng=random.Random(3)):
+                failures.append(f"estado carregado seleciona diferente para {user_id}")
+        file_size = os.path.getsize(state_path)
+
+    # Referência: o mesmo estado como um dict por par
+    per_item = sys.getsizeof({'reps': 0, 'interval': 1.0, 'ease': 2.5, 'lapses': 0, 'due': 0}) + 2 * 32
+    print(f"📊 {args.users:,} usuários, {scheduler.size:,} pares, {len(scheduler.questions.labels):,} questões")
+    print(f"  montagem (replay vetorizado):  {build_time:6.2f}s ({len(answers) / build_time:,.0f} respostas/s)")
+    print(f"  estado em arrays:              {scheduler.memory_bytes() / 1e6:6.1f} MB "
+          f"(~{per_item * scheduler.size / 1e6:.0f} MB como dict por par); .npz {file_size / 1e6:.1f} MB")
+    print(f"  gravar / carregar:             {save_time:6.2f}s / {load_time:.2f}s")
+    print(f"  seleção de 20:                 {len(selection_users) / select_time:8,.0f} por segundo")
+    print(f"  respostas registradas:         {20000 / record_time:8,.0f} por segundo")
+    print(f"  novas da categoria fraca:      {weak_share / max(new_total, 1):.0%} "
+          f"(uniforme seria {1 / len(CATEGORIES):.0%})")
+
+    for failure in failures[:20]:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"  ✅ SM-2 vetorizado = sequencial em {len(expected):,} pares; seleção em ordem, sem repetição, "
+          f"sem alterar o estado; .npz seleciona igual")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark: índice invertido BM25 (question_search) vs varredura linear estilo ILIKE.
+
+Monta um banco sintético de questões limpas, constrói o índice em disco e
+mede abertura e consultas (p50/p99). Confere o top-k de cada consulta contra
+um BM25 de referência em Python puro sobre os mesmos tokens; falha (exit 1)
+se divergir. O gerador, as consultas e a referência vêm de
+reference_impl.search, os mesmos de tests/test_question_search.py.
+
+Uso: python benchmarks/bench_search.py [num_questoes]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append('.')
+from question_search import SearchIndex, build_index
+from question_text import fold_text
+from reference_impl.search import EXTRA_TERMS, QUERIES, build_questions, reference_tokens, reference_top_k
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_questions', nargs='?', type=int, default=100000)
+    args = parser.parse_args()
+
+    num_questions = args.num_questions
+    questions = build_questions(num_questions)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'questions_search.idx')
+        summary = build_index(questions, path)
+
+        start = time.perf_counter()
+        index = SearchIndex(path)
+        open_time = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(5):
+            for query in QUERIES:
+                start = time.perf_counter()
+                index.search(query, 10)
+                latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        # Varredura linear: o que um ILIKE '%termo%' faz (texto dobrado, substring)
+        folded = [fold_text(q['text'] + ' ' + ' '.join(q['options'])) for q in questions]
+        start = time.perf_counter()
+        for query in QUERIES:
+            needle = fold_text(query)
+            [i for i, text in enumerate(folded) if needle in text]
+        scan_time = (time.perf_counter() - start) / len(QUERIES)
+
+        failures = []
+        sample = questions[:5000]
+        sample_path = os.path.join(tmp, 'sample.idx')
+        build_index(sample, sample_path)
+        sample_index = SearchIndex(sample_path)
+        documents = [reference_tokens(q) for q in sample]
+        for query in QUERIES + EXTRA_TERMS:
+            expected = reference_top_k(documents, query, 10)
+            found = sample_index.search(query, 10)
+            expected_ids = [sample[doc]['id'] for doc, _ in expected]
+            if [qid for qid, _ in found] != expected_ids or any(
+                    abs(score - ref) > 1e-9 for (_, score), (_, ref) in zip(found, expected)):
+                failures.append(query)
+
+        results = index.search('usucapião', 5)
+        del index, sample_index
+
+    print(f"📊 {num_questions} questões, {summary['terms']} termos")
+    print(f"  construção:        {summary['seconds']:6.2f}s")
+    print(f"  arquivo:           {summary['bytes'] / 1e6:6.1f} MB (postings {summary['postings_bytes'] / 1e6:.1f} MB)")
+    print(f"  abertura (mmap):   {open_time * 1000:6.2f} ms")
+    print(f"  consulta top-10:   p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms, máx {latencies[-1] * 1000:.2f} ms")
+    print(f"  varredura linear:  {scan_time * 1000:6.1f} ms por consulta (substring, sem ranking)")
+    print(f"  'usucapião': {', '.join(f'{qid} ({score:.2f})' for qid, score in results)}")
+
+    for query in failures:
+        print(f"  ❌ top-10 diverge do BM25 de referência: {query!r}")
+    if failures:
+        sys.exit(1)
+    print(f"  ✅ top-10 idêntico ao BM25 de referência em {len(QUERIES + EXTRA_TERMS)} consultas (5000 questões)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmark: texto normalizado (question_text) calculado uma vez e reaproveitado por busca e dedup.
+
+Gera um banco sintético com acentos, normaliza sem cache, com o cache quente
+e depois de alterar, remover e reordenar parte das questões, e mede a
+construção do índice de busca e os shingles do dedup a partir do cache contra
+normalizar de novo. Confere que os tokens do cache são os de fold_tokens em
+cada parte, que o cache atualizado é igual a normalizar do zero, e que índice
+e shingles saem idênticos com ou sem cache; falha (exit 1) se algo divergir.
+
+Uso: python benchmarks/bench_text_cache.py [num_questoes] [--changed 0.01]
+"""
+import argparse
+import dataclasses
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append('.')
+from question_dedup import shingle_hashes
+from question_model import Question
+from question_search import build_index
+from question_text import fold_tokens, normalize_questions
+
+WORDS = ['constituição', 'Constituicao', 'usucapião', 'TRIBUTÁRIO', 'tributario', 'família', 'ação', 'réu',
+         'contestação', 'citação', 'prazo', 'recurso', 'Ministério', 'Público', 'homicídio', 'crime', 'pena',
+         'contrato', 'locação', 'empregado', 'salário', 'sociedade', 'ônus', 'prova', 'juízo', 'competência',
+         'o', 'a', 'de', 'que', 'não', 'é', 'art.', '5º', 'CF/88', 'Lei nº 8.078/90']
+
+
+def sentence(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def build_questions(num_questions, seed=24):
+    rng = random.Random(seed)
+    return [Question.create(f"Q{i + 1:06d}", sentence(rng, 12, 40), tuple(sentence(rng, 0, 10) for _ in range(4)),
+                            i % 4, 3, 'Direito Civil', 'OAB_1_FASE', f"Questão {i}") for i in range(num_questions)]
+
+
+def edit(questions, fraction, seed=25):
+    """Altera uma fração das questões, remove outra e embaralha o resto"""
+    rng = random.Random(seed)
+    edited = [dataclasses.replace(q, text=q.text + ' alterada') if rng.random() < fraction else q
+              for q in questions if rng.random() >= fraction]
+    rng.shuffle(edited)
+    return edited
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def same_text(a, b):
+    return (len(a) == len(b) and all(a.parts(i) == b.parts(i) for i in range(len(a)))
+            and np.array_equal(a.keys, b.keys))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('questions', nargs='?', type=int, default=100000)
+    parser.add_argument('--changed', type=float, default=0.01)
+    args = parser.parse_args()
+
+    questions = build_questions(args.questions)
+    edited = edit(questions, args.changed)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, 'questions_text.npz')
+        cold, cold_time = timed(normalize_questions, questions, cache)
+        warm, warm_time = timed(normalize_questions, questions, cache)
+        cache_size = os.path.getsize(cache)
+        updated, update_time = timed(normalize_questions, edited, cache)
+        fresh = normalize_questions(edited, None)
+        reloaded = normalize_questions(edited, cache, save=False)
+
+        if warm.cache_hits != len(questions):
+            failures.append(f"cache quente: {warm.cache_hits}/{len(questions)} acertos")
+        if not same_text(updated, fresh) or not same_text(reloaded, fresh):
+            failures.append("cache atualizado difere de normalizar do zero")
+        for i in random.Random(3).sample(range(len(questions)), 500):
+            q = questions[i]
+            if cold.parts(i) != [fold_tokens(q.text)] + [fold_tokens(o) for o in q.options]:
+                failures.append(f"{q.id}: tokens diferem de fold_tokens")
+
+        cached_path, memory_path = os.path.join(tmp, 'cached.idx'), os.path.join(tmp, 'memory.idx')
+        _, index_cached = timed(build_index, questions, cached_path, warm)
+        _, index_memory = timed(build_index, questions, memory_path)
+        with open(cached_path, 'rb') as a, open(memory_path, 'rb') as b:
+            if a.read() != b.read():
+                failures.append("índice de busca muda com o cache")
+
+        (hashes, offsets), shingles_cached = timed(shingle_hashes, questions, text=warm)
+        (expected, expected_offsets), shingles_memory = timed(shingle_hashes, questions)
+        if not (np.array_equal(hashes, expected) and np.array_equal(offsets, expected_offsets)):
+            failures.append("shingles do dedup mudam com o cache")
+
+    changed = len(edited) - updated.cache_hits
+    print(f"📊 {len(questions):,} questões, {len(cold.vocabulary):,} termos, {len(cold.token_ids):,} tokens, "
+          f"cache de {cache_size / 1e6:.1f} MB")
+    print(f"  normalizar, sem cache:          {cold_time:6.2f}s")
+    print(f"  normalizar, cache quente:       {warm_time:6.2f}s ({cold_time / warm_time:.0f}x)")
+    print(f"  {changed:,} alteradas/{len(edited):,} (reordenado): {update_time:6.2f}s")
+    print(f"  índice de busca:  {index_cached:5.2f}s com o cache, {index_memory:5.2f}s normalizando de novo")
+    print(f"  shingles (dedup): {shingles_cached:5.2f}s com o cache, {shingles_memory:5.2f}s normalizando de novo")
+
+    for failure in failures[:20]:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("  ✅ tokens = fold_tokens por parte, cache atualizado = do zero, índice e shingles idênticos com o cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Benchmark: etapa de validação colunar (validate_frame) numa planilha sintética de ~100k linhas.
+
+Confere as rejeições contra uma implementação de referência linha a linha
+(loop simples com dicionários) e, numa planilha .xlsx com linhas vazias
+no meio, que o StreamValidator ligado ao XlsxRowStream informa as mesmas
+linhas da planilha que validate_frame sobre pd.read_excel; falha (exit 1)
+se divergirem. tests/test_question_validation.py roda as mesmas checagens
+numa planilha pequena, com a referência de reference_impl.validation.
+
+Uso: python benchmarks/bench_validation.py [num_questoes]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append('.')
+from question_assembly import SHEET_DTYPES
+from question_validation import StreamValidator, validate_frame
+from reference_impl.assembly import build_frame
+from reference_impl.validation import add_answer_problems, as_tuples, reference_rejects, with_blank_rows
+from xlsx_stream import XlsxRowStream
+
+
+def check_sheet_rows(df, every=37):
+    """Rejeições em streaming vs pd.read_excel numa planilha com uma linha vazia a cada `every` linhas"""
+    sheet, blank_rows = with_blank_rows(df, every)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'blank_rows.xlsx')
+        sheet.to_excel(path, index=False)
+        expected = validate_frame(pd.read_excel(path, engine='openpyxl', dtype=SHEET_DTYPES))
+        validator = StreamValidator()
+        for _ in XlsxRowStream(path, chunk_size=1000, on_chunk=validator.add_chunk).chunks():
+            pass
+    # O streaming pula as linhas vazias; pd.read_excel as mantém (e elas viram incomplete_row)
+    expected = expected[~expected['row'].isin(blank_rows)]
+    return as_tuples(validator.rejects()) == as_tuples(expected), len(blank_rows), len(expected)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_questions', nargs='?', type=int, default=25000)
+    args = parser.parse_args()
+
+    num_questions = args.num_questions
+    df = add_answer_problems(build_frame(num_questions))
+
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        rejects = validate_frame(df)
+        best = min(best, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    expected = reference_rejects(df)
+    reference_time = time.perf_counter() - start
+
+    validator = StreamValidator()
+    for offset in range(0, len(df), 5000):
+        chunk = df.iloc[offset:offset + 5000]
+        validator.add_chunk(list(chunk.itertuples(index=False, name=None)), list(df.columns))
+    streamed = validator.rejects()
+
+    print(f"📊 {len(df)} linhas, {num_questions} questões, {len(rejects)} rejeições")
+    print(f"  validate_frame:        {best:6.3f}s ({len(df) / best:,.0f} linhas/s)")
+    print(f"  referência por linha:  {reference_time:6.3f}s")
+    for rule, count in rejects['rule'].value_counts().items():
+        print(f"    {rule}: {count}")
+
+    failed = False
+    if as_tuples(rejects) != expected:
+        print("  ❌ rejeições divergem da referência linha a linha")
+        failed = True
+    if as_tuples(streamed) != expected:
+        print("  ❌ StreamValidator (em blocos) diverge da referência")
+        failed = True
+    same_rows, blank_rows, sheet_rejects = check_sheet_rows(df.iloc[:20000])
+    print(f"  .xlsx com {blank_rows} linhas vazias: {sheet_rejects} rejeições")
+    if not same_rows:
+        print("  ❌ StreamValidator via XlsxRowStream informa linhas diferentes da planilha")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("  ✅ idêntico à referência (frame inteiro e em blocos) e linhas da planilha certas em streaming")
+
+
+if __name__ == "__main__":
+    main()
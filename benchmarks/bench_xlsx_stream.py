@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Benchmark: pd.read_excel + montagem colunar vs leitura em streaming (xlsx_stream).
+
+A planilha é gerada e cada modo roda em um subprocesso separado, para que o pico de
+memória (RSS) de um não contamine o do outro. Numa planilha pequena com mais
+linhas vazias seguidas que um bloco e uma questão cujas alternativas voltam
+depois de outra, confere que os extratores em streaming (clean_questions,
+extract_questions_v2) devolvem as mesmas questões que os de lote
+(tests/test_xlsx_stream.py roda as mesmas checagens).
+
+Uso: python benchmarks/bench_xlsx_stream.py [num_questoes]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append('.')
+
+
+def run_mode(mode, file_path):
+    """Executado no subprocesso: processa a planilha e imprime métricas em JSON"""
+    from question_assembly import SHEET_DTYPES, assemble_questions, assemble_questions_stream
+    from xlsx_stream import XlsxRowStream, peak_memory_mb
+    import pandas as pd
+
+    baseline_mb = peak_memory_mb()
+    start = time.perf_counter()
+    if mode == 'pandas':
+        df = pd.read_excel(file_path, engine='openpyxl', dtype=SHEET_DTYPES)
+        rows = len(df)
+        questions = assemble_questions(df)
+    else:
+        row_stream = XlsxRowStream(file_path)
+        questions = assemble_questions_stream(row_stream.groups())
+        rows = row_stream.rows_read
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'rows': rows,
+        'questions': len(questions),
+        'seconds': elapsed,
+        'peak_mb': peak_memory_mb(),
+        'baseline_mb': baseline_mb,
+    }))
+
+
+def generate(num_questions, file_path):
+    """Executado no subprocesso: grava a planilha sintética"""
+    from reference_impl.assembly import build_frame
+    build_frame(num_questions).to_excel(file_path, index=False)
+
+
+def build_edge_workbook(file_path):
+    """Planilha com um trecho vazio maior que dois blocos (DEFAULT_CHUNK_SIZE) e um id que reaparece"""
+    from openpyxl import Workbook
+    from xlsx_stream import DEFAULT_CHUNK_SIZE
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['ObjectQuestionId', 'Name', 'QuestionStem', 'Letter', 'Description', 'Correct'])
+
+    def options(qid, name, letters):
+        for letter in letters:
+            sheet.append([qid, name, f"<p>Enunciado da questão {qid}</p>", letter,
+                          f"Alternativa {letter} da questão {qid}", int(letter == 'B')])
+
+    options('Q1', 'Direito Civil', 'ABCD')
+    options('Q2', 'Direito Penal', 'AB')
+    options('Q3', 'Processo Civil', 'ABCD')
+    options('Q2', 'Direito Penal', 'CD')
+    # Linhas vazias: a leitura não pode parar aqui
+    row = sheet.max_row + 2 * DEFAULT_CHUNK_SIZE + 10
+    for qid in ('Q4', 'Q5'):
+        for letter in 'ABCD':
+            for column, value in enumerate(['Direito do Trabalho', f"Enunciado da questão {qid}", letter,
+                                            f"Alternativa {letter} da questão {qid}", int(letter == 'A')], 2):
+                sheet.cell(row=row, column=column, value=value)
+            sheet.cell(row=row, column=1, value=qid)
+            row += 1
+    workbook.save(file_path)
+
+
+def check_stream_extractors(file_path):
+    """Lista de divergências entre os extratores em streaming e em lote"""
+    from clean_questions import extract_clean_questions, extract_clean_questions_stream
+    from extract_questions_v2 import extract_questions_from_excel_v2, extract_questions_from_excel_v2_stream
+
+    def summary(questions):
+        return [(q['id'], q['text'], q['options'], q['correctAnswerIndex'], q['category'], q['challengeType'])
+                for q in questions]
+
+    failures = []
+    pairs = [('clean_questions', extract_clean_questions, extract_clean_questions_stream),
+             ('extract_questions_v2', extract_questions_from_excel_v2, extract_questions_from_excel_v2_stream)]
+    for label, batch, stream in pairs:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected, streamed = summary(batch(file_path)), summary(stream(file_path))
+        if streamed != expected or len(expected) != 5:
+            failures.append(f"{label}: streaming {[q[0] for q in streamed]} != lote {[q[0] for q in expected]}")
+    return failures
+
+
+def main(num_questions):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, 'bench.xlsx')
+        subprocess.run([sys.executable, __file__, str(num_questions), '--generate', file_path], check=True)
+        print(f"📊 Planilha sintética: {num_questions} questões ({os.path.getsize(file_path) / 1e6:.1f} MB)")
+
+        results = {}
+        for mode in ('pandas', 'stream'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--mode', mode, '--input', file_path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+        edge_path = os.path.join(tmp, 'edges.xlsx')
+        build_edge_workbook(edge_path)
+        failures = check_stream_extractors(edge_path)
+
+    for mode, r in results.items():
+        if r['peak_mb'] is not None:
+            peak = f"{r['peak_mb']:.0f} MB (+{r['peak_mb'] - r['baseline_mb']:.0f} MB após imports)"
+        else:
+            peak = "n/d"
+        print(f"  {mode:7s} {r['seconds']:.2f}s  {r['rows'] / r['seconds']:.0f} linhas/s  pico {peak}  ({r['questions']} questões)")
+
+    if results['pandas']['questions'] != results['stream']['questions']:
+        failures.append("Contagem de questões diverge entre os modos")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Extratores em streaming iguais aos de lote (linhas vazias e id que reaparece)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('num_questions', nargs='?', type=int, default=12000)
+    # Usados pelos subprocessos do próprio benchmark
+    parser.add_argument('--generate', metavar='ARQUIVO', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', choices=['pandas', 'stream'], help=argparse.SUPPRESS)
+    parser.add_argument('--input', metavar='ARQUIVO', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.input)
+    elif args.generate:
+        generate(args.num_questions, args.generate)
+    else:
+        main(args.num_questions)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Gera planilhas sintéticas no layout opção-por-linha do extract_questions_v3.
+
+Colunas: ObjectQuestionId, Name, QuestionStem, Letter, Description, Correct.
+Os enunciados trazem HTML como o das exportações reais (<p>, <strong>, <br>,
+listas, entidades &nbsp; &quot; &ordm;...), as alternativas repetem frases
+comuns ("Todas as alternativas estão corretas.") e uma fração das questões
+tem linhas malformadas: células vazias, alternativa só com espaços ou longa
+demais, letra minúscula/com espaços ou fora de A-D, letra repetida, nenhuma
+ou duas corretas, linha totalmente vazia e questão que reaparece mais abaixo.
+Também há ~2% de quase-duplicatas (mesmo enunciado com uma palavra trocada).
+
+A gravação usa o modo write-only do openpyxl (memória constante), então
+1M de linhas cabe em qualquer máquina.
+
+Uso: python benchmarks/generate_workbook.py 100k [saida.xlsx] [--seed 42] [--malformed 0.03]
+"""
+import argparse
+import random
+import sys
+import time
+
+from openpyxl import Workbook
+
+sys.path.append('.')
+from question_validation import MAX_OPTION_LENGTH
+
+COLUMNS = ['ObjectQuestionId', 'Name', 'QuestionStem', 'Letter', 'Description', 'Correct']
+DEFAULT_SEED = 42
+DEFAULT_MALFORMED_RATE = 0.03
+FIRST_QUESTION_ID = 100000
+
+# (curso, peso): nomes no formato das exportações, com e sem acento, cobrindo todas as regras de NAME_RULES
+COURSES = [
+    ('OAB 1ª Fase - Direito Penal', 12), ('OAB 1ª Fase - Direito Civil', 14),
+    ('OAB 1ª Fase - Direito Constitucional', 10), ('OAB 1ª Fase - Direito Administrativo', 9),
+    ('OAB 1ª Fase - Direito Tributário', 3), ('OAB 1a Fase - Direito Tributario', 3),
+    ('OAB 1ª Fase - Ética Profissional', 8), ('OAB 1ª Fase - Direito Processual do Trabalho', 3),
+    ('OAB 1ª Fase - Processo Civil', 9), ('OAB 1ª Fase - Direito do Trabalho', 8),
+    ('OAB 1ª Fase - Direito Empresarial', 6), ('Concurso MPSP - Promotor de Justiça', 5),
+    ('Concurso Tribunal de Justiça - Magistratura', 3), ('Língua Portuguesa', 3),
+    ('Direitos Humanos', 3), (None, 4),
+]
+SUBJECTS = [
+    'o contrato de compra e venda', 'a prescrição aquisitiva', 'o crime de homicídio qualificado',
+    'a competência da Justiça do Trabalho', 'o mandado de segurança coletivo', 'a sociedade limitada',
+    'o lançamento tributário', 'a improbidade administrativa', 'a guarda compartilhada',
+    'o recurso de apelação', 'a legítima defesa', 'o controle concentrado de constitucionalidade',
+    'a desconsideração da personalidade jurídica', 'o processo administrativo disciplinar',
+    'a sucessão testamentária', 'o inquérito policial', 'a rescisão indireta do contrato de trabalho',
+    'a imunidade tributária recíproca', 'o sigilo profissional do advogado', 'a ação civil pública',
+]
+CONTEXTS = [
+    'Considere a seguinte situação hipotética', 'Leia o caso a seguir', 'Com base na jurisprudência do STJ',
+    'Segundo o entendimento do STF', 'De acordo com o Código de Processo Civil',
+    'Nos termos do Estatuto da Advocacia', 'À luz da Constituição Federal de 1988',
+]
+ACTORS = ['João', 'Maria', 'a empresa Alfa Ltda.', 'o Município de Beta', 'o servidor Carlos',
+          'a advogada Ana', 'o promotor de justiça', 'Pedro, menor de 16 anos']
+ARTICLES = ['art. 5&ordm;, LXIX', 'art. 121, &sect; 2&ordm;', 'art. 1.238', 'art. 37, &sect; 4&ordm;',
+            'art. 50', 'art. 483, alínea &quot;d&quot;', 'art. 150, VI, &quot;a&quot;', 'art. 7&ordm;, II']
+OPTION_STEMS = [
+    'É cabível {subject}, desde que observado o prazo legal.',
+    'Não se aplica {subject} ao caso, por ausência de previsão legal.',
+    'A conduta descrita configura {subject}, nos termos do {article}.',
+    'Depende de prévia autorização judicial, conforme o {article}.',
+    'O prazo é de {days} dias, contados da ciência do ato.',
+    'A responsabilidade é objetiva e independe de culpa.',
+]
+COMMON_OPTIONS = [
+    'Todas as alternativas estão corretas.', 'Nenhuma das alternativas anteriores.',
+    'Apenas as afirmativas I e II estão corretas.', 'Apenas a afirmativa III está correta.',
+]
+STEM_TEMPLATES = [
+    '<p>{context}: {actor} questiona {subject}.</p><p>Assinale a alternativa <strong>correta</strong>.</p>',
+    '<p>{context}, acerca d{subject_tail}, analise as afirmativas:</p>'
+    '<ol><li>I &ndash; É regulad{subject_tail_g} pelo {article}.</li><li>II &ndash; Admite exceções.</li>'
+    '<li>III &ndash; Não se aplica a {actor}.</li></ol>',
+    '<p><span style="font-size:11pt">{context}&nbsp;&ndash; {actor} ajuizou ação sobre {subject}.'
+    '</span><br/>Qual a solução jurídica adequada?</p>',
+    '<div class="enunciado"><p>{actor} consulta você, como advogado(a), sobre {subject} '
+    '(&quot;{article}&quot;).</p><p>Diante disso, é <em>correto</em> afirmar que:</p></div>',
+]
+MALFORMATIONS = [
+    'missing_description', 'blank_description', 'messy_letter', 'invalid_letter', 'duplicate_letter',
+    'no_correct', 'two_correct', 'long_option', 'missing_stem', 'blank_row', 'reappears_later',
+]
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1M' -> 1000000, '2500' -> 2500"""
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+
+def _stem(rng):
+    subject = rng.choice(SUBJECTS)
+    article, tail = subject.split(' ', 1)
+    return rng.choice(STEM_TEMPLATES).format(
+        context=rng.choice(CONTEXTS), actor=rng.choice(ACTORS), subject=subject,
+        subject_tail=('a ' if article == 'a' else 'o ') + tail, subject_tail_g=article,
+        article=rng.choice(ARTICLES),
+    ) + f"<p><small>Questão {rng.randrange(10**6):06d}</small></p>"
+
+
+def _options(rng):
+    options = []
+    for _ in range(4):
+        if rng.random() < 0.1:
+            options.append(rng.choice(COMMON_OPTIONS))
+        else:
+            options.append(rng.choice(OPTION_STEMS).format(
+                subject=rng.choice(SUBJECTS), article=rng.choice(ARTICLES), days=rng.choice([5, 10, 15, 30])
+            ))
+    return options
+
+
+def question_rows(qid, rng, courses, weights, malformed_rate, recent_stems):
+    """Option-per-row tuples of one question (and the malformation applied, or None)"""
+    name = rng.choices(courses, weights)[0]
+    if recent_stems and rng.random() < 0.02:
+        # Quase-duplicata: enunciado recente com uma palavra trocada
+        stem = rng.choice(recent_stems).replace('correta', 'incorreta', 1).replace('sobre', 'acerca de', 1)
+    else:
+        stem = _stem(rng)
+        recent_stems.append(stem)
+        if len(recent_stems) > 500:
+            recent_stems.pop(0)
+    correct = rng.randrange(4)
+    rows = [[qid, name, stem, letter, option, slot == correct]
+            for slot, (letter, option) in enumerate(zip('ABCD', _options(rng)))]
+
+    kind = rng.choice(MALFORMATIONS) if rng.random() < malformed_rate else None
+    target = rows[rng.randrange(4)]
+    if kind == 'missing_description':
+        target[4] = None
+    elif kind == 'blank_description':
+        target[4] = '   '
+    elif kind == 'messy_letter':
+        target[3] = f" {target[3].lower()} "
+    elif kind == 'invalid_letter':
+        target[3] = 'E'
+    elif kind == 'duplicate_letter':
+        rows.append([qid, name, stem, target[3], 'Alternativa repetida.', False])
+    elif kind == 'no_correct':
+        for row in rows:
+            row[5] = False
+    elif kind == 'two_correct':
+        rows[(correct + 1) % 4][5] = True
+    elif kind == 'long_option':
+        target[4] = 'Texto colado por engano. ' * (MAX_OPTION_LENGTH // 20)
+    elif kind == 'missing_stem':
+        target[2] = None
+    elif kind == 'blank_row':
+        rows.insert(rng.randrange(len(rows) + 1), [None] * len(COLUMNS))
+    return [tuple(row) for row in rows], kind
+
+
+def workbook_rows(num_rows, seed=DEFAULT_SEED, malformed_rate=DEFAULT_MALFORMED_RATE, stats=None):
+    """Yield exactly num_rows data rows (header excluded); stats, if given, collects counts"""
+    rng = random.Random(seed)
+    courses, weights = zip(*COURSES)
+    recent_stems, deferred = [], []
+    stats = stats if stats is not None else {}
+    stats.setdefault('questions', 0)
+    stats.setdefault('malformed', {})
+    emitted, qid = 0, FIRST_QUESTION_ID
+
+    while emitted < num_rows:
+        rows, kind = question_rows(qid, rng, courses, weights, malformed_rate, recent_stems)
+        stats['questions'] += 1
+        if kind:
+            stats['malformed'][kind] = stats['malformed'].get(kind, 0) + 1
+        if kind == 'reappears_later':
+            # A última alternativa só aparece algumas centenas de linhas depois
+            deferred.append((emitted + rng.randint(50, 500), rows.pop()))
+        qid += 1
+        ready = [row for due, row in deferred if due <= emitted]
+        deferred = [(due, row) for due, row in deferred if due > emitted]
+        for row in rows + ready:
+            if emitted == num_rows:
+                return
+            yield row
+            emitted += 1
+    # (questões adiadas que não couberem no tamanho pedido ficam sem a última alternativa)
+
+
+def generate_workbook(path, num_rows, seed=DEFAULT_SEED, malformed_rate=DEFAULT_MALFORMED_RATE):
+    """Write an .xlsx with num_rows data rows; returns stats (rows, questions, malformed per kind, seconds)"""
+    start = time.perf_counter()
+    stats = {}
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Questões')
+    sheet.append(COLUMNS)
+    for row in workbook_rows(num_rows, seed, malformed_rate, stats):
+        sheet.append(row)
+    workbook.save(path)
+    stats.update(rows=num_rows, seed=seed, seconds=time.perf_counter() - start)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('size', nargs='?', default='10k', help="linhas de dados: 10k, 100k, 1M...")
+    parser.add_argument('path', nargs='?', help="arquivo de saída (padrão: synthetic_<size>.xlsx)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--malformed', type=float, default=DEFAULT_MALFORMED_RATE, help="fração de questões malformadas")
+    args = parser.parse_args()
+    path = args.path or f"synthetic_{args.size}.xlsx"
+
+    stats = generate_workbook(path, parse_size(args.size), args.seed, args.malformed)
+    print(f"📊 {path}: {stats['rows']} linhas, {stats['questions']} questões em {stats['seconds']:.1f}s")
+    for kind, count in sorted(stats['malformed'].items()):
+        print(f"  {kind}: {count}")
+
+
+if __name__ == "__main__":
+    main()
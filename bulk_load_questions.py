@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Bulk-load cleaned questions into the `questions` table (shared/schema.ts) with COPY.
+
+Uso:
+    python bulk_load_questions.py                          # questions_cleaned.json, substitui a tabela
+    python bulk_load_questions.py --delta questions_delta.json
+    python bulk_load_questions.py arquivo.json --dsn postgresql://localhost/treinador
+
+A conexão vem de --dsn ou de DATABASE_URL (a mesma variável do servidor).
+As linhas vão por COPY FROM STDIN para uma tabela temporária e entram na
+tabela questions com um único INSERT ... ON CONFLICT, na mesma transação que
+remove as questões ausentes: quem lê a tabela vê a versão anterior inteira
+até o COMMIT, nunca uma tabela vazia ou pela metade.
+
+Requer psycopg 3 (pip install '.[postgres]').
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+
+from incremental_import import DELTA_PATH
+
+CLEANED_PATH = 'questions_cleaned.json'
+TABLE = 'questions'
+STAGING_TABLE = 'questions_staging'
+# Colunas do banco (snake_case) e o campo correspondente no JSON limpo
+COLUMNS = (
+    ('id', 'id'),
+    ('text', 'text'),
+    ('options', 'options'),
+    ('correct_answer_index', 'correctAnswerIndex'),
+    ('difficulty', 'difficulty'),
+    ('category', 'category'),
+    ('challenge_type', 'challengeType'),
+    ('explanation', 'explanation'),
+)
+COLUMN_LIST = ', '.join(column for column, _ in COLUMNS)
+UPDATE_LIST = ', '.join(f"{column} = EXCLUDED.{column}" for column, _ in COLUMNS[1:])
+
+
+def loader_available():
+    """True when psycopg is installed"""
+    return psycopg is not None
+
+
+def connect(dsn=None):
+    """Open an autocommit connection to dsn or DATABASE_URL (loads open their own transaction)"""
+    dsn = dsn or os.environ.get('DATABASE_URL')
+    if not dsn:
+        raise ValueError("DATABASE_URL não definida (ou passe --dsn)")
+    return psycopg.connect(dsn, autocommit=True)
+
+
+def question_rows(questions):
+    """Table rows (in COLUMNS order) for cleaned questions (Question or JSON dict), one at a time"""
+    for q in questions:
+        # options é tupla no Question; o COPY só converte list para text[]
+        yield tuple(list(q.get(field)) if field == 'options' else q.get(field) for _, field in COLUMNS)
+
+
+def copy_to_staging(cur, questions, table=TABLE):
+    """Create a temp table shaped like table and COPY the questions into it; returns the row count"""
+    cur.execute(f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+    rows = 0
+    with cur.copy(f"COPY {STAGING_TABLE} ({COLUMN_LIST}) FROM STDIN") as copy:
+        for row in question_rows(questions):
+            copy.write_row(row)
+            rows += 1
+    return rows
+
+
+def load_questions(conn, questions, replace=True, deleted_ids=(), table=TABLE):
+    """Upsert questions through a COPY-filled staging table in one transaction.
+
+    replace=True also deletes every row whose id is not in questions (full
+    reload); otherwise only deleted_ids are removed (delta). Returns
+    (upserted, deleted); rows identical to the stored ones are not counted.
+    """
+    current = ', '.join(f"{table}.{column}" for column, _ in COLUMNS[1:])
+    incoming = ', '.join(f"EXCLUDED.{column}" for column, _ in COLUMNS[1:])
+    with conn.transaction(), conn.cursor() as cur:
+        copy_to_staging(cur, questions, table)
+        # Linhas idênticas não são reescritas (sem tuplas mortas nem atualização de índice)
+        cur.execute(
+            f"INSERT INTO {table} ({COLUMN_LIST}) SELECT {COLUMN_LIST} FROM {STAGING_TABLE} "
+            f"ON CONFLICT (id) DO UPDATE SET {UPDATE_LIST} WHERE ({current}) IS DISTINCT FROM ({incoming})"
+        )
+        upserted = cur.rowcount
+        if replace:
+            cur.execute(f"DELETE FROM {table} t WHERE NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} s WHERE s.id = t.id)")
+        elif deleted_ids:
+            cur.execute(f"DELETE FROM {table} WHERE id = ANY(%s)", (list(deleted_ids),))
+        deleted = cur.rowcount if replace or deleted_ids else 0
+    return upserted, deleted
+
+
+def apply_difficulty_updates(conn, updates, table=TABLE):
+    """Set difficulty from a DataFrame of (id, difficulty) via COPY + one UPDATE; returns rows changed"""
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE difficulty_staging (id text PRIMARY KEY, difficulty integer) ON COMMIT DROP")
+        with cur.copy("COPY difficulty_staging (id, difficulty) FROM STDIN") as copy:
+            for row in updates[['id', 'difficulty']].itertuples(index=False):
+                copy.write_row((row.id, int(row.difficulty)))
+        cur.execute(
+            f"UPDATE {table} q SET difficulty = s.difficulty FROM difficulty_staging s "
+            f"WHERE q.id = s.id AND q.difficulty IS DISTINCT FROM s.difficulty"
+        )
+        return cur.rowcount
+
+
+def table_counts(conn, table=TABLE):
+    """Row count per challenge_type, computed by the database"""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT challenge_type, count(*) FROM {table} GROUP BY challenge_type ORDER BY challenge_type")
+        return dict(cur.fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga em massa das questões limpas no PostgreSQL (COPY)")
+    parser.add_argument('source', nargs='?', default=CLEANED_PATH, help="JSON de questões limpas")
+    parser.add_argument('--delta', nargs='?', const=DELTA_PATH, help="aplicar um delta (padrão: questions_delta.json)")
+    parser.add_argument('--dsn', help="string de conexão (padrão: DATABASE_URL)")
+    args = parser.parse_args()
+
+    if not loader_available():
+        print("❌ psycopg não instalado: pip install '.[postgres]'")
+        sys.exit(1)
+
+    if args.delta:
+        with open(args.delta, 'r', encoding='utf-8') as f:
+            delta = json.load(f)
+        questions = delta['added'] + delta['changed']
+        print(f"📚 Delta: {len(questions)} para inserir/atualizar, {len(delta['deleted'])} para remover")
+    else:
+        with open(args.source, 'r', encoding='utf-8') as f:
+            questions = json.load(f)
+        print(f"📚 Carregadas {len(questions)} questões de {args.source}")
+
+    start = time.perf_counter()
+    with connect(args.dsn) as conn:
+        if args.delta:
+            upserted, deleted = load_questions(conn, questions, replace=False, deleted_ids=delta['deleted'])
+        else:
+            upserted, deleted = load_questions(conn, questions)
+        elapsed = time.perf_counter() - start
+        counts = table_counts(conn)
+
+    print(f"\n📊 CARGA CONCLUÍDA:")
+    print(f"  Enviadas via COPY: {len(questions)} ({len(questions) / elapsed if elapsed else 0:,.0f} linhas/s)")
+    print(f"  Inseridas/atualizadas: {upserted} (idênticas ignoradas)")
+    print(f"  Removidas: {deleted}")
+    print(f"  Tempo: {elapsed:.2f}s")
+    for challenge_type, count in counts.items():
+        print(f"  {challenge_type}: {count} questões no banco")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Contiguous-block process pool for the CPU-bound per-question stages (clean, classify).
+
+A block function takes column lists (one list per field, all the same
+length) and returns a tuple of result columns for its block. map_columns
+splits the input columns into contiguous blocks, runs the blocks in a
+ProcessPoolExecutor and concatenates the result columns in input order, so
+only flat lists of strings/ints (or NumPy arrays) cross the process
+boundary, never one dict per question. With workers=1 the block function
+runs once, in-process, over the whole input.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Blocos por processo: equilibra blocos mais lentos sem multiplicar o custo de envio
+BLOCKS_PER_WORKER = 4
+
+
+def resolve_workers(workers):
+    """None/0 means one worker per core"""
+    return workers or os.cpu_count() or 1
+
+
+def block_bounds(count, blocks):
+    """[(start, end)] of at most `blocks` contiguous, near-equal blocks covering range(count)"""
+    blocks = max(1, min(blocks, count))
+    edges = [count * i // blocks for i in range(blocks + 1)]
+    return [(start, end) for start, end in zip(edges, edges[1:]) if end > start]
+
+
+def concat_columns(results):
+    """Concatenate per-block result tuples column by column"""
+    columns = []
+    for parts in zip(*results):
+        if isinstance(parts[0], np.ndarray):
+            columns.append(np.concatenate(parts))
+        else:
+            columns.append(list(itertools.chain.from_iterable(parts)))
+    return tuple(columns)
+
+
+def map_columns(func, columns, workers=1, blocks_per_worker=BLOCKS_PER_WORKER):
+    """func(*block_columns) over contiguous blocks in a process pool; result columns in input order"""
+    workers = resolve_workers(workers)
+    count = len(columns[0]) if columns else 0
+    if workers == 1 or count < 2:
+        return func(*columns)
+    bounds = block_bounds(count, workers * blocks_per_worker)
+    blocks = [[column[start:end] for start, end in bounds] for column in columns]
+    with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as executor:
+        return concat_columns(list(executor.map(func, *blocks)))
@@ -1,17 +1,62 @@
 #!/usr/bin/env python3
 import pandas as pd
-import re
-import html
+import sys
 
-def clean_html_text(text):
-    """Clean HTML tags and decode HTML entities"""
-    # Decode HTML entities
-    text = html.unescape(text)
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    # Clean up extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+from html_cleaning import clean_html_text, make_cleaner
+from question_classifier import classify_clean_question
+from ts_emitter import js_string
+from xlsx_stream import XlsxRowStream
+
+# Alternativas repetidas são limpas uma única vez
+clean_option_text = make_cleaner()
+
+def add_question_row(questions_dict, row):
+    """Add one option row (pandas row or streamed dict) to its question"""
+    question_id = str(row['ObjectQuestionId'])
+    
+    if question_id not in questions_dict:
+        # Clean the question stem
+        question_stem = str(row['QuestionStem']) if pd.notna(row['QuestionStem']) else ""
+        question_stem = clean_html_text(question_stem)
+        
+        # Get course name
+        course_name = str(row['Name']) if pd.notna(row['Name']) else "Direito"
+        
+        questions_dict[question_id] = {
+            'id': question_id,
+            'text': question_stem,
+            'course': course_name,
+            'options': [],
+            'correctAnswerIndex': 0,
+            'difficulty': 2,
+            'category': course_name,
+            'challengeType': "OAB_1_FASE",
+            'explanation': ""
+        }
+    
+    # Add option
+    if pd.notna(row['Description']):
+        option_text = clean_option_text(str(row['Description']))
+        if option_text and len(option_text) > 5:  # Filter out very short options
+            questions_dict[question_id]['options'].append(option_text)
+            
+            # If this is the correct answer
+            if int(row['Correct']) == 1:
+                questions_dict[question_id]['correctAnswerIndex'] = len(questions_dict[question_id]['options']) - 1
+
+def categorize_question(question):
+    """Categorize a complete question; returns None if it is incomplete"""
+    if not (question['text'] and len(question['options']) == 4):  # Only complete questions
+        return None
+    
+    # Categorize based on course name, falling back to the question text
+    category, challenge_type = classify_clean_question(question['course'], question['text'])
+    if category:
+        question['category'] = category
+    if challenge_type:
+        question['challengeType'] = challenge_type
+    
+    return question
 
 def extract_clean_questions(file_path, max_questions=50):
     """Extract and clean questions from Excel file"""
@@ -22,79 +67,13 @@ def extract_clean_questions(file_path, max_questions=50):
         questions_dict = {}
         
         for index, row in df.iterrows():
-            question_id = str(row['ObjectQuestionId'])
-            
-            if question_id not in questions_dict:
-                # Clean the question stem
-                question_stem = str(row['QuestionStem']) if pd.notna(row['QuestionStem']) else ""
-                question_stem = clean_html_text(question_stem)
-                
-                # Get course name
-                course_name = str(row['Name']) if pd.notna(row['Name']) else "Direito"
-                
-                questions_dict[question_id] = {
-                    'id': question_id,
-                    'text': question_stem,
-                    'course': course_name,
-                    'options': [],
-                    'correctAnswerIndex': 0,
-                    'difficulty': 2,
-                    'category': course_name,
-                    'challengeType': "OAB_1_FASE",
-                    'explanation': ""
-                }
-            
-            # Add option
-            if pd.notna(row['Description']):
-                option_text = clean_html_text(str(row['Description']))
-                if option_text and len(option_text) > 5:  # Filter out very short options
-                    questions_dict[question_id]['options'].append(option_text)
-                    
-                    # If this is the correct answer
-                    if int(row['Correct']) == 1:
-                        questions_dict[question_id]['correctAnswerIndex'] = len(questions_dict[question_id]['options']) - 1
+            add_question_row(questions_dict, row)
         
         # Filter and categorize questions
         valid_questions = []
         for q_id, question in questions_dict.items():
-            if question['text'] and len(question['options']) == 4:  # Only complete questions
-                # Categorize based on course name
-                course_lower = question['course'].lower()
-                
-                if 'constitucional' in course_lower:
-                    question['category'] = "Direito Constitucional"
-                    question['challengeType'] = "OAB_1_FASE"
-                elif 'civil' in course_lower:
-                    question['category'] = "Direito Civil"
-                    question['challengeType'] = "OAB_1_FASE"
-                elif 'penal' in course_lower:
-                    question['category'] = "Direito Penal"
-                    question['challengeType'] = "OAB_1_FASE"
-                elif 'processo' in course_lower:
-                    question['category'] = "Processo Civil"
-                    question['challengeType'] = "OAB_1_FASE"
-                elif 'trabalho' in course_lower:
-                    question['category'] = "Direito do Trabalho"
-                    question['challengeType'] = "OAB_1_FASE"
-                elif 'empresarial' in course_lower:
-                    question['category'] = "Direito Empresarial"
-                    question['challengeType'] = "OAB_1_FASE"
-                elif 'administrativo' in course_lower:
-                    question['category'] = "Direito Administrativo"
-                    question['challengeType'] = "CONCURSOS_MPSP"
-                else:
-                    # Try to categorize by question content
-                    text_lower = question['text'].lower()
-                    if any(word in text_lower for word in ['tribunal do júri', 'homicídio', 'crime']):
-                        question['category'] = "Direito Penal"
-                        question['challengeType'] = "OAB_1_FASE"
-                    elif any(word in text_lower for word in ['ministério público', 'promotor']):
-                        question['challengeType'] = "CONCURSOS_MPSP"
-                    elif any(word in text_lower for word in ['defensoria', 'defensor']):
-                        question['challengeType'] = "CONCURSOS_DEFENSORIA"
-                    elif any(word in text_lower for word in ['tribunal', 'magistratura']):
-                        question['challengeType'] = "CONCURSOS_TRIBUNAIS"
-                
+            question = categorize_question(question)
+            if question:
                 valid_questions.append(question)
                 
                 if len(valid_questions) >= max_questions:
@@ -106,48 +85,79 @@ def extract_clean_questions(file_path, max_questions=50):
         print(f"Erro: {e}")
         return []
 
-def generate_typescript_file(questions):
-    """Generate clean TypeScript file"""
-    ts_content = '''import { Question } from "@shared/schema";
+def extract_clean_questions_stream(file_path, max_questions=50):
+    """Extract and clean questions while streaming the workbook, stopping at max_questions"""
+    try:
+        row_stream = XlsxRowStream(file_path)
+        # Um só dicionário para o arquivo todo: um id que reaparece depois soma as linhas à mesma questão
+        questions_dict = {}
+        valid_ids = set()
+        
+        for _, rows in row_stream.groups():
+            for row in rows:
+                add_question_row(questions_dict, row)
+            
+            # Recategoriza a questão do grupo (pode já ter sido válida e mudado com as novas linhas)
+            question_id = str(rows[0]['ObjectQuestionId'])
+            if categorize_question(questions_dict[question_id]):
+                valid_ids.add(question_id)
+            else:
+                valid_ids.discard(question_id)
+            
+            if len(valid_ids) >= max_questions:
+                break
+        
+        row_stream.report()
+        # Mesma ordem do caminho em lote: primeira aparição de cada id
+        valid_questions = [question for question_id, question in questions_dict.items() if question_id in valid_ids]
+        return valid_questions[:max_questions]
+        
+    except Exception as e:
+        print(f"Erro: {e}")
+        return []
+
+def iter_typescript_file(questions):
+    """Yield the clean TypeScript file one question at a time"""
+    yield '''import { Question } from "@shared/schema";
 
 export const questionsFromExcel: Omit<Question, 'id' | 'createdAt'>[] = [
 '''
     
     for i, q in enumerate(questions):
-        # Escape quotes and newlines
-        text = q['text'].replace('"', '\\"').replace('\n', ' ').replace('\r', ' ')
-        options_str = '", "'.join([opt.replace('"', '\\"') for opt in q['options']])
+        # Quebras de linha no enunciado viram espaço; o resto é escapado como string JS
+        text = js_string(q['text'].replace('\n', ' ').replace('\r', ' '))
+        options_str = ', '.join(js_string(opt) for opt in q['options'])
+        separator = ",\n" if i else ""
         
-        ts_content += f'''  {{
-    text: "{text}",
-    options: ["{options_str}"],
+        yield f'''{separator}  {{
+    text: {text},
+    options: [{options_str}],
     correctAnswerIndex: {q['correctAnswerIndex']},
     difficulty: {q['difficulty']},
-    category: "{q['category']}",
-    challengeType: "{q['challengeType']}",
-    explanation: "Questão extraída do curso: {q['course']}"
-  }}{"," if i < len(questions) - 1 else ""}
-'''
+    category: {js_string(q['category'])},
+    challengeType: {js_string(q['challengeType'])},
+    explanation: {js_string(f"Questão extraída do curso: {q['course']}")}
+  }}'''
     
-    ts_content += '''
+    yield '''
+
 ];
 '''
-    
-    return ts_content
 
 if __name__ == "__main__":
     file_path = "attached_assets/Questões MC 1ª FASE e Concursos_1753714117406.xlsx"
     
     print("Extraindo e limpando questões...")
-    questions = extract_clean_questions(file_path, 50)
+    if '--stream' in sys.argv:
+        questions = extract_clean_questions_stream(file_path, 50)
+    else:
+        questions = extract_clean_questions(file_path, 50)
     
     print(f"Extraídas {len(questions)} questões válidas")
     
     if questions:
-        ts_content = generate_typescript_file(questions)
-        
         with open("clean_questions.ts", "w", encoding="utf-8") as f:
-            f.write(ts_content)
+            f.writelines(iter_typescript_file(questions))
         
         print("Arquivo 'clean_questions.ts' gerado!")
         
@@ -1,42 +1,57 @@
 import json
+import sys
 
-def create_diverse_sample():
+from pipeline_profile import StageProfiler
+from question_columnar import ARROW_PATH, bank_is_current, read_question_bank, table_to_questions
+from question_sampler import StratifiedSampler
+
+DEFAULT_SEED = 42
+
+def create_diverse_sample(seed=DEFAULT_SEED, profiler=None):
+    """Stratified sample: every CONCURSOS question plus a seeded draw per OAB category"""
+    profiler = profiler or StageProfiler.disabled('create_better_sample')
     try:
-        # Carregar todas as questões limpas
-        with open('questions_cleaned.json', 'r', encoding='utf-8') as f:
-            all_questions = json.load(f)
-        
-        print(f"📚 Total de questões disponíveis: {len(all_questions)}")
-        
-        # Separar por tipo
-        oab_questions = [q for q in all_questions if q['challengeType'] == 'OAB_1_FASE']
-        concursos_questions = [q for q in all_questions if q['challengeType'] == 'CONCURSOS_MPSP']
-        
-        print(f"  OAB 1ª FASE: {len(oab_questions)} questões")
-        print(f"  CONCURSOS: {len(concursos_questions)} questões")
-        
-        # Criar amostra diversificada
-        sample = []
-        
-        # Adicionar todas as questões de CONCURSOS (são poucas)
-        sample.extend(concursos_questions)
-        print(f"✅ Adicionadas {len(concursos_questions)} questões de CONCURSOS")
-        
-        # Para OAB, pegar amostra de cada categoria
-        oab_by_category = {}
-        for q in oab_questions:
-            cat = q['category']
-            if cat not in oab_by_category:
-                oab_by_category[cat] = []
-            oab_by_category[cat].append(q)
-        
-        # Adicionar amostras de cada categoria OAB
-        target_per_category = min(50, max(10, 500 // len(oab_by_category)))  # máximo 500 questões OAB
-        
-        for category, questions in oab_by_category.items():
-            category_sample = questions[:target_per_category]
-            sample.extend(category_sample)
-            print(f"✅ {category}: {len(category_sample)} questões")
+        # Carregar rótulos: do arquivo Arrow (só as colunas necessárias) ou do JSON
+        with profiler.stage('read') as stage:
+            if bank_is_current('questions_cleaned.json', ARROW_PATH):
+                bank = read_question_bank(ARROW_PATH)
+                labels = bank.select(['challengeType', 'category']).to_pylist()
+                fetch = lambda indices: table_to_questions(bank.take(indices))
+            else:
+                with open('questions_cleaned.json', 'r', encoding='utf-8') as f:
+                    all_questions = json.load(f)
+                labels = all_questions
+                fetch = lambda indices: [all_questions[i] for i in indices]
+            stage.rows_out = len(labels)
+        
+        print(f"📚 Total de questões disponíveis: {len(labels)}")
+        
+        with profiler.stage('sample', len(labels)) as stage:
+            # Índice challengeType × categoria, construído uma vez
+            sampler = StratifiedSampler(labels)
+            sizes = sampler.sizes()
+            concursos_strata = [s for s in sizes if s[0] == 'CONCURSOS_MPSP']
+            oab_strata = [s for s in sizes if s[0] == 'OAB_1_FASE']
+        
+            print(f"  OAB 1ª FASE: {sum(sizes[s] for s in oab_strata)} questões")
+            print(f"  CONCURSOS: {sum(sizes[s] for s in concursos_strata)} questões")
+        
+            # Todas as questões de CONCURSOS (são poucas)
+            quotas = {s: sizes[s] for s in concursos_strata}
+            print(f"✅ Adicionadas {sum(quotas.values())} questões de CONCURSOS")
+        
+            # Para OAB, amostra aleatória (com semente) de cada categoria
+            target_per_category = min(50, max(10, 500 // max(1, len(oab_strata))))  # máximo 500 questões OAB
+            oab_quotas = sampler.quotas(target_per_category * len(oab_strata), mode='equal',
+                                        max_per_stratum=target_per_category, strata=oab_strata)
+            quotas.update(oab_quotas)
+            for (_, category), count in oab_quotas.items():
+                print(f"✅ {category}: {count} questões")
+        
+            sample_indices = sampler.sample(quotas, seed)
+        
+            sample = fetch(sample_indices)
+            stage.rows_out = len(sample)
         
         print(f"\n📊 AMOSTRA FINAL:")
         print(f"  Total: {len(sample)} questões")
@@ -48,8 +63,10 @@ def create_diverse_sample():
         print(f"  CONCURSOS: {len(final_concursos)} questões")
         
         # Salvar amostra diversificada
-        with open('questions_diverse_sample.json', 'w', encoding='utf-8') as f:
-            json.dump(sample, f, indent=2, ensure_ascii=False)
+        with profiler.stage('write', len(sample)) as stage:
+            with open('questions_diverse_sample.json', 'w', encoding='utf-8') as f:
+                json.dump(sample, f, indent=2, ensure_ascii=False)
+            stage.rows_out = len(sample)
         
         # Mostrar estatísticas por categoria
         categories = {}
@@ -69,6 +86,12 @@ def create_diverse_sample():
         return []
 
 if __name__ == "__main__":
-    sample = create_diverse_sample()
+    seed = int(sys.argv[sys.argv.index('--seed') + 1]) if '--seed' in sys.argv else DEFAULT_SEED
+    # --profile [arquivo.json]: tempo, linhas e memória por etapa (--cprofile ETAPA para cProfile de uma etapa)
+    profiler = StageProfiler.from_argv('create_better_sample')
+    sample = create_diverse_sample(seed, profiler)
+    profiler.write_report()
     if sample:
-        print(f"🎉 Amostra criada com sucesso: {len(sample)} questões!")
\ No newline at end of file
+        print(f"🎉 Amostra criada com sucesso: {len(sample)} questões!")
+    else:
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""Calibrate questions.difficulty from a user_answers export (CSV or Parquet).
+
+Uso:
+    python difficulty_calibration.py user_answers.csv                  # 2PL, grava questions_difficulty.csv
+    python difficulty_calibration.py user_answers.parquet --model 1pl --min-answers 50
+    python difficulty_calibration.py user_answers.csv --apply [--dsn postgresql://...]
+
+The export needs question_id, user_id and is_correct (snake_case as in the
+table, or camelCase as in shared/schema.ts); time_spent is used when present.
+It is read in chunks and kept only as compact integer codes (user, question,
+correct) in temporary memory-mapped files, so tens of millions of rows fit in
+a bounded amount of memory; every pass of the fit walks those files chunk by
+chunk.
+
+Models:
+    pvalue  share of correct answers per question
+    1pl     P(correct) = sigmoid(theta_user - b_question)            (Rasch)
+    2pl     P(correct) = sigmoid(a_question * (theta_user - b_question))
+The IRT fits are joint MAP estimates (normal priors on theta, b and log a)
+with alternating diagonal Newton steps: each pass accumulates gradients and
+information per question (then per user) with np.bincount. b is mapped to
+1-5 stars with fixed cut points (STAR_THRESHOLDS), so stars mean the same
+thing across runs.
+Questions with fewer than --min-answers answers are left out of the update.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+UPDATES_PATH = 'questions_difficulty.csv'
+DEFAULT_CHUNK_SIZE = 1_000_000
+DEFAULT_MIN_ANSWERS = 20
+DEFAULT_MAX_ITER = 100
+DEFAULT_TOLERANCE = 1e-3
+MODELS = ('pvalue', '1pl', '2pl')
+# Cortes em b (escala logit) para 1-5 estrelas: b < -1.5 -> 1, ..., b >= 1.5 -> 5
+STAR_THRESHOLDS = (-1.5, -0.5, 0.5, 1.5)
+# Desvios-padrão das prioris: theta ~ N(0, 1), b ~ N(0, 2²), log a ~ N(0, 0.5²)
+THETA_SD, B_SD, LOG_A_SD = 1.0, 2.0, 0.5
+MAX_STEP = 1.0
+# Nomes aceitos para cada coluna (export do Postgres ou do Drizzle)
+COLUMN_ALIASES = {
+    'question': ('question_id', 'questionId'),
+    'user': ('user_id', 'userId'),
+    'correct': ('is_correct', 'isCorrect'),
+    'time': ('time_spent', 'timeSpent'),
+}
+UPDATE_COLUMNS = ['id', 'difficulty', 'answers', 'p_value', 'b', 'a', 'mean_time_spent']
+
+
+def _resolve_columns(available, aliases=COLUMN_ALIASES):
+    """Map logical column -> column name in the file (time is optional)"""
+    columns = {}
+    for key, names in aliases.items():
+        found = next((name for name in names if name in available), None)
+        if found is None and key != 'time':
+            raise ValueError(f"Coluna {' / '.join(names)} ausente no export")
+        if found is not None:
+            columns[key] = found
+    return columns
+
+
+def _as_bool(series):
+    """is_correct as bool from bool, 0/1 or t/f/true/false text"""
+    if series.dtype == bool:
+        return series.to_numpy()
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.fillna(0).to_numpy() != 0
+    return series.astype(str).str.strip().str.lower().isin(('t', 'true', '1', 'yes')).to_numpy()
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, aliases=COLUMN_ALIASES):
+    """Yield DataFrames of up to chunk_size rows, columns renamed to the keys of aliases.
+
+    Every column other than correct and time is read as text (ids, categories).
+    """
+    if path.endswith('.parquet'):
+        if pq is None:
+            raise ImportError("pyarrow necessário para Parquet: pip install '.[columnar]'")
+        parquet = pq.ParquetFile(path)
+        columns = _resolve_columns(parquet.schema_arrow.names, aliases)
+        batches = parquet.iter_batches(batch_size=chunk_size, columns=list(columns.values()))
+        frames = (batch.to_pandas() for batch in batches)
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        columns = _resolve_columns(header, aliases)
+        frames = pd.read_csv(path, usecols=list(columns.values()), chunksize=chunk_size,
+                             dtype={name: str for key, name in columns.items() if key not in ('correct', 'time')})
+    rename = {name: key for key, name in columns.items()}
+    for frame in frames:
+        yield frame.rename(columns=rename)
+
+
+class _Codes:
+    """Stable integer code per id, assigned in order of first appearance across chunks"""
+
+    def __init__(self):
+        self.index = {}
+        self.labels = []
+
+    def encode(self, values):
+        uniques_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        mapped = np.empty(len(uniques), dtype=np.int32)
+        for i, value in enumerate(uniques):
+            code = self.index.get(value)
+            if code is None:
+                code = self.index[value] = len(self.labels)
+                self.labels.append(value)
+            mapped[i] = code
+        return mapped[uniques_codes]
+
+
+class AnswerLog:
+    """user_answers reduced to int32 user/question codes and an int8 correct flag, spilled to disk"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.users = _Codes()
+        self.questions = _Codes()
+        self.rows = 0
+        self.time_sum = None
+        self.time_count = None
+        self._files = {name: open(os.path.join(directory, f"{name}.bin"), 'wb')
+                       for name in ('user', 'question', 'correct')}
+
+    @classmethod
+    def from_export(cls, path, directory, chunk_size=DEFAULT_CHUNK_SIZE):
+        log = cls(directory)
+        for chunk in read_chunks(path, chunk_size):
+            log.add_chunk(chunk)
+        log.close()
+        return log
+
+    def add_chunk(self, chunk):
+        chunk = chunk[chunk['question'].notna() & chunk['user'].notna()]
+        questions = self.questions.encode(chunk['question'].astype(str).to_numpy())
+        self._files['user'].write(self.users.encode(chunk['user'].astype(str).to_numpy()).tobytes())
+        self._files['question'].write(questions.tobytes())
+        self._files['correct'].write(_as_bool(chunk['correct']).astype(np.int8).tobytes())
+        if 'time' in chunk:
+            time_spent = pd.to_numeric(chunk['time'], errors='coerce').to_numpy(dtype=np.float64)
+            known = ~np.isnan(time_spent)
+            size = len(self.questions.labels)
+            self.time_sum = _grow(self.time_sum, size) + np.bincount(questions[known], time_spent[known], size)
+            self.time_count = _grow(self.time_count, size) + np.bincount(questions[known], minlength=size)
+        self.rows += len(chunk)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+    def column(self, name):
+        dtype = np.int8 if name == 'correct' else np.int32
+        if not self.rows:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.directory, f"{name}.bin"), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield (user, question, correct) array slices of up to chunk_size rows"""
+        user, question, correct = self.column('user'), self.column('question'), self.column('correct')
+        for start in range(0, self.rows, chunk_size):
+            stop = start + chunk_size
+            yield (np.asarray(user[start:stop]), np.asarray(question[start:stop]),
+                   np.asarray(correct[start:stop], dtype=np.float64))
+
+    def counts(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """(answers, correct) per question and per user"""
+        n_users, n_questions = len(self.users.labels), len(self.questions.labels)
+        answers, correct = np.zeros(n_questions), np.zeros(n_questions)
+        user_answers, user_correct = np.zeros(n_users), np.zeros(n_users)
+        for user, question, y in self.chunks(chunk_size):
+            answers += np.bincount(question, minlength=n_questions)
+            correct += np.bincount(question, y, n_questions)
+            user_answers += np.bincount(user, minlength=n_users)
+            user_correct += np.bincount(user, y, n_users)
+        return answers, correct, user_answers, user_correct
+
+
+def _grow(array, size):
+    if array is None:
+        return np.zeros(size)
+    return np.concatenate([array, np.zeros(size - len(array))])
+
+
+def _logit(p):
+    return np.log(p / (1 - p))
+
+
+def _item_pass(log, theta, b, a, model, chunk_size):
+    """Gradient and information of the log-likelihood for b (and a, in the 2PL) over all answers"""
+    n_questions = len(b)
+    g_b, h_b = np.zeros(n_questions), np.zeros(n_questions)
+    g_a, h_a = np.zeros(n_questions), np.zeros(n_questions)
+    for user, question, y in log.chunks(chunk_size):
+        slope = a[question]
+        distance = theta[user] - b[question]
+        p = 1 / (1 + np.exp(-slope * distance))
+        residual = y - p
+        weight = p * (1 - p)
+        g_b -= np.bincount(question, slope * residual, n_questions)
+        h_b += np.bincount(question, slope * slope * weight, n_questions)
+        if model == '2pl':
+            g_a += np.bincount(question, distance * residual, n_questions)
+            h_a += np.bincount(question, distance * distance * weight, n_questions)
+    return g_b, h_b, g_a, h_a
+
+
+def _user_pass(log, theta, b, a, chunk_size):
+    """Gradient and information of the log-likelihood for theta over all answers"""
+    n_users = len(theta)
+    g_theta, h_theta = np.zeros(n_users), np.zeros(n_users)
+    for user, question, y in log.chunks(chunk_size):
+        slope = a[question]
+        p = 1 / (1 + np.exp(-slope * (theta[user] - b[question])))
+        g_theta += np.bincount(user, slope * (y - p), n_users)
+        h_theta += np.bincount(user, slope * slope * p * (1 - p), n_users)
+    return g_theta, h_theta
+
+
+def _standardized(theta, b, a, model):
+    """Parameters on the scale where theta has mean 0 (and, in the 2PL, standard deviation 1)"""
+    scale = theta.std() if model == '2pl' and len(theta) > 1 and theta.std() > 0 else 1.0
+    shift = theta.mean() if len(theta) else 0.0
+    return (theta - shift) / scale, (b - shift) / scale, a * scale
+
+
+def fit_irt(log, model='2pl', chunk_size=DEFAULT_CHUNK_SIZE, max_iter=DEFAULT_MAX_ITER, tol=DEFAULT_TOLERANCE,
+            counts=None):
+    """Joint MAP fit of theta (users), b and a (questions); returns (theta, b, a, iterations).
+
+    Each iteration is a diagonal Newton step for the questions with theta
+    fixed, then one for the users with the questions fixed (two passes over
+    the answers); simultaneous steps oscillate in the 2PL. The 2PL scale is
+    only fixed by the priors, so the result is reported standardized.
+    """
+    answers, correct, user_answers, user_correct = counts or log.counts(chunk_size)
+    # Início: logits das taxas de acerto suavizadas
+    b = -_logit((correct + 0.5) / (answers + 1))
+    theta = _logit((user_correct + 0.5) / (user_answers + 1))
+    a = np.ones(len(b))
+    theta, b, a = _standardized(theta, b, a, '1pl')
+    previous = (b, a)
+
+    for iteration in range(1, max_iter + 1):
+        g_b, h_b, g_a, h_a = _item_pass(log, theta, b, a, model, chunk_size)
+        if model == '2pl':
+            # Passo em log a (mantém a > 0)
+            log_a = np.log(a)
+            a = np.exp(log_a + np.clip((a * g_a - log_a / LOG_A_SD ** 2) / (a * a * h_a + 1 / LOG_A_SD ** 2),
+                                       -MAX_STEP / 2, MAX_STEP / 2))
+        b = b + np.clip((g_b - b / B_SD ** 2) / (h_b + 1 / B_SD ** 2), -MAX_STEP, MAX_STEP)
+
+        g_theta, h_theta = _user_pass(log, theta, b, a, chunk_size)
+        theta = theta + np.clip((g_theta - theta / THETA_SD ** 2) / (h_theta + 1 / THETA_SD ** 2),
+                                -MAX_STEP, MAX_STEP)
+        # Identificação: usuários centrados em 0
+        theta, b, a = _standardized(theta, b, a, '1pl')
+
+        _, current_b, current_a = _standardized(theta, b, a, model)
+        change = max(np.abs(current_b - previous[0]).max(initial=0), np.abs(current_a - previous[1]).max(initial=0))
+        previous = (current_b, current_a)
+        if change < tol:
+            break
+    theta, b, a = _standardized(theta, b, a, model)
+    return theta, b, a, iteration
+
+
+def difficulty_stars(b):
+    """1-5 stars for IRT difficulties (fixed cut points)"""
+    return np.digitize(b, STAR_THRESHOLDS) + 1
+
+
+def calibrate(path, model='2pl', chunk_size=DEFAULT_CHUNK_SIZE, min_answers=DEFAULT_MIN_ANSWERS,
+              max_iter=DEFAULT_MAX_ITER, tol=DEFAULT_TOLERANCE):
+    """Calibrated difficulty per question as a DataFrame (UPDATE_COLUMNS), plus a summary dict"""
+    if model not in MODELS:
+        raise ValueError(f"Modelo {model} desconhecido (use {', '.join(MODELS)})")
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='calibration_') as directory:
+        log = AnswerLog.from_export(path, directory, chunk_size)
+        read_seconds = time.perf_counter() - start
+        counts = log.counts(chunk_size)
+        answers, correct = counts[0], counts[1]
+        p_value = np.divide(correct, answers, out=np.full(len(answers), np.nan), where=answers > 0)
+        iterations = 0
+        if model == 'pvalue':
+            b = -_logit((correct + 0.5) / (answers + 1))
+            a = np.ones(len(b))
+        else:
+            _, b, a, iterations = fit_irt(log, model, chunk_size, max_iter, tol, counts)
+        if log.time_count is not None:
+            time_count = _grow(log.time_count, len(answers))
+            mean_time = np.divide(_grow(log.time_sum, len(answers)), time_count,
+                                  out=np.full(len(answers), np.nan), where=time_count > 0)
+        else:
+            mean_time = np.full(len(answers), np.nan)
+        updates = pd.DataFrame({
+            'id': log.questions.labels,
+            'difficulty': difficulty_stars(b),
+            'answers': answers.astype(np.int64),
+            'p_value': p_value.round(4),
+            'b': b.round(4),
+            'a': a.round(4),
+            'mean_time_spent': mean_time.round(2),
+        })
+        rows, users = log.rows, len(log.users.labels)
+        del log
+    updates = updates[updates['answers'] >= min_answers].sort_values('id', ignore_index=True)
+    summary = {'rows': rows, 'users': users, 'questions': len(answers), 'calibrated': len(updates),
+               'iterations': iterations, 'read_seconds': read_seconds, 'seconds': time.perf_counter() - start}
+    return updates, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibração de dificuldade a partir de user_answers")
+    parser.add_argument('source', help="export de user_answers (.csv ou .parquet)")
+    parser.add_argument('--model', choices=MODELS, default='2pl')
+    parser.add_argument('--min-answers', type=int, default=DEFAULT_MIN_ANSWERS,
+                        help="respostas mínimas para atualizar uma questão")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="linhas por bloco")
+    parser.add_argument('--max-iter', type=int, default=DEFAULT_MAX_ITER)
+    parser.add_argument('--output', default=UPDATES_PATH, help="arquivo de atualização (CSV)")
+    parser.add_argument('--apply', action='store_true', help="aplicar em questions.difficulty (psycopg)")
+    parser.add_argument('--dsn', help="string de conexão (padrão: DATABASE_URL)")
+    args = parser.parse_args()
+
+    updates, summary = calibrate(args.source, args.model, args.chunk_size, args.min_answers, args.max_iter)
+    updates.to_csv(args.output, index=False, columns=UPDATE_COLUMNS)
+
+    print(f"📚 {summary['rows']:,} respostas, {summary['users']:,} usuários, {summary['questions']:,} questões "
+          f"(leitura em {summary['read_seconds']:.1f}s)")
+    if args.model != 'pvalue':
+        print(f"📐 Ajuste {args.model.upper()}: {summary['iterations']} iterações")
+    print(f"💾 {summary['calibrated']} questões calibradas (>= {args.min_answers} respostas) em {args.output} "
+          f"({summary['seconds']:.1f}s)")
+    for stars, count in updates['difficulty'].value_counts().sort_index().items():
+        print(f"  {'⭐' * int(stars)}: {count}")
+
+    if args.apply:
+        from bulk_load_questions import apply_difficulty_updates, connect, loader_available
+        if not loader_available():
+            print("❌ psycopg não instalado: pip install '.[postgres]'")
+            sys.exit(1)
+        with connect(args.dsn) as conn:
+            changed = apply_difficulty_updates(conn, updates)
+        print(f"🗄️  questions.difficulty atualizada em {changed} questões")
+
+
+if __name__ == "__main__":
+    main()
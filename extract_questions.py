@@ -2,6 +2,57 @@
 import pandas as pd
 import json
 import re
+import sys
+
+from question_classifier import classify_course
+from ts_emitter import js_string
+from xlsx_stream import XlsxRowStream
+
+def cell_text(value):
+    """str() of a cell, with integral floats as ints (pandas turns int columns with blanks into float)"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def build_question_from_row(index, row):
+    """Build a question from one row of values (question text, options, course); None if invalid"""
+    # Extract basic question data
+    question_data = {
+        'id': str(index + 1).zfill(3),  # Generate ID like 001, 002, etc.
+        'text': cell_text(row[0]) if pd.notna(row[0]) else "",  # First column as question text
+        'options': [],
+        'correctAnswerIndex': 0,
+        'difficulty': 2,  # Default difficulty
+        'category': "Direito",  # Default category
+        'challengeType': "OAB_1_FASE",  # Default challenge type
+        'explanation': ""
+    }
+    
+    # Extract options (assuming they are in columns 1-4)
+    for i in range(1, min(5, len(row))):
+        if pd.notna(row[i]) and cell_text(row[i]).strip():
+            question_data['options'].append(cell_text(row[i]).strip())
+    
+    # Try to identify correct answer (look for markers like *, A), etc.)
+    for i, option in enumerate(question_data['options']):
+        if option.startswith('*') or option.startswith('✓'):
+            question_data['correctAnswerIndex'] = i
+            question_data['options'][i] = re.sub(r'^[\*✓]\s*', '', option)
+            break
+    
+    # Try to extract course/category information
+    if len(row) > 5 and pd.notna(row[5]):
+        course_info = cell_text(row[5]).strip()
+        category, challenge_type = classify_course(course_info)
+        if category:
+            question_data['category'] = category
+        if challenge_type:
+            question_data['challengeType'] = challenge_type
+    
+    # Only add questions with valid text and at least 2 options
+    if question_data['text'] and len(question_data['options']) >= 2:
+        return question_data
+    return None
 
 def extract_questions_from_excel(file_path):
     """Extract questions from Excel file and convert to TypeScript format"""
@@ -19,68 +70,8 @@ def extract_questions_from_excel(file_path):
         # Process each row
         for index, row in df.iterrows():
             try:
-                # Extract basic question data
-                question_data = {
-                    'id': str(index + 1).zfill(3),  # Generate ID like 001, 002, etc.
-                    'text': str(row.iloc[0]) if pd.notna(row.iloc[0]) else "",  # First column as question text
-                    'options': [],
-                    'correctAnswerIndex': 0,
-                    'difficulty': 2,  # Default difficulty
-                    'category': "Direito",  # Default category
-                    'challengeType': "OAB_1_FASE",  # Default challenge type
-                    'explanation': ""
-                }
-                
-                # Extract options (assuming they are in columns 1-4)
-                for i in range(1, min(5, len(row))):
-                    if pd.notna(row.iloc[i]) and str(row.iloc[i]).strip():
-                        question_data['options'].append(str(row.iloc[i]).strip())
-                
-                # Try to identify correct answer (look for markers like *, A), etc.)
-                for i, option in enumerate(question_data['options']):
-                    if option.startswith('*') or option.startswith('✓'):
-                        question_data['correctAnswerIndex'] = i
-                        question_data['options'][i] = re.sub(r'^[\*✓]\s*', '', option)
-                        break
-                
-                # Try to extract course/category information
-                if len(row) > 5 and pd.notna(row.iloc[5]):
-                    course_info = str(row.iloc[5]).strip()
-                    if 'constitucional' in course_info.lower():
-                        question_data['category'] = "Direito Constitucional"
-                    elif 'civil' in course_info.lower():
-                        question_data['category'] = "Direito Civil"
-                    elif 'penal' in course_info.lower():
-                        question_data['category'] = "Direito Penal"
-                    elif 'processo' in course_info.lower():
-                        question_data['category'] = "Processo Civil"
-                    elif 'trabalho' in course_info.lower():
-                        question_data['category'] = "Direito do Trabalho"
-                    elif 'empresarial' in course_info.lower():
-                        question_data['category'] = "Direito Empresarial"
-                    elif 'administrativo' in course_info.lower():
-                        question_data['category'] = "Direito Administrativo"
-                        question_data['challengeType'] = "CONCURSOS_MPSP"
-                    
-                    # Determine challenge type based on course
-                    if any(x in course_info.lower() for x in ['mpsp', 'defensoria', 'tribunal', 'procuradoria', 'enam', 'cnu', 'concurso']):
-                        if 'mpsp' in course_info.lower():
-                            question_data['challengeType'] = "CONCURSOS_MPSP"
-                        elif 'defensoria' in course_info.lower():
-                            question_data['challengeType'] = "CONCURSOS_DEFENSORIA"
-                        elif 'tribunal' in course_info.lower():
-                            question_data['challengeType'] = "CONCURSOS_TRIBUNAIS"
-                        elif 'procuradoria' in course_info.lower():
-                            question_data['challengeType'] = "CONCURSOS_PROCURADORIAS"
-                        elif 'enam' in course_info.lower():
-                            question_data['challengeType'] = "CONCURSOS_ENAM"
-                        elif 'cnu' in course_info.lower():
-                            question_data['challengeType'] = "CONCURSOS_CNU"
-                        else:
-                            question_data['challengeType'] = "CONCURSOS_MPSP"
-                
-                # Only add questions with valid text and at least 2 options
-                if question_data['text'] and len(question_data['options']) >= 2:
+                question_data = build_question_from_row(index, row.tolist())
+                if question_data:
                     questions.append(question_data)
                     
             except Exception as e:
@@ -93,41 +84,71 @@ def extract_questions_from_excel(file_path):
         print(f"Erro ao ler arquivo Excel: {e}")
         return []
 
-def generate_typescript_questions(questions):
-    """Generate TypeScript code for questions"""
-    ts_code = "export const questionsData = [\n"
+def extract_questions_from_excel_stream(file_path):
+    """Extract questions while streaming the workbook in read-only mode"""
+    try:
+        sheet_rows = []
+
+        def keep_sheet_rows(chunk, columns, rows):
+            sheet_rows[:] = rows
+
+        row_stream = XlsxRowStream(file_path, on_chunk=keep_sheet_rows)
+        questions = []
+        
+        for chunk in row_stream.chunks():
+            for row, sheet_row in zip(chunk, sheet_rows):
+                # Mesmo índice do DataFrame: o cabeçalho é a linha 1 e as linhas vazias também contam
+                index = sheet_row - 2
+                try:
+                    question_data = build_question_from_row(index, row)
+                    if question_data:
+                        questions.append(question_data)
+                except Exception as e:
+                    print(f"Erro ao processar linha {index}: {e}")
+        
+        row_stream.report()
+        return questions
+        
+    except Exception as e:
+        print(f"Erro ao ler arquivo Excel: {e}")
+        return []
+
+def iter_typescript_questions(questions):
+    """Yield TypeScript code for questions, one question at a time"""
+    yield "export const questionsData = [\n"
     
     for i, q in enumerate(questions):
-        ts_code += "  {\n"
-        ts_code += f'    id: "{q["id"]}",\n'
-        clean_text = q["text"].replace('"', '\\"')
-        ts_code += f'    text: "{clean_text}",\n'
-        ts_code += f'    options: {json.dumps(q["options"])},\n'
-        ts_code += f'    correctAnswerIndex: {q["correctAnswerIndex"]},\n'
-        ts_code += f'    difficulty: {q["difficulty"]},\n'
-        ts_code += f'    category: "{q["category"]}",\n'
-        ts_code += f'    challengeType: "{q["challengeType"]}",\n'
-        ts_code += f'    explanation: "{q.get("explanation", "")}"\n'
-        ts_code += "  }" + ("," if i < len(questions) - 1 else "") + "\n"
+        yield (
+            (",\n" if i else "")
+            + "  {\n"
+            + f'    id: {js_string(q["id"])},\n'
+            + f'    text: {js_string(q["text"])},\n'
+            + f'    options: {json.dumps(q["options"])},\n'
+            + f'    correctAnswerIndex: {q["correctAnswerIndex"]},\n'
+            + f'    difficulty: {q["difficulty"]},\n'
+            + f'    category: {js_string(q["category"])},\n'
+            + f'    challengeType: {js_string(q["challengeType"])},\n'
+            + f'    explanation: {js_string(q.get("explanation", ""))}\n'
+            + "  }"
+        )
     
-    ts_code += "];\n"
-    return ts_code
+    yield "\n];\n" if questions else "];\n"
 
 if __name__ == "__main__":
     file_path = "attached_assets/Questões MC 1ª FASE e Concursos_1753714117406.xlsx"
     
     print("Extraindo questões do arquivo Excel...")
-    questions = extract_questions_from_excel(file_path)
+    if '--stream' in sys.argv:
+        questions = extract_questions_from_excel_stream(file_path)
+    else:
+        questions = extract_questions_from_excel(file_path)
     
     print(f"Encontradas {len(questions)} questões válidas")
     
     if questions:
-        # Generate TypeScript code
-        ts_code = generate_typescript_questions(questions)
-        
-        # Save to file
+        # Generate TypeScript code straight into the file
         with open("extracted_questions.ts", "w", encoding="utf-8") as f:
-            f.write(ts_code)
+            f.writelines(iter_typescript_questions(questions))
         
         print("Arquivo 'extracted_questions.ts' gerado com sucesso!")
         
@@ -1,6 +1,51 @@
 #!/usr/bin/env python3
 import pandas as pd
 import json
+import sys
+
+from question_classifier import classify_text
+from ts_emitter import js_string
+from xlsx_stream import XlsxRowStream
+
+def add_question_row_v2(questions_dict, row):
+    """Add one option row (pandas row or streamed dict) to its question"""
+    question_id = str(row['ObjectQuestionId'])
+    
+    if question_id not in questions_dict:
+        questions_dict[question_id] = {
+            'id': question_id,
+            'text': str(row['QuestionStem']) if pd.notna(row['QuestionStem']) else "",
+            'options': [],
+            'correctAnswerIndex': 0,
+            'difficulty': 2,
+            'category': "Direito",
+            'challengeType': "OAB_1_FASE",
+            'explanation': ""
+        }
+    
+    # Add option
+    if pd.notna(row['Description']):
+        option_text = str(row['Description']).strip()
+        if option_text:
+            questions_dict[question_id]['options'].append(option_text)
+            
+            # If this is the correct answer
+            if int(row['Correct']) == 1:
+                questions_dict[question_id]['correctAnswerIndex'] = len(questions_dict[question_id]['options']) - 1
+
+def categorize_question_v2(question):
+    """Categorize a question by its content; returns None if it is not valid"""
+    if not (question['text'] and len(question['options']) >= 2):
+        return None
+    
+    # Categorize and determine challenge type based on question content
+    category, challenge_type = classify_text(question['text'])
+    if category:
+        question['category'] = category
+    if challenge_type:
+        question['challengeType'] = challenge_type
+    
+    return question
 
 def extract_questions_from_excel_v2(file_path):
     """Extract questions from Excel file with proper structure analysis"""
@@ -19,63 +64,13 @@ def extract_questions_from_excel_v2(file_path):
         questions_dict = {}
         
         for index, row in df.iterrows():
-            question_id = str(row['ObjectQuestionId'])
-            
-            if question_id not in questions_dict:
-                questions_dict[question_id] = {
-                    'id': question_id,
-                    'text': str(row['QuestionStem']) if pd.notna(row['QuestionStem']) else "",
-                    'options': [],
-                    'correctAnswerIndex': 0,
-                    'difficulty': 2,
-                    'category': "Direito",
-                    'challengeType': "OAB_1_FASE",
-                    'explanation': ""
-                }
-            
-            # Add option
-            if pd.notna(row['Description']):
-                option_text = str(row['Description']).strip()
-                if option_text:
-                    questions_dict[question_id]['options'].append(option_text)
-                    
-                    # If this is the correct answer
-                    if int(row['Correct']) == 1:
-                        questions_dict[question_id]['correctAnswerIndex'] = len(questions_dict[question_id]['options']) - 1
+            add_question_row_v2(questions_dict, row)
         
         # Convert to list and filter valid questions
         valid_questions = []
         for q_id, question in questions_dict.items():
-            if question['text'] and len(question['options']) >= 2:
-                # Try to categorize based on question content
-                text_lower = question['text'].lower()
-                
-                if any(word in text_lower for word in ['constituição', 'constitucional', 'supremo tribunal']):
-                    question['category'] = "Direito Constitucional"
-                elif any(word in text_lower for word in ['civil', 'contrato', 'propriedade', 'família']):
-                    question['category'] = "Direito Civil"
-                elif any(word in text_lower for word in ['penal', 'crime', 'delito', 'homicídio']):
-                    question['category'] = "Direito Penal"
-                elif any(word in text_lower for word in ['processo', 'citação', 'contestação', 'recurso']):
-                    question['category'] = "Processo Civil"
-                elif any(word in text_lower for word in ['trabalho', 'trabalhista', 'empregado', 'salário']):
-                    question['category'] = "Direito do Trabalho"
-                elif any(word in text_lower for word in ['empresarial', 'sociedade', 'empresa', 'comercial']):
-                    question['category'] = "Direito Empresarial"
-                elif any(word in text_lower for word in ['administrativo', 'servidor', 'administração pública']):
-                    question['category'] = "Direito Administrativo"
-                    question['challengeType'] = "CONCURSOS_MPSP"
-                
-                # Determine challenge type for concursos
-                if any(word in text_lower for word in ['ministério público', 'mp', 'promotor']):
-                    question['challengeType'] = "CONCURSOS_MPSP"
-                elif any(word in text_lower for word in ['defensoria', 'defensor público']):
-                    question['challengeType'] = "CONCURSOS_DEFENSORIA"
-                elif any(word in text_lower for word in ['tribunal', 'magistratura']):
-                    question['challengeType'] = "CONCURSOS_TRIBUNAIS"
-                elif any(word in text_lower for word in ['procuradoria', 'procurador']):
-                    question['challengeType'] = "CONCURSOS_PROCURADORIAS"
-                
+            question = categorize_question_v2(question)
+            if question:
                 valid_questions.append(question)
         
         return valid_questions[:100]  # Limit to first 100 questions for performance
@@ -84,46 +79,81 @@ def extract_questions_from_excel_v2(file_path):
         print(f"Erro ao ler arquivo Excel: {e}")
         return []
 
-def generate_typescript_questions_v2(questions):
-    """Generate TypeScript code for questions"""
-    ts_code = "export const questionsData = [\n"
+def extract_questions_from_excel_v2_stream(file_path, limit=100):
+    """Extract questions while streaming the workbook, stopping once limit questions are valid"""
+    try:
+        row_stream = XlsxRowStream(file_path)
+        # Um só dicionário para o arquivo todo: um id que reaparece depois soma as linhas à mesma questão
+        questions_dict = {}
+        valid_ids = set()
+        
+        for _, rows in row_stream.groups():
+            for row in rows:
+                add_question_row_v2(questions_dict, row)
+            
+            # Recategoriza a questão do grupo (pode já ter sido válida e mudado com as novas linhas)
+            question_id = str(rows[0]['ObjectQuestionId'])
+            if categorize_question_v2(questions_dict[question_id]):
+                valid_ids.add(question_id)
+            else:
+                valid_ids.discard(question_id)
+            
+            if len(valid_ids) >= limit:
+                break
+        
+        row_stream.report()
+        # Mesma ordem do caminho em lote: primeira aparição de cada id
+        valid_questions = [question for question_id, question in questions_dict.items() if question_id in valid_ids]
+        return valid_questions[:limit]
+        
+    except Exception as e:
+        print(f"Erro ao ler arquivo Excel: {e}")
+        return []
+
+def iter_typescript_questions_v2(questions):
+    """Yield TypeScript code for questions, one question at a time"""
+    yield "export const questionsData = [\n"
     
     for i, q in enumerate(questions):
-        ts_code += "  {\n"
-        ts_code += f'    id: "{q["id"]}",\n'
+        # Trim long statements for the TypeScript bundle
+        text = q["text"].replace('\r', '')
+        if len(text) > 300:
+            text = text[:300] + "..."
         
-        # Clean text for TypeScript
-        clean_text = q["text"].replace('"', '\\"').replace('\n', '\\n').replace('\r', '')
-        if len(clean_text) > 300:
-            clean_text = clean_text[:300] + "..."
-        
-        ts_code += f'    text: "{clean_text}",\n'
-        ts_code += f'    options: {json.dumps(q["options"])},\n'
-        ts_code += f'    correctAnswerIndex: {q["correctAnswerIndex"]},\n'
-        ts_code += f'    difficulty: {q["difficulty"]},\n'
-        ts_code += f'    category: "{q["category"]}",\n'
-        ts_code += f'    challengeType: "{q["challengeType"]}",\n'
-        ts_code += f'    explanation: ""\n'
-        ts_code += "  }" + ("," if i < len(questions) - 1 else "") + "\n"
+        yield (
+            (",\n" if i else "")
+            + "  {\n"
+            + f'    id: {js_string(q["id"])},\n'
+            + f'    text: {js_string(text)},\n'
+            + f'    options: {json.dumps(q["options"])},\n'
+            + f'    correctAnswerIndex: {q["correctAnswerIndex"]},\n'
+            + f'    difficulty: {q["difficulty"]},\n'
+            + f'    category: {js_string(q["category"])},\n'
+            + f'    challengeType: {js_string(q["challengeType"])},\n'
+            + f'    explanation: ""\n'
+            + "  }"
+        )
     
-    ts_code += "];\n"
-    return ts_code
+    yield "\n];\n" if questions else "];\n"
 
 if __name__ == "__main__":
     file_path = "attached_assets/Questões MC 1ª FASE e Concursos_1753714117406.xlsx"
     
     print("Extraindo questões do arquivo Excel (versão 2)...")
-    questions = extract_questions_from_excel_v2(file_path)
+    if '--stream' in sys.argv:
+        questions = extract_questions_from_excel_v2_stream(file_path)
+    else:
+        questions = extract_questions_from_excel_v2(file_path)
     
     print(f"Encontradas {len(questions)} questões válidas")
     
     if questions:
         # Generate TypeScript code
-        ts_code = generate_typescript_questions_v2(questions)
+        ts_chunks = iter_typescript_questions_v2(questions)
         
         # Save to file
         with open("questions_from_excel.ts", "w", encoding="utf-8") as f:
-            f.write(ts_code)
+            f.writelines(ts_chunks)
         
         print("Arquivo 'questions_from_excel.ts' gerado com sucesso!")
         
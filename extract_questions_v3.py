@@ -1,115 +1,106 @@
 import pandas as pd
-import json
 import sys
 
-def process_excel_questions(file_path):
+from pipeline_profile import StageProfiler
+from question_assembly import SHEET_DTYPES, _text_column, assemble_questions, assemble_questions_stream, classify_names
+from question_model import question_dicts
+from question_validation import StreamValidator, rejected_ids, summarize_rejects, validate_frame, write_rejects
+from ts_emitter import write_json_file, write_ts_module
+from xlsx_stream import XlsxRowStream
+
+DEFAULT_INPUT = "attached_assets/Questões MC 1ª FASE e Concursos_1753717156491.xlsx"
+JSON_PATH = 'questions_from_new_excel.json'
+# Módulo TS: caminho, nome do export e comentário ({count} = número de questões)
+TS_MODULE = ('questions_from_new_excel.ts', 'questionsFromNewExcel', "Questões extraídas do novo Excel - {count} questões")
+
+def load_excel_frame(file_path):
+    # Ler o arquivo Excel
+    df = pd.read_excel(file_path, dtype=SHEET_DTYPES)
+    
+    print(f"📊 Arquivo carregado com {len(df)} linhas")
+    print(f"📋 Colunas: {list(df.columns)}")
+    
+    # Mostrar algumas linhas de exemplo
+    print("\n🔍 Primeiras 5 linhas:")
+    for i in range(min(5, len(df))):
+        row = df.iloc[i]
+        print(f"Linha {i+1}:")
+        for col in df.columns:
+            print(f"  {col}: {str(row[col])[:100]}...")
+    
+    # Estrutura esperada:
+    # ObjectQuestionId: ID da questão
+    # Name: Nome/título da questão
+    # QuestionStem: Texto da questão
+    # Letter: A, B, C, D (opção)
+    # Description: Texto da opção
+    # Correct: True/False se é a resposta correta
+    return df
+
+def validate_extracted(questions, rejects):
+    """Drop every question with a reject that excludes it (see question_validation.rejected_ids)"""
+    rejected = rejected_ids(rejects)
+    return [q for q in questions if q.id not in rejected]
+
+def save_extracted_questions(complete_questions, compact=False, ts=True):
+    """Write questions_from_new_excel.json and (unless ts=False) the .ts module, streaming one question at a time"""
+    # Salvar arquivos (Question -> dict só na gravação)
+    write_json_file(JSON_PATH, question_dicts(complete_questions), compact)
+    
+    # Salvar em TypeScript
+    ts_path, export_name, comment = TS_MODULE
+    if ts:
+        write_ts_module(ts_path, export_name, question_dicts(complete_questions), comment.format(count=len(complete_questions)), compact)
+    
+    print(f"\n💾 ARQUIVOS SALVOS:")
+    print(f"  - {JSON_PATH} ({len(complete_questions)} questões)")
+    if ts:
+        print(f"  - {ts_path}")
+
+def process_excel_questions(file_path, stream=False, compact=False, profiler=None, ts=True, workers=1):
+    profiler = profiler or StageProfiler.disabled('extract_questions_v3')
     try:
-        # Ler o arquivo Excel
-        df = pd.read_excel(file_path)
-        
-        print(f"📊 Arquivo carregado com {len(df)} linhas")
-        print(f"📋 Colunas: {list(df.columns)}")
-        
-        # Mostrar algumas linhas de exemplo
-        print("\n🔍 Primeiras 5 linhas:")
-        for i in range(min(5, len(df))):
-            row = df.iloc[i]
-            print(f"Linha {i+1}:")
-            for col in df.columns:
-                print(f"  {col}: {str(row[col])[:100]}...")
-        
-        # Estrutura esperada:
-        # ObjectQuestionId: ID da questão
-        # Name: Nome/título da questão
-        # QuestionStem: Texto da questão
-        # Letter: A, B, C, D (opção)
-        # Description: Texto da opção
-        # Correct: True/False se é a resposta correta
-        
-        questions_dict = {}
-        
-        # Processar cada linha
-        for index, row in df.iterrows():
-            try:
-                question_id = str(row['ObjectQuestionId']) if pd.notna(row['ObjectQuestionId']) else None
-                question_stem = str(row['QuestionStem']) if pd.notna(row['QuestionStem']) else None
-                letter = str(row['Letter']).strip().upper() if pd.notna(row['Letter']) else None
-                description = str(row['Description']) if pd.notna(row['Description']) else None
-                is_correct = row['Correct'] if pd.notna(row['Correct']) else False
-                name = str(row['Name']) if pd.notna(row['Name']) else None
-                
-                if not question_id or not question_stem or not letter or not description:
-                    continue
-                
-                # Inicializar questão se não existir
-                if question_id not in questions_dict:
-                    questions_dict[question_id] = {
-                        'id': question_id,
-                        'name': name,
-                        'text': question_stem,
-                        'options': ['', '', '', ''],
-                        'correctAnswerIndex': 0,
-                        'difficulty': 3,
-                        'category': 'Direito Geral',
-                        'challengeType': 'OAB_1_FASE',
-                        'explanation': f"Questão {question_id}"
-                    }
-                
-                # Mapear letra para índice
-                letter_index = ord(letter) - ord('A') if letter in ['A', 'B', 'C', 'D'] else 0
-                
-                # Definir opção
-                if 0 <= letter_index < 4:
-                    questions_dict[question_id]['options'][letter_index] = description
-                    
-                    # Se é a resposta correta
-                    if is_correct:
-                        questions_dict[question_id]['correctAnswerIndex'] = letter_index
-                
-                # Tentar identificar categoria pela questão/nome
-                if name and any(word in name.upper() for word in ['PENAL', 'CRIMINAL']):
-                    questions_dict[question_id]['category'] = 'Direito Penal'
-                elif name and any(word in name.upper() for word in ['CIVIL', 'CIVILISTICO']):
-                    questions_dict[question_id]['category'] = 'Direito Civil'
-                elif name and any(word in name.upper() for word in ['CONSTITUCIONAL', 'CONSTITUICAO']):
-                    questions_dict[question_id]['category'] = 'Direito Constitucional'
-                elif name and any(word in name.upper() for word in ['ADMINISTRATIVO', 'ADMIN']):
-                    questions_dict[question_id]['category'] = 'Direito Administrativo'
-                elif name and any(word in name.upper() for word in ['TRIBUTARIO', 'TRIBUTO']):
-                    questions_dict[question_id]['category'] = 'Tributário'
-                elif name and any(word in name.upper() for word in ['ETICA', 'PROFISSIONAL']):
-                    questions_dict[question_id]['category'] = 'Ética Profissional'
-                elif name and any(word in name.upper() for word in ['PROCESSO', 'PROCESSUAL']):
-                    questions_dict[question_id]['category'] = 'Direito Processual'
-                elif name and any(word in name.upper() for word in ['TRABALHO', 'TRABALHISTA']):
-                    questions_dict[question_id]['category'] = 'Direito do Trabalho'
-                elif name and any(word in name.upper() for word in ['EMPRESA', 'EMPRESARIAL']):
-                    questions_dict[question_id]['category'] = 'Direito Empresarial'
-                elif name and any(word in name.upper() for word in ['CONCURSO', 'MPSP', 'TRIBUNAL']):
-                    questions_dict[question_id]['challengeType'] = 'CONCURSOS_MPSP'
-                    questions_dict[question_id]['category'] = 'Direito Administrativo'
-                
-            except Exception as e:
-                print(f"❌ Erro na linha {index + 1}: {e}")
-                continue
-        
-        # Converter para lista
-        questions = list(questions_dict.values())
-        
-        # Filtrar questões completas
-        complete_questions = []
-        for q in questions:
-            # Verificar se tem todas as 4 opções preenchidas
-            if all(opt.strip() for opt in q['options']):
-                complete_questions.append(q)
+        if stream:
+            # Leitura em streaming (openpyxl read-only), questão a questão;
+            # leitura, classificação e montagem acontecem juntas, numa etapa só
+            validator = StreamValidator()
+            row_stream = XlsxRowStream(file_path, on_chunk=validator.add_chunk)
+            with profiler.stage('read+assemble') as stage:
+                questions = assemble_questions_stream(row_stream.groups())
+                stage.rows_in, stage.rows_out = row_stream.rows_read, len(questions)
+            with profiler.stage('validate', row_stream.rows_read) as stage:
+                rejects = validator.rejects()
+                stage.rows_out = len(rejects)
+            row_stream.report()
+        else:
+            with profiler.stage('read') as stage:
+                df = load_excel_frame(file_path)
+                stage.rows_out = len(df)
+            with profiler.stage('classify', len(df)) as stage:
+                labels = classify_names(_text_column(df['Name']), workers)
+                stage.rows_out = len(labels)
+            # Montagem colunar: pivot de Letter/Description/Correct por ObjectQuestionId
+            with profiler.stage('assemble', len(df)) as stage:
+                questions = assemble_questions(df, labels)
+                stage.rows_out = len(questions)
+            with profiler.stage('validate', len(df)) as stage:
+                rejects = validate_frame(df)
+                stage.rows_out = len(rejects)
+        
+        # Validação (letras, Correct, alternativas): manter só as questões aprovadas
+        with profiler.stage('filter', len(questions)) as stage:
+            complete_questions = validate_extracted(questions, rejects)
+            write_rejects(rejects)
+            stage.rows_out = len(complete_questions)
+        summarize_rejects(rejects)
         
         print(f"\n📊 PROCESSAMENTO CONCLUÍDO:")
         print(f"  Total de IDs únicos: {len(questions)}")
-        print(f"  Questões completas (4 opções): {len(complete_questions)}")
+        print(f"  Questões válidas: {len(complete_questions)}")
         
         # Contar por tipo
-        oab_count = len([q for q in complete_questions if q['challengeType'] == 'OAB_1_FASE'])
-        concursos_count = len([q for q in complete_questions if q['challengeType'] == 'CONCURSOS_MPSP'])
+        oab_count = len([q for q in complete_questions if q.challenge_type == 'OAB_1_FASE'])
+        concursos_count = len([q for q in complete_questions if q.challenge_type == 'CONCURSOS_MPSP'])
         
         print(f"  OAB 1ª FASE: {oab_count} questões")
         print(f"  CONCURSOS: {concursos_count} questões")
@@ -117,7 +108,7 @@ def process_excel_questions(file_path):
         # Contar por categoria
         categories = {}
         for q in complete_questions:
-            cat = q['category']
+            cat = q.category
             categories[cat] = categories.get(cat, 0) + 1
         
         print(f"\n📚 POR CATEGORIA:")
@@ -128,26 +119,14 @@ def process_excel_questions(file_path):
         if complete_questions:
             print(f"\n📝 EXEMPLO DAS PRIMEIRAS 5 QUESTÕES:")
             for i, q in enumerate(complete_questions[:5], 1):
-                print(f"\n{i}. {q['category']} ({q['challengeType']})")
-                print(f"   Texto: {q['text'][:100]}...")
-                print(f"   Opções: {len([opt for opt in q['options'] if opt.strip()])}")
-                print(f"   Correta: {chr(65 + q['correctAnswerIndex'])}")
-        
-        # Salvar arquivos
-        with open('questions_from_new_excel.json', 'w', encoding='utf-8') as f:
-            json.dump(complete_questions, f, indent=2, ensure_ascii=False)
-        
-        # Salvar em TypeScript
-        ts_content = f"""// Questões extraídas do novo Excel - {len(complete_questions)} questões
-export const questionsFromNewExcel = {json.dumps(complete_questions, indent=2, ensure_ascii=False)};
-"""
-        
-        with open('questions_from_new_excel.ts', 'w', encoding='utf-8') as f:
-            f.write(ts_content)
+                print(f"\n{i}. {q.category} ({q.challenge_type})")
+                print(f"   Texto: {q.text[:100]}...")
+                print(f"   Opções: {len([opt for opt in q.options if opt.strip()])}")
+                print(f"   Correta: {chr(65 + q.correct_answer_index)}")
         
-        print(f"\n💾 ARQUIVOS SALVOS:")
-        print(f"  - questions_from_new_excel.json ({len(complete_questions)} questões)")
-        print(f"  - questions_from_new_excel.ts")
+        with profiler.stage('write', len(complete_questions)) as stage:
+            save_extracted_questions(complete_questions, compact, ts)
+            stage.rows_out = len(complete_questions)
         
         return complete_questions
         
@@ -156,10 +135,18 @@ export const questionsFromNewExcel = {json.dumps(complete_questions, indent=2, e
         return []
 
 if __name__ == "__main__":
-    file_path = "attached_assets/Questões MC 1ª FASE e Concursos_1753717156491.xlsx"
-    questions = process_excel_questions(file_path)
+    # --input PLANILHA: outra planilha; --no-ts: só o JSON (o .ts pode ser gerado depois com ts_emitter.py)
+    file_path = sys.argv[sys.argv.index('--input') + 1] if '--input' in sys.argv else DEFAULT_INPUT
+    # --profile [arquivo.json]: tempo, linhas e memória por etapa (--cprofile ETAPA para cProfile de uma etapa)
+    # --workers N: classificação dos nomes em N processos, em blocos contíguos (0 = um por núcleo)
+    profiler = StageProfiler.from_argv('extract_questions_v3')
+    workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else 1
+    questions = process_excel_questions(file_path, stream='--stream' in sys.argv, compact='--compact' in sys.argv,
+                                        profiler=profiler, ts='--no-ts' not in sys.argv, workers=workers)
+    profiler.write_report()
     
     if questions:
         print(f"\n🎉 SUCESSO! {len(questions)} questões extraídas e prontas!")
     else:
-        print(f"\n❌ Falha na extração.")
\ No newline at end of file
+        print(f"\n❌ Falha na extração.")
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,41 @@
+import html
+import re
+from functools import lru_cache
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# Alternativas como "Todas as alternativas" se repetem muito; memo limitado
+DEFAULT_CACHE_SIZE = 4096
+
+
+def clean_html_text(text):
+    """Remove HTML tags, decode HTML entities and collapse whitespace.
+
+    Same output as html.unescape + re.sub(tags) + re.sub(whitespace) + strip,
+    but entities are only decoded when an '&' is present, tags are removed in
+    one regex pass only when a '<' is present, and whitespace is collapsed
+    with str.split/join.
+    """
+    if not text:
+        return ""
+
+    if '&' in text:
+        text = html.unescape(text)
+
+    if '<' in text:
+        text = TAG_PATTERN.sub('', text)
+
+    return ' '.join(text.split())
+
+
+def make_cleaner(cache_size=DEFAULT_CACHE_SIZE):
+    """Return clean_html_text behind a bounded LRU memo (cache_size=0 disables it)"""
+    if not cache_size:
+        return clean_html_text
+    return lru_cache(maxsize=cache_size)(clean_html_text)
+
+
+def clean_many(texts, cache_size=DEFAULT_CACHE_SIZE):
+    """Clean an iterable of strings, returning a list; repeated strings are cleaned once"""
+    clean = make_cleaner(cache_size)
+    return [clean(text) for text in texts]
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+
+MANIFEST_PATH = 'questions_manifest.json'
+DELTA_PATH = 'questions_delta.json'
+MANIFEST_VERSION = 1
+
+# Campos que vão para a tabela questions; mudar qualquer um deles gera "changed"
+HASHED_FIELDS = ('text', 'options', 'correctAnswerIndex', 'difficulty', 'category', 'challengeType', 'explanation')
+
+
+def content_hash(question):
+    """Stable hash of a raw question's content (stem, options, correct index and labels)"""
+    payload = json.dumps([question.get(field) for field in HASHED_FIELDS], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Load the ObjectQuestionId -> {hash, id} manifest, or an empty one on first run"""
+    if not os.path.exists(path):
+        return {'version': MANIFEST_VERSION, 'next_number': 1, 'questions': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Manifesto {path} com versão {manifest.get('version')} não suportada")
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Write the manifest atomically, so an interrupted run keeps the previous one"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def full_manifest(raw_questions, valid_numbers):
+    """Manifest matching a full run, where the question at 1-based position n is number n (Qxxxx)"""
+    questions = {}
+    for number, q in enumerate(raw_questions, 1):
+        # Id repetido: fica a primeira posição, como no modo incremental
+        questions.setdefault(str(q['id']), {'hash': content_hash(q), 'number': number,
+                                            'valid': number in valid_numbers})
+    return {'version': MANIFEST_VERSION, 'next_number': len(raw_questions) + 1, 'questions': questions}
+
+
+def diff_questions(raw_questions, manifest):
+    """Split raw questions (keyed by ObjectQuestionId) into added, changed and deleted.
+
+    Returns (added, changed, deleted_ids, hashes) where added/changed are lists
+    of (question, hash) and deleted_ids are source ids missing from this run.
+    """
+    known = manifest['questions']
+    added, changed, hashes = [], [], {}
+
+    for q in raw_questions:
+        source_id = str(q['id'])
+        digest = content_hash(q)
+        hashes[source_id] = digest
+        entry = known.get(source_id)
+        if entry is None:
+            added.append((q, digest))
+        elif entry['hash'] != digest:
+            changed.append((q, digest))
+
+    deleted_ids = [source_id for source_id in known if source_id not in hashes]
+    return added, changed, deleted_ids, hashes
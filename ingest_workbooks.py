@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Ingest several option-per-row workbooks in parallel and merge them into questions_from_new_excel.json.
+
+Uso:
+    python ingest_workbooks.py attached_assets/            # todos os .xlsx do diretório
+    python ingest_workbooks.py "exports/*_semana*.xlsx" --workers 4 [--stream] [--compact]
+
+Regra de conflito: os arquivos são mesclados em ordem de nome. Quando o mesmo
+ObjectQuestionId aparece em mais de um arquivo, vale a versão do arquivo que
+vem por último nessa ordem (exports semanais levam timestamp no nome, então o
+mais recente vence); a questão mantém a posição da primeira ocorrência. A
+validação vale para a versão vencedora: se o arquivo mais recente rejeita o
+ObjectQuestionId, a questão sai do resultado, mesmo que um arquivo anterior
+tivesse uma versão válida.
+
+A saída é bruta, como a do extract_questions_v3: o HTML é limpo uma única vez
+no estágio clean do migrate_all_questions (use --workers lá para paralelizar).
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from extract_questions_v3 import save_extracted_questions
+from question_assembly import SHEET_DTYPES, assemble_questions, assemble_questions_stream
+from question_validation import (
+    REJECT_COLUMNS, StreamValidator, rejected_ids, summarize_rejects, validate_frame, write_rejects,
+)
+from xlsx_stream import XlsxRowStream
+
+
+def find_workbooks(source):
+    """Expand a directory or glob into a sorted list of .xlsx paths (Excel lock files skipped)"""
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '*.xlsx'))
+    else:
+        paths = glob.glob(source)
+    return sorted(p for p in paths if not os.path.basename(p).startswith('~$'))
+
+
+def parse_workbook(file_path, stream=False):
+    """Worker: read, assemble and validate one workbook; returns (path, questions, rejects, rows, seconds).
+
+    Questions are not filtered here: merge_questions applies the rejects of
+    the file that wins each ObjectQuestionId. Text is kept raw (HTML is
+    cleaned by the clean stage, once).
+    """
+    start = time.perf_counter()
+    if stream:
+        validator = StreamValidator()
+        row_stream = XlsxRowStream(file_path, on_chunk=validator.add_chunk)
+        questions = assemble_questions_stream(row_stream.groups())
+        rejects = validator.rejects()
+        rows = row_stream.rows_read
+    else:
+        df = pd.read_excel(file_path, engine='openpyxl', dtype=SHEET_DTYPES)
+        questions = assemble_questions(df)
+        rejects = validate_frame(df)
+        rows = len(df)
+    return file_path, questions, rejects.assign(file=os.path.basename(file_path)), rows, time.perf_counter() - start
+
+
+def merge_questions(results):
+    """Merge per-file results in file-name order; the last file wins on ObjectQuestionId conflicts.
+
+    Validation is applied after the merge: an id the winning file rejects is
+    dropped, even when an older file had a valid version of it.
+    """
+    merged = {}
+    conflicts = 0
+    for _, questions, rejects, _, _ in sorted(results, key=lambda r: r[0]):
+        rejected = rejected_ids(rejects)
+        latest = {q.id: q for q in questions}
+        for question_id in list(latest) + sorted(rejected - latest.keys()):
+            if question_id in merged:
+                conflicts += 1
+            merged[question_id] = None if question_id in rejected else latest[question_id]
+    return [q for q in merged.values() if q is not None], conflicts
+
+
+def ingest_workbooks(paths, workers=None, stream=False):
+    """Parse workbooks in a process pool (one worker per core by default) and merge deterministically"""
+    start = time.perf_counter()
+    results = []
+
+    if workers == 1 or len(paths) == 1:
+        results = [parse_workbook(path, stream) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(parse_workbook, paths, [stream] * len(paths)))
+
+    print(f"\n⏱️  TEMPO POR ARQUIVO:")
+    for path, questions, rejects, rows, seconds in results:
+        print(f"  {os.path.basename(path)}: {rows} linhas, {len(questions)} questões "
+              f"({len(rejected_ids(rejects))} rejeitadas) em {seconds:.2f}s")
+
+    questions, conflicts = merge_questions(results)
+    elapsed = time.perf_counter() - start
+    busy = sum(r[4] for r in results)
+    
+    rejects = pd.concat([r[2] for r in results], ignore_index=True)
+    write_rejects(rejects, columns=['file'] + REJECT_COLUMNS)
+    summarize_rejects(rejects)
+
+    print(f"\n📊 INGESTÃO CONCLUÍDA:")
+    print(f"  Arquivos: {len(paths)}")
+    print(f"  Questões mescladas: {len(questions)} ({conflicts} conflitos de ObjectQuestionId resolvidos)")
+    print(f"  Tempo total: {elapsed:.2f}s (soma por arquivo {busy:.2f}s, {busy / elapsed if elapsed else 0:.1f}x)")
+
+    return questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão paralela de planilhas de questões")
+    parser.add_argument('source', help="diretório ou glob de arquivos .xlsx")
+    parser.add_argument('--workers', type=int, default=None, help="processos (padrão: um por núcleo)")
+    parser.add_argument('--stream', action='store_true', help="ler cada planilha em streaming (openpyxl read-only)")
+    parser.add_argument('--compact', action='store_true', help="gravar JSON/TS sem indentação")
+    args = parser.parse_args()
+
+    paths = find_workbooks(args.source)
+    if not paths:
+        print(f"❌ Nenhum arquivo .xlsx encontrado em {args.source}")
+        sys.exit(1)
+
+    print(f"📂 {len(paths)} planilhas encontradas")
+    questions = ingest_workbooks(paths, workers=args.workers, stream=args.stream)
+    save_extracted_questions(questions, args.compact)
+
+    print(f"\n🎉 SUCESSO! {len(questions)} questões extraídas e prontas!")
+
+
+if __name__ == "__main__":
+    main()
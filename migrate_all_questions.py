@@ -1,74 +1,134 @@
 import json
-import re
-import html
+import os
 import sys
 sys.path.append('.')
 
-def clean_html_text(text):
-    """Remove HTML tags and decode HTML entities"""
-    if not text:
-        return ""
+import pandas as pd
+
+from bulk_load_questions import connect, load_questions, loader_available
+from chunk_pool import map_columns
+from html_cleaning import make_cleaner
+from incremental_import import DELTA_PATH, diff_questions, full_manifest, load_manifest, save_manifest
+from pipeline_profile import StageProfiler
+from question_columnar import ARROW_PATH, columnar_available, write_question_bank
+from question_dedup import DEFAULT_THRESHOLD, DUPLICATES_PATH, find_near_duplicates, save_duplicate_report
+from question_model import Question, question_dicts, questions_from_dicts
+from question_sampler import StratifiedSampler
+from question_text import TEXT_CACHE_PATH, normalize_questions
+from question_validation import REJECT_COLUMNS, summarize_rejects, validate_questions, write_rejects
+from ts_emitter import write_json_file, write_ts_module
+
+CLEANED_REJECTS_PATH = 'questions_cleaned_rejects.csv'
+# Módulo TS: caminho, nome do export e comentário ({count} = número de questões)
+TS_MODULE = ('questions_cleaned.ts', 'questionsCleanedFromExcel', "Questões limpas do Excel - {count} questões válidas")
+
+def question_id_for(number):
+    """Cleaned question id (Q0001, Q0002, ...) for a 1-based source position"""
+    return f"Q{str(number).zfill(4)}"
+
+def clean_columns(texts, options, explanations):
+    """Worker: cleaned text/options/explanation columns for a block of questions, plus an error column"""
+    # Limpeza com memo: alternativas repetidas são processadas uma vez (um memo por processo)
+    clean_text = make_cleaner()
+    columns = ([], [], [], [])
+    for text, opts, explanation in zip(texts, options, explanations):
+        try:
+            row = (clean_text(text), tuple(clean_text(opt) for opt in opts), clean_text(explanation), None)
+        except Exception as e:
+            row = ('', (), '', str(e))
+        for column, value in zip(columns, row):
+            column.append(value)
+    return columns
+
+def clean_questions(raw_questions, numbers, workers=1):
+    """Cleaned copies of raw Questions (HTML stripped from text, options and explanation).
     
-    # Decode HTML entities
-    text = html.unescape(text)
+    Returns (cleaned, errors), aligned with raw_questions: cleaned[i] is None
+    and errors[i] the message when cleaning raised. With workers > 1 the text
+    is cleaned in contiguous blocks in a process pool (same result and order).
+    """
+    explanations = [q.explanation if q.explanation is not None else f"Questão {number} extraída do Excel"
+                    for q, number in zip(raw_questions, numbers)]
+    texts, options, explanations, errors = map_columns(
+        clean_columns, [[q.text for q in raw_questions], [q.options for q in raw_questions], explanations], workers)
+    cleaned = [
+        None if error else Question(question_id_for(number), text, opts, q.correct_answer_index, q.difficulty,
+                                    q.category_code, q.challenge_type_code, explanation)
+        for q, number, text, opts, explanation, error in zip(raw_questions, numbers, texts, options, explanations, errors)
+    ]
+    return cleaned, errors
+
+def save_cleaned_questions(cleaned_questions, compact=False, ts=True):
+    """Write questions_cleaned.json and (unless ts=False) questions_cleaned.ts, streaming one question at a time"""
+    # Salvar questões limpas
+    write_json_file('questions_cleaned.json', question_dicts(cleaned_questions), compact)
     
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    # Criar arquivo TypeScript
+    if ts:
+        ts_path, export_name, comment = TS_MODULE
+        write_ts_module(ts_path, export_name, question_dicts(cleaned_questions), comment.format(count=len(cleaned_questions)), compact)
     
-    # Clean up extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    # Banco colunar (Arrow IPC) para leitura por colunas com memory-map; guarda o digest do JSON acima
+    if columnar_available():
+        write_question_bank(cleaned_questions, ARROW_PATH, 'questions_cleaned.json')
+        print(f"💾 Banco colunar salvo em {ARROW_PATH}")
     
-    return text
+    # Enunciado e alternativas sem acento e tokenizados, uma vez por questão (só o que mudou desde a última execução)
+    text = normalize_questions(cleaned_questions, TEXT_CACHE_PATH)
+    print(f"💾 Texto normalizado salvo em {TEXT_CACHE_PATH}: {text.cache_hits} do cache, "
+          f"{len(text) - text.cache_hits} normalizadas")
 
-def load_and_clean_questions():
-    """Load questions from JSON and clean HTML"""
-    try:
+def load_raw_questions(profiler):
+    """Read stage: questions_from_new_excel.json as Question records"""
+    with profiler.stage('read') as stage:
         with open('questions_from_new_excel.json', 'r', encoding='utf-8') as f:
-            raw_questions = json.load(f)
+            raw_questions = questions_from_dicts(json.load(f))
+        stage.rows_out = len(raw_questions)
+    return raw_questions
+
+def load_and_clean_questions(compact=False, profiler=None, ts=True, workers=1):
+    """Load questions from JSON and clean HTML (workers > 1: in a process pool)"""
+    profiler = profiler or StageProfiler.disabled('migrate_all_questions')
+    try:
+        raw_questions = load_raw_questions(profiler)
         
         print(f"📚 Carregadas {len(raw_questions)} questões do JSON")
         
-        cleaned_questions = []
+        cleaned_all, source_ids, numbers, errors = [], [], [], []
         
-        for i, q in enumerate(raw_questions):
-            try:
-                # Clean text and options
-                cleaned_question = {
-                    'id': f"Q{str(i+1).zfill(4)}",
-                    'text': clean_html_text(q['text']),
-                    'options': [clean_html_text(opt) for opt in q['options']],
-                    'correctAnswerIndex': q['correctAnswerIndex'],
-                    'difficulty': q['difficulty'], 
-                    'category': q['category'],
-                    'challengeType': q['challengeType'],
-                    'explanation': clean_html_text(q.get('explanation', f"Questão {i+1} extraída do Excel"))
-                }
-                
-                # Validar se tem texto e 4 opções não vazias
-                if (cleaned_question['text'].strip() and 
-                    len(cleaned_question['options']) == 4 and
-                    all(opt.strip() for opt in cleaned_question['options'])):
-                    cleaned_questions.append(cleaned_question)
+        with profiler.stage('clean', len(raw_questions)) as stage:
+            cleaned, clean_errors = clean_questions(raw_questions, range(1, len(raw_questions) + 1), workers)
+            for number, (q, cleaned_question, error) in enumerate(zip(raw_questions, cleaned, clean_errors), 1):
+                if error is None:
+                    cleaned_all.append(cleaned_question)
+                    source_ids.append(q.id)
+                    numbers.append(number)
                 else:
-                    print(f"⚠️  Questão {i+1} ignorada: dados incompletos")
-                    
-            except Exception as e:
-                print(f"❌ Erro na questão {i+1}: {e}")
-                continue
-        
-        print(f"✅ {len(cleaned_questions)} questões limpas e válidas")
+                    errors.append((q.id, 'clean_error', number, error))
+            stage.rows_out = len(cleaned_all)
         
-        # Salvar questões limpas
-        with open('questions_cleaned.json', 'w', encoding='utf-8') as f:
-            json.dump(cleaned_questions, f, indent=2, ensure_ascii=False)
+        # Validação colunar: um registro por problema no CSV, em vez de um print por questão
+        with profiler.stage('validate', len(cleaned_all)) as stage:
+            rejects = validate_questions(cleaned_all, source_ids, numbers)
+            if errors:
+                rejects = pd.concat([rejects, pd.DataFrame(errors, columns=REJECT_COLUMNS)], ignore_index=True)
+                rejects = rejects.sort_values('row', kind='stable', ignore_index=True)
+            rejected_rows = set(rejects['row'])
+            cleaned_questions = [q for q, number in zip(cleaned_all, numbers) if number not in rejected_rows]
+            write_rejects(rejects, CLEANED_REJECTS_PATH)
+            stage.rows_out = len(cleaned_questions)
+        summarize_rejects(rejects, CLEANED_REJECTS_PATH)
         
-        # Criar arquivo TypeScript
-        ts_content = f"""// Questões limpas do Excel - {len(cleaned_questions)} questões válidas
-export const questionsCleanedFromExcel = {json.dumps(cleaned_questions, indent=2, ensure_ascii=False)};
-"""
+        print(f"✅ {len(cleaned_questions)} questões limpas e válidas")
         
-        with open('questions_cleaned.ts', 'w', encoding='utf-8') as f:
-            f.write(ts_content)
+        with profiler.stage('write', len(cleaned_questions)) as stage:
+            save_cleaned_questions(cleaned_questions, compact, ts)
+            # Os Qxxxx foram renumerados: o manifesto do --incremental passa a refletir esta execução
+            save_manifest(full_manifest(raw_questions, set(numbers) - rejected_rows))
+            # ...e um questions_delta.json anterior não vale mais para o banco
+            if os.path.exists(DELTA_PATH):
+                os.remove(DELTA_PATH)
+            stage.rows_out = len(cleaned_questions)
         
         return cleaned_questions
         
@@ -76,38 +136,187 @@ export const questionsCleanedFromExcel = {json.dumps(cleaned_questions, indent=2
         print(f"❌ Erro ao processar questões: {e}")
         return []
 
-def save_sample_questions(questions, sample_size=50):
-    """Save a sample of questions for testing"""
-    if not questions:
-        return
+def load_and_clean_questions_incremental(compact=False, profiler=None, ts=True, workers=1):
+    """Clean only questions added or changed since the last run and write a delta file.
     
-    # Get sample from different categories
-    sample = []
-    categories_seen = set()
+    Unchanged questions (same content hash in the manifest) are not cleaned or
+    validated again and keep their Qxxxx id, so the database can apply
+    questions_delta.json instead of reloading everything. Their rejects are
+    carried over from the previous questions_cleaned_rejects.csv.
     
-    for q in questions:
-        if len(sample) >= sample_size:
-            break
+    Only cleaning, validation and the delta/DB load are incremental: the
+    outputs (JSON, TS, Arrow) are rewritten in full on every run. When the
+    manifest does not match the previous outputs this falls back to the full
+    mode, which removes questions_delta.json (load_into_database then does a
+    full load).
+    """
+    profiler = profiler or StageProfiler.disabled('migrate_all_questions')
+    try:
+        raw_questions = load_raw_questions(profiler)
+        
+        print(f"📚 Carregadas {len(raw_questions)} questões do JSON")
+        
+        manifest = load_manifest()
+        known = manifest['questions']
+        first_run = not known
+        cleaned_by_id = {}
+        previous_rejects = pd.DataFrame(columns=REJECT_COLUMNS)
+        missing = [path for path in ('questions_cleaned.json', CLEANED_REJECTS_PATH) if not os.path.exists(path)]
+        if not first_run and missing:
+            # Sem a saída anterior não há como reaproveitar: reprocessa tudo mantendo os ids
+            print(f"⚠️  {', '.join(missing)} ausente: reprocessando todas as questões")
+            for entry in known.values():
+                entry['hash'] = ''
+        elif not first_run:
+            with open('questions_cleaned.json', 'r', encoding='utf-8') as f:
+                cleaned_by_id = {q.id: q for q in questions_from_dicts(json.load(f))}
+            # Manifesto de outra numeração (ex.: saída gravada por uma versão sem manifesto no modo completo)
+            if {question_id_for(entry['number']) for entry in known.values() if entry['valid']} != set(cleaned_by_id):
+                print("⚠️  Manifesto não corresponde a questions_cleaned.json: executando o modo completo")
+                return load_and_clean_questions(compact, profiler, ts, workers)
+            previous_rejects = pd.read_csv(CLEANED_REJECTS_PATH, dtype={'id': str, 'detail': str})
+        added, changed, deleted_ids, _ = diff_questions(raw_questions, manifest)
+        unchanged = len(raw_questions) - len(added) - len(changed)
+        print(f"🔁 Delta: {len(added)} novas, {len(changed)} alteradas, {len(deleted_ids)} removidas, {unchanged} inalteradas")
+        
+        delta = {'added': [], 'changed': [], 'deleted': []}
+        
+        with profiler.stage('clean', len(added) + len(changed)) as stage:
+            entries = []
+            for q, digest in added + changed:
+                entry = known.get(str(q.id))
+                if entry is None:
+                    entry = known[str(q.id)] = {'hash': digest, 'number': manifest['next_number'], 'valid': False}
+                    manifest['next_number'] += 1
+                entries.append(entry)
+            pending = [q for q, _ in added + changed]
+            numbers = [entry['number'] for entry in entries]
+            cleaned, clean_errors = clean_questions(pending, numbers, workers)
+            ok = [i for i, error in enumerate(clean_errors) if error is None]
+            errors = [(str(q.id), 'clean_error', number, error)
+                      for q, number, error in zip(pending, numbers, clean_errors) if error is not None]
+            stage.rows_out = len(ok)
+        
+        # Mesmas regras do modo completo, só para o que foi limpo agora (row = número do Qxxxx)
+        with profiler.stage('validate', len(ok)) as stage:
+            rejects = validate_questions([cleaned[i] for i in ok], [str(pending[i].id) for i in ok], [numbers[i] for i in ok])
+            # Rejeições das questões inalteradas vêm da execução anterior
+            reprocessed = {str(q.id) for q in pending} | set(deleted_ids)
+            kept = previous_rejects[~previous_rejects['id'].isin(reprocessed)]
+            rejects = pd.concat([kept, rejects, pd.DataFrame(errors, columns=REJECT_COLUMNS)], ignore_index=True)
+            rejects = rejects.sort_values('row', kind='stable', ignore_index=True)
+            rejected_rows = set(rejects['row'])
+            write_rejects(rejects, CLEANED_REJECTS_PATH)
+            
+            for (q, digest), entry, cleaned_question in zip(added + changed, entries, cleaned):
+                if entry['number'] in rejected_rows:
+                    cleaned_question = None
+            
+                was_valid = entry['valid']
+                entry['hash'] = digest
+                entry['valid'] = cleaned_question is not None
+            
+                if cleaned_question is None:
+                    if was_valid:
+                        delta['deleted'].append(question_id_for(entry['number']))
+                elif was_valid:
+                    delta['changed'].append(cleaned_question)
+                else:
+                    delta['added'].append(cleaned_question)
+            stage.rows_out = len(delta['added']) + len(delta['changed'])
+        summarize_rejects(rejects, CLEANED_REJECTS_PATH)
         
-        cat = q['category']
-        if cat not in categories_seen or len(sample) < 20:
-            sample.append(q)
-            categories_seen.add(cat)
+        for source_id in deleted_ids:
+            entry = known.pop(source_id)
+            if entry['valid']:
+                delta['deleted'].append(question_id_for(entry['number']))
+        
+        # Aplicar o delta sobre o questions_cleaned.json anterior
+        for question_id in delta['deleted']:
+            cleaned_by_id.pop(question_id, None)
+        for q in delta['added'] + delta['changed']:
+            cleaned_by_id[q.id] = q
+        
+        cleaned_questions = []
+        for q in raw_questions:
+            entry = known[str(q.id)]
+            if entry['valid']:
+                cleaned_questions.append(cleaned_by_id[question_id_for(entry['number'])])
+        
+        with profiler.stage('write', len(cleaned_questions)) as stage:
+            with open(DELTA_PATH, 'w', encoding='utf-8') as f:
+                json.dump({'added': [q.to_dict() for q in delta['added']],
+                           'changed': [q.to_dict() for q in delta['changed']],
+                           'deleted': delta['deleted']}, f, indent=2, ensure_ascii=False)
+            
+            save_cleaned_questions(cleaned_questions, compact, ts)
+            save_manifest(manifest)
+            stage.rows_out = len(cleaned_questions)
+        
+        print(f"💾 Delta salvo em {DELTA_PATH}: {len(delta['added'])} inserir, {len(delta['changed'])} atualizar, {len(delta['deleted'])} remover")
+        print(f"✅ {len(cleaned_questions)} questões limpas e válidas")
+        
+        return cleaned_questions
+        
+    except Exception as e:
+        print(f"❌ Erro ao processar questões: {e}")
+        return []
+
+def report_near_duplicates(questions, threshold=DEFAULT_THRESHOLD):
+    """Dedup stage: find near-duplicate stems/options and write the cluster report.
     
-    # Ensure we have both types
-    oab_sample = [q for q in sample if q['challengeType'] == 'OAB_1_FASE'][:40]
-    concursos_sample = [q for q in sample if q['challengeType'] == 'CONCURSOS_MPSP'][:10]
+    The cleaned outputs are left untouched (ids stay stable for the incremental
+    manifest); the report names a canonical question per cluster. Tokens come
+    from the text cache written with the cleaned questions.
+    """
+    text = normalize_questions(questions, TEXT_CACHE_PATH, save=False)
+    clusters = find_near_duplicates(questions, threshold, text=text)
+    save_duplicate_report(questions, clusters, threshold)
+    duplicates = sum(len(cluster) - 1 for cluster in clusters)
+    print(f"🔍 Quase-duplicatas (Jaccard >= {threshold}): {len(clusters)} grupos, {duplicates} questões redundantes")
+    print(f"💾 Relatório salvo em {DUPLICATES_PATH}")
+    return clusters
+
+def load_into_database(questions, incremental=False):
+    """Loader stage: COPY the cleaned questions (or just the delta) into the questions table.
     
-    final_sample = oab_sample + concursos_sample
+    Without questions_delta.json (the incremental run fell back to the full
+    mode, which renumbers the Qxxxx ids) the whole table is reloaded.
+    """
+    if not loader_available():
+        print("⚠️  psycopg não instalado: carga no banco ignorada (pip install '.[postgres]')")
+        return
+    if incremental and not os.path.exists(DELTA_PATH):
+        print(f"⚠️  {DELTA_PATH} ausente (modo completo): recarregando todas as questões")
+        incremental = False
+    with connect() as conn:
+        if incremental:
+            with open(DELTA_PATH, 'r', encoding='utf-8') as f:
+                delta = json.load(f)
+            upserted, deleted = load_questions(conn, delta['added'] + delta['changed'], replace=False,
+                                               deleted_ids=delta['deleted'])
+        else:
+            upserted, deleted = load_questions(conn, questions)
+    print(f"🗄️  Banco atualizado via COPY: {upserted} inseridas/atualizadas, {deleted} removidas")
+
+def save_sample_questions(questions, sample_size=50, seed=42):
+    """Save a seeded stratified sample (proportional per challengeType × category) for testing"""
+    if not questions:
+        return
+    
+    # Cotas proporcionais, com pelo menos uma questão de cada estrato (garante os dois tipos)
+    sampler = StratifiedSampler(questions)
+    quotas = sampler.quotas(sample_size, mode='proportional', min_per_stratum=1)
+    final_sample = [questions[i] for i in sampler.sample(quotas, seed)]
     
     with open('questions_sample.json', 'w', encoding='utf-8') as f:
-        json.dump(final_sample, f, indent=2, ensure_ascii=False)
+        json.dump([q.to_dict() for q in final_sample], f, indent=2, ensure_ascii=False)
     
     print(f"💾 Amostra salva: {len(final_sample)} questões em questions_sample.json")
     
     # Show sample stats
-    oab_count = len([q for q in final_sample if q['challengeType'] == 'OAB_1_FASE'])
-    conc_count = len([q for q in final_sample if q['challengeType'] == 'CONCURSOS_MPSP'])
+    oab_count = sum(count for (challenge_type, _), count in quotas.items() if challenge_type == 'OAB_1_FASE')
+    conc_count = sum(count for (challenge_type, _), count in quotas.items() if challenge_type == 'CONCURSOS_MPSP')
     
     print(f"   OAB: {oab_count} questões")
     print(f"   CONCURSOS: {conc_count} questões")
@@ -117,16 +326,41 @@ def save_sample_questions(questions, sample_size=50):
 if __name__ == "__main__":
     print("🚀 Iniciando limpeza e preparação das questões...")
     
-    # Load and clean questions
-    questions = load_and_clean_questions()
+    # Load and clean questions (--incremental: clean/validate only what changed since the last run
+    # and load only questions_delta.json; the JSON/TS/Arrow outputs are still rewritten in full;
+    # --dedup [--dedup-threshold 0.8]: report near-duplicate questions;
+    # --load-db: COPY into the questions table at DATABASE_URL;
+    # --no-ts: skip questions_cleaned.ts, e.g. when run_pipeline.py emits it as its own stage)
+    # --profile [arquivo.json]: tempo, linhas e memória por etapa (--cprofile ETAPA para cProfile de uma etapa)
+    # --workers N: limpeza em N processos, em blocos contíguos (0 = um por núcleo)
+    profiler = StageProfiler.from_argv('migrate_all_questions')
+    compact = '--compact' in sys.argv
+    workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else 1
+    ts = '--no-ts' not in sys.argv
+    threshold = float(sys.argv[sys.argv.index('--dedup-threshold') + 1]) if '--dedup-threshold' in sys.argv else DEFAULT_THRESHOLD
+    if '--incremental' in sys.argv:
+        questions = load_and_clean_questions_incremental(compact, profiler, ts, workers)
+    else:
+        questions = load_and_clean_questions(compact, profiler, ts, workers)
+    
+    if questions and '--load-db' in sys.argv:
+        with profiler.stage('load-db', len(questions)) as stage:
+            load_into_database(questions, '--incremental' in sys.argv)
+            stage.rows_out = len(questions)
+    
+    if questions and '--dedup' in sys.argv:
+        with profiler.stage('dedup', len(questions)) as stage:
+            stage.rows_out = len(report_near_duplicates(questions, threshold))
     
     if questions:
         # Save sample for testing
-        sample = save_sample_questions(questions, 100)
+        with profiler.stage('sample', len(questions)) as stage:
+            sample = save_sample_questions(questions, 100)
+            stage.rows_out = len(sample)
         
         # Print statistics
-        oab_total = len([q for q in questions if q['challengeType'] == 'OAB_1_FASE'])
-        conc_total = len([q for q in questions if q['challengeType'] == 'CONCURSOS_MPSP'])
+        oab_total = len([q for q in questions if q.challenge_type == 'OAB_1_FASE'])
+        conc_total = len([q for q in questions if q.challenge_type == 'CONCURSOS_MPSP'])
         
         print(f"\n📊 ESTATÍSTICAS FINAIS:")
         print(f"  Total processado: {len(questions)} questões")
@@ -135,7 +369,7 @@ if __name__ == "__main__":
         
         categories = {}
         for q in questions:
-            cat = q['category']
+            cat = q.category
             categories[cat] = categories.get(cat, 0) + 1
         
         print(f"\n📚 TOP 10 CATEGORIAS:")
@@ -144,4 +378,7 @@ if __name__ == "__main__":
         
         print(f"\n🎉 Processamento concluído! Questões prontas para migração.")
     else:
-        print(f"❌ Falha no processamento das questões.")
\ No newline at end of file
+        print(f"❌ Falha no processamento das questões.")
+    profiler.write_report()
+    if not questions:
+        sys.exit(1)
\ No newline at end of file
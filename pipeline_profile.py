@@ -0,0 +1,210 @@
+"""Per-stage instrumentation for the question pipeline scripts.
+
+Each stage (read, classify, assemble, clean, validate, sample, write, ...)
+runs inside profiler.stage(name); with --profile the profiler records wall
+time, rows in/out, rows/s and memory per stage and writes a JSON report, so
+runs on successive Excel drops can be compared. Without --profile the stages
+cost nothing beyond a context manager.
+
+Memory per stage: rss_mb is the RSS when the stage ends and peak_rss_mb the
+highest RSS sampled while it ran (a background thread reads /proc every
+RSS_SAMPLE_SECONDS, so a spike shorter than that can be missed).
+process_peak_rss_mb is ru_maxrss, the peak of the whole process so far
+(cumulative: it never goes down from one stage to the next).
+
+Flags (read by StageProfiler.from_argv):
+    --profile [report.json]   write the report (default: pipeline_profile.json)
+    --profile-memory          per-stage peak with tracemalloc (slower; default is RSS)
+    --cprofile STAGE          run cProfile on one stage, dump STAGE.prof and print the top calls
+"""
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from xlsx_stream import peak_memory_mb
+
+DEFAULT_REPORT_PATH = 'pipeline_profile.json'
+REPORT_VERSION = 2
+RSS_SAMPLE_SECONDS = 0.005
+CPROFILE_TOP = 15
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB (Linux /proc; None elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RssSampler:
+    """Highest RSS seen between __enter__ and __exit__, read by a daemon thread (peak_mb is None without /proc)"""
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak_mb = None
+        self._done = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.peak_mb = current_rss_mb()
+        if self.peak_mb is not None:
+            self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is not None:
+            self._done.set()
+            self._thread.join()
+            self._sample()
+        return False
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and rss > self.peak_mb:
+            self.peak_mb = rss
+
+
+class StageRecord:
+    """Metrics of one stage; the code inside the stage sets rows_out (and rows_in if not given)"""
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = 0.0
+        self.rss_mb = None
+        self.peak_rss_mb = None
+        self.process_peak_rss_mb = None
+        self.peak_traced_mb = None
+
+    def to_dict(self):
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        return {
+            'stage': self.name,
+            'seconds': round(self.seconds, 4),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'rows_per_second': round(rows / self.seconds, 1) if rows and self.seconds else None,
+            'rss_mb': round(self.rss_mb, 1) if self.rss_mb is not None else None,
+            'peak_rss_mb': round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            'process_peak_rss_mb': round(self.process_peak_rss_mb, 1) if self.process_peak_rss_mb is not None else None,
+            'peak_traced_mb': round(self.peak_traced_mb, 2) if self.peak_traced_mb is not None else None,
+        }
+
+
+class StageProfiler:
+    """Collects StageRecords for one script run and writes them as a JSON report"""
+
+    def __init__(self, script, enabled=True, report_path=DEFAULT_REPORT_PATH, trace_memory=False, cprofile_stage=None):
+        self.script = script
+        self.enabled = enabled
+        self.report_path = report_path
+        self.trace_memory = enabled and trace_memory
+        self.cprofile_stage = cprofile_stage if enabled else None
+        self.records = []
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_argv(cls, script, argv=None):
+        """Profiler configured from --profile / --profile-memory / --cprofile (disabled without --profile)"""
+        argv = sys.argv if argv is None else argv
+        enabled = '--profile' in argv
+        report_path = DEFAULT_REPORT_PATH
+        if enabled:
+            following = argv[argv.index('--profile') + 1:argv.index('--profile') + 2]
+            if following and not following[0].startswith('--'):
+                report_path = following[0]
+        cprofile_stage = argv[argv.index('--cprofile') + 1] if '--cprofile' in argv[:-1] else None
+        return cls(script, enabled, report_path, '--profile-memory' in argv, cprofile_stage)
+
+    @classmethod
+    def disabled(cls, script=''):
+        return cls(script, enabled=False)
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Time (and measure) the enclosed block as one pipeline stage"""
+        record = StageRecord(name, rows_in)
+        if not self.enabled:
+            yield record
+            return
+
+        profile = cProfile.Profile() if name == self.cprofile_stage else None
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        sampler = RssSampler()
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            with sampler:
+                yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record.seconds = time.perf_counter() - start
+            record.rss_mb = current_rss_mb()
+            record.peak_rss_mb = sampler.peak_mb
+            # ru_maxrss e /proc/statm têm granularidades diferentes: o pico do processo nunca fica abaixo
+            # do pico de uma etapa já medida
+            peaks = [peak for peak in [peak_memory_mb(), record.peak_rss_mb]
+                     + [r.process_peak_rss_mb for r in self.records[-1:]] if peak is not None]
+            record.process_peak_rss_mb = max(peaks) if peaks else None
+            if self.trace_memory:
+                record.peak_traced_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            self.records.append(record)
+            if profile is not None:
+                self._dump_cprofile(name, profile)
+
+    def _dump_cprofile(self, name, profile):
+        path = f"{name}.prof"
+        profile.dump_stats(path)
+        print(f"\n🔬 cProfile da etapa '{name}' salvo em {path} (top {CPROFILE_TOP} por tempo acumulado):")
+        pstats.Stats(profile, stream=sys.stdout).sort_stats('cumulative').print_stats(CPROFILE_TOP)
+
+    def report(self):
+        """Report dict: script, timestamps, total time and one entry per stage"""
+        return {
+            'version': REPORT_VERSION,
+            'script': self.script,
+            'started_at': self.started_at,
+            'argv': sys.argv[1:],
+            'python': sys.version.split()[0],
+            'total_seconds': round(time.perf_counter() - self._start, 4),
+            'memory': 'tracemalloc' if self.trace_memory else 'rss',
+            'stages': [record.to_dict() for record in self.records],
+        }
+
+    def write_report(self):
+        """Write the JSON report and print a one-line-per-stage table (no-op when disabled)"""
+        if not self.enabled:
+            return None
+        report = self.report()
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        print(f"\n⏱️  PERFIL POR ETAPA ({self.report_path}):")
+        for stage in report['stages']:
+            rate = f"{stage['rows_per_second']:>12,.0f} linhas/s" if stage['rows_per_second'] else ' ' * 20
+            memory = stage['peak_traced_mb'] if self.trace_memory else stage['peak_rss_mb']
+            memory_info = f"  {memory:8.1f} MB" if memory is not None else ''
+            print(f"  {stage['stage']:<12s} {stage['seconds']:8.3f}s {rate}{memory_info}")
+        print(f"  {'total':<12s} {report['total_seconds']:8.3f}s")
+        return self.report_path
@@ -0,0 +1,159 @@
+import pandas as pd
+
+from chunk_pool import map_columns
+from question_classifier import classify_name
+from question_model import Question
+
+LETTER_SLOTS = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
+# dtype para pd.read_excel: sem isso uma linha vazia torna a coluna float e o id 123 vira "123.0"
+# (delta revisado do JSON, fixado em tests/test_question_assembly.py)
+SHEET_DTYPES = {'ObjectQuestionId': object}
+
+def _text_column(series):
+    """Convert a column to str, keeping missing cells as None"""
+    return series.map(str).where(series.notna(), None)
+
+
+def classify_name_columns(names):
+    """Worker: category and is_concursos columns for a block of names"""
+    labels = [classify_name(name) for name in names]
+    return [category for category, _ in labels], [is_concursos for _, is_concursos in labels]
+
+
+def classify_names(names, workers=1):
+    """(category, is_concursos) per distinct name, classified once each (workers > 1: in a process pool)"""
+    distinct = pd.unique(pd.Series(names, dtype=object).dropna()).tolist()
+    categories, concursos = map_columns(classify_name_columns, [distinct], workers)
+    return dict(zip(distinct, zip(categories, concursos)))
+
+
+def assemble_questions(df, labels=None):
+    """Assemble option-per-row sheet into Question records using columnar operations.
+
+    Produces the same records, in the same order, as the former iterrows loop of
+    extract_questions_v3: the first valid row of each ObjectQuestionId fixes
+    name/text, later rows overwrite option slots, the last correct row wins and
+    category comes from the last row whose Name matches a rule.
+
+    labels (from classify_names) lets the caller run classification as its
+    own stage; names missing from it count as unclassified.
+    """
+    qid = _text_column(df['ObjectQuestionId'])
+    stem = _text_column(df['QuestionStem'])
+    letter = _text_column(df['Letter']).str.strip().str.upper()
+    description = _text_column(df['Description'])
+    name = _text_column(df['Name'])
+    correct = df['Correct'].map(bool).where(df['Correct'].notna(), False).astype(bool)
+
+    valid = (
+        qid.fillna('').astype(bool) & stem.fillna('').astype(bool)
+        & letter.fillna('').astype(bool) & description.fillna('').astype(bool)
+    )
+
+    rows = pd.DataFrame({
+        'qid': qid[valid],
+        'name': name[valid],
+        'text': stem[valid],
+        'slot': letter[valid].map(LETTER_SLOTS).fillna(0).astype('int8'),
+        'description': description[valid],
+        'correct': correct[valid],
+    })
+
+    if rows.empty:
+        return []
+
+    # Classificar uma vez por nome distinto e propagar para as linhas
+    if labels is None:
+        labels = classify_names(rows['name'])
+    rows['category'] = rows['name'].map(lambda n: labels.get(n, (None, False))[0])
+    rows['concursos'] = rows['name'].map(lambda n: labels.get(n, (None, False))[1]).astype(bool)
+
+    heads = rows.drop_duplicates('qid', keep='first').set_index('qid')
+    order = heads.index
+
+    options = (
+        rows.drop_duplicates(['qid', 'slot'], keep='last')
+        .pivot(index='qid', columns='slot', values='description')
+        .reindex(index=order, columns=range(4))
+        .fillna('')
+    )
+
+    correct_index = (
+        rows[rows['correct']].drop_duplicates('qid', keep='last')
+        .set_index('qid')['slot']
+        .reindex(order).fillna(0).astype(int)
+    )
+
+    category = (
+        rows[rows['category'].notna()].drop_duplicates('qid', keep='last')
+        .set_index('qid')['category']
+        .reindex(order)
+    )
+    concursos = rows.groupby('qid', sort=False)['concursos'].any().reindex(order)
+
+    questions = []
+    for question_id, q_name, text, opts, answer, cat, is_concursos in zip(
+        order, heads['name'], heads['text'], options.itertuples(index=False, name=None),
+        correct_index.tolist(), category.tolist(), concursos.tolist()
+    ):
+        questions.append(Question.create(
+            question_id, text, opts, answer, 3,
+            cat if isinstance(cat, str) else 'Direito Geral',
+            'CONCURSOS_MPSP' if is_concursos else 'OAB_1_FASE',
+            f"Questão {question_id}",
+            name=q_name if isinstance(q_name, str) else None,
+        ))
+
+    return questions
+
+
+def assemble_questions_stream(groups):
+    """Assemble questions from streamed (question_id, rows) groups, row dicts as read by xlsx_stream.
+
+    Applies the same per-row rules as assemble_questions, so a question id that
+    reappears later in the sheet is merged into the record already built
+    (a mutable dict until the sheet ends, then a Question).
+    """
+    questions_dict = {}
+    labels = {}
+
+    for _, rows in groups:
+        for row in rows:
+            values = [row.get(col) for col in ('ObjectQuestionId', 'QuestionStem', 'Letter', 'Description', 'Name')]
+            question_id, question_stem, letter, description, name = [
+                str(v) if v is not None else None for v in values
+            ]
+            letter = letter.strip().upper() if letter is not None else None
+            is_correct = bool(row.get('Correct')) if row.get('Correct') is not None else False
+
+            if not question_id or not question_stem or not letter or not description:
+                continue
+
+            question = questions_dict.get(question_id)
+            if question is None:
+                question = questions_dict[question_id] = {
+                    'id': question_id,
+                    'name': name,
+                    'text': question_stem,
+                    'options': ['', '', '', ''],
+                    'correctAnswerIndex': 0,
+                    'difficulty': 3,
+                    'category': 'Direito Geral',
+                    'challengeType': 'OAB_1_FASE',
+                    'explanation': f"Questão {question_id}"
+                }
+
+            slot = LETTER_SLOTS.get(letter, 0)
+            question['options'][slot] = description
+            if is_correct:
+                question['correctAnswerIndex'] = slot
+
+            if name not in labels:
+                labels[name] = classify_name(name)
+            category, is_concursos = labels[name]
+            if category:
+                question['category'] = category
+            if is_concursos:
+                question['challengeType'] = 'CONCURSOS_MPSP'
+
+    return [Question.from_dict(q) for q in questions_dict.values()]
@@ -0,0 +1,138 @@
+"""In-memory question bank with prebuilt filter indexes for session assembly.
+
+Positions are grouped once per (challengeType, category), per challengeType,
+per category and for the whole bank, as compact int32 arrays. A draw never
+copies or sorts a pool: random_questions() runs a sparse partial Fisher–Yates
+over the matching array, so it costs O(count) and every subset is equally
+likely (unlike sort(() => Math.random() - 0.5)).
+
+    bank = QuestionBank.load()               # Arrow bank if current, else JSON
+    session = bank.random_questions(20, 'OAB_1_FASE', 'Direito Civil', seed=7)
+"""
+import json
+import random
+
+import numpy as np
+
+from question_columnar import ARROW_PATH, bank_is_current, pa, read_question_bank, table_to_questions
+from question_sampler import partial_shuffle
+
+CLEANED_PATH = 'questions_cleaned.json'
+EMPTY_POOL = np.empty(0, dtype=np.int32)
+
+
+def _factorize(values):
+    """(codes, labels) with labels in order of first appearance"""
+    lookup = {}
+    codes = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(lookup)
+
+
+def _dictionary_codes(column):
+    """(codes, labels) straight from an Arrow dictionary column; nulls become label None"""
+    if not pa.types.is_dictionary(column.type):
+        return _factorize(column.to_pylist())
+    array = column.unify_dictionaries().combine_chunks() if column.num_chunks > 1 else column.chunk(0)
+    labels = array.dictionary.to_pylist() + [None]
+    codes = array.indices.fill_null(len(labels) - 1).to_numpy(zero_copy_only=False).astype(np.int32)
+    return codes, labels
+
+
+def _group_positions(codes, size):
+    """Positions per code (source order inside each group) via one stable argsort"""
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    return [order[bounds[i]:bounds[i + 1]] for i in range(size)]
+
+
+class QuestionBank:
+    """Cleaned questions plus per-filter position arrays.
+
+    Built from question dicts (questions_cleaned.json) or from the Arrow
+    question table; with Arrow only the two label columns are decoded and
+    questions are materialised on demand.
+    """
+
+    def __init__(self, types, categories, fetch, ids):
+        """types and categories are (codes, labels) pairs as returned by _factorize"""
+        self._fetch = fetch
+        self._ids = ids
+        self._by_id = None
+        type_codes, type_labels = types
+        category_codes, category_labels = categories
+        self.size = len(type_codes)
+
+        pair_codes = type_codes.astype(np.int64) * len(category_labels) + category_codes
+
+        self.pools = {(None, None): np.arange(self.size, dtype=np.int32)}
+        # Rótulo ausente (None) só entra no pool geral, para não colidir com o filtro "qualquer"
+        for label, positions in zip(type_labels, _group_positions(type_codes, len(type_labels))):
+            if label is not None:
+                self.pools[(label, None)] = positions
+        for label, positions in zip(category_labels, _group_positions(category_codes, len(category_labels))):
+            if label is not None:
+                self.pools[(None, label)] = positions
+        pair_groups = _group_positions(pair_codes, len(type_labels) * len(category_labels))
+        for t, type_label in enumerate(type_labels):
+            for c, category_label in enumerate(category_labels):
+                positions = pair_groups[t * len(category_labels) + c]
+                if len(positions) and type_label is not None and category_label is not None:
+                    self.pools[(type_label, category_label)] = positions
+        self._rng = random.Random()
+
+    @classmethod
+    def from_questions(cls, questions):
+        """Bank over a list of cleaned question dicts"""
+        return cls(
+            _factorize([q['challengeType'] for q in questions]),
+            _factorize([q['category'] for q in questions]),
+            lambda positions: [questions[i] for i in positions],
+            ids=lambda: [q['id'] for q in questions],
+        )
+
+    @classmethod
+    def from_table(cls, table):
+        """Bank over the Arrow question table (rows are taken only when drawn)"""
+        return cls(
+            _dictionary_codes(table.column('challengeType')),
+            _dictionary_codes(table.column('category')),
+            lambda positions: table_to_questions(table.take(positions)),
+            ids=lambda: table.column('id').to_pylist(),
+        )
+
+    @classmethod
+    def load(cls, json_path=CLEANED_PATH, arrow_path=ARROW_PATH):
+        """Load the pipeline's cleaned output: memory-mapped Arrow if it matches the JSON, JSON otherwise"""
+        if bank_is_current(json_path, arrow_path):
+            return cls.from_table(read_question_bank(arrow_path))
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return cls.from_questions(json.load(f))
+
+    def pool(self, challenge_type=None, category=None):
+        """Positions matching the filter (None means any), in source order"""
+        return self.pools.get((challenge_type or None, category or None), EMPTY_POOL)
+
+    def random_positions(self, count, challenge_type=None, category=None, seed=None):
+        """Up to count distinct positions drawn uniformly from the filter, in O(count)"""
+        rng = self._rng if seed is None else random.Random(seed)
+        return [int(i) for i in partial_shuffle(self.pool(challenge_type, category), count, rng)]
+
+    def random_questions(self, count=20, challenge_type=None, category=None, seed=None):
+        """Up to count random questions matching the filter (all of them if fewer exist)"""
+        positions = self.random_positions(count, challenge_type, category, seed)
+        return self._fetch(positions) if positions else []
+
+    def question_count(self, challenge_type=None, category=None):
+        """Number of questions matching the filter"""
+        return len(self.pool(challenge_type, category))
+
+    def categories(self, challenge_type=None):
+        """Sorted categories, optionally restricted to one challengeType"""
+        return sorted(category for t, category in self.pools if category is not None and t == (challenge_type or None))
+
+    def get(self, question_id):
+        """Question by id, or None (the id map is built on first use)"""
+        if self._by_id is None:
+            self._by_id = {qid: i for i, qid in enumerate(self._ids())}
+        position = self._by_id.get(question_id)
+        return None if position is None else self._fetch([position])[0]
@@ -0,0 +1,320 @@
+import re
+import unicodedata
+from functools import reduce
+from operator import or_
+
+from question_text import fold_text
+
+# Tabelas de regras: (palavras-chave, rótulo) em ordem de precedência.
+# Cada extrator mantém sua tabela para preservar os rótulos atuais; as tabelas
+# lidas juntas (nome do curso, enunciado) compartilham um classificador.
+# Um keyword casa como substring do texto em minúsculas (como nas cadeias
+# originais) ou, sem acento (fold_text), como palavra inteira: 'TRIBUTARIO'
+# casa "Direito Tributário" e 'família' casa "familia", mas não "familiar".
+
+# extract_questions_v3: campo Name
+NAME_RULES = [
+    (['PENAL', 'CRIMINAL'], ('Direito Penal', None)),
+    (['CIVIL', 'CIVILISTICO'], ('Direito Civil', None)),
+    (['CONSTITUCIONAL', 'CONSTITUICAO'], ('Direito Constitucional', None)),
+    (['ADMINISTRATIVO', 'ADMIN'], ('Direito Administrativo', None)),
+    (['TRIBUTARIO', 'TRIBUTO'], ('Tributário', None)),
+    (['ETICA', 'PROFISSIONAL'], ('Ética Profissional', None)),
+    (['PROCESSO', 'PROCESSUAL'], ('Direito Processual', None)),
+    (['TRABALHO', 'TRABALHISTA'], ('Direito do Trabalho', None)),
+    (['EMPRESA', 'EMPRESARIAL'], ('Direito Empresarial', None)),
+    (['CONCURSO', 'MPSP', 'TRIBUNAL'], ('Direito Administrativo', 'CONCURSOS_MPSP')),
+]
+
+# extract_questions / clean_questions: nome do curso
+COURSE_CATEGORY_RULES = [
+    (['constitucional'], ('Direito Constitucional', 'OAB_1_FASE')),
+    (['civil'], ('Direito Civil', 'OAB_1_FASE')),
+    (['penal'], ('Direito Penal', 'OAB_1_FASE')),
+    (['processo'], ('Processo Civil', 'OAB_1_FASE')),
+    (['trabalho'], ('Direito do Trabalho', 'OAB_1_FASE')),
+    (['empresarial'], ('Direito Empresarial', 'OAB_1_FASE')),
+    (['administrativo'], ('Direito Administrativo', 'CONCURSOS_MPSP')),
+]
+
+# extract_questions: tipo de desafio pelo nome do curso
+COURSE_CHALLENGE_RULES = [
+    (['mpsp'], 'CONCURSOS_MPSP'),
+    (['defensoria'], 'CONCURSOS_DEFENSORIA'),
+    (['tribunal'], 'CONCURSOS_TRIBUNAIS'),
+    (['procuradoria'], 'CONCURSOS_PROCURADORIAS'),
+    (['enam'], 'CONCURSOS_ENAM'),
+    (['cnu'], 'CONCURSOS_CNU'),
+    (['concurso'], 'CONCURSOS_MPSP'),
+]
+
+# clean_questions: enunciado, usado quando o curso não casa nenhuma regra
+TEXT_FALLBACK_RULES = [
+    (['tribunal do júri', 'homicídio', 'crime'], ('Direito Penal', 'OAB_1_FASE')),
+    (['ministério público', 'promotor'], (None, 'CONCURSOS_MPSP')),
+    (['defensoria', 'defensor'], (None, 'CONCURSOS_DEFENSORIA')),
+    (['tribunal', 'magistratura'], (None, 'CONCURSOS_TRIBUNAIS')),
+]
+
+# extract_questions_v2: categoria e tipo de desafio pelo enunciado
+TEXT_CATEGORY_RULES = [
+    (['constituição', 'constitucional', 'supremo tribunal'], ('Direito Constitucional', None)),
+    (['civil', 'contrato', 'propriedade', 'família'], ('Direito Civil', None)),
+    (['penal', 'crime', 'delito', 'homicídio'], ('Direito Penal', None)),
+    (['processo', 'citação', 'contestação', 'recurso'], ('Processo Civil', None)),
+    (['trabalho', 'trabalhista', 'empregado', 'salário'], ('Direito do Trabalho', None)),
+    (['empresarial', 'sociedade', 'empresa', 'comercial'], ('Direito Empresarial', None)),
+    (['administrativo', 'servidor', 'administração pública'], ('Direito Administrativo', 'CONCURSOS_MPSP')),
+]
+
+TEXT_CHALLENGE_RULES = [
+    (['ministério público', 'mp', 'promotor'], 'CONCURSOS_MPSP'),
+    (['defensoria', 'defensor público'], 'CONCURSOS_DEFENSORIA'),
+    (['tribunal', 'magistratura'], 'CONCURSOS_TRIBUNAIS'),
+    (['procuradoria', 'procurador'], 'CONCURSOS_PROCURADORIAS'),
+]
+
+
+WORD_PATTERN = re.compile(r'\w+')
+# Pontuação fora do ASCII ('—', '“') vira espaço antes do fold_text, que a descartaria e colaria as palavras
+NON_ASCII_SEPARATOR = re.compile(r'[^\w\x00-\x7f]')
+LETTER = re.compile(r'[^\W\d_]')
+
+
+def _fold_words(text):
+    """Accent-folded text whose words are the accent-folded words of text"""
+    return fold_text(NON_ASCII_SEPARATOR.sub(' ', text))
+
+
+def _alternation(masks, order, first_char, tail, implies):
+    """One regex over all keys, as (pattern, rule mask per group), or (None, None) without keys.
+
+    Keys are grouped by first character ('c(?=(?:(ivil)|(ontrato)))|p(?=...)'),
+    so re skips every position whose character starts no key and the match
+    consumes one character: occurrences that overlap are all reported. Inside
+    a group the keys go in `order`, so the key reported at a position is the
+    longest one found there; the keys it implies (found inside it) are OR-ed
+    into its group's mask.
+    """
+    if not masks:
+        return None, None
+    by_first = {}
+    for key in sorted(masks, key=order):
+        by_first.setdefault(first_char(key), []).append(key)
+    branches, group_masks = [], [None]
+    for char, keys in by_first.items():
+        branches.append(re.escape(char) + tail(keys))
+        group_masks += [reduce(or_, (masks[other] for other in masks if implies(key, other))) for key in keys]
+    return re.compile('|'.join(branches)), group_masks
+
+
+def _substring_alternation(masks):
+    """Lowercase keywords as plain substrings"""
+    return _alternation(
+        masks, order=lambda key: (-len(key), key), first_char=lambda key: key[0],
+        tail=lambda keys: '(?=(?:' + '|'.join(f'({re.escape(key[1:])})' for key in keys) + '))',
+        implies=lambda key, other: other in key,
+    )
+
+
+def _contains_run(words, run):
+    return any(words[i:i + len(run)] == run for i in range(len(words) - len(run) + 1))
+
+
+def _word_alternation(masks):
+    """Accent-folded keywords as whole words (runs of words separated by non-word characters)"""
+    def tail(keys):
+        runs = [re.escape(key[0][1:]) + ''.join(r'\W+' + re.escape(word) for word in key[1:]) for key in keys]
+        # (?<!\w.): o caractere antes da primeira letra não é de palavra
+        return r'(?<!\w.)(?=(?:' + '|'.join(f'({run})(?!\\w)' for run in runs) + '))'
+    return _alternation(
+        masks, order=lambda key: (-len(key), -len(' '.join(key)), key), first_char=lambda key: key[0][0],
+        tail=tail, implies=_contains_run,
+    )
+
+
+def _scan(pattern, group_masks, text):
+    """OR of the rule masks of every match of an _alternation pattern in text"""
+    mask = 0
+    if pattern is not None:
+        for match in pattern.finditer(text):
+            mask |= group_masks[match.lastindex]
+    return mask
+
+
+class KeywordClassifier:
+    """Classify a text against several ordered rule tables.
+
+    A keyword hits when it occurs in the lowercased text, as in the original
+    if/elif chains, or when it equals a whole word of the text (a run of
+    words, for multi-word keywords) once both sides are accent-folded, so
+    'família' matches "familia" but not "familiar". For each table the first
+    rule (in table order) with a keyword hit wins.
+
+    Every rule is one bit of a mask, in table order, so the rule that wins in
+    a table is the lowest bit set in that table's slice. The keywords are
+    compiled into four alternation regexes (substring and folded whole word,
+    for one-word keywords and for phrases) whose groups map to the bits of
+    the rules they prove. A one-word keyword can only hit inside one
+    whitespace-separated chunk of the text, so each chunk is scanned once,
+    the first time it is seen (the new chunks of a text in a single pass),
+    and the chunks with a hit keep their mask. A text then costs one split
+    and a few set operations, and its labels are looked up by mask. The
+    phrase regexes scan the text only when a chunk holds the first word of a
+    phrase. classify_many also skips repeated texts (course names, common
+    options).
+    """
+
+    def __init__(self, tables):
+        self.tables = list(tables)
+        self._cache = {}
+        self._labels = {}
+        self._slices = []
+        offset = 0
+        for name in self.tables:
+            self._slices.append((name, offset, (1 << len(tables[name])) - 1, [label for _, label in tables[name]]))
+            offset += len(tables[name])
+
+        word_substrings, folded_words, phrase_substrings, phrase_runs = {}, {}, {}, {}
+        phrase_starts = set()
+        bit = 1
+        for name in self.tables:
+            for keywords, _ in tables[name]:
+                for keyword in keywords:
+                    lower, run = keyword.lower(), tuple(WORD_PATTERN.findall(fold_text(keyword)))
+                    single = WORD_PATTERN.fullmatch(lower) is not None
+                    for index, key in ((word_substrings if single else phrase_substrings, lower),
+                                       (folded_words if len(run) == 1 else phrase_runs, run)):
+                        if key:
+                            index[key] = index.get(key, 0) | bit
+                    if not single or len(run) > 1:
+                        first = WORD_PATTERN.match(lower)
+                        phrase_starts.add(fold_text(first.group()) if first else '')
+                bit <<= 1
+
+        # Chunk sem letra (números, datas) só precisa de varredura se algum keyword de uma palavra não tiver letra
+        one_word_keys = list(word_substrings) + [run[0] for run in folded_words]
+        self._letterless_keywords = not all(LETTER.search(key) for key in one_word_keys)
+        self._word_substrings, self._word_substring_masks = _substring_alternation(word_substrings)
+        self._folded_words, self._folded_word_masks = _word_alternation(folded_words)
+        self._phrase_substrings, self._phrase_substring_masks = _substring_alternation(phrase_substrings)
+        self._phrase_runs, self._phrase_run_masks = _word_alternation(phrase_runs)
+        # Frase que não começa por letra (ou cuja primeira palavra some no fold_text): varre sempre
+        self._always_phrases = '' in phrase_starts
+        starts = sorted(map(re.escape, phrase_starts - {''}))
+        self._phrase_starts = re.compile('|'.join(starts)) if starts else None
+        self._clear_chunks()
+
+    def _clear_chunks(self):
+        self._seen = set()
+        self._chunk_masks = {}
+        self._hit_chunks = set()
+        self._phrase_chunks = set()
+
+    def _add_chunks(self, chunks):
+        """Scan new chunks (as split from a text) joined by newlines, one pass per regex"""
+        joined = '\n'.join(chunks)
+        self._seen.update(chunks)
+        if not self._letterless_keywords and not LETTER.search(joined):
+            return
+        lower = (joined if joined.isascii() else unicodedata.normalize('NFC', joined)).lower()
+        folded = _fold_words(lower)
+        masks = {}
+        for pattern, group_masks, text in ((self._word_substrings, self._word_substring_masks, lower),
+                                           (self._folded_words, self._folded_word_masks, folded)):
+            if pattern is not None:
+                for match in pattern.finditer(text):
+                    # Os chunks não têm espaço nem quebra de linha: a posição diz de qual chunk é o acerto
+                    chunk = chunks[text.count('\n', 0, match.start())]
+                    masks[chunk] = masks.get(chunk, 0) | group_masks[match.lastindex]
+        if self._phrase_starts is not None:
+            self._phrase_chunks.update(chunks[folded.count('\n', 0, match.start())]
+                                       for match in self._phrase_starts.finditer(folded))
+        self._chunk_masks.update(masks)
+        self._hit_chunks.update(masks)
+
+    def _labels_for(self, mask):
+        """{table: label of the lowest rule bit in the table's slice, or None}"""
+        labels = self._labels.get(mask)
+        if labels is None:
+            labels = {}
+            for name, offset, width, table_labels in self._slices:
+                rules = (mask >> offset) & width
+                labels[name] = table_labels[(rules & -rules).bit_length() - 1] if rules else None
+            self._labels[mask] = labels
+        return dict(labels)
+
+    def classify(self, text):
+        """Return {table: label or None} for one text"""
+        if not text:
+            return dict.fromkeys(self.tables)
+        chunks = text.split()
+        if not self._seen.issuperset(chunks):
+            if len(self._seen) > 200_000:
+                self._clear_chunks()
+            self._add_chunks(list(set(chunks).difference(self._seen)))
+        mask = reduce(or_, map(self._chunk_masks.__getitem__, self._hit_chunks.intersection(chunks)), 0)
+
+        if self._always_phrases or not self._phrase_chunks.isdisjoint(chunks):
+            lower = (text if text.isascii() else unicodedata.normalize('NFC', text)).lower()
+            mask |= _scan(self._phrase_substrings, self._phrase_substring_masks, lower)
+            if self._phrase_runs is not None:
+                mask |= _scan(self._phrase_runs, self._phrase_run_masks, _fold_words(lower))
+        return self._labels_for(mask)
+
+    def classify_many(self, texts):
+        """Classify a list (returns a list) or pandas Series (returns a Series); repeated texts are scanned once"""
+        cache = self._cache
+        if len(cache) > 100_000:
+            cache.clear()
+
+        def lookup(text):
+            result = cache.get(text)
+            if result is None:
+                result = cache[text] = self.classify(text)
+            return result
+
+        if hasattr(texts, 'map') and hasattr(texts, 'index'):
+            return texts.map(lookup)
+        return [lookup(text) for text in texts]
+
+
+NAME_CLASSIFIER = KeywordClassifier({'category': NAME_RULES})
+COURSE_CLASSIFIER = KeywordClassifier({'category': COURSE_CATEGORY_RULES, 'challenge': COURSE_CHALLENGE_RULES})
+FALLBACK_CLASSIFIER = KeywordClassifier({'fallback': TEXT_FALLBACK_RULES})
+TEXT_CLASSIFIER = KeywordClassifier({'category': TEXT_CATEGORY_RULES, 'challenge': TEXT_CHALLENGE_RULES})
+
+
+def classify_name(name):
+    """Return (category, is_concursos) for a course name (v3 rules), or (None, False) if nothing matches"""
+    label = NAME_CLASSIFIER.classify(name)['category']
+    if label is None:
+        return None, False
+    category, challenge_type = label
+    return category, challenge_type is not None
+
+
+def classify_course(course_info):
+    """Return (category, challenge_type) for a course name (extract_questions rules); None where unchanged"""
+    labels = COURSE_CLASSIFIER.classify(course_info)
+    category, challenge_type = labels['category'] or (None, None)
+    if labels['challenge']:
+        challenge_type = labels['challenge']
+    return category, challenge_type
+
+
+def classify_clean_question(course, text):
+    """Return (category, challenge_type) for clean_questions: course rules first, statement as fallback"""
+    course_label = COURSE_CLASSIFIER.classify(course)['category']
+    if course_label:
+        return course_label
+    return FALLBACK_CLASSIFIER.classify(text)['fallback'] or (None, None)
+
+
+def classify_text(text):
+    """Return (category, challenge_type) for a statement (extract_questions_v2 rules); None where unchanged"""
+    labels = TEXT_CLASSIFIER.classify(text)
+    category, challenge_type = labels['category'] or (None, None)
+    if labels['challenge']:
+        challenge_type = labels['challenge']
+    return category, challenge_type
@@ -0,0 +1,108 @@
+"""Columnar (Arrow IPC) question bank written alongside the JSON outputs.
+
+The file is uncompressed Arrow IPC, so readers memory-map it and only touch the
+columns they select. pyarrow is optional (pip install '.[columnar]'); without
+it the pipeline keeps writing JSON only.
+
+The pipeline writes the JSON first and then the bank, storing a digest of the
+JSON in the schema metadata; readers that prefer the bank check it with
+bank_is_current() and fall back to the JSON when the two disagree (JSON
+edited or regenerated without pyarrow, interrupted run).
+"""
+import hashlib
+import os
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+ARROW_PATH = 'questions_cleaned.arrow'
+SOURCE_DIGEST_KEY = b'source_digest'
+
+
+def columnar_available():
+    """True when pyarrow is installed"""
+    return pa is not None
+
+
+def question_schema():
+    """Typed schema: list of options, int8 indexes, dictionary-encoded labels"""
+    # int32: com índices int8 o cast falha a partir de 128 rótulos distintos
+    label = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('id', pa.string()),
+        ('text', pa.string()),
+        ('options', pa.list_(pa.string())),
+        ('correctAnswerIndex', pa.int8()),
+        ('difficulty', pa.int8()),
+        ('category', label),
+        ('challengeType', label),
+        ('explanation', pa.string()),
+    ])
+
+
+def questions_to_table(questions):
+    """Build an Arrow table from cleaned question dicts"""
+    schema = question_schema()
+    columns = {name: [q.get(name) for q in questions] for name in schema.names}
+    arrays = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(columns[field.name], pa.string()).dictionary_encode().cast(field.type))
+        else:
+            arrays.append(pa.array(columns[field.name], field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def file_digest(path):
+    """Hex blake2b digest of a file's bytes"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_question_bank(questions, path=ARROW_PATH, source_path=None):
+    """Write questions as an Arrow IPC file (atomically); source_path is the JSON written from the same questions"""
+    table = questions_to_table(questions)
+    if source_path:
+        table = table.replace_schema_metadata({SOURCE_DIGEST_KEY: file_digest(source_path)})
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def bank_is_current(json_path, path=ARROW_PATH):
+    """True when the bank at path can stand in for json_path: written from it as it is now, or no JSON at all"""
+    if not columnar_available() or not os.path.exists(path):
+        return False
+    if not os.path.exists(json_path):
+        return True
+    metadata = pa.ipc.open_file(pa.memory_map(path, 'r')).schema.metadata or {}
+    return metadata.get(SOURCE_DIGEST_KEY) == file_digest(json_path).encode('ascii')
+
+
+def read_question_bank(path=ARROW_PATH, columns=None):
+    """Memory-map the Arrow file and return a table with only the requested columns"""
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def table_to_questions(table):
+    """Convert (a slice of) the question table back to dicts in the JSON field order"""
+    return table.to_pylist()
+
+
+def iter_question_batches(path=ARROW_PATH, batch_size=5000):
+    """Yield lists of up to batch_size question dicts from the memory-mapped bank, one slice at a time"""
+    reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        for start in range(0, batch.num_rows, batch_size):
+            yield batch.slice(start, batch_size).to_pylist()
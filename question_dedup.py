@@ -0,0 +1,206 @@
+"""Near-duplicate detection for cleaned questions (word shingles + MinHash LSH).
+
+Each question becomes a set of word 3-gram shingles taken from the stem and
+from every option separately (so option order does not matter); words are
+the accent-folded tokens of question_text, so "constituição" and
+"constituicao" are the same word. MinHash signatures are banded for LSH;
+only questions sharing a band bucket are compared, with the exact Jaccard
+similarity of their shingle sets, so the cost stays close to linear in the
+number of questions. Inside a bucket every pair not already in the same
+cluster is verified, so a question similar to any earlier member is joined.
+
+Clusters are returned as lists of positions; the canonical question of a
+cluster is the one that appears first in the input, which keeps its Qxxxx id
+stable across runs.
+"""
+import json
+
+import numpy as np
+
+from question_text import normalize_questions
+
+DUPLICATES_PATH = 'questions_duplicates.json'
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+SHINGLE_SIZE = 3
+DEFAULT_RECALL = 0.999
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+# Multiplicadores ímpares de 64 bits para combinar os ids das palavras de um shingle
+SHINGLE_MULTIPLIERS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F), np.uint64(0x165667B19E3779F9))
+CHUNK_SHINGLES = 1 << 20
+
+
+def shingle_hashes(questions, size=SHINGLE_SIZE, text=None):
+    """32-bit hashes of every word shingle, concatenated per question.
+
+    Words are the accent-folded tokens of text, the questions' NormalizedText
+    (computed in memory when not given). Returns (hashes, offsets): question
+    i owns hashes[offsets[i]:offsets[i + 1]]. Parts shorter than size are
+    padded so every part yields one shingle.
+    """
+    if text is None:
+        text = normalize_questions(questions, path=None)
+    part_lengths = np.maximum(text.part_lengths(), size)
+    part_ends = np.cumsum(part_lengths)
+    part_starts = part_ends - part_lengths
+
+    # Ids das palavras a partir de 1; o 0 completa as partes curtas
+    tokens = np.zeros(int(part_ends[-1]) if len(part_ends) else 0, dtype=np.uint64)
+    positions = np.repeat(part_starts - text.part_offsets[:-1], text.part_lengths())
+    positions += np.arange(len(text.token_ids), dtype=np.int64)
+    tokens[positions] = text.token_ids.astype(np.uint64) + np.uint64(1)
+
+    # Um shingle começa em cada posição que ainda tem size palavras dentro da mesma parte
+    per_part = part_lengths - size + 1
+    starts = np.repeat(part_starts - np.concatenate(([0], np.cumsum(per_part)[:-1])), per_part)
+    starts += np.arange(len(starts), dtype=np.int64)
+
+    with np.errstate(over='ignore'):
+        combined = np.zeros(len(starts), dtype=np.uint64)
+        for k in range(size):
+            combined += tokens[starts + k] * SHINGLE_MULTIPLIERS[k % len(SHINGLE_MULTIPLIERS)]
+    hashes = (combined >> np.uint64(32)) ^ (combined & MAX_HASH)
+
+    shingles_per_question = np.add.reduceat(per_part, text.question_offsets[:-1])
+    offsets = np.concatenate(([0], np.cumsum(shingles_per_question)))
+    return hashes, offsets
+
+
+def minhash_signatures(hashes, offsets, num_perm=DEFAULT_NUM_PERM, seed=1):
+    """MinHash signature matrix (questions × num_perm, uint32) from shingle hashes"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+    signatures = np.empty((len(offsets) - 1, num_perm), dtype=np.uint32)
+
+    # Blocos de questões inteiras com ~CHUNK_SHINGLES shingles, para limitar memória
+    first = 0
+    while first < len(offsets) - 1:
+        last = int(np.searchsorted(offsets, offsets[first] + CHUNK_SHINGLES, side='right')) - 1
+        last = max(last, first + 1)
+        block = hashes[offsets[first]:offsets[last]]
+        segments = offsets[first:last] - offsets[first]
+        for p in range(num_perm):
+            with np.errstate(over='ignore'):
+                permuted = (a[p] * block + b[p]) % MERSENNE_PRIME & MAX_HASH
+            signatures[first:last, p] = np.minimum.reduceat(permuted, segments)
+        first = last
+    return signatures
+
+
+def lsh_params(threshold, num_perm=DEFAULT_NUM_PERM, recall=DEFAULT_RECALL):
+    """(bands, rows) with the most rows per band that still makes a pair at
+    exactly threshold a candidate with probability >= recall.
+
+    More rows per band means fewer dissimilar candidates to verify; pairs
+    above the threshold are caught with even higher probability.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class _DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # A menor posição vira a raiz: a questão canônica é a primeira
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def find_near_duplicates(questions, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, seed=1, text=None):
+    """Clusters (lists of positions, canonical first) of questions with Jaccard >= threshold"""
+    if len(questions) < 2:
+        return []
+    hashes, offsets = shingle_hashes(questions, text=text)
+    signatures = minhash_signatures(hashes, offsets, num_perm, seed)
+    bands, rows = lsh_params(threshold, num_perm)
+
+    shingle_sets = {}
+
+    def shingles(i):
+        found = shingle_sets.get(i)
+        if found is None:
+            found = shingle_sets[i] = np.unique(hashes[offsets[i]:offsets[i + 1]])
+        return found
+
+    def similar(i, j):
+        a, b = shingles(i), shingles(j)
+        common = len(np.intersect1d(a, b, assume_unique=True))
+        return common / (len(a) + len(b) - common) >= threshold
+
+    groups = _DisjointSet(len(questions))
+    compared = set()
+    with np.errstate(over='ignore'):
+        weights = np.uint64(0x100000001B3) ** np.arange(rows, dtype=np.uint64)
+    for band in range(bands):
+        with np.errstate(over='ignore'):
+            keys = (signatures[:, band * rows:(band + 1) * rows].astype(np.uint64) * weights).sum(axis=1)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        run_starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        run_ends = np.concatenate((run_starts[1:], [len(order)]))
+        for start, end in zip(run_starts[run_ends - run_starts > 1], run_ends[run_ends - run_starts > 1]):
+            # Cada membro do balde é comparado a todos os anteriores que ainda não estão no seu grupo
+            # (só com os "líderes" um membro parecido apenas com um não-líder se perdia)
+            members = order[start:end].tolist()
+            for position, i in enumerate(members):
+                for j in members[:position]:
+                    pair = (j, i)
+                    if pair in compared or groups.find(j) == groups.find(i):
+                        continue
+                    compared.add(pair)
+                    if similar(j, i):
+                        groups.union(j, i)
+
+    clusters = {}
+    for i in range(len(questions)):
+        root = groups.find(i)
+        if root != i:
+            clusters.setdefault(root, [root]).append(i)
+    return sorted(clusters.values())
+
+
+def duplicate_report(questions, clusters):
+    """JSON-ready report: canonical id and duplicate ids per cluster"""
+    return [
+        {
+            'canonical': questions[cluster[0]]['id'],
+            'duplicates': [questions[i]['id'] for i in cluster[1:]],
+            'category': questions[cluster[0]]['category'],
+            'challengeType': questions[cluster[0]]['challengeType'],
+        }
+        for cluster in clusters
+    ]
+
+
+def save_duplicate_report(questions, clusters, threshold, path=DUPLICATES_PATH):
+    """Write the cluster report next to questions_cleaned.json"""
+    report = {
+        'threshold': threshold,
+        'clusters': duplicate_report(questions, clusters),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def drop_duplicates(questions, clusters):
+    """Questions without the non-canonical members of each cluster (input order kept)"""
+    dropped = {i for cluster in clusters for i in cluster[1:]}
+    return [q for i, q in enumerate(questions) if i not in dropped]
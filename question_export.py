@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Streaming .xlsx export of the question bank (openpyxl write-only mode).
+
+Uso:
+    python question_export.py [questions_export.xlsx] [--layout opcoes|questoes]
+                              [--challenge-type OAB_1_FASE] [--category "Direito Civil"]
+    python question_export.py questions_export.xlsx --source questions_cleaned.arrow
+    python question_export.py questions_export.xlsx --db [--dsn postgresql://...]
+
+Layouts:
+    opcoes      the original export layout, one row per option:
+                ObjectQuestionId, Name, QuestionStem, Letter, Description, Correct
+                (extract_questions_v3 reads it back; Name is the course name
+                when the record has one, otherwise the category)
+    questoes    one row per question, the columns of /api/admin/export/questions:
+                ID, Categoria, Tipo, Questao, AlternativaA-D, RespostaCorreta,
+                Explicacao, Dificuldade
+
+Questions are read in batches (slices of the memory-mapped Arrow bank, or a
+server-side cursor on the questions table) and every row goes straight to
+the write-only sheet, which openpyxl streams to a temp file with inline
+strings, so memory does not grow with the bank. Without pyarrow the source
+is questions_cleaned.json, loaded whole. A sheet holds at most
+MAX_SHEET_ROWS rows; bigger exports continue on "Questões (2)", ... and a
+question's option rows are never split across sheets.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from bulk_load_questions import COLUMN_LIST, COLUMNS, TABLE, connect, loader_available
+from question_assembly import LETTER_SLOTS
+from question_columnar import ARROW_PATH, bank_is_current, iter_question_batches
+
+CLEANED_PATH = 'questions_cleaned.json'
+EXPORT_PATH = 'questions_export.xlsx'
+SHEET_TITLE = 'Questões'
+BATCH_SIZE = 5000
+# Limite de linhas de uma planilha do Excel (cabeçalho incluído)
+MAX_SHEET_ROWS = 1_048_576
+LETTERS = list(LETTER_SLOTS)
+
+OPTION_COLUMNS = ['ObjectQuestionId', 'Name', 'QuestionStem', 'Letter', 'Description', 'Correct']
+QUESTION_COLUMNS = (['ID', 'Categoria', 'Tipo', 'Questao'] + [f"Alternativa{letter}" for letter in LETTERS]
+                    + ['RespostaCorreta', 'Explicacao', 'Dificuldade'])
+
+
+def cell(value):
+    """Cell value with the control characters Excel rejects removed"""
+    return ILLEGAL_CHARACTERS_RE.sub('', value) if isinstance(value, str) else value
+
+
+def option_rows(q):
+    """Layout opcoes: one row per option, Correct on the answer"""
+    question_id, stem = cell(q['id']), cell(q['text'])
+    name = cell(q.get('name') or q.get('category'))
+    answer = q['correctAnswerIndex']
+    return [[question_id, name, stem, letter, cell(option), slot == answer]
+            for slot, (letter, option) in enumerate(zip(LETTERS, q['options']))]
+
+
+def question_rows(q):
+    """Layout questoes: the question in one row, answer as a letter"""
+    options = [cell(option) for option in q['options']][:len(LETTERS)]
+    answer = q['correctAnswerIndex']
+    return [[cell(q['id']), cell(q.get('category')), cell(q.get('challengeType')), cell(q['text'])]
+            + options + [None] * (len(LETTERS) - len(options))
+            + [LETTERS[answer] if answer in range(len(LETTERS)) else None, cell(q.get('explanation')),
+               q.get('difficulty')]]
+
+
+LAYOUTS = {
+    'opcoes': (OPTION_COLUMNS, option_rows),
+    'questoes': (QUESTION_COLUMNS, question_rows),
+}
+
+
+def matches(q, challenge_type=None, category=None):
+    return (not challenge_type or q.get('challengeType') == challenge_type) and \
+        (not category or q.get('category') == category)
+
+
+def bank_questions(source=None, challenge_type=None, category=None, batch_size=BATCH_SIZE):
+    """Question dicts from the Arrow bank (batch by batch) or, without pyarrow, the cleaned JSON"""
+    if source is None:
+        source = ARROW_PATH if bank_is_current(CLEANED_PATH, ARROW_PATH) else CLEANED_PATH
+    if source.endswith('.arrow'):
+        batches = iter_question_batches(source, batch_size)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            batches = [json.load(f)]
+    for batch in batches:
+        for q in batch:
+            if matches(q, challenge_type, category):
+                yield q
+
+
+def db_questions(conn, challenge_type=None, category=None, batch_size=BATCH_SIZE, table=TABLE):
+    """Question dicts from the questions table through a server-side cursor (batch_size rows per fetch)"""
+    filters, params = [], []
+    for column, value in (('challenge_type', challenge_type), ('category', category)):
+        if value:
+            filters.append(f"{column} = %s")
+            params.append(value)
+    where = f" WHERE {' AND '.join(filters)}" if filters else ''
+    fields = [field for _, field in COLUMNS]
+    # Cursor nomeado: o servidor entrega batch_size linhas por vez, dentro de uma transação
+    with conn.transaction(), conn.cursor(name='question_export') as cur:
+        cur.itersize = batch_size
+        cur.execute(f"SELECT {COLUMN_LIST} FROM {table}{where} ORDER BY id", params)
+        for row in cur:
+            yield dict(zip(fields, row))
+
+
+def export_questions(questions, path=EXPORT_PATH, layout='opcoes', max_sheet_rows=MAX_SHEET_ROWS):
+    """Stream questions (an iterable of dicts or Question) into an .xlsx file; returns a summary dict"""
+    start = time.perf_counter()
+    columns, rows_for = LAYOUTS[layout]
+    workbook = Workbook(write_only=True)
+    sheets, sheet, sheet_rows = 0, None, 0
+    count = rows = 0
+    for q in questions:
+        block = rows_for(q)
+        if sheet is None or sheet_rows + len(block) > max_sheet_rows:
+            sheets += 1
+            sheet = workbook.create_sheet(SHEET_TITLE if sheets == 1 else f"{SHEET_TITLE} ({sheets})")
+            sheet.append(columns)
+            sheet_rows = 1
+        for row in block:
+            sheet.append(row)
+        sheet_rows += len(block)
+        rows += len(block)
+        count += 1
+    if sheet is None:
+        workbook.create_sheet(SHEET_TITLE).append(columns)
+        sheets = 1
+
+    tmp_path = path + '.tmp.xlsx'
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+    return {'questions': count, 'rows': rows, 'sheets': sheets, 'bytes': os.path.getsize(path),
+            'seconds': time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportar o banco de questões para .xlsx")
+    parser.add_argument('output', nargs='?', default=EXPORT_PATH)
+    parser.add_argument('--layout', choices=sorted(LAYOUTS), default='opcoes',
+                        help="opcoes: uma linha por alternativa (planilha original); questoes: uma linha por questão")
+    parser.add_argument('--challenge-type')
+    parser.add_argument('--category')
+    parser.add_argument('--source', help=f"banco limpo (.arrow ou .json; padrão: {ARROW_PATH}, senão {CLEANED_PATH})")
+    parser.add_argument('--db', action='store_true', help="ler da tabela questions (DATABASE_URL ou --dsn)")
+    parser.add_argument('--dsn')
+    args = parser.parse_args()
+
+    if args.db:
+        if not loader_available():
+            print("❌ psycopg não instalado (pip install '.[postgres]')")
+            sys.exit(1)
+        with connect(args.dsn) as conn:
+            summary = export_questions(db_questions(conn, args.challenge_type, args.category), args.output,
+                                       args.layout)
+    else:
+        summary = export_questions(bank_questions(args.source, args.challenge_type, args.category), args.output,
+                                   args.layout)
+
+    if not summary['questions']:
+        print(f"⚠️  Nenhuma questão para exportar; {args.output} só tem o cabeçalho")
+    print(f"💾 {summary['questions']:,} questões exportadas para {args.output} ({summary['rows']:,} linhas, "
+          f"{summary['sheets']} planilha(s), {summary['bytes'] / 1e6:.1f} MB) em {summary['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Compact in-memory question record for the Python pipeline.
+
+A Question is a frozen, slotted dataclass: options are a tuple, the correct
+index and difficulty are small ints, and category / challengeType are codes
+into process-wide interned label tables (CATEGORIES, CHALLENGE_TYPES), so
+100k questions share a dozen label strings instead of holding 200k copies.
+
+Dicts only exist at the JSON boundary: Question.from_dict when reading a
+pipeline JSON file and to_dict when writing one (same keys, same order, so
+the files are byte-identical). For the helpers written against those dicts
+(validation rules, sampler, dedup, Arrow and COPY writers), a Question also
+answers q['challengeType'] / q.get('explanation') by JSON field name.
+"""
+import sys
+from dataclasses import dataclass
+
+# Campo do JSON -> atributo do Question, na ordem em que os arquivos são gravados
+JSON_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'text': 'text',
+    'options': 'options',
+    'correctAnswerIndex': 'correct_answer_index',
+    'difficulty': 'difficulty',
+    'category': 'category',
+    'challengeType': 'challenge_type',
+    'explanation': 'explanation',
+}
+
+
+class LabelTable:
+    """Interned label <-> small int code, shared by every Question in the process"""
+
+    def __init__(self, labels=()):
+        self.labels = []
+        self.codes = {}
+        for label in labels:
+            self.code(label)
+
+    def code(self, label):
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(sys.intern(label) if isinstance(label, str) else label)
+        return code
+
+    def __getitem__(self, code):
+        return self.labels[code]
+
+    def __len__(self):
+        return len(self.labels)
+
+
+CATEGORIES = LabelTable()
+CHALLENGE_TYPES = LabelTable(('OAB_1_FASE', 'CONCURSOS_MPSP'))
+
+
+class _NoName:
+    """Marker for records without a 'name' key (cleaned questions); extracted ones always have it"""
+
+    def __repr__(self):
+        return 'NO_NAME'
+
+
+NO_NAME = _NoName()
+
+
+@dataclass(frozen=True, slots=True)
+class Question:
+    id: str
+    text: str
+    options: tuple
+    correct_answer_index: int
+    difficulty: int
+    category_code: int
+    challenge_type_code: int
+    explanation: str
+    name: object = NO_NAME
+
+    @classmethod
+    def create(cls, id, text, options, correct_answer_index, difficulty, category, challenge_type, explanation,
+               name=NO_NAME):
+        """Build from plain values, interning the labels"""
+        return cls(id, text, tuple(options), correct_answer_index, difficulty, CATEGORIES.code(category),
+                   CHALLENGE_TYPES.code(challenge_type), explanation, name)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Question from a pipeline JSON record"""
+        return cls.create(data['id'], data['text'], data['options'], data['correctAnswerIndex'],
+                          data.get('difficulty'), data.get('category'), data.get('challengeType'),
+                          data.get('explanation'), data.get('name', NO_NAME))
+
+    def to_dict(self):
+        """The JSON record (name only for records that had one)"""
+        data = {'id': self.id}
+        if self.name is not NO_NAME:
+            data['name'] = self.name
+        data.update({
+            'text': self.text,
+            'options': list(self.options),
+            'correctAnswerIndex': self.correct_answer_index,
+            'difficulty': self.difficulty,
+            'category': self.category,
+            'challengeType': self.challenge_type,
+            'explanation': self.explanation,
+        })
+        return data
+
+    @property
+    def category(self):
+        return CATEGORIES[self.category_code]
+
+    @property
+    def challenge_type(self):
+        return CHALLENGE_TYPES[self.challenge_type_code]
+
+    def __getitem__(self, field):
+        value = getattr(self, JSON_FIELDS[field])
+        if value is NO_NAME:
+            raise KeyError(field)
+        return value
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def __reduce__(self):
+        # Os códigos só valem neste processo: serializa os rótulos (ProcessPoolExecutor, pickle)
+        return _from_labels, (self.id, self.text, self.options, self.correct_answer_index, self.difficulty,
+                              self.category, self.challenge_type, self.explanation, self.name)
+
+
+def _from_labels(*values):
+    *fields, name = values
+    return Question.create(*fields, name=NO_NAME if isinstance(name, _NoName) else name)
+
+
+def questions_from_dicts(records):
+    """Questions from an iterable of JSON records"""
+    return [Question.from_dict(record) for record in records]
+
+
+def question_dicts(questions):
+    """JSON records for questions, one at a time (for the streaming writers in ts_emitter)"""
+    return (q.to_dict() for q in questions)
@@ -0,0 +1,115 @@
+"""Stratified, seeded question sampling over a challengeType × category index.
+
+The index is built once (one pass over the labels); after that each draw
+costs O(sample size): quotas are computed per stratum and every stratum is
+sampled with a sparse partial Fisher–Yates, so the same index can serve many
+draws (one per A/B cohort, per seed, per quota policy).
+
+    sampler = StratifiedSampler(questions)
+    quotas = sampler.quotas(100, mode='proportional', min_per_stratum=1)
+    indices = sampler.sample(quotas, seed=42)
+    cohorts = sampler.sample_cohorts(['A', 'B'], quotas, seed=42)
+"""
+import random
+
+STRATUM_KEYS = ('challengeType', 'category')
+QUOTA_MODES = ('proportional', 'equal')
+
+
+def partial_shuffle(pool, k, rng):
+    """First k elements of a uniform shuffle of pool, touching only k positions (O(k))"""
+    n = len(pool)
+    k = min(k, n)
+    swapped = {}
+    drawn = []
+    for i in range(k):
+        j = rng.randrange(i, n)
+        picked = swapped.get(j, j)
+        swapped[j] = swapped.get(i, i)
+        drawn.append(pool[picked])
+    return drawn
+
+
+def allocate_quotas(total, weights, low, high):
+    """Split total across strata proportionally to weights within [low, high] per stratum.
+
+    Largest-remainder rounding; capacity freed by strata that hit their cap is
+    redistributed among the others. Minimums win over total when they exceed it.
+    """
+    alloc = list(low)
+    remaining = total - sum(alloc)
+    active = [s for s in range(len(weights)) if alloc[s] < high[s]]
+
+    while remaining > 0 and active:
+        weight_sum = sum(weights[s] for s in active)
+        exact = {s: remaining * weights[s] / weight_sum for s in active}
+        shares = {s: int(exact[s]) for s in active}
+        leftover = remaining - sum(shares.values())
+        for s in sorted(active, key=lambda s: shares[s] - exact[s])[:leftover]:
+            shares[s] += 1
+
+        for s in active:
+            added = min(shares[s], high[s] - alloc[s])
+            alloc[s] += added
+            remaining -= added
+        active = [s for s in active if alloc[s] < high[s]]
+
+    return alloc
+
+
+class StratifiedSampler:
+    """Index of question positions per (challengeType, category) stratum.
+
+    labels is any sequence of mappings with the stratum keys (cleaned question
+    dicts, or the label columns of the Arrow bank as pylist). Strata keep the
+    order of first appearance; positions inside a stratum keep source order.
+    """
+
+    def __init__(self, labels, keys=STRATUM_KEYS):
+        self.keys = keys
+        self.strata = {}
+        for i, label in enumerate(labels):
+            stratum = tuple(label[key] for key in keys)
+            positions = self.strata.get(stratum)
+            if positions is None:
+                positions = self.strata[stratum] = []
+            positions.append(i)
+        self.total = sum(len(p) for p in self.strata.values())
+
+    def sizes(self):
+        """Number of questions per stratum"""
+        return {stratum: len(positions) for stratum, positions in self.strata.items()}
+
+    def quotas(self, total, mode='proportional', min_per_stratum=0, max_per_stratum=None, strata=None):
+        """Questions to draw per stratum, summing to total when capacity allows.
+
+        mode 'proportional' follows stratum sizes, 'equal' splits evenly. Every
+        stratum gets at least min_per_stratum and at most max_per_stratum
+        (both capped by the stratum size). strata restricts the draw to a subset.
+        """
+        if mode not in QUOTA_MODES:
+            raise ValueError(f"Modo de cota desconhecido: {mode} (use {', '.join(QUOTA_MODES)})")
+        chosen = list(self.strata) if strata is None else [s for s in strata if s in self.strata]
+        sizes = [len(self.strata[s]) for s in chosen]
+        weights = sizes if mode == 'proportional' else [1] * len(sizes)
+        high = [size if max_per_stratum is None else min(size, max_per_stratum) for size in sizes]
+        low = [min(h, min_per_stratum) for h in high]
+        return dict(zip(chosen, allocate_quotas(total, weights, low, high)))
+
+    def sample(self, quotas, seed=None):
+        """Draw positions for {stratum: count}; reproducible for a given seed.
+
+        Positions come grouped by stratum in quota order, in draw order inside
+        each stratum. Counts larger than the stratum take the whole stratum.
+        """
+        rng = random.Random(seed)
+        drawn = []
+        for stratum, count in quotas.items():
+            positions = self.strata.get(stratum)
+            if positions and count > 0:
+                drawn.extend(partial_shuffle(positions, count, rng))
+        return drawn
+
+    def sample_cohorts(self, cohorts, quotas, seed=None):
+        """One independent, reproducible sample per cohort name, all from the same index"""
+        return {cohort: self.sample(quotas, f"{seed}:{cohort}") for cohort in cohorts}
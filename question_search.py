@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""On-disk inverted index with BM25 ranking over question stems and options.
+
+Uso:
+    python question_search.py build [questions_cleaned.json] [questions_search.idx]
+    python question_search.py "usucapião extraordinária" [-k 10] [--index questions_search.idx]
+
+Tokens are accent-folded (NFKD, combining marks dropped), lowercased and split
+on non-alphanumerics; Portuguese stopwords are dropped, so "Usucapião" and
+"usucapiao" are the same term. Each question's text and options form one
+document. Document tokens come from question_text, read from the clean
+stage's cache when it is current.
+
+The index is a single file, memory-mapped on open (nothing is parsed up
+front):
+    header      magic, JSON table of sections (offset, dtype, length)
+    terms       sorted term bytes + offsets (binary search on the map)
+    postings    per term, VByte-compressed (doc gap, tf) pairs
+    documents   token count per document, question ids
+A query decodes only its terms' postings (vectorized with NumPy), scores with
+BM25 into one float array and takes the top k with argpartition.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from question_text import TEXT_CACHE_PATH, fold_tokens, normalize_questions
+
+CLEANED_PATH = 'questions_cleaned.json'
+INDEX_PATH = 'questions_search.idx'
+MAGIC = b'QSIDX001'
+ALIGNMENT = 8
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_TOP_K = 10
+
+# Palavras funcionais do português, já sem acento
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de dela delas dele deles depois do dos e ela elas ele eles em entre era
+essa essas esse esses esta estas este estes eu foi ha isso isto ja la lhe lhes mais mas me mesmo meu meus
+minha minhas na nas nao nem no nos nossa nossas nosso nossos num numa o os ou para pela pelas pelo pelos
+por qual quando que quem se sem ser seu seus so sua suas tambem te tem um uma umas uns voce voces
+""".split())
+
+
+def tokenize(text):
+    """Accent-folded tokens of text, stopwords removed"""
+    return [token for token in fold_tokens(text) if token not in STOPWORDS]
+
+
+def vbyte_sizes(values):
+    """Encoded length in bytes of each value"""
+    sizes = np.ones(len(values), dtype=np.int64)
+    for bits in (7, 14, 21, 28, 35, 42, 49, 56, 63):
+        sizes += values >= np.uint64(1 << bits)
+    return sizes
+
+
+def vbyte_encode(values, sizes=None):
+    """VByte bytes for non-negative ints (7 bits per byte, high bit marks the last byte)"""
+    values = np.asarray(values, dtype=np.uint64)
+    if not len(values):
+        return b''
+    sizes = vbyte_sizes(values) if sizes is None else sizes
+    total = int(sizes.sum())
+    out = np.empty(total, dtype=np.uint8)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    remaining = values.copy()
+    for byte in range(int(sizes.max())):
+        active = sizes > byte
+        positions = starts[active] + byte
+        chunk = (remaining[active] & np.uint64(0x7F)).astype(np.uint8)
+        last = sizes[active] == byte + 1
+        out[positions] = chunk | (last.astype(np.uint8) << 7)
+        remaining[active] >>= np.uint64(7)
+    return out.tobytes()
+
+
+def vbyte_decode(data):
+    """Inverse of vbyte_encode for a uint8 array (vectorized)"""
+    data = np.asarray(data, dtype=np.uint8)
+    if not len(data):
+        return np.empty(0, dtype=np.int64)
+    ends = np.flatnonzero(data & 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shifts = np.arange(len(data), dtype=np.int64) - np.repeat(starts, ends - starts + 1)
+    payload = (data & 0x7F).astype(np.int64) << (7 * shifts)
+    return np.add.reduceat(payload, starts)
+
+
+def build_index(questions, path=INDEX_PATH, text=None):
+    """Write the index file from the questions' normalized text; returns a summary dict.
+
+    text is the questions' NormalizedText (question_text); it is computed
+    in memory when not given.
+    """
+    start = time.perf_counter()
+    if text is None:
+        text = normalize_questions(questions, path=None)
+    num_docs = len(questions)
+    kept = np.array([term not in STOPWORDS for term in text.vocabulary], dtype=bool)
+    token_docs = np.repeat(np.arange(num_docs, dtype=np.int64), text.question_lengths())
+    mask = kept[text.token_ids]
+    token_ids, token_docs = text.token_ids[mask], token_docs[mask]
+    lengths = np.bincount(token_docs, minlength=num_docs).astype(np.uint32)
+
+    # Termos em ordem alfabética; (termo, doc) únicos dão as listas já ordenadas e os tf
+    used = np.unique(token_ids).tolist()
+    by_term = sorted(used, key=text.vocabulary.__getitem__)
+    terms = [text.vocabulary[i] for i in by_term]
+    rank = np.zeros(len(text.vocabulary), dtype=np.int64)
+    rank[by_term] = np.arange(len(by_term), dtype=np.int64)
+    stride = max(num_docs, 1)
+    pairs, tfs = np.unique(rank[token_ids] * stride + token_docs, return_counts=True)
+    term_of_pair = pairs // stride
+    docs = (pairs % stride).astype(np.uint64)
+    tfs = tfs.astype(np.uint64)
+    doc_freq = np.bincount(term_of_pair, minlength=len(terms)).astype(np.uint32)
+
+    term_bytes = [term.encode('ascii') for term in terms]
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.uint32)
+    term_offsets[1:] = np.cumsum([len(t) for t in term_bytes])
+
+    term_starts = np.zeros(len(terms), dtype=np.int64)
+    term_starts[1:] = np.cumsum(doc_freq[:-1], dtype=np.int64)
+    # Primeiro doc de cada termo guardado inteiro, os demais como diferença para o anterior
+    gaps = docs.copy()
+    gaps[1:] -= docs[:-1]
+    gaps[term_starts] = docs[term_starts]
+    interleaved = np.empty(2 * len(docs), dtype=np.uint64)
+    interleaved[0::2] = gaps
+    interleaved[1::2] = tfs
+    sizes = vbyte_sizes(interleaved)
+    posting_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+    if len(terms):
+        posting_offsets[1:] = np.cumsum(np.add.reduceat(sizes, 2 * term_starts))
+    posting_bytes = vbyte_encode(interleaved, sizes)
+
+    ids = [str(q['id']).encode('utf-8') for q in questions]
+    id_offsets = np.zeros(len(ids) + 1, dtype=np.uint32)
+    id_offsets[1:] = np.cumsum([len(i) for i in ids])
+
+    sections = [
+        ('term_bytes', np.frombuffer(b''.join(term_bytes), dtype=np.uint8)),
+        ('term_offsets', term_offsets),
+        ('doc_freq', doc_freq),
+        ('posting_offsets', posting_offsets),
+        ('posting_bytes', np.frombuffer(posting_bytes, dtype=np.uint8)),
+        ('doc_lengths', lengths),
+        ('id_bytes', np.frombuffer(b''.join(ids), dtype=np.uint8)),
+        ('id_offsets', id_offsets),
+    ]
+    header = {
+        'documents': len(questions),
+        'terms': len(terms),
+        'avg_length': float(lengths.mean()) if len(lengths) else 0.0,
+        'sections': {},
+    }
+    # Offsets relativos ao início dos dados (logo após o cabeçalho, alinhado a 8 bytes)
+    offset = 0
+    layout = []
+    for name, array in sections:
+        layout.append((name, offset, array))
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    for name, relative, array in layout:
+        header['sections'][name] = [relative, array.dtype.str, len(array)]
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(4, 'little'))
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+        for name, relative, array in layout:
+            f.write(array.tobytes())
+            f.write(b'\0' * (-array.nbytes % ALIGNMENT))
+    os.replace(tmp_path, path)
+    return {'documents': len(questions), 'terms': len(terms), 'bytes': data_start + offset,
+            'postings_bytes': int(posting_offsets[-1]), 'seconds': time.perf_counter() - start}
+
+
+class SearchIndex:
+    """Memory-mapped index written by build_index; search() returns [(question_id, score)]"""
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} não é um índice de busca (versão {MAGIC.decode()})")
+        header_length = int.from_bytes(bytes(buffer[len(MAGIC):len(MAGIC) + 4]), 'little')
+        header = json.loads(bytes(buffer[len(MAGIC) + 4:len(MAGIC) + 4 + header_length]))
+        data_start = -(-(len(MAGIC) + 4 + header_length) // ALIGNMENT) * ALIGNMENT
+        self._buffer = buffer
+        for name, (relative, dtype, length) in header['sections'].items():
+            dtype = np.dtype(dtype)
+            begin = data_start + relative
+            setattr(self, name, buffer[begin:begin + length * dtype.itemsize].view(dtype))
+        self.documents = header['documents']
+        self.terms = header['terms']
+        self.avg_length = header['avg_length'] or 1.0
+        self._term_cache = {}
+        self._norm = None
+
+    def __len__(self):
+        return self.documents
+
+    def _term(self, i):
+        return bytes(self.term_bytes[self.term_offsets[i]:self.term_offsets[i + 1]])
+
+    def term_index(self, term):
+        """Position of term in the sorted vocabulary (binary search on the map), or None"""
+        if term in self._term_cache:
+            return self._term_cache[term]
+        key, low, high = term.encode('ascii'), 0, self.terms
+        while low < high:
+            mid = (low + high) // 2
+            if self._term(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        found = low if low < self.terms and self._term(low) == key else None
+        self._term_cache[term] = found
+        return found
+
+    def postings(self, term):
+        """(doc positions, term frequencies) of term; empty arrays if absent"""
+        i = self.term_index(term)
+        if i is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        values = vbyte_decode(self.posting_bytes[int(self.posting_offsets[i]):int(self.posting_offsets[i + 1])])
+        return np.cumsum(values[0::2]), values[1::2]
+
+    def question_id(self, doc):
+        return bytes(self.id_bytes[self.id_offsets[doc]:self.id_offsets[doc + 1]]).decode('utf-8')
+
+    def scores(self, query):
+        """BM25 score of every document for query (float64 array of len(self))"""
+        scores = np.zeros(self.documents, dtype=np.float64)
+        terms = {}
+        for token in tokenize(query):
+            terms[token] = terms.get(token, 0) + 1
+        if self._norm is None:
+            # Normalização por tamanho do documento: a mesma para todas as consultas
+            self._norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths / self.avg_length)
+        norm = self._norm
+        for term, query_tf in terms.items():
+            docs, tfs = self.postings(term)
+            if not len(docs):
+                continue
+            idf = math.log(1 + (self.documents - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += query_tf * idf * tfs * (BM25_K1 + 1) / (tfs + norm[docs])
+        return scores
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """Top-k (question_id, score) by BM25, best first; documents without any query term are left out"""
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        if len(matched) > k:
+            # Mantém todos os empatados com o k-ésimo, para o desempate abaixo ser determinístico
+            kth = scores[matched[np.argpartition(-scores[matched], k - 1)[k - 1]]]
+            matched = matched[scores[matched] >= kth]
+        # Empate: posição no banco
+        order = matched[np.lexsort((matched, -scores[matched]))][:k]
+        return [(self.question_id(doc), float(scores[doc])) for doc in order]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        source = sys.argv[2] if len(sys.argv) > 2 else CLEANED_PATH
+        path = sys.argv[3] if len(sys.argv) > 3 else INDEX_PATH
+        with open(source, 'r', encoding='utf-8') as f:
+            questions = json.load(f)
+        # Cache da etapa clean; sem ele (ou desatualizado) normaliza em memória
+        text = normalize_questions(questions, TEXT_CACHE_PATH, save=False)
+        summary = build_index(questions, path, text)
+        print(f"💾 Índice de busca salvo em {path}: {summary['documents']} questões, {summary['terms']} termos, "
+              f"{summary['bytes'] / 1e6:.1f} MB em {summary['seconds']:.2f}s")
+        return
+
+    parser = argparse.ArgumentParser(description="Busca BM25 nas questões limpas")
+    parser.add_argument('query')
+    parser.add_argument('-k', type=int, default=DEFAULT_TOP_K)
+    parser.add_argument('--index', default=INDEX_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = SearchIndex(args.index).search(args.query, args.k)
+    elapsed = time.perf_counter() - start
+    print(f"🔍 \"{args.query}\": {len(results)} resultados em {elapsed * 1000:.1f} ms")
+    for question_id, score in results:
+        print(f"  {question_id}  {score:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Accent-folded, tokenized stem and options, computed once per question and shared by the text stages.
+
+Text is folded with NFKD, combining marks and other non-ASCII dropped, then
+lowercased ("Constituição" -> "constituicao", "TRIBUTÁRIO" -> "tributario"),
+and split into [a-z0-9]+ tokens. Each question has one token list per part:
+the stem, then every option.
+
+NormalizedText keeps the tokens of a list of questions as columns (one
+vocabulary, uint32 token ids, part offsets, question offsets), so dedup can
+shingle token ids directly and search can count postings with NumPy.
+normalize_questions builds it through a cache file (questions_text.npz) keyed
+by a hash of stem + options: questions whose text did not change since the
+run that wrote the cache are not folded again. The clean stage of
+migrate_all_questions writes the cache; later stages (search, dedup) read it.
+"""
+import hashlib
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+TEXT_CACHE_PATH = 'questions_text.npz'
+CACHE_VERSION = 1
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+# Separa enunciado e alternativas no hash (não aparece em texto limpo)
+PART_SEPARATOR = '\x1f'
+
+
+def fold_text(text):
+    """Lowercase text with accents removed (NFKD, non-ASCII dropped): "Usucapião" -> "usucapiao" """
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def fold_tokens(text):
+    """Folded [a-z0-9]+ tokens of text (stopwords kept)"""
+    return TOKEN_PATTERN.findall(fold_text(text or ''))
+
+
+def question_parts(question):
+    """Stem and options of a question, in that order"""
+    return [question['text'] or ''] + [option or '' for option in question['options']]
+
+
+def text_keys(questions):
+    """64-bit content hash of each question's stem and options (uint64 array)"""
+    digests = b''.join(hashlib.blake2b(PART_SEPARATOR.join(question_parts(q)).encode('utf-8'),
+                                       digest_size=8).digest() for q in questions)
+    return np.frombuffer(digests, dtype='<u8').copy()
+
+
+def _segments(offsets, rows):
+    """Indices covering offsets[r]:offsets[r + 1] for each r in rows, concatenated, and the new offsets"""
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    new_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    indices = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1], dtype=np.int64)
+    return indices, new_offsets
+
+
+class NormalizedText:
+    """Folded tokens of a list of questions, as columns.
+
+    Question i owns parts question_offsets[i]:question_offsets[i + 1] (stem
+    first, then options); part p owns token_ids[part_offsets[p]:part_offsets[p + 1]],
+    ids into vocabulary.
+    """
+
+    def __init__(self, vocabulary, token_ids, part_offsets, question_offsets, keys):
+        self.vocabulary = vocabulary
+        self.token_ids = token_ids
+        self.part_offsets = part_offsets
+        self.question_offsets = question_offsets
+        self.keys = keys
+
+    @classmethod
+    def from_questions(cls, questions, vocabulary=None):
+        """Fold and tokenize questions; new terms are appended to vocabulary (a list, extended in place)"""
+        vocabulary = [] if vocabulary is None else vocabulary
+        term_ids = {term: i for i, term in enumerate(vocabulary)}
+        ids, part_ends, question_ends = [], [], []
+        for q in questions:
+            for part in question_parts(q):
+                for token in fold_tokens(part):
+                    term = term_ids.get(token)
+                    if term is None:
+                        term = term_ids[token] = len(vocabulary)
+                        vocabulary.append(token)
+                    ids.append(term)
+                part_ends.append(len(ids))
+            question_ends.append(len(part_ends))
+        return cls(vocabulary, np.array(ids, dtype=np.uint32), np.array([0] + part_ends, dtype=np.int64),
+                   np.array([0] + question_ends, dtype=np.int64), text_keys(questions))
+
+    def __len__(self):
+        return len(self.question_offsets) - 1
+
+    def take(self, rows):
+        """NormalizedText of the given questions, in the given order (same vocabulary)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        parts, question_offsets = _segments(self.question_offsets, rows)
+        tokens, part_offsets = _segments(self.part_offsets, parts)
+        return NormalizedText(self.vocabulary, self.token_ids[tokens], part_offsets, question_offsets,
+                              self.keys[rows])
+
+    def part_lengths(self):
+        return np.diff(self.part_offsets)
+
+    def question_lengths(self):
+        """Token count per question (all parts)"""
+        return np.diff(self.part_offsets[self.question_offsets])
+
+    def parts(self, i):
+        """Token lists of question i: stem, then each option"""
+        vocabulary, ids, offsets = self.vocabulary, self.token_ids, self.part_offsets
+        return [[vocabulary[t] for t in ids[offsets[p]:offsets[p + 1]].tolist()]
+                for p in range(self.question_offsets[i], self.question_offsets[i + 1])]
+
+    def tokens(self, i):
+        """All tokens of question i, stem first"""
+        begin, end = self.part_offsets[self.question_offsets[i]], self.part_offsets[self.question_offsets[i + 1]]
+        return [self.vocabulary[t] for t in self.token_ids[begin:end].tolist()]
+
+    def text(self, i):
+        """Folded text of question i (tokens joined by spaces), for keyword matching"""
+        return ' '.join(self.tokens(i))
+
+    def save(self, path=TEXT_CACHE_PATH):
+        """Write as the cache file, dropping vocabulary terms no question uses"""
+        used = np.unique(self.token_ids)
+        remap = np.zeros(len(self.vocabulary), dtype=np.uint32)
+        remap[used] = np.arange(len(used), dtype=np.uint32)
+        vocabulary = '\n'.join(self.vocabulary[t] for t in used.tolist()).encode('ascii')
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, version=np.array(CACHE_VERSION), keys=self.keys,
+                 vocabulary=np.frombuffer(vocabulary, dtype=np.uint8), token_ids=remap[self.token_ids],
+                 part_offsets=self.part_offsets, question_offsets=self.question_offsets)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=TEXT_CACHE_PATH):
+        with np.load(path) as data:
+            if int(data['version']) != CACHE_VERSION:
+                raise ValueError(f"Cache de texto {path} com versão {int(data['version'])} não suportada")
+            blob = data['vocabulary'].tobytes().decode('ascii')
+            return cls(blob.split('\n') if blob else [], data['token_ids'], data['part_offsets'],
+                       data['question_offsets'], data['keys'])
+
+
+def normalize_questions(questions, path=TEXT_CACHE_PATH, save=True):
+    """NormalizedText aligned with questions, folding only what the cache at path does not have.
+
+    path=None skips the cache. With save=True the cache is rewritten with
+    exactly these questions when anything was missing or stale.
+    """
+    keys = text_keys(questions)
+    cached = None
+    if path and os.path.exists(path):
+        try:
+            cached = NormalizedText.load(path)
+        except (ValueError, KeyError, OSError):
+            cached = None
+
+    if cached is None:
+        text = NormalizedText.from_questions(questions)
+        hits = 0
+    else:
+        rows = {key: row for row, key in enumerate(cached.keys.tolist())}
+        found = np.array([rows.get(key, -1) for key in keys.tolist()], dtype=np.int64)
+        missing = np.flatnonzero(found < 0)
+        hits = len(questions) - len(missing)
+        if not len(missing) and len(cached) == len(questions) and (found == np.arange(len(found))).all():
+            cached.cache_hits = hits
+            return cached
+        # Questões novas entram depois das do cache, com o mesmo vocabulário; depois reordena
+        fresh = NormalizedText.from_questions([questions[i] for i in missing.tolist()], list(cached.vocabulary))
+        combined = NormalizedText(
+            fresh.vocabulary, np.concatenate([cached.token_ids, fresh.token_ids]),
+            np.concatenate([cached.part_offsets, fresh.part_offsets[1:] + cached.part_offsets[-1]]),
+            np.concatenate([cached.question_offsets, fresh.question_offsets[1:] + cached.question_offsets[-1]]),
+            np.concatenate([cached.keys, fresh.keys]))
+        found[missing] = len(cached) + np.arange(len(missing))
+        text = combined.take(found)
+
+    if path and save:
+        text.save(path)
+    text.cache_hits = hits
+    return text
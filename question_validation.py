@@ -0,0 +1,215 @@
+"""Validation stage: columnar checks on the option-per-row sheet and on cleaned questions.
+
+Every problem becomes one reject record (id, rule, row, detail) instead of a
+print; the records are written once as a small CSV and summarised per rule.
+A question with any reject is left out of the output, except for the
+row-level rules in ROW_ONLY_RULES: those rows are only skipped (as the
+original loop did), and the question still goes out when its other rows
+give A-D and a correct answer (otherwise missing_letter or no_correct
+rejects it).
+
+Sheet rules (validate_frame, or StreamValidator for streamed sheets;
+row = spreadsheet row, header = 1):
+    incomplete_row        row without ObjectQuestionId, QuestionStem, Letter or Description (row only)
+    invalid_letter        Letter other than A-D
+    correct_out_of_range  Correct row whose Letter is not A-D (no answer index 0-3)
+    duplicate_letter      same Letter repeated in a question (later rows)
+    missing_letter        question without some of A-D (detail = missing letters)
+    empty_option          Description with only whitespace
+    option_too_long       Description longer than max_option_length
+    no_correct            question without a Correct row
+    multiple_correct      Correct rows after the first one of a question
+
+Cleaned-question rules (validate_questions / question_rules; row = 1-based
+source position): empty_text, option_count, empty_option,
+option_too_long, correct_out_of_range.
+"""
+import numpy as np
+import pandas as pd
+
+from question_assembly import LETTER_SLOTS, _text_column
+
+REJECTS_PATH = 'questions_rejects.csv'
+MAX_OPTION_LENGTH = 2000
+REJECT_COLUMNS = ['id', 'rule', 'row', 'detail']
+# Regras que só registram a linha ignorada, sem excluir a questão
+ROW_ONLY_RULES = ('incomplete_row',)
+# Bitmask das letras presentes -> letras ausentes ("" quando A-D estão todas)
+MISSING_LETTERS = {mask: ''.join(l for l, s in LETTER_SLOTS.items() if not mask & (1 << s)) for mask in range(16)}
+
+
+def _rejects(ids, rule, rows, detail=None):
+    return pd.DataFrame({'id': ids, 'rule': rule, 'row': rows, 'detail': detail})
+
+
+def _combine(found):
+    """Concatenate reject frames, ordered by row"""
+    found = [f for f in found if not f.empty]
+    if not found:
+        return pd.DataFrame(columns=REJECT_COLUMNS)
+    rejects = pd.concat(found, ignore_index=True)
+    return rejects.sort_values(['row', 'rule'], kind='stable', ignore_index=True)[REJECT_COLUMNS]
+
+
+def _present(series):
+    """True where the cell has a non-empty string"""
+    return series.fillna('').astype(bool)
+
+
+def row_features(df, first_row=2, max_option_length=MAX_OPTION_LENGTH, rows=None):
+    """Per-row facts the sheet rules need (same cell parsing as assemble_questions).
+
+    Long text columns are reduced to flags, so features of a streamed sheet can
+    be kept for every row at a fraction of the sheet's memory. Rows are
+    numbered from first_row on, unless rows gives each row's sheet number.
+    """
+    qid = _text_column(df['ObjectQuestionId'])
+    letter = _text_column(df['Letter']).str.strip().str.upper()
+    description = _text_column(df['Description'])
+    length = description.str.len()
+    return pd.DataFrame({
+        'qid': qid,
+        'valid': _present(qid) & _present(_text_column(df['QuestionStem'])) & _present(letter) & _present(description),
+        'letter': letter,
+        'slot': letter.map(LETTER_SLOTS),
+        'correct': df['Correct'].map(bool).where(df['Correct'].notna(), False).astype(bool),
+        'blank': ~description.str.strip().fillna('').astype(bool),
+        'too_long': length > max_option_length,
+        'length': length,
+        'row': np.arange(first_row, first_row + len(df)) if rows is None else np.asarray(rows, dtype=np.int64),
+    })
+
+
+def validate_features(features):
+    """Reject records from row_features (one frame for the whole sheet)"""
+    qid, row, letter, correct = features['qid'], features['row'], features['letter'], features['correct']
+    valid = features['valid']
+    bad_letter = valid & features['slot'].isna()
+    blank = valid & features['blank']
+    too_long = valid & features['too_long']
+    found = [
+        _rejects(qid[~valid], 'incomplete_row', row[~valid]),
+        _rejects(qid[bad_letter & ~correct], 'invalid_letter', row[bad_letter & ~correct], letter[bad_letter & ~correct]),
+        _rejects(qid[bad_letter & correct], 'correct_out_of_range', row[bad_letter & correct], letter[bad_letter & correct]),
+        _rejects(qid[blank], 'empty_option', row[blank], letter[blank]),
+        _rejects(qid[too_long], 'option_too_long', row[too_long], features['length'][too_long].astype(int).astype(str)),
+    ]
+
+    rows = features[valid]
+    if not rows.empty:
+        lettered = rows[rows['slot'].notna()]
+        duplicate = lettered.duplicated(['qid', 'slot'], keep='first')
+        found.append(_rejects(lettered['qid'][duplicate], 'duplicate_letter', lettered['row'][duplicate],
+                              lettered['letter'][duplicate]))
+
+        by_question = rows.groupby('qid', sort=False)
+        first_row = by_question['row'].first()
+        masks = (
+            lettered.drop_duplicates(['qid', 'slot'])
+            .assign(bit=lambda f: np.left_shift(1, f['slot'].astype(int)))
+            .groupby('qid', sort=False)['bit'].sum()
+            .reindex(first_row.index, fill_value=0)
+        )
+        missing = masks[masks != 15]
+        found.append(_rejects(missing.index, 'missing_letter', first_row[missing.index].values,
+                              missing.map(MISSING_LETTERS).values))
+
+        correct_count = by_question['correct'].sum()
+        none_correct = correct_count[correct_count == 0].index
+        found.append(_rejects(none_correct, 'no_correct', first_row[none_correct].values))
+
+        correct_rows = rows[rows['correct']]
+        extra = correct_rows.duplicated('qid', keep='first')
+        found.append(_rejects(correct_rows['qid'][extra], 'multiple_correct', correct_rows['row'][extra]))
+
+    return _combine(found)
+
+
+def validate_frame(df, max_option_length=MAX_OPTION_LENGTH):
+    """Reject records for an option-per-row sheet"""
+    return validate_features(row_features(df, max_option_length=max_option_length))
+
+
+class StreamValidator:
+    """Collects row_features chunk by chunk (XlsxRowStream on_chunk hook) and validates at the end"""
+
+    def __init__(self, max_option_length=MAX_OPTION_LENGTH):
+        self.max_option_length = max_option_length
+        self.features = []
+        self.next_row = 2
+
+    def add_chunk(self, chunk, columns, rows=None):
+        """rows: sheet row number of each row (XlsxRowStream skips blank rows); default is consecutive"""
+        frame = pd.DataFrame(chunk, columns=columns)
+        self.features.append(row_features(frame, self.next_row, self.max_option_length, rows))
+        self.next_row = rows[-1] + 1 if rows else self.next_row + len(chunk)
+
+    def rejects(self):
+        if not self.features:
+            return pd.DataFrame(columns=REJECT_COLUMNS)
+        return validate_features(pd.concat(self.features, ignore_index=True))
+
+
+def question_rules(question, max_option_length=MAX_OPTION_LENGTH):
+    """Rules broken by one cleaned question (scalar twin of validate_questions)"""
+    options = question['options']
+    broken = []
+    if not question['text'].strip():
+        broken.append('empty_text')
+    if len(options) != 4:
+        broken.append('option_count')
+    if not all(opt.strip() for opt in options):
+        broken.append('empty_option')
+    if any(len(opt) > max_option_length for opt in options):
+        broken.append('option_too_long')
+    if question['correctAnswerIndex'] not in range(len(LETTER_SLOTS)):
+        broken.append('correct_out_of_range')
+    return broken
+
+
+def validate_questions(questions, ids=None, rows=None, max_option_length=MAX_OPTION_LENGTH):
+    """Reject records for a list of cleaned questions.
+
+    ids defaults to each question's id and rows to the 1-based position.
+    """
+    count = len(questions)
+    ids = pd.Series([q['id'] for q in questions] if ids is None else list(ids), dtype=object)
+    row = pd.Series(np.arange(1, count + 1) if rows is None else list(rows))
+    text = pd.Series([q['text'] for q in questions], dtype=object)
+    answer = pd.Series([q['correctAnswerIndex'] for q in questions], dtype=object)
+    option_count = np.fromiter((len(q['options']) for q in questions), dtype=np.int64, count=count)
+    options = pd.Series([opt for q in questions for opt in q['options']], dtype=object)
+    owner = np.repeat(np.arange(count), option_count)
+
+    empty_text = ~text.str.strip().fillna('').astype(bool)
+    wrong_count = pd.Series(option_count != 4)
+    empty_option = pd.Series(np.bincount(owner[~options.str.strip().fillna('').astype(bool).to_numpy()],
+                                         minlength=count) > 0)
+    too_long = pd.Series(np.bincount(owner[(options.str.len() > max_option_length).to_numpy()], minlength=count) > 0)
+    out_of_range = ~answer.isin(range(len(LETTER_SLOTS)))
+
+    return _combine([_rejects(ids[mask], rule, row[mask]) for rule, mask in (
+        ('empty_text', empty_text), ('option_count', wrong_count), ('empty_option', empty_option),
+        ('option_too_long', too_long), ('correct_out_of_range', out_of_range),
+    )])
+
+
+def rejected_ids(rejects):
+    """Set of question ids with at least one reject that excludes the question (ROW_ONLY_RULES don't)"""
+    return set(rejects.loc[~rejects['rule'].isin(ROW_ONLY_RULES), 'id'].dropna())
+
+
+def write_rejects(rejects, path=REJECTS_PATH, columns=REJECT_COLUMNS):
+    """Write reject records as CSV (id,rule,row,detail by default)"""
+    rejects.to_csv(path, index=False, columns=columns)
+    return path
+
+
+def summarize_rejects(rejects, path=REJECTS_PATH):
+    """One line per rule instead of one print per rejected row"""
+    if rejects.empty:
+        print("✅ Validação: nenhuma rejeição")
+        return
+    print(f"🚫 Validação: {len(rejects)} rejeições, {len(rejected_ids(rejects))} questões excluídas ({path})")
+    for rule, count in rejects['rule'].value_counts().items():
+        print(f"  {rule}: {count}")
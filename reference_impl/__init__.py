@@ -0,0 +1,6 @@
+"""Reference implementations and synthetic inputs shared by tests/ and benchmarks/.
+
+Each module keeps the original code a fast path replaced (verbatim, with the
+reviewed deltas applied outside it) next to the generators both sides use,
+so the pytest checks and the benchmark checks cannot drift apart.
+"""
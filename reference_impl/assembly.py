@@ -0,0 +1,122 @@
+"""Original iterrows loop of extract_questions_v3 (reference for question_assembly) and its option-per-row sheets."""
+import random
+
+import pandas as pd
+
+SHEET_COLUMNS = ['ObjectQuestionId', 'Name', 'QuestionStem', 'Letter', 'Description', 'Correct']
+COURSE_NAMES = [
+    'Direito Penal - OAB', 'Direito Civil', 'Direito Constitucional', 'Direito Administrativo',
+    'Direito Tributário', 'Ética Profissional', 'Processo Civil', 'Direito do Trabalho',
+    'Direito Empresarial', 'Concursos MPSP', 'Língua Portuguesa', None,
+]
+
+# Deltas revisados em relação ao loop original, aplicados por fora da referência:
+# - as regras comparam sem acento (fold_text): 'TRIBUTARIO' não casava "DIREITO TRIBUTÁRIO"
+#   e a questão ficava em 'Direito Geral'; o loop recebe o nome sem acento e o original é devolvido
+# - ids sem ".0" quando a coluna tem célula vazia (SHEET_DTYPES), ver id_delta
+ACCENT_DELTA = {'Direito Tributário': 'Direito Tributario'}
+
+
+def legacy_process_rows(df):
+    """Loop original de extract_questions_v3.process_excel_questions (referência)"""
+    questions_dict = {}
+    for index, row in df.iterrows():
+        question_id = str(row['ObjectQuestionId']) if pd.notna(row['ObjectQuestionId']) else None
+        question_stem = str(row['QuestionStem']) if pd.notna(row['QuestionStem']) else None
+        letter = str(row['Letter']).strip().upper() if pd.notna(row['Letter']) else None
+        description = str(row['Description']) if pd.notna(row['Description']) else None
+        is_correct = row['Correct'] if pd.notna(row['Correct']) else False
+        name = str(row['Name']) if pd.notna(row['Name']) else None
+
+        if not question_id or not question_stem or not letter or not description:
+            continue
+
+        if question_id not in questions_dict:
+            questions_dict[question_id] = {
+                'id': question_id,
+                'name': name,
+                'text': question_stem,
+                'options': ['', '', '', ''],
+                'correctAnswerIndex': 0,
+                'difficulty': 3,
+                'category': 'Direito Geral',
+                'challengeType': 'OAB_1_FASE',
+                'explanation': f"Questão {question_id}"
+            }
+
+        letter_index = ord(letter) - ord('A') if letter in ['A', 'B', 'C', 'D'] else 0
+        if 0 <= letter_index < 4:
+            questions_dict[question_id]['options'][letter_index] = description
+            if is_correct:
+                questions_dict[question_id]['correctAnswerIndex'] = letter_index
+
+        if name and any(word in name.upper() for word in ['PENAL', 'CRIMINAL']):
+            questions_dict[question_id]['category'] = 'Direito Penal'
+        elif name and any(word in name.upper() for word in ['CIVIL', 'CIVILISTICO']):
+            questions_dict[question_id]['category'] = 'Direito Civil'
+        elif name and any(word in name.upper() for word in ['CONSTITUCIONAL', 'CONSTITUICAO']):
+            questions_dict[question_id]['category'] = 'Direito Constitucional'
+        elif name and any(word in name.upper() for word in ['ADMINISTRATIVO', 'ADMIN']):
+            questions_dict[question_id]['category'] = 'Direito Administrativo'
+        elif name and any(word in name.upper() for word in ['TRIBUTARIO', 'TRIBUTO']):
+            questions_dict[question_id]['category'] = 'Tributário'
+        elif name and any(word in name.upper() for word in ['ETICA', 'PROFISSIONAL']):
+            questions_dict[question_id]['category'] = 'Ética Profissional'
+        elif name and any(word in name.upper() for word in ['PROCESSO', 'PROCESSUAL']):
+            questions_dict[question_id]['category'] = 'Direito Processual'
+        elif name and any(word in name.upper() for word in ['TRABALHO', 'TRABALHISTA']):
+            questions_dict[question_id]['category'] = 'Direito do Trabalho'
+        elif name and any(word in name.upper() for word in ['EMPRESA', 'EMPRESARIAL']):
+            questions_dict[question_id]['category'] = 'Direito Empresarial'
+        elif name and any(word in name.upper() for word in ['CONCURSO', 'MPSP', 'TRIBUNAL']):
+            questions_dict[question_id]['challengeType'] = 'CONCURSOS_MPSP'
+            questions_dict[question_id]['category'] = 'Direito Administrativo'
+
+    return list(questions_dict.values())
+
+
+def id_delta(question_id):
+    """SHEET_DTYPES lê ObjectQuestionId como object: com uma célula vazia o pandas fazia '123.0', agora '123'"""
+    return question_id[:-2] if question_id.endswith('.0') else question_id
+
+
+def reviewed_process_rows(df):
+    """legacy_process_rows com os deltas revisados (acento e id) aplicados explicitamente"""
+    folded = df.assign(Name=df['Name'].replace(ACCENT_DELTA))
+    restore = {v: k for k, v in ACCENT_DELTA.items()}
+    questions = legacy_process_rows(folded)
+    for q in questions:
+        q['name'] = restore.get(q['name'], q['name'])
+        q['id'] = id_delta(q['id'])
+        q['explanation'] = f"Questão {q['id']}"
+    return questions
+
+
+def complete(questions):
+    return [q for q in questions if all(opt.strip() for opt in q['options'])]
+
+
+def build_frame(num_questions, seed=42):
+    """Option-per-row sheet (as read by pd.read_excel) with a few bad rows and repeated ids"""
+    rng = random.Random(seed)
+    rows = []
+    for qid in range(10000, 10000 + num_questions):
+        name = rng.choice(COURSE_NAMES)
+        stem = f"<p>Enunciado da questão {qid} sobre {name or 'tema geral'}.</p>"
+        correct = rng.randrange(4)
+        for slot, letter in enumerate('ABCD'):
+            desc = f"Alternativa {letter} da questão {qid}"
+            roll = rng.random()
+            if roll < 0.01:
+                desc = None
+            elif roll < 0.015:
+                desc = '   '
+            elif roll < 0.02:
+                letter = f' {letter.lower()} '
+            elif roll < 0.025:
+                letter = 'E'
+            rows.append((qid, name, stem, letter, desc, slot == correct))
+        if rng.random() < 0.02:
+            # Linha repetida com outro curso (sobrescreve a categoria)
+            rows.append((qid, rng.choice(COURSE_NAMES), stem, 'A', 'Alternativa repetida', False))
+    return pd.DataFrame(rows, columns=SHEET_COLUMNS)
@@ -0,0 +1,197 @@
+"""Original if/elif keyword chains of each extractor (reference for question_classifier) and their inputs.
+
+The chains are kept as written in each extractor. MatchText runs them with the
+classifier's matching rule (lowercase substring, or accent-folded run of whole
+words), so reference(chain) is what the compiled tables must return.
+"""
+import json
+import random
+import re
+import unicodedata
+
+from question_classifier import (
+    COURSE_CATEGORY_RULES, COURSE_CHALLENGE_RULES, TEXT_CATEGORY_RULES, TEXT_CHALLENGE_RULES, TEXT_FALLBACK_RULES,
+)
+from question_text import fold_text
+
+# Nomes de curso com e sem acento, comparados com a cadeia original
+COURSE_NAMES = [
+    'Direito Penal - OAB', 'Direito Civil', 'Direito Constitucional', 'Direito Administrativo',
+    'Direito Tributário', 'Direito Tributario', 'Ética Profissional', 'Etica Profissional',
+    'Processo Civil', 'Processo Penal', 'Direito do Trabalho', 'Processo do Trabalho',
+    'Direito Empresarial', 'Concursos MPSP', 'Concurso Defensoria', 'Tribunal de Justiça',
+    'Procuradoria Geral', 'ENAM 2024', 'CNU Bloco 4', 'Língua Portuguesa', 'Admin Geral',
+    'Direito Civilistico', 'Criminalística', '', 'Magistratura Federal', 'Direito Constituicao',
+]
+
+
+class MatchText(str):
+    """Texto que a cadeia original vê com a regra do classificador: `kw in texto` é
+    substring em minúsculas ou, sem acento, uma sequência de palavras inteiras"""
+
+    def lower(self):
+        return self
+
+    def upper(self):
+        return self
+
+    def __contains__(self, keyword):
+        text = unicodedata.normalize('NFC', str(self)).lower()
+        if keyword.lower() in text:
+            return True
+        words = [fold_text(word) for word in re.findall(r'\w+', text)]
+        tokens = re.findall(r'\w+', fold_text(keyword))
+        return any(words[i:i + len(tokens)] == tokens for i in range(len(words) - len(tokens) + 1))
+
+
+def reference(legacy):
+    """A cadeia original com a regra de casamento do classificador"""
+    def wrapped(*items):
+        return legacy(*(MatchText(item) for item in items))
+    return wrapped
+
+
+def legacy_name(name):
+    """Cadeia original do extract_questions_v3 (campo Name)"""
+    if name and any(word in name.upper() for word in ['PENAL', 'CRIMINAL']):
+        return 'Direito Penal', False
+    elif name and any(word in name.upper() for word in ['CIVIL', 'CIVILISTICO']):
+        return 'Direito Civil', False
+    elif name and any(word in name.upper() for word in ['CONSTITUCIONAL', 'CONSTITUICAO']):
+        return 'Direito Constitucional', False
+    elif name and any(word in name.upper() for word in ['ADMINISTRATIVO', 'ADMIN']):
+        return 'Direito Administrativo', False
+    elif name and any(word in name.upper() for word in ['TRIBUTARIO', 'TRIBUTO']):
+        return 'Tributário', False
+    elif name and any(word in name.upper() for word in ['ETICA', 'PROFISSIONAL']):
+        return 'Ética Profissional', False
+    elif name and any(word in name.upper() for word in ['PROCESSO', 'PROCESSUAL']):
+        return 'Direito Processual', False
+    elif name and any(word in name.upper() for word in ['TRABALHO', 'TRABALHISTA']):
+        return 'Direito do Trabalho', False
+    elif name and any(word in name.upper() for word in ['EMPRESA', 'EMPRESARIAL']):
+        return 'Direito Empresarial', False
+    elif name and any(word in name.upper() for word in ['CONCURSO', 'MPSP', 'TRIBUNAL']):
+        return 'Direito Administrativo', True
+    return None, False
+
+
+def legacy_course(course_info):
+    """Cadeias originais do extract_questions (nome do curso)"""
+    category, challenge_type = None, None
+    if 'constitucional' in course_info.lower():
+        category = "Direito Constitucional"
+    elif 'civil' in course_info.lower():
+        category = "Direito Civil"
+    elif 'penal' in course_info.lower():
+        category = "Direito Penal"
+    elif 'processo' in course_info.lower():
+        category = "Processo Civil"
+    elif 'trabalho' in course_info.lower():
+        category = "Direito do Trabalho"
+    elif 'empresarial' in course_info.lower():
+        category = "Direito Empresarial"
+    elif 'administrativo' in course_info.lower():
+        category = "Direito Administrativo"
+        challenge_type = "CONCURSOS_MPSP"
+
+    if any(x in course_info.lower() for x in ['mpsp', 'defensoria', 'tribunal', 'procuradoria', 'enam', 'cnu', 'concurso']):
+        if 'mpsp' in course_info.lower():
+            challenge_type = "CONCURSOS_MPSP"
+        elif 'defensoria' in course_info.lower():
+            challenge_type = "CONCURSOS_DEFENSORIA"
+        elif 'tribunal' in course_info.lower():
+            challenge_type = "CONCURSOS_TRIBUNAIS"
+        elif 'procuradoria' in course_info.lower():
+            challenge_type = "CONCURSOS_PROCURADORIAS"
+        elif 'enam' in course_info.lower():
+            challenge_type = "CONCURSOS_ENAM"
+        elif 'cnu' in course_info.lower():
+            challenge_type = "CONCURSOS_CNU"
+        else:
+            challenge_type = "CONCURSOS_MPSP"
+    return category, challenge_type
+
+
+def legacy_clean(course, text):
+    """Cadeia original do clean_questions (curso, depois enunciado); categoria padrão = curso"""
+    category, challenge_type = course, "OAB_1_FASE"
+    course_lower = course.lower()
+    if 'constitucional' in course_lower:
+        category, challenge_type = "Direito Constitucional", "OAB_1_FASE"
+    elif 'civil' in course_lower:
+        category, challenge_type = "Direito Civil", "OAB_1_FASE"
+    elif 'penal' in course_lower:
+        category, challenge_type = "Direito Penal", "OAB_1_FASE"
+    elif 'processo' in course_lower:
+        category, challenge_type = "Processo Civil", "OAB_1_FASE"
+    elif 'trabalho' in course_lower:
+        category, challenge_type = "Direito do Trabalho", "OAB_1_FASE"
+    elif 'empresarial' in course_lower:
+        category, challenge_type = "Direito Empresarial", "OAB_1_FASE"
+    elif 'administrativo' in course_lower:
+        category, challenge_type = "Direito Administrativo", "CONCURSOS_MPSP"
+    else:
+        text_lower = text.lower()
+        if any(word in text_lower for word in ['tribunal do júri', 'homicídio', 'crime']):
+            category, challenge_type = "Direito Penal", "OAB_1_FASE"
+        elif any(word in text_lower for word in ['ministério público', 'promotor']):
+            challenge_type = "CONCURSOS_MPSP"
+        elif any(word in text_lower for word in ['defensoria', 'defensor']):
+            challenge_type = "CONCURSOS_DEFENSORIA"
+        elif any(word in text_lower for word in ['tribunal', 'magistratura']):
+            challenge_type = "CONCURSOS_TRIBUNAIS"
+    return category, challenge_type
+
+
+def legacy_text(text):
+    """Cadeias originais do extract_questions_v2 (enunciado)"""
+    category, challenge_type = None, None
+    text_lower = text.lower()
+    if any(word in text_lower for word in ['constituição', 'constitucional', 'supremo tribunal']):
+        category = "Direito Constitucional"
+    elif any(word in text_lower for word in ['civil', 'contrato', 'propriedade', 'família']):
+        category = "Direito Civil"
+    elif any(word in text_lower for word in ['penal', 'crime', 'delito', 'homicídio']):
+        category = "Direito Penal"
+    elif any(word in text_lower for word in ['processo', 'citação', 'contestação', 'recurso']):
+        category = "Processo Civil"
+    elif any(word in text_lower for word in ['trabalho', 'trabalhista', 'empregado', 'salário']):
+        category = "Direito do Trabalho"
+    elif any(word in text_lower for word in ['empresarial', 'sociedade', 'empresa', 'comercial']):
+        category = "Direito Empresarial"
+    elif any(word in text_lower for word in ['administrativo', 'servidor', 'administração pública']):
+        category = "Direito Administrativo"
+        challenge_type = "CONCURSOS_MPSP"
+
+    if any(word in text_lower for word in ['ministério público', 'mp', 'promotor']):
+        challenge_type = "CONCURSOS_MPSP"
+    elif any(word in text_lower for word in ['defensoria', 'defensor público']):
+        challenge_type = "CONCURSOS_DEFENSORIA"
+    elif any(word in text_lower for word in ['tribunal', 'magistratura']):
+        challenge_type = "CONCURSOS_TRIBUNAIS"
+    elif any(word in text_lower for word in ['procuradoria', 'procurador']):
+        challenge_type = "CONCURSOS_PROCURADORIAS"
+    return category, challenge_type
+
+
+def load_samples():
+    """Enunciados e alternativas dos JSONs versionados"""
+    texts = []
+    for path in ('questions_diverse_sample.json', 'questions_sample.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for q in json.load(f):
+                texts.append(q['text'])
+                texts.extend(q['options'])
+    return texts
+
+
+def synthetic_texts(count=2000):
+    """Combinações de palavras-chave, com e sem acento, e de palavras que quase casam"""
+    rng = random.Random(7)
+    tables = (TEXT_FALLBACK_RULES, TEXT_CATEGORY_RULES, TEXT_CHALLENGE_RULES, COURSE_CATEGORY_RULES, COURSE_CHALLENGE_RULES)
+    keywords = {w.lower() for rules in tables for words, _ in rules for w in words}
+    words = sorted(keywords | {fold_text(w) for w in keywords})
+    words += ['Supremo Tribunal do Júri', 'DEFENSOR PÚBLICO', 'Procuradoria', 'empregador', 'familiar',
+              'empresário', 'ministério-público', 'a', ' ']
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(0, 6))) for _ in range(count)]
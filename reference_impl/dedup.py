@@ -0,0 +1,41 @@
+"""Exhaustive O(n²) Jaccard search (reference for question_dedup) and questions with planted near-copies."""
+import random
+
+from question_dedup import shingle_hashes
+
+WORDS = ('contrato obrigação responsabilidade civil penal pena crime tributo lei decreto norma artigo '
+         'constituição federal estado município união competência recurso apelação sentença juiz '
+         'ministério público advogado ética processo prazo prescrição decadência posse propriedade '
+         'família sucessão herança tributário empresa sociedade falência trabalho empregado salário').split()
+
+
+def build_questions(num_questions, seed=9):
+    """Questões aleatórias; ~5% são cópias de uma anterior com uma palavra trocada"""
+    rng = random.Random(seed)
+    questions, planted = [], []
+    for i in range(num_questions):
+        if i > 10 and rng.random() < 0.05:
+            source = rng.randrange(i)
+            words = questions[source]['text'].split()
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            text, options = ' '.join(words), list(questions[source]['options'])
+            planted.append((source, i))
+        else:
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(30, 60)))
+            options = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))) for _ in range(4)]
+        questions.append({'id': f"Q{i + 1:04d}", 'text': text, 'options': options,
+                          'category': 'Direito Civil', 'challengeType': 'OAB_1_FASE'})
+    return questions, planted
+
+
+def brute_force_pairs(questions, threshold):
+    """Todos os pares (i, j), i < j, cujos conjuntos de shingles têm Jaccard >= threshold"""
+    hashes, offsets = shingle_hashes(questions)
+    sets = [set(hashes[offsets[i]:offsets[i + 1]].tolist()) for i in range(len(questions))]
+    return {(i, j) for i in range(len(sets)) for j in range(i + 1, len(sets))
+            if len(sets[i] & sets[j]) / len(sets[i] | sets[j]) >= threshold}
+
+
+def clustered(clusters):
+    """Índice da questão -> número do cluster"""
+    return {i: n for n, cluster in enumerate(clusters) for i in cluster}
@@ -0,0 +1,35 @@
+"""Original clean_html_text of migrate_all_questions (reference for html_cleaning) and its inputs."""
+import html
+import json
+import re
+
+EDGE_CASES = [
+    '', '   ', '<p>Texto</p>', '&lt;p&gt;Texto escapado&lt;/p&gt;', 'a<br>b', 'a <br> b',
+    'x <<b> y', '< sem fechamento', 'A&nbsp;&nbsp;B', 'linha\r\n\tquebrada', '<b></b>',
+    '&amp;lt;b&amp;gt;', 'Todas as alternativas', '  <i> espaço </i>  ', 'a  b',
+    '&#60;span class="x"&#62;Art. 5º&#60;/span&#62;', 'R$ 1.000,00 &amp; juros',
+]
+
+
+def legacy_clean_html_text(text):
+    """clean_html_text original de migrate_all_questions.py"""
+    if not text:
+        return ""
+    text = html.unescape(text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def load_strings(path):
+    """Enunciado, alternativas e explicação de cada questão, com e sem HTML"""
+    with open(path, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+    strings = []
+    for q in questions:
+        strings.append(q['text'])
+        strings.extend(q['options'])
+        strings.append(q.get('explanation') or '')
+    # O JSON versionado já está limpo; a planilha real vem com HTML
+    wrapped = [f"<p>{s.replace(' ', '&nbsp; ', 3)}</p>\n<br/>" for s in strings]
+    return strings, wrapped
@@ -0,0 +1,72 @@
+"""Plain-Python BM25 (reference for question_search) and the synthetic question bank it is checked on."""
+import math
+import random
+
+from question_search import BM25_B, BM25_K1, tokenize
+
+QUERIES = [
+    'usucapião', 'prescrição aquisitiva', 'habeas corpus', 'mandado de segurança coletivo',
+    'homicídio qualificado legítima defesa', 'improbidade administrativa', 'sociedade limitada',
+    'art. 1.238', 'imunidade tributária recíproca', 'sigilo profissional do advogado',
+    'Justiça do Trabalho', 'STF', 'competência', 'prazo legal', 'Processo Civil apelação recurso',
+]
+# Termos raros, plantados em ~5% dos enunciados
+EXTRA_TERMS = ['usucapião extraordinária', 'habeas corpus preventivo', 'habeas data', 'usucapião especial urbana']
+SUBJECTS = [
+    'o contrato de compra e venda', 'a prescrição aquisitiva', 'o crime de homicídio qualificado',
+    'a competência da Justiça do Trabalho', 'o mandado de segurança coletivo', 'a sociedade limitada',
+    'a improbidade administrativa', 'o recurso de apelação', 'a legítima defesa',
+    'a imunidade tributária recíproca', 'o sigilo profissional do advogado', 'a ação civil pública',
+]
+CONTEXTS = ['Considere a seguinte situação hipotética', 'Segundo o entendimento do STF',
+            'De acordo com o Código de Processo Civil', 'À luz da Constituição Federal de 1988']
+ACTORS = ['João', 'a empresa Alfa Ltda.', 'o servidor Carlos', 'o promotor de justiça']
+ARTICLES = ['art. 5º, LXIX', 'art. 121, § 2º', 'art. 1.238', 'art. 37, § 4º']
+OPTION_STEMS = [
+    'É cabível {subject}, desde que observado o prazo legal.',
+    'Não se aplica {subject} ao caso, por ausência de previsão legal.',
+    'A conduta descrita configura {subject}, nos termos do {article}.',
+    'Nenhuma das alternativas anteriores.',
+]
+
+
+def build_questions(num_questions, seed=17):
+    """Questões limpas com enunciados e alternativas sorteados das listas acima (~5% com um EXTRA_TERMS)"""
+    rng = random.Random(seed)
+    questions = []
+    for i in range(num_questions):
+        text = (f"{rng.choice(CONTEXTS)}: {rng.choice(ACTORS)} questiona {rng.choice(SUBJECTS)}, "
+                f"{rng.choice(ARTICLES)}. Assinale a alternativa correta.")
+        if rng.random() < 0.05:
+            text += f" Discute-se {rng.choice(EXTRA_TERMS)}."
+        options = [rng.choice(OPTION_STEMS).format(subject=rng.choice(SUBJECTS), article=rng.choice(ARTICLES))
+                   for _ in range(4)]
+        questions.append({'id': f"Q{i + 1:06d}", 'text': text, 'options': options})
+    return questions
+
+
+def reference_tokens(question):
+    """Tokens do documento de uma questão (enunciado e alternativas), sem o cache do question_text"""
+    return tokenize(' '.join([question['text']] + list(question['options'])))
+
+
+def reference_top_k(documents, query, k):
+    """BM25 documento a documento, sem índice"""
+    terms = {}
+    for token in tokenize(query):
+        terms[token] = terms.get(token, 0) + 1
+    n = len(documents)
+    avg = sum(len(d) for d in documents) / n
+    df = {t: sum(1 for d in documents if t in d) for t in terms}
+    scored = []
+    for doc, tokens in enumerate(documents):
+        score = 0.0
+        for term, query_tf in terms.items():
+            tf = tokens.count(term)
+            if tf:
+                idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+                score += query_tf * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg))
+        if score:
+            scored.append((-score, doc))
+    scored.sort()
+    return [(doc, -score) for score, doc in scored[:k]]
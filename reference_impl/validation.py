@@ -0,0 +1,72 @@
+"""Row-by-row validation (reference for question_validation) and sheets with answer problems and blank rows."""
+import random
+
+import numpy as np
+import pandas as pd
+
+from question_assembly import LETTER_SLOTS
+from question_validation import MAX_OPTION_LENGTH
+
+
+def add_answer_problems(df, seed=13):
+    """Marca Correct extra e alternativas longas demais em ~1% das linhas"""
+    rng = random.Random(seed)
+    df = df.copy()
+    for i in rng.sample(range(len(df)), len(df) // 100):
+        if rng.random() < 0.5:
+            df.at[i, 'Correct'] = True
+        else:
+            df.at[i, 'Description'] = 'x' * (MAX_OPTION_LENGTH + 1)
+    return df
+
+
+def reference_rejects(df):
+    """Mesmas regras, uma linha por vez"""
+    rejects = []
+    seen_letters, correct_seen, first_row = {}, {}, {}
+    for position, values in enumerate(df[['ObjectQuestionId', 'QuestionStem', 'Letter', 'Description', 'Correct']]
+                                      .itertuples(index=False, name=None)):
+        row = position + 2
+        qid, stem, letter, description, correct = [v if v == v else None for v in values]  # NaN -> None
+        qid = str(qid) if qid is not None else None
+        letter = str(letter).strip().upper() if letter is not None else None
+        description = str(description) if description is not None else None
+        correct = bool(correct) if correct is not None else False
+        if not qid or stem is None or not str(stem) or not letter or not description:
+            rejects.append((qid, 'incomplete_row', row, None))
+            continue
+        first_row.setdefault(qid, row)
+        if letter not in LETTER_SLOTS:
+            rejects.append((qid, 'correct_out_of_range' if correct else 'invalid_letter', row, letter))
+        elif letter in seen_letters.setdefault(qid, set()):
+            rejects.append((qid, 'duplicate_letter', row, letter))
+        else:
+            seen_letters[qid].add(letter)
+        if not description.strip():
+            rejects.append((qid, 'empty_option', row, letter))
+        if len(description) > MAX_OPTION_LENGTH:
+            rejects.append((qid, 'option_too_long', row, str(len(description))))
+        if correct:
+            if correct_seen.get(qid):
+                rejects.append((qid, 'multiple_correct', row, None))
+            correct_seen[qid] = True
+    for qid, row in first_row.items():
+        missing = ''.join(l for l in LETTER_SLOTS if l not in seen_letters[qid])
+        if missing:
+            rejects.append((qid, 'missing_letter', row, missing))
+        if not correct_seen.get(qid):
+            rejects.append((qid, 'no_correct', row, None))
+    return sorted(rejects, key=lambda r: (r[2], r[1]))
+
+
+def as_tuples(rejects):
+    """Rejeições (DataFrame) como tuplas, NaN -> None"""
+    return [tuple(None if v != v else v for v in r) for r in rejects.itertuples(index=False, name=None)]
+
+
+def with_blank_rows(df, every=37):
+    """Planilha com uma linha vazia a cada `every` linhas; devolve (planilha, linhas vazias na planilha)"""
+    blank = pd.DataFrame(np.nan, index=range(len(df) // every), columns=df.columns)
+    position = np.r_[np.arange(len(df)) + np.arange(len(df)) // every, np.arange(len(blank)) * (every + 1) + every]
+    sheet = pd.concat([df, blank], ignore_index=True).iloc[np.argsort(position, kind='stable')]
+    return sheet, np.flatnonzero(sheet.isna().all(axis=1).to_numpy()) + 2
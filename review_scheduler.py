@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""Spaced-repetition scheduler (SM-2) for choosing a user's next questions.
+
+Uso:
+    python review_scheduler.py build user_answers.csv [mais.parquet ...] [--questions questions_cleaned.json]
+    python review_scheduler.py next <user_id> [-k 20] [--challenge-type OAB_1_FASE]
+
+Every (user, question) pair answered in user_answers gets an SM-2 review
+state: repetitions, interval, ease factor, lapses and due time. The history
+is replayed vectorized: answers are sorted by pair and time, and the k-th
+answer of every pair is applied in one NumPy step. The state lives in flat
+arrays (one entry per pair) and is saved as a single .npz (review_state.npz).
+
+Each user has a binary min-heap (array of int64 keys: priority minute << 32
+| pair) over their pairs. The priority is the due time moved earlier by up to
+WEAK_BIAS_DAYS for categories where the user's accuracy is low, so weak
+categories come up first. next_questions pops the due pairs (O(k log n)),
+fills the rest with unseen questions drawn from the weakest categories and
+then with the pairs closest to being due. A new answer pushes a new key;
+the old key of the pair becomes stale and is dropped when it is popped.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from difficulty_calibration import DEFAULT_CHUNK_SIZE, _as_bool, _Codes, read_chunks
+
+STATE_PATH = 'review_state.npz'
+SESSION_SIZE = 20
+MINUTES_PER_DAY = 1440
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+WEAK_BIAS_DAYS = 3.0
+# Qualidade SM-2 (0-5) a partir de acerto e tempo: errou -> 1; acertou em até 20s -> 5, até 60s -> 4, depois -> 3
+FAST_SECONDS, SLOW_SECONDS = 20, 60
+ITEM_BITS = 32
+ITEM_MASK = (1 << ITEM_BITS) - 1
+ANSWER_ALIASES = {
+    'user': ('user_id', 'userId'),
+    'question': ('question_id', 'questionId'),
+    'correct': ('is_correct', 'isCorrect'),
+    'time': ('time_spent', 'timeSpent'),
+    'created': ('created_at', 'createdAt'),
+    'challenge_type': ('challenge_type', 'challengeType'),
+    'category': ('category',),
+}
+ITEM_ARRAYS = {'item_user': np.int32, 'item_question': np.int32, 'item_key': np.int64, 'due': np.int64,
+               'interval': np.float32, 'ease': np.float32, 'reps': np.int16, 'lapses': np.int16}
+
+
+def answer_quality(correct, time_spent):
+    """SM-2 quality (0-5) per answer"""
+    return np.where(~correct, 1, np.where(time_spent <= FAST_SECONDS, 5, np.where(time_spent <= SLOW_SECONDS, 4, 3)))
+
+
+def sm2_update(reps, interval, ease, lapses, quality):
+    """One SM-2 step over arrays of pairs; returns (reps, interval in days, ease, lapses)"""
+    failed = quality < 3
+    new_reps = np.where(failed, 0, reps + 1)
+    new_interval = np.where(failed | (new_reps == 1), 1.0, np.where(new_reps == 2, 6.0, interval * ease))
+    penalty = 5 - quality
+    new_ease = np.maximum(MIN_EASE, ease + 0.1 - penalty * (0.08 + penalty * 0.02))
+    return (new_reps.astype(np.int16), new_interval.astype(np.float32), new_ease.astype(np.float32),
+            (lapses + failed).astype(np.int16))
+
+
+def _minutes(created):
+    """Timestamps (text or datetime) -> minutes since the epoch"""
+    stamps = pd.to_datetime(created, utc=True, format='mixed')
+    return ((stamps - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(minutes=1)).to_numpy(dtype=np.int64)
+
+
+def _heap_push(heap, key):
+    heap.append(key)
+    pos = len(heap) - 1
+    while pos:
+        parent = (pos - 1) >> 1
+        if heap[parent] <= key:
+            break
+        heap[pos] = heap[parent]
+        pos = parent
+    heap[pos] = key
+
+
+def _heap_pop(heap):
+    last = heap.pop()
+    if not heap:
+        return last
+    top, size, pos = heap[0], len(heap), 0
+    while True:
+        child = 2 * pos + 1
+        if child >= size:
+            break
+        if child + 1 < size and heap[child + 1] < heap[child]:
+            child += 1
+        if heap[child] >= last:
+            break
+        heap[pos] = heap[child]
+        pos = child
+    heap[pos] = last
+    return top
+
+
+class ReviewScheduler:
+    """SM-2 state per (user, question) in flat arrays, plus one due-time heap per user"""
+
+    def __init__(self):
+        self.users = _Codes()
+        self.questions = _Codes()
+        self.categories = _Codes()
+        self.challenge_types = _Codes()
+        self.question_category = np.zeros(0, dtype=np.int16)
+        self.question_challenge = np.zeros(0, dtype=np.int16)
+        self.items = {name: np.zeros(0, dtype=dtype) for name, dtype in ITEM_ARRAYS.items()}
+        self.size = 0
+        self.heaps = []
+        # Questões já vistas por usuário: códigos ordenados e o par correspondente
+        self.seen = []
+        self.seen_items = []
+        self.category_total = np.zeros((0, 0), dtype=np.int32)
+        self.category_correct = np.zeros((0, 0), dtype=np.int32)
+        self.pools = []
+
+    # Construção a partir do histórico
+
+    @classmethod
+    def from_answers(cls, paths, questions=(), chunk_size=DEFAULT_CHUNK_SIZE):
+        """Replay user_answers exports (in any order) into a scheduler; questions adds unanswered ones"""
+        scheduler = cls()
+        if questions:
+            scheduler._question_codes([q['id'] for q in questions], [q.get('category', '') for q in questions],
+                                      [q.get('challengeType', '') for q in questions])
+        parts = []
+        for path in paths:
+            for chunk in read_chunks(path, chunk_size, ANSWER_ALIASES):
+                chunk = chunk[chunk['user'].notna() & chunk['question'].notna()]
+                question = scheduler._question_codes(chunk['question'].astype(str).to_numpy(),
+                                                     chunk['category'].fillna('').to_numpy(),
+                                                     chunk['challenge_type'].fillna('').to_numpy())
+                parts.append((scheduler.users.encode(chunk['user'].astype(str).to_numpy()), question,
+                              _as_bool(chunk['correct']),
+                              pd.to_numeric(chunk['time'], errors='coerce').fillna(0).to_numpy(dtype=np.int32),
+                              _minutes(chunk['created'])))
+        if parts:
+            columns = [np.concatenate(column) for column in zip(*parts)]
+        else:
+            columns = [np.zeros(0, dtype=dtype) for dtype in (np.int32, np.int32, bool, np.int32, np.int64)]
+        scheduler._replay(*columns)
+        return scheduler
+
+    def _question_codes(self, ids, categories, challenge_types):
+        """Codes for question ids, recording category and challenge type (the last seen wins)"""
+        codes = self.questions.encode(np.asarray(ids, dtype=object))
+        size = len(self.questions.labels)
+        if size > len(self.question_category):
+            grow = size - len(self.question_category)
+            self.question_category = np.concatenate([self.question_category, np.zeros(grow, dtype=np.int16)])
+            self.question_challenge = np.concatenate([self.question_challenge, np.zeros(grow, dtype=np.int16)])
+        self.question_category[codes] = self.categories.encode(np.asarray(categories, dtype=object))
+        self.question_challenge[codes] = self.challenge_types.encode(np.asarray(challenge_types, dtype=object))
+        return codes
+
+    def _replay(self, user, question, correct, time_spent, minute):
+        n_users, n_questions, n_categories = (len(self.users.labels), len(self.questions.labels),
+                                              len(self.categories.labels))
+        pair = user.astype(np.int64) * max(n_questions, 1) + question
+        order = np.lexsort((minute, pair))
+        pair, minute = pair[order], minute[order]
+        quality = answer_quality(correct[order], time_spent[order])
+        starts = np.flatnonzero(np.r_[True, pair[1:] != pair[:-1]]) if len(pair) else np.zeros(0, dtype=np.int64)
+        item = np.cumsum(np.r_[False, pair[1:] != pair[:-1]]) if len(pair) else np.zeros(0, dtype=np.int64)
+        rank = np.arange(len(pair)) - starts[item]
+
+        self.size = len(starts)
+        reps = np.zeros(self.size, dtype=np.int16)
+        interval = np.zeros(self.size, dtype=np.float32)
+        ease = np.full(self.size, INITIAL_EASE, dtype=np.float32)
+        lapses = np.zeros(self.size, dtype=np.int16)
+        last = np.zeros(self.size, dtype=np.int64)
+        # Camada r: a (r+1)-ésima resposta de cada par, aplicada a todos os pares de uma vez
+        by_rank = np.argsort(rank, kind='stable')
+        bounds = np.r_[0, np.cumsum(np.bincount(rank))] if len(rank) else np.zeros(1, dtype=np.int64)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            rows = by_rank[start:stop]
+            items = item[rows]
+            reps[items], interval[items], ease[items], lapses[items] = sm2_update(
+                reps[items], interval[items], ease[items], lapses[items], quality[rows])
+            last[items] = minute[rows]
+
+        self.items = {
+            'item_user': (pair[starts] // max(n_questions, 1)).astype(np.int32),
+            'item_question': (pair[starts] % max(n_questions, 1)).astype(np.int32),
+            'item_key': np.zeros(self.size, dtype=np.int64),
+            'due': last + np.round(interval * MINUTES_PER_DAY).astype(np.int64),
+            'interval': interval, 'ease': ease, 'reps': reps, 'lapses': lapses,
+        }
+        flat = user.astype(np.int64) * n_categories + self.question_category[question]
+        self.category_total = np.bincount(flat, minlength=n_users * n_categories).astype(np.int32).reshape(
+            n_users, n_categories)
+        self.category_correct = np.bincount(flat, correct, n_users * n_categories).astype(np.int32).reshape(
+            n_users, n_categories)
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Heaps, seen lists and category pools from the item arrays"""
+        n_users = len(self.users.labels)
+        user, question = self.items['item_user'][:self.size], self.items['item_question'][:self.size]
+        keys = self._keys(np.arange(self.size), user, question, self.items['due'][:self.size])
+        self.items['item_key'][:self.size] = keys
+        offsets = np.r_[0, np.cumsum(np.bincount(user, minlength=n_users))]
+        # Um vetor ordenado já é um heap
+        by_key = np.lexsort((keys, user))
+        by_question = np.lexsort((question, user))
+        self.heaps = [array('q', keys[by_key[a:b]].tobytes()) for a, b in zip(offsets[:-1], offsets[1:])]
+        self.seen = [question[by_question[a:b]] for a, b in zip(offsets[:-1], offsets[1:])]
+        self.seen_items = [by_question[a:b].astype(np.int32) for a, b in zip(offsets[:-1], offsets[1:])]
+        self._build_pools()
+
+    def _build_pools(self):
+        order = np.argsort(self.question_category, kind='stable')
+        counts = np.bincount(self.question_category, minlength=len(self.categories.labels))
+        self.pools = np.split(order.astype(np.int32), np.cumsum(counts)[:-1]) if len(counts) else []
+
+    def _weakness_minutes(self, user, category):
+        """How much earlier pairs come due in categories where the user misses more (Laplace-smoothed)"""
+        accuracy = (self.category_correct[user, category] + 1) / (self.category_total[user, category] + 2)
+        return np.round((1 - accuracy) * WEAK_BIAS_DAYS * MINUTES_PER_DAY).astype(np.int64)
+
+    def _keys(self, items, user, question, due):
+        priority = due - self._weakness_minutes(user, self.question_category[question])
+        return (np.maximum(priority, 0) << ITEM_BITS) | items
+
+    # Seleção e atualização
+
+    def next_questions(self, user_id, k=SESSION_SIZE, now=None, challenge_type=None, rng=None):
+        """Ids of the next k questions for user_id: due reviews, then unseen ones, then the soonest due.
+
+        An unknown challenge_type has no questions: the result is empty.
+        """
+        if challenge_type and challenge_type not in self.challenge_types.index:
+            return []
+        now_minute = int((time.time() if now is None else now) // 60)
+        rng = rng or random
+        user = self.users.index.get(user_id)
+        heap = self.heaps[user] if user is not None else array('q')
+        wanted = self.challenge_types.index.get(challenge_type) if challenge_type else None
+        item_key, item_question = self.items['item_key'], self.items['item_question']
+        picked, popped, skipped = [], [], []
+
+        def pop_until(limit):
+            while heap and len(picked) < k and (heap[0] >> ITEM_BITS) <= limit:
+                key = _heap_pop(heap)
+                item = key & ITEM_MASK
+                if item_key[item] != key:
+                    continue  # chave obsoleta: o par foi respondido de novo
+                question = int(item_question[item])
+                if challenge_type and self.question_challenge[question] != wanted:
+                    skipped.append(key)
+                    continue
+                popped.append(key)
+                picked.append(question)
+
+        pop_until(now_minute)
+        if len(picked) < k:
+            picked.extend(self._unseen(user, k - len(picked), picked, wanted, rng))
+        pop_until(np.iinfo(np.int64).max >> ITEM_BITS)
+        # A seleção não altera o estado: as chaves voltam ao heap
+        for key in popped + skipped:
+            _heap_push(heap, key)
+        return [self.questions.labels[q] for q in picked]
+
+    def _unseen(self, user, count, exclude, challenge, rng):
+        """Up to count unseen questions, categories drawn with weight 1 - accuracy"""
+        n_categories = len(self.categories.labels)
+        if user is None:
+            weights = [1.0] * n_categories
+        else:
+            total, correct = self.category_total[user], self.category_correct[user]
+            weights = list(1 - (correct + 1) / (total + 2))
+        weights = [w if len(pool) else 0.0 for w, pool in zip(weights, self.pools)]
+        chosen, excluded = [], set(exclude)
+        seen = self.seen[user] if user is not None else np.zeros(0, dtype=np.int32)
+        for _ in range(count * 10):
+            if len(chosen) == count or not any(weights):
+                break
+            category = rng.choices(range(n_categories), weights)[0]
+            pool = self.pools[category]
+            question = int(pool[rng.randrange(len(pool))])
+            position = np.searchsorted(seen, question)
+            if question in excluded or (position < len(seen) and seen[position] == question):
+                continue
+            if challenge is not None and self.question_challenge[question] != challenge:
+                continue
+            chosen.append(question)
+            excluded.add(question)
+        return chosen
+
+    def record_answer(self, user_id, question_id, correct, time_spent, now=None, category=None,
+                      challenge_type=None):
+        """Apply one answer: SM-2 step for the pair and a new heap key"""
+        now_minute = int((time.time() if now is None else now) // 60)
+        user = int(self.users.encode(np.array([user_id], dtype=object))[0])
+        if question_id in self.questions.index:
+            question = self.questions.index[question_id]
+        else:
+            question = int(self._question_codes([question_id], [category or ''], [challenge_type or ''])[0])
+            self._build_pools()
+        self._grow_users()
+        seen, position = self.seen[user], np.searchsorted(self.seen[user], question)
+        if position < len(seen) and seen[position] == question:
+            item = int(self.seen_items[user][position])
+        else:
+            item = self._new_item(user, question)
+            self.seen[user] = np.insert(seen, position, question)
+            self.seen_items[user] = np.insert(self.seen_items[user], position, item)
+
+        items = self.items
+        quality = answer_quality(np.array([bool(correct)]), np.array([time_spent]))
+        reps, interval, ease, lapses = sm2_update(items['reps'][item:item + 1], items['interval'][item:item + 1],
+                                                  items['ease'][item:item + 1], items['lapses'][item:item + 1],
+                                                  quality)
+        items['reps'][item], items['interval'][item], items['ease'][item], items['lapses'][item] = (
+            reps[0], interval[0], ease[0], lapses[0])
+        items['due'][item] = now_minute + round(float(interval[0]) * MINUTES_PER_DAY)
+        category_code = self.question_category[question]
+        self.category_total[user, category_code] += 1
+        self.category_correct[user, category_code] += bool(correct)
+        key = int(self._keys(np.array([item]), np.array([user]), np.array([question]), items['due'][item:item + 1])[0])
+        items['item_key'][item] = key
+        _heap_push(self.heaps[user], key)
+
+    def _grow_users(self):
+        n_users, n_categories = len(self.users.labels), len(self.categories.labels)
+        while len(self.heaps) < n_users:
+            self.heaps.append(array('q'))
+            self.seen.append(np.zeros(0, dtype=np.int32))
+            self.seen_items.append(np.zeros(0, dtype=np.int32))
+        if self.category_total.shape != (n_users, n_categories):
+            for name in ('category_total', 'category_correct'):
+                old = getattr(self, name)
+                grown = np.zeros((n_users, n_categories), dtype=np.int32)
+                grown[:old.shape[0], :old.shape[1]] = old
+                setattr(self, name, grown)
+
+    def _new_item(self, user, question):
+        if self.size == len(self.items['due']):
+            capacity = max(1024, 2 * self.size)
+            for name, values in self.items.items():
+                grown = np.zeros(capacity, dtype=values.dtype)
+                grown[:self.size] = values[:self.size]
+                self.items[name] = grown
+        item = self.size
+        self.size += 1
+        self.items['item_user'][item], self.items['item_question'][item] = user, question
+        self.items['ease'][item] = INITIAL_EASE
+        return item
+
+    # Persistência
+
+    def save(self, path=STATE_PATH):
+        """Write the whole state as flat arrays (heaps without stale keys, sorted and concatenated per user)"""
+        heap_keys = np.frombuffer(b''.join(heap.tobytes() for heap in self.heaps), dtype=np.int64)
+        heap_lengths = np.array([len(heap) for heap in self.heaps], dtype=np.int64)
+        valid = self.items['item_key'][heap_keys & ITEM_MASK] == heap_keys
+        heap_owner = np.repeat(np.arange(len(self.heaps)), heap_lengths)
+        heap_counts = np.bincount(heap_owner[valid], minlength=len(self.heaps))
+        # Tirar chaves do meio quebra a ordem de heap: cada usuário grava as suas ordenadas (um heap válido)
+        kept = heap_keys[valid]
+        kept = kept[np.lexsort((kept, heap_owner[valid]))]
+        arrays = {name: values[:self.size] for name, values in self.items.items()}
+        with open(path, 'wb') as f:
+            np.savez(f, users=np.array(self.users.labels, dtype=str),
+                     questions=np.array(self.questions.labels, dtype=str),
+                     categories=np.array(self.categories.labels, dtype=str),
+                     challenge_types=np.array(self.challenge_types.labels, dtype=str),
+                     question_category=self.question_category, question_challenge=self.question_challenge,
+                     category_total=self.category_total, category_correct=self.category_correct,
+                     heap_keys=kept, heap_offsets=np.r_[0, np.cumsum(heap_counts)], **arrays)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        scheduler = cls()
+        with np.load(path, allow_pickle=False) as data:
+            for name, codes in (('users', scheduler.users), ('questions', scheduler.questions),
+                                ('categories', scheduler.categories), ('challenge_types', scheduler.challenge_types)):
+                codes.labels = data[name].tolist()
+                codes.index = {label: i for i, label in enumerate(codes.labels)}
+            scheduler.items = {name: data[name].astype(dtype) for name, dtype in ITEM_ARRAYS.items()}
+            scheduler.size = len(scheduler.items['due'])
+            for name in ('question_category', 'question_challenge', 'category_total', 'category_correct'):
+                setattr(scheduler, name, data[name])
+            heap_keys, offsets = data['heap_keys'], data['heap_offsets']
+        scheduler.heaps = [array('q', heap_keys[a:b].tobytes()) for a, b in zip(offsets[:-1], offsets[1:])]
+        user, question = scheduler.items['item_user'], scheduler.items['item_question']
+        by_question = np.lexsort((question, user))
+        seen_offsets = np.r_[0, np.cumsum(np.bincount(user, minlength=len(scheduler.users.labels)))]
+        scheduler.seen = [question[by_question[a:b]] for a, b in zip(seen_offsets[:-1], seen_offsets[1:])]
+        scheduler.seen_items = [by_question[a:b].astype(np.int32) for a, b in zip(seen_offsets[:-1], seen_offsets[1:])]
+        scheduler._build_pools()
+        return scheduler
+
+    def memory_bytes(self):
+        """Bytes held in the state arrays and heaps (without Python object overhead of the labels)"""
+        total = sum(values.nbytes for values in self.items.values())
+        total += sum(heap.itemsize * len(heap) for heap in self.heaps)
+        total += sum(s.nbytes + i.nbytes for s, i in zip(self.seen, self.seen_items))
+        return total + self.category_total.nbytes + self.category_correct.nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agendador de revisão espaçada (SM-2)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="montar o estado a partir de exports de user_answers")
+    build.add_argument('sources', nargs='+', help="exports de user_answers (.csv ou .parquet)")
+    build.add_argument('--questions', help="banco limpo (JSON) para sortear questões ainda não respondidas")
+    build.add_argument('--state', default=STATE_PATH)
+    build.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="linhas por bloco")
+    pick = commands.add_parser('next', help="próximas questões de um usuário")
+    pick.add_argument('user')
+    pick.add_argument('-k', type=int, default=SESSION_SIZE)
+    pick.add_argument('--challenge-type')
+    pick.add_argument('--state', default=STATE_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        questions = []
+        if args.questions:
+            with open(args.questions, 'r', encoding='utf-8') as f:
+                questions = json.load(f)
+        start = time.perf_counter()
+        scheduler = ReviewScheduler.from_answers(args.sources, questions, args.chunk_size)
+        scheduler.save(args.state)
+        print(f"📚 {len(scheduler.users.labels):,} usuários, {scheduler.size:,} pares usuário×questão, "
+              f"{len(scheduler.questions.labels):,} questões ({time.perf_counter() - start:.1f}s)")
+        print(f"💾 Estado em {args.state} ({scheduler.memory_bytes() / 1e6:.1f} MB em arrays)")
+    else:
+        scheduler = ReviewScheduler.load(args.state)
+        if args.user not in scheduler.users.index:
+            print(f"⚠️  Usuário {args.user} sem histórico: só questões novas")
+        if args.challenge_type and args.challenge_type not in scheduler.challenge_types.index:
+            print(f"⚠️  challengeType {args.challenge_type} desconhecido "
+                  f"(conhecidos: {', '.join(filter(None, scheduler.challenge_types.labels))})")
+        for question_id in scheduler.next_questions(args.user, args.k, challenge_type=args.challenge_type):
+            print(question_id)
+        if not scheduler.questions.labels:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
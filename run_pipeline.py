@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Run the question pipeline as a stage graph, redoing only what is out of date.
+
+Uso:
+    python run_pipeline.py                      # tudo que estiver desatualizado
+    python run_pipeline.py sample               # só o necessário para a amostra diversificada
+    python run_pipeline.py --dry-run            # mostra o que rodaria
+    python run_pipeline.py --force clean        # refaz clean (e o que mudar por causa dele)
+    python run_pipeline.py --workbook outra.xlsx --stream --incremental --compact
+
+Etapas (entradas -> saídas):
+    extract     planilha                      -> questions_from_new_excel.json, questions_rejects.csv
+    extract-ts  questions_from_new_excel.json -> questions_from_new_excel.ts
+    clean       questions_from_new_excel.json -> questions_cleaned.json (+ .arrow), rejeições, questions_sample.json,
+                                                 questions_text.npz (texto normalizado, question_text.py)
+    clean-ts    questions_cleaned.json        -> questions_cleaned.ts
+    sample      questions_cleaned.json/.arrow -> questions_diverse_sample.json
+    search      questions_cleaned.json/.npz   -> questions_search.idx (índice BM25, question_search.py)
+    packs       questions_cleaned.json        -> questions_packs.bin (pacotes de sessão, session_packs.py)
+
+extract-ts roda em paralelo com clean; clean-ts, sample, search e packs em paralelo entre si.
+Uma etapa é pulada quando suas entradas, o código do script (e dos módulos
+locais que ele importa) e os argumentos são os mesmos da última execução
+bem-sucedida (pipeline_state.json). A saída de cada etapa vai para
+pipeline_logs/<etapa>.log.
+"""
+import argparse
+import sys
+
+from create_better_sample import DEFAULT_SEED
+from extract_questions_v3 import DEFAULT_INPUT, JSON_PATH as EXTRACTED_PATH, TS_MODULE as EXTRACTED_TS
+from incremental_import import DELTA_PATH, MANIFEST_PATH
+from migrate_all_questions import CLEANED_REJECTS_PATH, TS_MODULE as CLEANED_TS
+from question_columnar import ARROW_PATH
+from question_dedup import DUPLICATES_PATH
+from question_search import INDEX_PATH as SEARCH_INDEX_PATH
+from question_text import TEXT_CACHE_PATH
+from question_validation import REJECTS_PATH
+from session_packs import PACKS_PATH
+from stage_graph import Stage, StageGraph
+
+CLEANED_PATH = 'questions_cleaned.json'
+DIVERSE_SAMPLE_PATH = 'questions_diverse_sample.json'
+TEST_SAMPLE_PATH = 'questions_sample.json'
+
+
+def ts_stage(name, json_path, ts_module, compact):
+    ts_path, export_name, comment = ts_module
+    return Stage(name, ['ts_emitter.py', json_path, ts_path, export_name, '--comment', comment] + compact,
+                 inputs=[json_path], outputs=[ts_path])
+
+
+def pipeline_stages(workbook=DEFAULT_INPUT, stream=False, compact=False, incremental=False, dedup=False,
+                    seed=DEFAULT_SEED):
+    """The extract -> clean -> sample graph, with the TS modules as separate stages"""
+    compact = ['--compact'] if compact else []
+    clean_flags = (['--incremental'] if incremental else []) + (['--dedup'] if dedup else [])
+    return [
+        Stage('extract', ['extract_questions_v3.py', '--input', workbook, '--no-ts']
+              + (['--stream'] if stream else []) + compact,
+              inputs=[workbook], outputs=[EXTRACTED_PATH, REJECTS_PATH]),
+        ts_stage('extract-ts', EXTRACTED_PATH, EXTRACTED_TS, compact),
+        Stage('clean', ['migrate_all_questions.py', '--no-ts'] + clean_flags + compact,
+              inputs=[EXTRACTED_PATH], outputs=[CLEANED_PATH, CLEANED_REJECTS_PATH, TEST_SAMPLE_PATH, TEXT_CACHE_PATH],
+              optional_outputs=[ARROW_PATH, MANIFEST_PATH] + ([DUPLICATES_PATH] if dedup else [])
+              + ([DELTA_PATH] if incremental else [])),
+        ts_stage('clean-ts', CLEANED_PATH, CLEANED_TS, compact),
+        Stage('sample', ['create_better_sample.py', '--seed', str(seed)],
+              inputs=[CLEANED_PATH, ARROW_PATH], outputs=[DIVERSE_SAMPLE_PATH]),
+        Stage('search', ['question_search.py', 'build', CLEANED_PATH, SEARCH_INDEX_PATH],
+              inputs=[CLEANED_PATH, TEXT_CACHE_PATH], outputs=[SEARCH_INDEX_PATH]),
+        Stage('packs', ['session_packs.py', 'build', CLEANED_PATH, PACKS_PATH],
+              inputs=[CLEANED_PATH], outputs=[PACKS_PATH]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline de questões com cache por etapa")
+    parser.add_argument('targets', nargs='*', help="etapas a produzir (padrão: todas)")
+    parser.add_argument('--workbook', default=DEFAULT_INPUT, help="planilha de entrada")
+    parser.add_argument('--stream', action='store_true', help="extract em streaming (openpyxl read-only)")
+    parser.add_argument('--compact', action='store_true', help="JSON/TS sem indentação")
+    parser.add_argument('--incremental', action='store_true', help="limpar e validar só o que mudou (questions_delta.json); as saídas são regravadas inteiras")
+    parser.add_argument('--dedup', action='store_true', help="relatório de quase-duplicatas no clean")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="semente da amostra diversificada")
+    parser.add_argument('--force', nargs='*', metavar='ETAPA', help="refazer estas etapas (sem nomes: todas)")
+    parser.add_argument('--workers', type=int, default=None, help="etapas simultâneas")
+    parser.add_argument('--dry-run', action='store_true', help="só mostrar o que está desatualizado")
+    args = parser.parse_args()
+
+    stages = pipeline_stages(args.workbook, args.stream, args.compact, args.incremental, args.dedup, args.seed)
+    graph = StageGraph(stages)
+    force = [stage.name for stage in stages] if args.force == [] else (args.force or [])
+
+    print(f"🚀 Pipeline: {len(stages)} etapas{' (dry run)' if args.dry_run else ''}")
+    results = graph.run(args.targets or None, force=force, workers=args.workers, dry_run=args.dry_run)
+
+    counts = {}
+    for status in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    print(f"\n📊 {', '.join(f'{status}: {count}' for status, count in sorted(counts.items()))}")
+    if counts.get('failed') or counts.get('blocked'):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
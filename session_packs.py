@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Precomputed 20-question session packs, so starting a game is one indexed read.
+
+Uso:
+    python session_packs.py build [questions_cleaned.json] [questions_packs.bin] [--packs 100] [--workers N]
+                                  [--difficulty questions_difficulty.csv]
+    python session_packs.py pack [--challenge-type OAB_1_FASE] [--category "Direito Civil"] [--number 7]
+
+Packs are generated per stratum: every (challengeType, category), every
+challengeType and every category alone, and "all" (ANY = '*' in the key,
+e.g. "OAB_1_FASE/*"), matching the filters of storage.getRandomQuestions.
+Inside a stratum each pack draws from the difficulty levels in proportion
+to their size (at least one question per level when the pack has room),
+never repeats a question, and consecutive packs walk shuffled copies of
+each level end to end, so the rotation uses every question before any
+comes back. Strata are generated in a process pool.
+
+The file is written once and memory-mapped by readers:
+    header      magic, JSON with pack_size and strata {key: [first row, packs]}
+    packs       uint32 matrix, one row of pack_size question positions per
+                pack (MISSING pads strata smaller than a pack)
+    questions   id bytes + offsets, difficulty per position
+Pack n of a stratum is the pack_size * 4 bytes at row first + n % packs,
+so the server reads one pack with a single pread once the header and the
+id table are loaded.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from question_model import questions_from_dicts
+from question_sampler import StratifiedSampler, allocate_quotas
+
+CLEANED_PATH = 'questions_cleaned.json'
+PACKS_PATH = 'questions_packs.bin'
+MAGIC = b'QPACK001'
+ALIGNMENT = 8
+PACK_SIZE = 20
+DEFAULT_PACKS = 100
+DEFAULT_SEED = 42
+ANY = '*'
+MISSING = np.iinfo(np.uint32).max
+
+
+def stratum_key(challenge_type=None, category=None):
+    """File key of a filter; None/empty means any value"""
+    return f"{challenge_type or ANY}/{category or ANY}"
+
+
+def pack_strata(questions):
+    """{key: positions} for every filter combination the server accepts"""
+    sampler = StratifiedSampler(questions)
+    strata = {}
+    for (challenge_type, category), positions in sampler.strata.items():
+        for key in (stratum_key(challenge_type, category), stratum_key(challenge_type), stratum_key(None, category),
+                    stratum_key()):
+            strata.setdefault(key, []).extend(positions)
+    return {key: np.sort(np.array(positions, dtype=np.uint32)) for key, positions in strata.items()}
+
+
+def cyclic_draws(pool, per_pack, packs, rng):
+    """packs × per_pack positions from pool, walking shuffled copies of it end to end.
+
+    Every position is used once before any repeats; when a pack straddles two
+    copies, the next copy starts with positions the pack does not hold yet.
+    """
+    total = packs * per_pack
+    out = np.empty(total, dtype=np.uint32)
+    filled = 0
+    while filled < total:
+        copy = rng.permutation(pool)
+        open_pack = out[filled - filled % per_pack:filled]
+        if len(open_pack):
+            taken = np.isin(copy, open_pack)
+            copy = np.concatenate([copy[~taken], copy[taken]])
+        take = min(len(copy), total - filled)
+        out[filled:filled + take] = copy[:take]
+        filled += take
+    return out.reshape(packs, per_pack)
+
+
+def stratum_packs(key, positions, difficulty, packs, pack_size, seed):
+    """Worker: (key, packs × pack_size uint32 matrix) for one stratum"""
+    rng = np.random.default_rng([seed, zlib.crc32(key.encode('utf-8'))])
+    levels = np.unique(difficulty)
+    buckets = [positions[difficulty == level] for level in levels]
+    sizes = [len(bucket) for bucket in buckets]
+    size = min(pack_size, len(positions))
+    low = [1] * len(sizes) if len(sizes) <= size else [0] * len(sizes)
+    quotas = allocate_quotas(size, sizes, low, sizes)
+    chosen = np.hstack([cyclic_draws(bucket, quota, packs, rng) for bucket, quota in zip(buckets, quotas) if quota])
+    # Embaralhar dentro do pacote para os níveis não virem agrupados
+    matrix = np.full((packs, pack_size), MISSING, dtype=np.uint32)
+    matrix[:, :size] = rng.permuted(chosen, axis=1)
+    return key, matrix
+
+
+def read_difficulty_updates(path):
+    """{question id: difficulty} from a difficulty_calibration.py CSV"""
+    updates = pd.read_csv(path, usecols=['id', 'difficulty'], dtype={'id': str})
+    return dict(zip(updates['id'], updates['difficulty'].astype(int)))
+
+
+def build_packs(questions, path=PACKS_PATH, packs=DEFAULT_PACKS, pack_size=PACK_SIZE, seed=DEFAULT_SEED,
+                workers=None, difficulty_updates=None):
+    """Generate every stratum's packs and write the pack file; returns a summary dict"""
+    start = time.perf_counter()
+    updates = difficulty_updates or {}
+    difficulty = np.array([updates.get(q['id'], q['difficulty'] or 0) for q in questions], dtype=np.int8)
+    strata = pack_strata(questions)
+    jobs = [(key, positions, difficulty[positions]) for key, positions in sorted(strata.items())]
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [stratum_packs(key, positions, levels, packs, pack_size, seed) for key, positions, levels in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            keys, positions, levels = zip(*jobs)
+            results = list(executor.map(stratum_packs, keys, positions, levels, [packs] * len(jobs),
+                                        [pack_size] * len(jobs), [seed] * len(jobs), chunksize=8))
+
+    directory, matrices, row = {}, [], 0
+    for key, matrix in results:
+        directory[key] = [row, len(matrix)]
+        matrices.append(matrix)
+        row += len(matrix)
+    ids = [str(q['id']).encode('utf-8') for q in questions]
+    id_offsets = np.zeros(len(ids) + 1, dtype=np.uint32)
+    id_offsets[1:] = np.cumsum([len(i) for i in ids])
+
+    sections = [
+        ('packs', np.vstack(matrices).ravel() if matrices else np.empty(0, dtype=np.uint32)),
+        ('id_bytes', np.frombuffer(b''.join(ids), dtype=np.uint8)),
+        ('id_offsets', id_offsets),
+        ('difficulty', difficulty),
+    ]
+    header = {'pack_size': pack_size, 'questions': len(questions), 'seed': seed, 'strata': directory, 'sections': {}}
+    offset = 0
+    for name, array in sections:
+        header['sections'][name] = [offset, array.dtype.str, len(array)]
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(4, 'little'))
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+        for _, array in sections:
+            f.write(array.tobytes())
+            f.write(b'\0' * (-array.nbytes % ALIGNMENT))
+    os.replace(tmp_path, path)
+    return {'strata': len(directory), 'packs': row, 'bytes': data_start + offset,
+            'seconds': time.perf_counter() - start}
+
+
+class PackFile:
+    """Memory-mapped pack file written by build_packs; pack() returns question ids"""
+
+    def __init__(self, path=PACKS_PATH):
+        self.path = path
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} não é um arquivo de pacotes (versão {MAGIC.decode()})")
+        header_length = int.from_bytes(bytes(buffer[len(MAGIC):len(MAGIC) + 4]), 'little')
+        header = json.loads(bytes(buffer[len(MAGIC) + 4:len(MAGIC) + 4 + header_length]))
+        self.data_start = -(-(len(MAGIC) + 4 + header_length) // ALIGNMENT) * ALIGNMENT
+        self.sections = header['sections']
+        for name, (relative, dtype, length) in self.sections.items():
+            dtype = np.dtype(dtype)
+            begin = self.data_start + relative
+            setattr(self, name, buffer[begin:begin + length * dtype.itemsize].view(dtype))
+        self.pack_size = header['pack_size']
+        self.strata = header['strata']
+        self.ids = [bytes(self.id_bytes[self.id_offsets[i]:self.id_offsets[i + 1]]).decode('utf-8')
+                    for i in range(header['questions'])]
+
+    def pack_count(self, challenge_type=None, category=None):
+        return self.strata.get(stratum_key(challenge_type, category), (0, 0))[1]
+
+    def pack_range(self, challenge_type=None, category=None, number=0):
+        """(byte offset, length) of pack number in the file, or None for an unknown stratum"""
+        first, count = self.strata.get(stratum_key(challenge_type, category), (0, 0))
+        if not count:
+            return None
+        row = first + number % count
+        begin = self.data_start + self.sections['packs'][0] + row * self.pack_size * 4
+        return begin, self.pack_size * 4
+
+    def positions(self, challenge_type=None, category=None, number=0):
+        """Question positions of one pack (padding removed)"""
+        found = self.pack_range(challenge_type, category, number)
+        if found is None:
+            return np.empty(0, dtype=np.uint32)
+        row = (found[0] - self.data_start - self.sections['packs'][0]) // 4
+        positions = self.packs[row:row + self.pack_size]
+        return positions[positions != MISSING]
+
+    def pack(self, challenge_type=None, category=None, number=None, rng=random):
+        """Question ids of pack number (a random pack when None); [] for an unknown stratum"""
+        if number is None:
+            number = rng.randrange(max(self.pack_count(challenge_type, category), 1))
+        return [self.ids[p] for p in self.positions(challenge_type, category, number).tolist()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pacotes de sessão pré-calculados")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="gerar os pacotes a partir do banco limpo")
+    build.add_argument('source', nargs='?', default=CLEANED_PATH)
+    build.add_argument('output', nargs='?', default=PACKS_PATH)
+    build.add_argument('--packs', type=int, default=DEFAULT_PACKS, help="pacotes por estrato")
+    build.add_argument('--size', type=int, default=PACK_SIZE, help="questões por pacote")
+    build.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    build.add_argument('--workers', type=int, default=None, help="processos (padrão: um por núcleo)")
+    build.add_argument('--difficulty', help="CSV do difficulty_calibration.py para sobrepor a dificuldade")
+    show = commands.add_parser('pack', help="questões de um pacote")
+    show.add_argument('--challenge-type')
+    show.add_argument('--category')
+    show.add_argument('--number', type=int, help="número do pacote (padrão: sorteado)")
+    show.add_argument('--packs-file', default=PACKS_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.source, 'r', encoding='utf-8') as f:
+            questions = questions_from_dicts(json.load(f))
+        updates = read_difficulty_updates(args.difficulty) if args.difficulty else None
+        summary = build_packs(questions, args.output, args.packs, args.size, args.seed, args.workers, updates)
+        print(f"💾 Pacotes salvos em {args.output}: {summary['packs']:,} pacotes de {args.size} em "
+              f"{summary['strata']} estratos, {summary['bytes'] / 1e6:.1f} MB em {summary['seconds']:.2f}s")
+        return
+
+    packs = PackFile(args.packs_file)
+    ids = packs.pack(args.challenge_type, args.category, args.number)
+    if not ids:
+        print(f"⚠️  Nenhum pacote para {stratum_key(args.challenge_type, args.category)}")
+        sys.exit(1)
+    for question_id in ids:
+        print(question_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Stage graph with fingerprinted, cached artifacts (see run_pipeline.py).
+
+A Stage is a command (a repo script run in a subprocess) with declared input
+and output files. Its fingerprint covers the content of its inputs, the source
+of the script and of every local module it imports (transitively), and the
+command line. A stage whose fingerprint matches the one saved in the state
+file, and whose outputs all still exist, is skipped.
+
+Stages run as soon as the stages producing their inputs have finished, up to
+`workers` at a time. The fingerprint is taken at that moment, so if an
+upstream stage reruns but writes byte-identical outputs, the downstream stages
+are still skipped.
+"""
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+STATE_PATH = 'pipeline_state.json'
+STATE_VERSION = 1
+LOG_DIR = 'pipeline_logs'
+REPO = os.path.dirname(os.path.abspath(__file__))
+HASH_BLOCK = 1 << 20
+
+
+class Stage:
+    """One node: argv[0] is a script in the repo; inputs/outputs are paths relative to the working directory"""
+
+    def __init__(self, name, argv, inputs=(), outputs=(), optional_outputs=()):
+        self.name = name
+        self.argv = list(argv)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        # Saídas que podem não existir (ex.: .arrow sem pyarrow): entram no grafo mas não forçam rerun
+        self.optional_outputs = list(optional_outputs)
+
+    @property
+    def script(self):
+        return os.path.join(REPO, self.argv[0])
+
+    def all_outputs(self):
+        return self.outputs + self.optional_outputs
+
+
+def file_digest(path, known=None):
+    """sha256 of a file (None if missing); known maps path -> {size, mtime_ns, sha256} to skip rehashing"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    entry = (known or {}).get(path)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    if known is not None:
+        known[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    return digest.hexdigest()
+
+
+def local_imports(script, repo=REPO):
+    """Sorted paths of script and every repo module it imports, directly or through other repo modules"""
+    seen, pending = set(), [os.path.abspath(script)]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                candidate = os.path.join(repo, name.split('.')[0] + '.py')
+                if os.path.exists(candidate):
+                    pending.append(candidate)
+    return sorted(seen)
+
+
+def code_version(script, repo=REPO):
+    """sha256 over the source of script and its local imports"""
+    digest = hashlib.sha256()
+    for path in local_imports(script, repo):
+        digest.update(os.path.relpath(path, repo).encode('utf-8'))
+        digest.update(file_digest(path).encode('ascii'))
+    return digest.hexdigest()
+
+
+def load_state(path=STATE_PATH):
+    """Fingerprints of the last successful run of each stage (empty on first run)"""
+    if not os.path.exists(path):
+        return {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        raise ValueError(f"Estado {path} com versão {state.get('version')} não suportada")
+    return state
+
+
+def save_state(state, path=STATE_PATH):
+    """Write the state atomically, so an interrupted run keeps the previous one"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class StageGraph:
+    """Runs stages in dependency order, skipping the ones whose fingerprint is unchanged"""
+
+    def __init__(self, stages, state_path=STATE_PATH, log_dir=LOG_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.log_dir = log_dir
+        producers = {}
+        for stage in stages:
+            for output in stage.all_outputs():
+                if output in producers:
+                    raise ValueError(f"{output} é saída de {producers[output]} e de {stage.name}")
+                producers[output] = stage.name
+        self.dependencies = {
+            stage.name: sorted({producers[i] for i in stage.inputs if i in producers}) for stage in stages
+        }
+        self._check_acyclic()
+        self._code_versions = {}
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo entre etapas: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dependency in self.dependencies[name]:
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+    def fingerprint(self, stage, files):
+        """Hash of the stage's command, code version and input contents"""
+        if stage.script not in self._code_versions:
+            self._code_versions[stage.script] = code_version(stage.script)
+        payload = {
+            'argv': stage.argv,
+            'code': self._code_versions[stage.script],
+            'inputs': {path: file_digest(path, files) for path in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def is_stale(self, stage, fingerprint, state):
+        """True if the fingerprint changed or a required output is missing"""
+        previous = state['stages'].get(stage.name)
+        if previous is None or previous['fingerprint'] != fingerprint:
+            return True
+        return not all(os.path.exists(path) for path in stage.outputs)
+
+    def _execute(self, stage):
+        """Run the stage's script; stdout/stderr go to pipeline_logs/<stage>.log"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        log_path = os.path.join(self.log_dir, f"{stage.name}.log")
+        env = dict(os.environ, PYTHONPATH=REPO + os.pathsep + os.environ.get('PYTHONPATH', ''))
+        start = time.perf_counter()
+        with open(log_path, 'w', encoding='utf-8') as log:
+            returncode = subprocess.run([sys.executable, stage.script] + stage.argv[1:], stdout=log,
+                                        stderr=subprocess.STDOUT, env=env).returncode
+        return returncode, time.perf_counter() - start, log_path
+
+    def run(self, targets=None, force=(), workers=None, dry_run=False):
+        """Run the stages needed for targets (default: all). Returns {stage: status}.
+
+        status is 'ran', 'skipped' (up to date), 'failed', 'blocked' (a dependency
+        failed) or, with dry_run, 'stale'.
+        """
+        needed = self._closure(targets or list(self.stages))
+        state = load_state(self.state_path)
+        files = state.setdefault('files', {})
+        results, running = {}, {}
+        workers = workers or max(2, os.cpu_count() or 1)  # as etapas passam parte do tempo em E/S
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while len(results) < len(needed):
+                for name in needed:
+                    if name in results or name in running:
+                        continue
+                    dependencies = [results.get(d) for d in self.dependencies[name]]
+                    if any(status in ('failed', 'blocked') for status in dependencies):
+                        results[name] = 'blocked'
+                        print(f"⛔ {name}: bloqueada (dependência falhou)")
+                        continue
+                    if None in dependencies:
+                        continue
+                    stage = self.stages[name]
+                    fingerprint = self.fingerprint(stage, files)
+                    # No dry run as entradas ainda não mudaram: desatualizada se alguma dependência está
+                    forced = name in force or (dry_run and 'stale' in dependencies)
+                    if not forced and not self.is_stale(stage, fingerprint, state):
+                        results[name] = 'skipped'
+                        print(f"⏭️  {name}: em dia")
+                    elif dry_run:
+                        results[name] = 'stale'
+                        print(f"🔸 {name}: desatualizada")
+                    else:
+                        print(f"▶️  {name}: {' '.join(stage.argv)}")
+                        running[name] = (executor.submit(self._execute, stage), fingerprint)
+
+                if not running:
+                    continue
+                done, _ = wait([future for future, _ in running.values()], return_when=FIRST_COMPLETED)
+                for name in [n for n, (future, _) in running.items() if future in done]:
+                    future, fingerprint = running.pop(name)
+                    returncode, seconds, log_path = future.result()
+                    stage = self.stages[name]
+                    missing = [path for path in stage.outputs if not os.path.exists(path)]
+                    if returncode == 0 and not missing:
+                        results[name] = 'ran'
+                        state['stages'][name] = {
+                            'fingerprint': fingerprint,
+                            'seconds': round(seconds, 3),
+                            'outputs': {path: file_digest(path, files) for path in stage.all_outputs()},
+                        }
+                        save_state(state, self.state_path)
+                        print(f"✅ {name}: {seconds:.2f}s ({log_path})")
+                    else:
+                        results[name] = 'failed'
+                        reason = f"código {returncode}" if returncode else f"saídas ausentes: {', '.join(missing)}"
+                        print(f"❌ {name}: falhou ({reason}), veja {log_path}")
+        return results
+
+    def _closure(self, targets):
+        """targets plus every stage they depend on, in declaration order"""
+        needed, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Etapa desconhecida: {name}")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.dependencies[name])
+        return [name for name in self.stages if name in needed]
@@ -0,0 +1,4 @@
+"""Labels shared by the test modules (sheets and reference code shared with benchmarks/ are in reference_impl)."""
+CATEGORIES = ['Direito Civil', 'Direito Penal', 'Direito Constitucional', 'Direito Administrativo',
+              'Direito do Trabalho', 'Direito Tributário', 'Direito Empresarial', 'Ética Profissional',
+              'Direitos Humanos', 'Direito Ambiental', 'Direito do Consumidor', 'Direito Processual Civil']
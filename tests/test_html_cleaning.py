@@ -0,0 +1,18 @@
+"""html_cleaning returns exactly what the original clean_html_text of migrate_all_questions returned."""
+import pytest
+
+from html_cleaning import clean_html_text, clean_many
+from reference_impl.html_cleaning import EDGE_CASES, legacy_clean_html_text, load_strings
+
+
+@pytest.mark.parametrize('text', EDGE_CASES)
+def test_edge_cases_match_legacy(text):
+    assert clean_html_text(text) == legacy_clean_html_text(text)
+
+
+@pytest.mark.parametrize('path', ['questions_diverse_sample.json', 'questions_sample.json'])
+def test_samples_match_legacy(path):
+    plain, wrapped = load_strings(path)
+    corpus = plain + wrapped
+    assert clean_many(corpus) == [legacy_clean_html_text(text) for text in corpus]
+    assert clean_many(corpus, cache_size=0) == clean_many(corpus)
@@ -0,0 +1,152 @@
+"""Incremental cleaning (manifest by content hash) against the full run of migrate_all_questions."""
+import contextlib
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from incremental_import import DELTA_PATH, MANIFEST_PATH, full_manifest, load_manifest, save_manifest
+import migrate_all_questions
+from migrate_all_questions import (
+    CLEANED_REJECTS_PATH, load_and_clean_questions, load_and_clean_questions_incremental, load_into_database,
+)
+
+CLEANED_PATH = 'questions_cleaned.json'
+
+
+def build_raw_questions(num_questions):
+    """Questions as in questions_from_new_excel.json, with HTML in the stem and options"""
+    return [{
+        'id': str(40000 + i),
+        'name': 'Direito Civil',
+        'text': f"<p>Enunciado {40000 + i}&nbsp;sobre contratos e <b>responsabilidade</b> civil.</p>",
+        'options': [f"<span>Alternativa {letter} da questão {40000 + i}</span>" for letter in 'ABCD'],
+        'correctAnswerIndex': i % 4,
+        'difficulty': 3,
+        'category': 'Direito Civil',
+        'challengeType': 'OAB_1_FASE',
+        'explanation': f"Questão {40000 + i}"
+    } for i in range(num_questions)]
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_raw(raw):
+    with open('questions_from_new_excel.json', 'w', encoding='utf-8') as f:
+        json.dump(raw, f, ensure_ascii=False)
+
+
+def content(questions):
+    return sorted((q['text'], tuple(q['options']), q['correctAnswerIndex']) for q in questions)
+
+
+@pytest.fixture
+def raw(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    questions = build_raw_questions(120)
+    write_raw(questions)
+    return questions
+
+
+def test_first_incremental_run_matches_full(raw):
+    load_and_clean_questions()
+    full, manifest = read_json(CLEANED_PATH), read_json(MANIFEST_PATH)
+    os.remove(CLEANED_PATH)
+    os.remove(MANIFEST_PATH)
+    load_and_clean_questions_incremental()
+    assert read_json(CLEANED_PATH) == full
+    assert read_json(MANIFEST_PATH) == manifest
+
+
+def test_incremental_delta_matches_full_content(raw):
+    load_and_clean_questions_incremental()
+    raw[3]['options'][0] += ' (revisada)'
+    raw[10] = dict(raw[10], id='N10')
+    del raw[20]
+    write_raw(raw)
+
+    load_and_clean_questions_incremental()
+    delta = read_json(DELTA_PATH)
+    assert {kind: len(items) for kind, items in delta.items()} == {'added': 1, 'changed': 1, 'deleted': 2}
+    incremental = read_json(CLEANED_PATH)
+    load_and_clean_questions()
+    assert content(incremental) == content(read_json(CLEANED_PATH))
+
+
+def test_incremental_after_full_run_sees_no_delta(raw):
+    load_and_clean_questions_incremental()
+    # Remove uma questão: o modo completo renumera os Qxxxx
+    write_raw(raw[1:])
+    load_and_clean_questions()
+    full = read_json(CLEANED_PATH)
+    load_and_clean_questions_incremental()
+    assert read_json(CLEANED_PATH) == full
+    assert not any(read_json(DELTA_PATH).values())
+
+
+def test_incremental_with_stale_manifest_falls_back_to_full(raw):
+    load_and_clean_questions_incremental()
+    stale = read_json(MANIFEST_PATH)
+    write_raw(raw[1:])
+    load_and_clean_questions()
+    full = read_json(CLEANED_PATH)
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(stale, f)
+    load_and_clean_questions_incremental()
+    assert read_json(CLEANED_PATH) == full
+    assert not os.path.exists(DELTA_PATH)
+
+
+def test_manifest_round_trip(raw):
+    load_and_clean_questions()
+    written = load_manifest()
+    valid = {entry['number'] for entry in written['questions'].values() if entry['valid']}
+    assert written == full_manifest(raw, valid)
+    save_manifest(written, 'copy.json')
+    assert load_manifest('copy.json') == written
+    assert not os.path.exists('copy.json.tmp')
+    assert load_manifest('missing.json')['questions'] == {}
+
+
+def test_incremental_rejects_match_full(raw):
+    load_and_clean_questions_incremental()
+    raw[5]['options'][2] = '<p> </p>'
+    raw[7]['text'] = ''
+    write_raw(raw)
+    load_and_clean_questions_incremental()
+    raw[7]['text'] = 'Enunciado corrigido'
+    del raw[9]
+    write_raw(raw)
+    load_and_clean_questions_incremental()
+    incremental = pd.read_csv(CLEANED_REJECTS_PATH, dtype={'id': str})
+    assert list(zip(incremental['id'], incremental['rule'])) == [('40005', 'empty_option')]
+    load_and_clean_questions()
+    full = pd.read_csv(CLEANED_REJECTS_PATH, dtype={'id': str})
+    assert list(zip(full['id'], full['rule'])) == [('40005', 'empty_option')]
+
+
+def test_load_db_after_manifest_mismatch_is_a_full_load(raw, monkeypatch):
+    loads = []
+    monkeypatch.setattr(migrate_all_questions, 'loader_available', lambda: True)
+    monkeypatch.setattr(migrate_all_questions, 'connect', contextlib.nullcontext)
+    monkeypatch.setattr(migrate_all_questions, 'load_questions',
+                        lambda conn, questions, **kwargs: loads.append((questions, kwargs)) or (len(questions), 0))
+
+    load_and_clean_questions_incremental()
+    stale = read_json(MANIFEST_PATH)
+    write_raw(raw[1:])
+    load_and_clean_questions()
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(stale, f)
+    # questions_delta.json velho no lugar: o modo completo de reserva precisa descartá-lo
+    with open(DELTA_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'added': [], 'changed': [], 'deleted': ['Q0001']}, f)
+
+    questions = load_and_clean_questions_incremental()
+    assert not os.path.exists(DELTA_PATH)
+    load_into_database(questions, incremental=True)
+    assert loads == [(questions, {})]
@@ -0,0 +1,59 @@
+"""ingest_workbooks: the last file wins, its rejects apply to the winner, and the output stays raw."""
+import pandas as pd
+
+from ingest_workbooks import merge_questions, parse_workbook
+from migrate_all_questions import clean_questions
+from question_model import Question
+from question_validation import REJECT_COLUMNS
+
+
+def question(question_id, text):
+    return Question(question_id, text, ('A', 'B', 'C', 'D'), 0, 1, 0, 0, f"Questão {question_id}")
+
+
+def result(path, questions, rejected=()):
+    rejects = pd.DataFrame([(question_id, 'letters', 2, '') for question_id in rejected], columns=REJECT_COLUMNS)
+    return path, questions, rejects, 0, 0.0
+
+
+def test_last_file_wins_and_keeps_first_position():
+    merged, conflicts = merge_questions([
+        result('b_semana2.xlsx', [question('2', 'nova'), question('3', 'três')]),
+        result('a_semana1.xlsx', [question('1', 'um'), question('2', 'velha')]),
+    ])
+    assert [(q.id, q.text) for q in merged] == [('1', 'um'), ('2', 'nova'), ('3', 'três')]
+    assert conflicts == 1
+
+
+def test_rejected_by_the_winning_file_is_dropped():
+    merged, conflicts = merge_questions([
+        result('a_semana1.xlsx', [question('1', 'um'), question('2', 'velha válida')]),
+        result('b_semana2.xlsx', [question('2', 'nova inválida')], rejected=['2']),
+    ])
+    assert [q.id for q in merged] == ['1']
+    assert conflicts == 1
+
+
+def test_rejected_only_by_an_older_file_is_kept():
+    merged, _ = merge_questions([
+        result('a_semana1.xlsx', [question('2', 'velha inválida')], rejected=['2']),
+        result('b_semana2.xlsx', [question('2', 'nova válida')]),
+    ])
+    assert [(q.id, q.text) for q in merged] == [('2', 'nova válida')]
+
+
+def test_ingest_output_is_raw_and_cleaned_once(tmp_path):
+    rows = [
+        ('7', 'Direito Civil', '<p>Use &amp;lt;p&amp;gt; tags</p>', letter, f'A &amp;amp; {letter}', letter == 'A')
+        for letter in 'ABCD'
+    ]
+    path = tmp_path / 'semana1.xlsx'
+    pd.DataFrame(rows, columns=['ObjectQuestionId', 'Name', 'QuestionStem', 'Letter', 'Description', 'Correct']).to_excel(path, index=False)
+
+    for stream in (False, True):
+        _, (raw,), _, _, _ = parse_workbook(str(path), stream)
+        assert raw.text == '<p>Use &amp;lt;p&amp;gt; tags</p>'
+        (cleaned,), errors = clean_questions([raw], [1])
+        assert errors == [None]
+        assert cleaned.text == 'Use &lt;p&gt; tags'
+        assert cleaned.options[0] == 'A &amp; A'
@@ -0,0 +1,38 @@
+"""Per-stage RSS peaks of StageProfiler (pipeline_profile)."""
+import time
+
+import pytest
+
+from pipeline_profile import StageProfiler, current_rss_mb
+
+SIZE_MB = 64
+
+
+def busy(seconds):
+    """Pure-Python loop, so the sampler thread gets the GIL as it does during real stages"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.mark.skipif(current_rss_mb() is None, reason="sem /proc/self/statm")
+def test_stage_peak_is_per_stage():
+    profiler = StageProfiler('test_profile', report_path='/dev/null')
+    with profiler.stage('heavy'):
+        block = bytearray(SIZE_MB * 1024 * 1024)
+        busy(0.05)
+        del block
+    with profiler.stage('light'):
+        busy(0.05)
+    heavy, light = (record.to_dict() for record in profiler.records)
+
+    assert heavy['peak_rss_mb'] >= heavy['rss_mb'] + 0.75 * SIZE_MB
+    assert light['peak_rss_mb'] <= light['rss_mb'] + 0.25 * SIZE_MB
+    assert light['process_peak_rss_mb'] >= heavy['peak_rss_mb']
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StageProfiler.disabled('test_profile')
+    with profiler.stage('cpu') as stage:
+        stage.rows_out = 1
+    assert profiler.records == []
@@ -0,0 +1,42 @@
+"""Columnar assembly (question_assembly) against the original iterrows loop of extract_questions_v3."""
+import pandas as pd
+import pytest
+
+from question_assembly import SHEET_DTYPES, assemble_questions
+from reference_impl.assembly import ACCENT_DELTA, build_frame, complete, legacy_process_rows, reviewed_process_rows
+
+
+@pytest.mark.parametrize('seed', [42, 7])
+def test_assembly_matches_iterrows(seed):
+    df = build_frame(600, seed=seed)
+    expected = complete(reviewed_process_rows(df))
+    assert [q.to_dict() for q in complete(assemble_questions(df))] == expected
+
+
+def test_accent_delta_is_exercised():
+    df = build_frame(600)
+    legacy = {q['id']: q['category'] for q in legacy_process_rows(df)}
+    changed = [q for q in reviewed_process_rows(df) if q['category'] != legacy[q['id']]]
+    assert changed
+    assert all(q['name'] in ACCENT_DELTA and q['category'] == 'Tributário' for q in changed)
+
+
+@pytest.fixture
+def blank_id_workbook(tmp_path):
+    """Planilha com uma linha sem ObjectQuestionId (o pandas lia a coluna como float)"""
+    df = build_frame(40)
+    df.loc[5, 'ObjectQuestionId'] = None
+    path = tmp_path / 'blank_id.xlsx'
+    df.to_excel(path, index=False)
+    return path
+
+
+def test_blank_id_sheet_keeps_integer_ids(blank_id_workbook):
+    legacy = legacy_process_rows(pd.read_excel(blank_id_workbook, engine='openpyxl'))
+    assert legacy[0]['id'] == '10000.0'
+
+    df = pd.read_excel(blank_id_workbook, engine='openpyxl', dtype=SHEET_DTYPES)
+    questions = [q.to_dict() for q in assemble_questions(df)]
+    assert questions[0]['id'] == '10000'
+    assert questions[0]['explanation'] == 'Questão 10000'
+    assert questions == reviewed_process_rows(pd.read_excel(blank_id_workbook, engine='openpyxl'))
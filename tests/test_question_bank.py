@@ -0,0 +1,93 @@
+"""QuestionBank draws (question_bank) and the choice between the .arrow bank and the cleaned JSON."""
+import json
+import random
+
+import pytest
+
+from helpers import CATEGORIES
+from question_bank import QuestionBank
+from question_columnar import bank_is_current, columnar_available, questions_to_table, write_question_bank
+
+BACKENDS = ['dicts'] + (['arrow'] if columnar_available() else [])
+SESSION_SIZE = 20
+
+
+def build_questions(num_questions, seed=2):
+    """Cleaned questions over 8 categories, ~10% CONCURSOS_MPSP"""
+    rng = random.Random(seed)
+    options = ['Alternativa A', 'Alternativa B', 'Alternativa C', 'Alternativa D']
+    return [{
+        'id': f"Q{i + 1:04d}",
+        'text': f"Enunciado {i}",
+        'options': options,
+        'correctAnswerIndex': i % 4,
+        'difficulty': 1 + i % 5,
+        'category': rng.choice(CATEGORIES[:8]),
+        'challengeType': 'CONCURSOS_MPSP' if rng.random() < 0.1 else 'OAB_1_FASE',
+        'explanation': '',
+    } for i in range(num_questions)]
+
+
+@pytest.fixture(scope='module')
+def questions():
+    return build_questions(3000)
+
+
+def make_bank(questions, backend):
+    if backend == 'arrow':
+        return QuestionBank.from_table(questions_to_table(questions))
+    return QuestionBank.from_questions(questions)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_draws_match_the_filter(questions, backend):
+    bank = make_bank(questions, backend)
+    drawn = bank.random_questions(SESSION_SIZE, 'OAB_1_FASE', 'Direito Civil', seed=3)
+    assert len({q['id'] for q in drawn}) == len(drawn) == SESSION_SIZE
+    assert all(q['challengeType'] == 'OAB_1_FASE' and q['category'] == 'Direito Civil' for q in drawn)
+    assert bank.question_count('OAB_1_FASE', 'Direito Civil') == sum(
+        q['challengeType'] == 'OAB_1_FASE' and q['category'] == 'Direito Civil' for q in questions)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_seeded_draws_are_reproducible(questions, backend):
+    bank = make_bank(questions, backend)
+    assert bank.random_positions(SESSION_SIZE, 'OAB_1_FASE', seed=3) == bank.random_positions(SESSION_SIZE, 'OAB_1_FASE', seed=3)
+
+
+def test_small_pool_returns_everything(questions):
+    bank = make_bank(questions[:30], 'dicts')
+    pool = bank.pool('CONCURSOS_MPSP')
+    assert sorted(bank.random_positions(len(pool) + 10, 'CONCURSOS_MPSP')) == [int(i) for i in pool]
+
+
+@pytest.mark.skipif(not columnar_available(), reason="precisa de pyarrow")
+def test_table_holds_more_labels_than_int8(questions):
+    many = [dict(q, category=f"Categoria {i % 300}") for i, q in enumerate(questions)]
+    table = questions_to_table(many)
+    assert len(table.column('category').combine_chunks().dictionary) == 300
+    assert table.column('category').to_pylist() == [q['category'] for q in many]
+    bank = QuestionBank.from_table(table)
+    assert bank.question_count(category='Categoria 299') == sum(q['category'] == 'Categoria 299' for q in many)
+
+
+@pytest.mark.skipif(not columnar_available(), reason="precisa de pyarrow")
+def test_load_uses_arrow_only_when_it_matches_the_json(questions, tmp_path):
+    json_path, arrow_path = str(tmp_path / 'questions_cleaned.json'), str(tmp_path / 'questions_cleaned.arrow')
+
+    def write_json(items):
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False)
+
+    write_json(questions)
+    write_question_bank(questions, arrow_path, json_path)
+    assert bank_is_current(json_path, arrow_path)
+    # JSON regravado sem o .arrow (ex.: sem pyarrow naquela execução)
+    write_json(questions[1:])
+    assert not bank_is_current(json_path, arrow_path)
+    bank = QuestionBank.load(json_path, arrow_path)
+    assert bank.question_count() == len(questions) - 1
+    assert bank.get(questions[0]['id']) is None
+    # .arrow gravado sem o digest do JSON
+    write_question_bank(questions[1:], arrow_path)
+    assert not bank_is_current(json_path, arrow_path)
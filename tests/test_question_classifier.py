@@ -0,0 +1,178 @@
+"""Golden labels of the keyword classifier (question_classifier).
+
+Each table pins the label the extractors produce today: v3 uses the course
+Name, v2 the statement, extract_questions the course and clean_questions the
+course with the statement as fallback. Rules also match accent-folded whole
+words; the ACCENT_DELTA cases are the labels that changed on purpose because
+of that, and every other case is what the original if/elif chains returned.
+The versioned samples are checked against those chains (kept in
+reference_impl.classifier as written in each extractor) in full, so any new
+delta has to be pinned here.
+"""
+import pandas as pd
+import pytest
+
+from clean_questions import categorize_question
+from question_classifier import (
+    NAME_CLASSIFIER, TEXT_CLASSIFIER, classify_clean_question, classify_course, classify_name, classify_text,
+)
+from reference_impl.classifier import COURSE_NAMES, legacy_clean, legacy_name, legacy_text, load_samples
+
+# extract_questions_v3: Name -> (categoria, é concurso)
+V3_NAMES = [
+    ('Direito Penal - OAB', ('Direito Penal', False)),
+    ('Direito Civil', ('Direito Civil', False)),
+    ('Direito Constitucional', ('Direito Constitucional', False)),
+    ('Direito Administrativo', ('Direito Administrativo', False)),
+    ('DIREITO TRIBUTARIO', ('Tributário', False)),
+    ('Ética Profissional', ('Ética Profissional', False)),
+    # CIVIL vem antes de PROCESSO na tabela
+    ('Processo Civil', ('Direito Civil', False)),
+    ('Direito Processual Penal', ('Direito Penal', False)),
+    ('Direito do Trabalho', ('Direito do Trabalho', False)),
+    ('Direito Empresarial', ('Direito Empresarial', False)),
+    ('Concursos MPSP', ('Direito Administrativo', True)),
+    ('Tribunal de Justiça', ('Direito Administrativo', True)),
+    ('Língua Portuguesa', (None, False)),
+    ('', (None, False)),
+    (None, (None, False)),
+]
+
+# extract_questions_v2: enunciado -> (categoria, tipo de desafio); None = mantém o padrão
+V2_TEXTS = [
+    ('Sobre a constituição federal, assinale a correta', ('Direito Constitucional', None)),
+    ('Crime de homicídio qualificado', ('Direito Penal', None)),
+    ('A citação no processo de conhecimento', ('Processo Civil', None)),
+    ('Sociedade limitada e seus sócios', ('Direito Empresarial', None)),
+    ('Servidor público e administração pública', ('Direito Administrativo', 'CONCURSOS_MPSP')),
+    # 'mp' é substring: "compra" marca CONCURSOS_MPSP, como na cadeia original
+    ('Contrato de compra e venda', ('Direito Civil', 'CONCURSOS_MPSP')),
+    ('O promotor do Ministério Público', (None, 'CONCURSOS_MPSP')),
+    ('Defensor público da União', (None, 'CONCURSOS_DEFENSORIA')),
+    ('Tribunal do júri', (None, 'CONCURSOS_TRIBUNAIS')),
+    ('Procurador do estado', (None, 'CONCURSOS_PROCURADORIAS')),
+    ('Texto sem tema', (None, None)),
+    ('', (None, None)),
+]
+
+# extract_questions: nome do curso -> (categoria, tipo de desafio)
+COURSES = [
+    ('Direito Constitucional - MPSP', ('Direito Constitucional', 'CONCURSOS_MPSP')),
+    ('Processo Civil - Defensoria', ('Direito Civil', 'CONCURSOS_DEFENSORIA')),
+    ('Direito Penal Tribunal', ('Direito Penal', 'CONCURSOS_TRIBUNAIS')),
+    ('Procuradoria', (None, 'CONCURSOS_PROCURADORIAS')),
+    ('ENAM 2024', (None, 'CONCURSOS_ENAM')),
+    ('CNU bloco 8', (None, 'CONCURSOS_CNU')),
+    ('Concurso público', (None, 'CONCURSOS_MPSP')),
+    ('Língua Portuguesa', (None, None)),
+]
+
+# clean_questions: (curso, enunciado) -> (categoria, tipo de desafio) da questão limpa;
+# sem regra que case, fica o curso como categoria e OAB_1_FASE
+CLEAN = [
+    ('Direito Civil', 'Tribunal do júri', ('Direito Civil', 'OAB_1_FASE')),
+    ('Direito Administrativo', 'Texto sem tema', ('Direito Administrativo', 'CONCURSOS_MPSP')),
+    ('Língua Portuguesa', 'Tribunal do júri', ('Direito Penal', 'OAB_1_FASE')),
+    ('Língua Portuguesa', 'Crime de homicídio qualificado', ('Direito Penal', 'OAB_1_FASE')),
+    ('Língua Portuguesa', 'O promotor do Ministério Público', ('Língua Portuguesa', 'CONCURSOS_MPSP')),
+    ('Língua Portuguesa', 'Defensor público da União', ('Língua Portuguesa', 'CONCURSOS_DEFENSORIA')),
+    ('Língua Portuguesa', 'Magistratura estadual', ('Língua Portuguesa', 'CONCURSOS_TRIBUNAIS')),
+    ('Língua Portuguesa', 'Texto sem tema', ('Língua Portuguesa', 'OAB_1_FASE')),
+]
+
+# Sem acento só casa palavra inteira: "familiar" e "empresário" não viram família/empresa
+NEAR_MISSES = [
+    ('A situação familiar do empregado', ('Direito do Trabalho', 'CONCURSOS_MPSP')),
+    ('A oitiva do empresário em fase de investigação', (None, 'CONCURSOS_MPSP')),
+    ('Ministério-Público e promotoria', (None, 'CONCURSOS_MPSP')),
+]
+
+# Rótulos que mudaram com a comparação sem acento: (classificador, texto, antes, agora)
+ACCENT_DELTA = [
+    (classify_name, 'Direito Tributário', (None, False), ('Tributário', False)),
+    (classify_text, 'Questao sobre a constituicao', (None, None), ('Direito Constitucional', None)),
+    (classify_text, 'HOMICIDIO culposo', (None, None), ('Direito Penal', None)),
+    (classify_text, 'Uma questão de familia', (None, None), ('Direito Civil', None)),
+    (classify_text, 'Atuação do ministerio publico', (None, None), (None, 'CONCURSOS_MPSP')),
+]
+
+# Delta completo nos nomes de curso e nos JSONs versionados (enunciados e alternativas)
+SAMPLE_DELTA = {
+    'v3 Name': {'Direito Tributário': ((None, False), ('Tributário', False))},
+    'extract_questions_v2': {},
+    'clean_questions': {},
+}
+
+
+@pytest.mark.parametrize('name, expected', V3_NAMES)
+def test_v3_name_labels(name, expected):
+    assert classify_name(name) == expected
+
+
+@pytest.mark.parametrize('text, expected', V2_TEXTS)
+def test_v2_text_labels(text, expected):
+    assert classify_text(text) == expected
+
+
+@pytest.mark.parametrize('course, expected', COURSES)
+def test_course_labels(course, expected):
+    assert classify_course(course) == expected
+
+
+@pytest.mark.parametrize('course, text, expected', CLEAN)
+def test_clean_question_labels(course, text, expected):
+    question = {'text': text, 'course': course, 'options': ['A', 'B', 'C', 'D'], 'category': course,
+                'challengeType': 'OAB_1_FASE'}
+    assert categorize_question(question) is question
+    assert (question['category'], question['challengeType']) == expected
+
+
+def test_clean_question_without_match():
+    assert classify_clean_question('Língua Portuguesa', 'Texto sem tema') == (None, None)
+
+
+@pytest.mark.parametrize('text, expected', NEAR_MISSES)
+def test_folded_keywords_match_whole_words(text, expected):
+    assert legacy_text(text) == expected
+    assert classify_text(text) == expected
+
+
+@pytest.mark.parametrize('classify, text, before, after', ACCENT_DELTA)
+def test_accent_delta(classify, text, before, after):
+    assert before != after
+    assert classify(text) == after
+
+
+def _clean_labels(course, text):
+    category, challenge_type = classify_clean_question(course, text)
+    return category or course, challenge_type or 'OAB_1_FASE'
+
+
+def test_sample_delta():
+    texts = list(dict.fromkeys(load_samples()))
+    pairs = list(dict.fromkeys(zip(COURSE_NAMES * 200, texts)))
+    delta = {
+        'v3 Name': {name: (legacy_name(name), classify_name(name))
+                    for name in COURSE_NAMES if legacy_name(name) != classify_name(name)},
+        'extract_questions_v2': {text: (legacy_text(text), classify_text(text))
+                                 for text in texts if legacy_text(text) != classify_text(text)},
+        'clean_questions': {pair: (legacy_clean(*pair), _clean_labels(*pair))
+                            for pair in pairs if legacy_clean(*pair) != _clean_labels(*pair)},
+    }
+    assert delta == SAMPLE_DELTA
+
+
+@pytest.mark.parametrize('accented, plain', [
+    ('Direito Tributário', 'DIREITO TRIBUTARIO'),
+    ('Constituição Federal', 'CONSTITUICAO FEDERAL'),
+    ('Ética Profissional', 'etica profissional'),
+])
+def test_name_accents_do_not_matter(accented, plain):
+    assert classify_name(accented) == classify_name(plain) != (None, False)
+
+
+def test_classify_many_matches_classify():
+    texts = [text for text, _ in V2_TEXTS] * 3
+    assert TEXT_CLASSIFIER.classify_many(texts) == [TEXT_CLASSIFIER.classify(text) for text in texts]
+    names = pd.Series([name for name, _ in V3_NAMES if name])
+    assert NAME_CLASSIFIER.classify_many(names).tolist() == [NAME_CLASSIFIER.classify(name) for name in names]
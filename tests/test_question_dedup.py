@@ -0,0 +1,51 @@
+"""Near-duplicate detection (question_dedup): recall of planted copies and no pair lost vs brute force."""
+import random
+
+import numpy as np
+
+import question_dedup
+from question_dedup import find_near_duplicates
+from reference_impl.dedup import WORDS, brute_force_pairs, build_questions, clustered
+
+THRESHOLD = 0.8
+
+
+def test_planted_copies_are_found():
+    questions, planted = build_questions(2000)
+    group = clustered(find_near_duplicates(questions, THRESHOLD))
+    assert planted
+    assert [(a, b) for a, b in planted if a not in group or group.get(a) != group.get(b)] == []
+
+
+def test_no_pair_lost_vs_brute_force():
+    questions, _ = build_questions(600, seed=4)
+    group = clustered(find_near_duplicates(questions, THRESHOLD))
+    pairs = brute_force_pairs(questions, THRESHOLD)
+    assert pairs
+    assert [(i, j) for i, j in pairs if i not in group or group.get(i) != group.get(j)] == []
+
+
+def build_chain(length, seed=5):
+    """A question followed by copies of the previous one with two stem words swapped each"""
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS) for _ in range(40)]
+    options = [' '.join(rng.choice(WORDS) for _ in range(8)) for _ in range(4)]
+    questions = []
+    for i in range(length):
+        if i:
+            for _ in range(2):
+                words[rng.randrange(len(words))] = rng.choice(WORDS)
+        questions.append({'id': f"Q{i + 1:04d}", 'text': ' '.join(words), 'options': options})
+    return questions
+
+
+def test_bucket_members_similar_to_a_non_leader_are_joined(monkeypatch):
+    questions = build_chain(8)
+    pairs = brute_force_pairs(questions, THRESHOLD)
+    # A cadeia só fica inteira pela transitividade: as pontas não são parecidas entre si
+    assert (0, len(questions) - 1) not in pairs
+    assert all((i, i + 1) in pairs for i in range(len(questions) - 1))
+    # Todas as questões no mesmo balde em todas as bandas
+    monkeypatch.setattr(question_dedup, 'minhash_signatures',
+                        lambda hashes, offsets, num_perm, seed: np.zeros((len(offsets) - 1, num_perm), dtype=np.uint32))
+    assert find_near_duplicates(questions, THRESHOLD) == [list(range(len(questions)))]
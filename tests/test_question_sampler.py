@@ -0,0 +1,54 @@
+"""Stratified sampler (question_sampler): quotas, reproducibility and uniqueness."""
+import random
+
+import pytest
+
+from helpers import CATEGORIES
+from question_sampler import StratifiedSampler
+
+NUM_QUESTIONS = 5000
+
+
+def build_labels(num_questions, seed=5):
+    """Unbalanced strata: CONCURSOS ~3%, category weights decreasing along CATEGORIES"""
+    rng = random.Random(seed)
+    weights = [len(CATEGORIES) - i for i in range(len(CATEGORIES))]
+    return [{'challengeType': 'CONCURSOS_MPSP' if rng.random() < 0.03 else 'OAB_1_FASE',
+             'category': rng.choices(CATEGORIES, weights)[0]} for _ in range(num_questions)]
+
+
+@pytest.fixture(scope='module')
+def labels():
+    return build_labels(NUM_QUESTIONS)
+
+
+@pytest.fixture(scope='module')
+def sampler(labels):
+    return StratifiedSampler(labels)
+
+
+@pytest.mark.parametrize('mode', ['proportional', 'equal'])
+def test_quotas_and_samples(labels, sampler, mode):
+    sizes = sampler.sizes()
+    quotas = sampler.quotas(200, mode=mode, min_per_stratum=2, max_per_stratum=30)
+    assert sum(quotas.values()) == 200
+    assert all(min(2, sizes[s]) <= count <= min(30, sizes[s]) for s, count in quotas.items())
+
+    first = sampler.sample(quotas, seed=7)
+    assert first == sampler.sample(quotas, seed=7)
+    assert len(set(first)) == len(first) == 200
+    assert all((labels[i]['challengeType'], labels[i]['category']) in quotas for i in first)
+
+
+def test_proportional_quotas_round_exactly(sampler):
+    sizes = sampler.sizes()
+    quotas = sampler.quotas(100, mode='proportional')
+    assert all(abs(quotas[s] - 100 * n / NUM_QUESTIONS) < 1 for s, n in sizes.items())
+
+
+def test_cohorts_differ_and_are_reproducible(sampler):
+    quotas = sampler.quotas(100, mode='proportional', min_per_stratum=1)
+    cohorts = [f"coorte{i}" for i in range(20)]
+    drawn = sampler.sample_cohorts(cohorts, quotas, seed=42)
+    assert len({tuple(v) for v in drawn.values()}) > 1
+    assert drawn == sampler.sample_cohorts(cohorts, quotas, seed=42)
@@ -0,0 +1,27 @@
+"""BM25 index (question_search) against a plain-Python BM25 over the same tokens."""
+import pytest
+
+from question_search import SearchIndex, build_index
+from reference_impl.search import EXTRA_TERMS, QUERIES, build_questions, reference_tokens, reference_top_k
+
+
+@pytest.fixture(scope='module')
+def indexed(tmp_path_factory):
+    questions = build_questions(1500)
+    path = str(tmp_path_factory.mktemp('search') / 'questions_search.idx')
+    build_index(questions, path)
+    return questions, SearchIndex(path), [reference_tokens(q) for q in questions]
+
+
+@pytest.mark.parametrize('query', QUERIES + EXTRA_TERMS)
+def test_top_k_matches_reference(indexed, query):
+    questions, index, documents = indexed
+    expected = reference_top_k(documents, query, 10)
+    found = index.search(query, 10)
+    assert [qid for qid, _ in found] == [questions[doc]['id'] for doc, _ in expected]
+    assert [score for _, score in found] == pytest.approx([score for _, score in expected], abs=1e-9)
+
+
+def test_accents_do_not_matter(indexed):
+    _, index, _ = indexed
+    assert index.search('usucapião', 10) == index.search('USUCAPIAO', 10) != []
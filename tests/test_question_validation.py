@@ -0,0 +1,61 @@
+"""Columnar validation (validate_frame, StreamValidator) against a row-by-row reference."""
+import pandas as pd
+import pytest
+
+from extract_questions_v3 import validate_extracted
+from question_assembly import SHEET_DTYPES, assemble_questions
+from question_validation import StreamValidator, rejected_ids, validate_frame
+from reference_impl.assembly import build_frame
+from reference_impl.validation import add_answer_problems, as_tuples, reference_rejects, with_blank_rows
+from xlsx_stream import XlsxRowStream
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return add_answer_problems(build_frame(1500))
+
+
+def test_validate_frame_matches_reference(frame):
+    rejects = validate_frame(frame)
+    assert len(rejects)
+    assert as_tuples(rejects) == reference_rejects(frame)
+
+
+@pytest.mark.parametrize('chunk_size', [97, 333, 5000])
+def test_stream_validator_matches_reference(frame, chunk_size):
+    validator = StreamValidator()
+    for offset in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[offset:offset + chunk_size]
+        validator.add_chunk(list(chunk.itertuples(index=False, name=None)), list(frame.columns))
+    assert as_tuples(validator.rejects()) == reference_rejects(frame)
+
+
+def test_stream_reports_sheet_rows(frame, tmp_path):
+    # Uma linha vazia a cada 37: o streaming as pula, pd.read_excel as mantém (e elas viram incomplete_row)
+    sheet, blank_rows = with_blank_rows(frame.iloc[:3000], every=37)
+    path = tmp_path / 'blank_rows.xlsx'
+    sheet.to_excel(path, index=False)
+
+    expected = validate_frame(pd.read_excel(path, engine='openpyxl', dtype=SHEET_DTYPES))
+    validator = StreamValidator()
+    for _ in XlsxRowStream(str(path), chunk_size=1000, on_chunk=validator.add_chunk).chunks():
+        pass
+    assert len(blank_rows) == 3000 // 37
+    assert as_tuples(validator.rejects()) == as_tuples(expected[~expected['row'].isin(blank_rows)])
+
+
+def test_incomplete_row_does_not_exclude_a_complete_question():
+    rows = [('1', 'Direito Civil', 'Enunciado 1', letter, f'Alternativa {letter}', letter == 'B') for letter in 'ABCD']
+    rows.insert(2, ('1', 'Direito Civil', 'Enunciado 1', 'C', None, False))
+    # Questão 2: a linha incompleta é a da resposta correta
+    rows += [('2', 'Direito Civil', 'Enunciado 2', letter, f'Alternativa {letter}', False) for letter in 'ABC']
+    rows.append(('2', 'Direito Civil', 'Enunciado 2', 'D', None, True))
+    df = pd.DataFrame(rows, columns=['ObjectQuestionId', 'Name', 'QuestionStem', 'Letter', 'Description', 'Correct'])
+
+    rejects = validate_frame(df)
+    assert as_tuples(rejects) == [('1', 'incomplete_row', 4, None), ('2', 'missing_letter', 7, 'D'),
+                                  ('2', 'no_correct', 7, None), ('2', 'incomplete_row', 10, None)]
+    assert rejected_ids(rejects) == {'2'}
+    kept, = validate_extracted(assemble_questions(df), rejects)
+    assert kept.id == '1' and kept.correct_answer_index == 1
+    assert kept.options == tuple(f'Alternativa {letter}' for letter in 'ABCD')
@@ -0,0 +1,40 @@
+"""ReviewScheduler.next_questions filtered by challengeType."""
+import pandas as pd
+import pytest
+
+from review_scheduler import ReviewScheduler
+
+NOW = pd.Timestamp('2025-06-01', tz='UTC').timestamp()
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    questions = [{'id': f'Q{i}', 'category': 'Direito Civil' if i % 2 else 'Direito Penal',
+                  'challengeType': 'CONCURSOS_MPSP' if i % 5 == 0 else 'OAB_1_FASE'} for i in range(40)]
+    answers = pd.DataFrame({
+        'user_id': ['u1'] * 10,
+        'question_id': [f'Q{i}' for i in range(10)],
+        'is_correct': ['t', 'f'] * 5,
+        'time_spent': [30] * 10,
+        'challenge_type': [q['challengeType'] for q in questions[:10]],
+        'category': [q['category'] for q in questions[:10]],
+        'created_at': ['2025-05-01 10:00:00+00'] * 10,
+    })
+    path = tmp_path / 'user_answers.csv'
+    answers.to_csv(path, index=False)
+    return ReviewScheduler.from_answers([str(path)], questions), {q['id']: q['challengeType'] for q in questions}
+
+
+@pytest.mark.parametrize('user_id', ['u1', 'novo'])
+def test_challenge_type_filter(scheduler, user_id):
+    scheduler, challenge = scheduler
+    picked = scheduler.next_questions(user_id, 6, now=NOW, challenge_type='CONCURSOS_MPSP')
+    assert picked and len(set(picked)) == len(picked)
+    assert {challenge[q] for q in picked} == {'CONCURSOS_MPSP'}
+
+
+@pytest.mark.parametrize('user_id', ['u1', 'novo'])
+def test_unknown_challenge_type_picks_nothing(scheduler, user_id):
+    scheduler, _ = scheduler
+    assert scheduler.next_questions(user_id, 6, now=NOW, challenge_type='OAB_1_FASSE') == []
+    assert len(scheduler.next_questions(user_id, 6, now=NOW)) == 6
@@ -0,0 +1,80 @@
+"""Streaming reads (xlsx_stream) return the same questions as the pandas batch path."""
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from clean_questions import extract_clean_questions, extract_clean_questions_stream
+from extract_questions import extract_questions_from_excel, extract_questions_from_excel_stream
+from extract_questions_v2 import extract_questions_from_excel_v2, extract_questions_from_excel_v2_stream
+from question_assembly import SHEET_DTYPES, assemble_questions, assemble_questions_stream
+from reference_impl.assembly import SHEET_COLUMNS, build_frame
+from xlsx_stream import DEFAULT_CHUNK_SIZE, XlsxRowStream
+
+
+@pytest.fixture
+def edge_workbook(tmp_path):
+    """Blank run longer than two chunks, and an id whose options come back after another question"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(SHEET_COLUMNS)
+
+    def options(qid, name, letters):
+        for letter in letters:
+            sheet.append([qid, name, f"<p>Enunciado da questão {qid}</p>", letter,
+                          f"Alternativa {letter} da questão {qid}", int(letter == 'B')])
+
+    options('Q1', 'Direito Civil', 'ABCD')
+    options('Q2', 'Direito Penal', 'AB')
+    options('Q3', 'Processo Civil', 'ABCD')
+    options('Q2', 'Direito Penal', 'CD')
+    row = sheet.max_row + 2 * DEFAULT_CHUNK_SIZE + 10
+    for qid in ('Q4', 'Q5'):
+        for letter in 'ABCD':
+            for column, value in enumerate([qid, 'Direito do Trabalho', f"Enunciado da questão {qid}", letter,
+                                            f"Alternativa {letter} da questão {qid}", int(letter == 'A')], 1):
+                sheet.cell(row=row, column=column, value=value)
+            row += 1
+    path = str(tmp_path / 'edges.xlsx')
+    workbook.save(path)
+    return path
+
+
+def summary(questions):
+    return [(q['id'], q['text'], q['options'], q['correctAnswerIndex'], q['category'], q['challengeType'])
+            for q in questions]
+
+
+def test_stream_assembly_matches_batch(tmp_path):
+    path = tmp_path / 'questions.xlsx'
+    build_frame(300).to_excel(path, index=False)
+    batch = assemble_questions(pd.read_excel(path, engine='openpyxl', dtype=SHEET_DTYPES))
+    stream = assemble_questions_stream(XlsxRowStream(str(path)).groups())
+    assert [q.to_dict() for q in stream] == [q.to_dict() for q in batch]
+
+
+@pytest.mark.parametrize('batch, stream', [
+    (extract_clean_questions, extract_clean_questions_stream),
+    (extract_questions_from_excel_v2, extract_questions_from_excel_v2_stream),
+])
+def test_stream_extractors_match_batch(edge_workbook, batch, stream):
+    expected = summary(batch(edge_workbook))
+    assert len(expected) == 5
+    assert summary(stream(edge_workbook)) == expected
+
+
+def test_row_extractor_stream_matches_batch(tmp_path):
+    """Blank row in the middle (ids follow the sheet row) and an int column with blanks (pandas reads it as float)"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['Questão', 'A', 'B', 'C', 'D', 'Curso'])
+    sheet.append(['Quanto é 2 + 3?', 4, '*5', 6, None, 'Direito Civil'])
+    sheet.append([])
+    sheet.append(['Qual o prazo em dias?', 10, '✓ 15', 30, None, 'Concurso MPSP'])
+    sheet.append(['Enunciado 4', 'Sim', 'Não', None, None, None])
+    path = str(tmp_path / 'rows.xlsx')
+    workbook.save(path)
+
+    expected = summary(extract_questions_from_excel(path))
+    assert [q[0] for q in expected] == ['001', '003', '004']
+    assert expected[0][2] == ['4', '5', '6']
+    assert summary(extract_questions_from_excel_stream(path)) == expected
@@ -0,0 +1,79 @@
+"""Streaming JSON / TypeScript module writers.
+
+Also a small CLI to emit the .ts module from an existing JSON file (used by
+run_pipeline.py so the TS module is its own stage):
+
+Uso: python ts_emitter.py questions_cleaned.json questions_cleaned.ts questionsCleanedFromExcel \\
+         --comment "Questões limpas do Excel - {count} questões válidas" [--compact]
+"""
+import argparse
+import json
+
+INDENT = 2
+COMPACT_SEPARATORS = (',', ':')
+
+
+def js_string(value):
+    """JavaScript string literal for value (quotes, backslashes, newlines and U+2028/2029 escaped)"""
+    return json.dumps(value or "", ensure_ascii=False).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+
+
+def iter_json_array(items, compact=False):
+    """Yield a JSON array one element at a time.
+
+    Works on any iterable (lists or generators) and produces the same bytes as
+    json.dumps(list(items), indent=2, ensure_ascii=False), or the compact form
+    without whitespace.
+    """
+    if compact:
+        yield '['
+        for i, item in enumerate(items):
+            yield (',' if i else '') + json.dumps(item, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+        yield ']'
+        return
+
+    pad = ' ' * INDENT
+    empty = True
+    for item in items:
+        element = json.dumps(item, indent=INDENT, ensure_ascii=False).replace('\n', '\n' + pad)
+        yield ('[\n' if empty else ',\n') + pad + element
+        empty = False
+    yield '[]' if empty else '\n]'
+
+
+def write_json_file(path, items, compact=False):
+    """Stream items as a JSON array to path"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(iter_json_array(items, compact))
+
+
+def write_ts_module(path, export_name, items, comment, compact=False):
+    """Stream items as `export const <export_name> = [...];` preceded by a // comment line"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"// {comment}\nexport const {export_name} = ")
+        f.writelines(iter_json_array(items, compact))
+        f.write(";\n")
+
+
+def json_to_ts_module(json_path, ts_path, export_name, comment, compact=False):
+    """Write the TS module for the questions in json_path; {count} in comment becomes the question count"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        items = json.load(f)
+    write_ts_module(ts_path, export_name, items, comment.format(count=len(items)), compact)
+    return len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o módulo TypeScript a partir de um JSON de questões")
+    parser.add_argument('json_path')
+    parser.add_argument('ts_path')
+    parser.add_argument('export_name')
+    parser.add_argument('--comment', default="{count} questões", help="comentário da primeira linha ({count} = total)")
+    parser.add_argument('--compact', action='store_true')
+    args = parser.parse_args()
+    count = json_to_ts_module(args.json_path, args.ts_path, args.export_name, args.comment, args.compact)
+    print(f"💾 {args.ts_path}: {count} questões ({args.export_name})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Incremental per-user statistics rollup over user_answers batches.
+
+Uso:
+    python user_stats_rollup.py lote_0001.csv lote_0002.parquet    # aplica os lotes novos
+    python user_stats_rollup.py --rebuild lotes/*.csv               # recomeça do zero
+    python user_stats_rollup.py --user <id> [--challenge-type OAB_1_FASE]
+
+getUserStats (server/storage.ts) reads every answer of a user on each call.
+Here each append-only export of user_answers (CSV or Parquet, same columns as
+the table) is folded into running accumulators keyed by (user_id,
+challenge_type, category): answers, correct answers and time_spent sum. The
+result is the snapshot table user_stats_snapshot.csv, sorted by user, from
+which a user's stats come from a handful of rows (stats_from_rows gives the
+same response as getUserStats). user_stats_rollup.json records the sha256 of
+every batch already applied (and of the snapshot itself), so re-running with
+the same files counts nothing twice.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from difficulty_calibration import DEFAULT_CHUNK_SIZE, _as_bool, read_chunks
+from stage_graph import file_digest
+
+SNAPSHOT_PATH = 'user_stats_snapshot.csv'
+MANIFEST_PATH = 'user_stats_rollup.json'
+KEY_COLUMNS = ['user_id', 'challenge_type', 'category']
+SNAPSHOT_COLUMNS = KEY_COLUMNS + ['total', 'correct', 'time_sum']
+ANSWER_ALIASES = {
+    'user_id': ('user_id', 'userId'),
+    'challenge_type': ('challenge_type', 'challengeType'),
+    'category': ('category',),
+    'correct': ('is_correct', 'isCorrect'),
+    'time': ('time_spent', 'timeSpent'),
+}
+
+
+class StatsRollup:
+    """Running (total, correct, time_sum) per (user_id, challenge_type, category) in growable int64 arrays"""
+
+    def __init__(self, capacity=1024):
+        self.index = {}
+        self.keys = []
+        self.total = np.zeros(capacity, dtype=np.int64)
+        self.correct = np.zeros(capacity, dtype=np.int64)
+        self.time_sum = np.zeros(capacity, dtype=np.int64)
+
+    @classmethod
+    def from_snapshot(cls, path=SNAPSHOT_PATH):
+        rollup = cls()
+        if os.path.exists(path):
+            snapshot = pd.read_csv(path, dtype={column: str for column in KEY_COLUMNS}, keep_default_na=False)
+            rows = rollup._rows(snapshot[KEY_COLUMNS].itertuples(index=False, name=None), len(snapshot))
+            for column in ('total', 'correct', 'time_sum'):
+                getattr(rollup, column)[rows] = snapshot[column].to_numpy()
+        return rollup
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _rows(self, keys, count):
+        """Row of each key, appending (and growing the arrays) for keys not seen yet"""
+        rows = np.empty(count, dtype=np.int64)
+        for i, key in enumerate(keys):
+            row = self.index.get(key)
+            if row is None:
+                row = self.index[key] = len(self.keys)
+                self.keys.append(key)
+            rows[i] = row
+        if len(self.keys) > len(self.total):
+            capacity = max(len(self.keys), 2 * len(self.total))
+            for column in ('total', 'correct', 'time_sum'):
+                values = getattr(self, column)
+                setattr(self, column, np.concatenate([values, np.zeros(capacity - len(values), dtype=np.int64)]))
+        return rows
+
+    def add_chunk(self, chunk):
+        """Fold one DataFrame of answers (ANSWER_ALIASES keys) into the accumulators"""
+        if 'time' not in chunk:
+            raise ValueError("Coluna time_spent ausente no export")
+        chunk = chunk[chunk['user_id'].notna()]
+        frame = pd.DataFrame({
+            'user_id': chunk['user_id'].to_numpy(),
+            'challenge_type': chunk['challenge_type'].fillna('').to_numpy(),
+            'category': chunk['category'].fillna('').to_numpy(),
+            'correct': _as_bool(chunk['correct']).astype(np.int64),
+            'time': pd.to_numeric(chunk['time'], errors='coerce').fillna(0).to_numpy(dtype=np.int64),
+        })
+        grouped = frame.groupby(KEY_COLUMNS, sort=False).agg(
+            total=('correct', 'size'), correct=('correct', 'sum'), time_sum=('time', 'sum'))
+        # Chaves únicas no grupo: soma direta por índice, sem np.add.at
+        rows = self._rows(grouped.index, len(grouped))
+        self.total[rows] += grouped['total'].to_numpy()
+        self.correct[rows] += grouped['correct'].to_numpy()
+        self.time_sum[rows] += grouped['time_sum'].to_numpy()
+        return len(frame)
+
+    def apply_batch(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Fold a whole export file; returns the number of answers"""
+        return sum(self.add_chunk(chunk) for chunk in read_chunks(path, chunk_size, ANSWER_ALIASES))
+
+    def snapshot(self):
+        """The snapshot table (SNAPSHOT_COLUMNS), sorted by key"""
+        size = len(self.keys)
+        snapshot = pd.DataFrame(self.keys, columns=KEY_COLUMNS)
+        snapshot['total'] = self.total[:size]
+        snapshot['correct'] = self.correct[:size]
+        snapshot['time_sum'] = self.time_sum[:size]
+        return snapshot.sort_values(KEY_COLUMNS, ignore_index=True)
+
+    def write(self, path=SNAPSHOT_PATH):
+        """Write the snapshot atomically"""
+        tmp_path = path + '.tmp'
+        self.snapshot().to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {'rows': 0, 'batches': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def update_snapshot(batches, snapshot_path=SNAPSHOT_PATH, manifest_path=MANIFEST_PATH, rebuild=False,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """Apply the batches not applied yet and rewrite the snapshot; returns (applied, skipped, rows)"""
+    if rebuild:
+        rollup, manifest = StatsRollup(), {'rows': 0, 'batches': []}
+    else:
+        manifest = load_manifest(manifest_path)
+        if os.path.exists(snapshot_path) and manifest.get('snapshot_sha256') != file_digest(snapshot_path):
+            raise ValueError(f"{snapshot_path} não confere com {manifest_path} (gravação interrompida?): use --rebuild")
+        rollup = StatsRollup.from_snapshot(snapshot_path)
+    applied_digests = {batch['sha256'] for batch in manifest['batches']}
+    applied, skipped, rows = [], [], 0
+    for path in batches:
+        digest = file_digest(path)
+        if digest in applied_digests:
+            skipped.append(path)
+            continue
+        batch_rows = rollup.apply_batch(path, chunk_size)
+        manifest['batches'].append({'path': path, 'sha256': digest, 'rows': batch_rows})
+        manifest['rows'] += batch_rows
+        applied_digests.add(digest)
+        applied.append(path)
+        rows += batch_rows
+    if applied or rebuild or not os.path.exists(snapshot_path):
+        # O manifesto guarda o sha256 do snapshot: uma interrupção entre as duas gravações
+        # é detectada na próxima execução em vez de contar lotes em dobro
+        rollup.write(snapshot_path)
+        manifest['snapshot_sha256'] = file_digest(snapshot_path)
+        save_manifest(manifest, manifest_path)
+    return applied, skipped, rows
+
+
+def user_rows(snapshot, user_id):
+    """Snapshot rows of one user (binary search on the sorted user_id column)"""
+    users = snapshot['user_id'].to_numpy()
+    start, stop = np.searchsorted(users, user_id, 'left'), np.searchsorted(users, user_id, 'right')
+    return snapshot.iloc[start:stop]
+
+
+def _js_round(value):
+    """Math.round from JavaScript (halves round up)"""
+    return math.floor(value + 0.5)
+
+
+def stats_from_rows(rows, challenge_type=None):
+    """The getUserStats response from a user's snapshot rows.
+
+    Ties in categoryStats (same total) are ordered by category name.
+    """
+    total = correct = time_sum = 0
+    categories = {}
+    for row in rows.itertuples(index=False):
+        if challenge_type and row.challenge_type != challenge_type:
+            continue
+        total += row.total
+        correct += row.correct
+        time_sum += row.time_sum
+        current = categories.setdefault(row.category, [0, 0])
+        current[0] += row.total
+        current[1] += row.correct
+    category_stats = [
+        {'category': category, 'total': int(count), 'correct': int(hits), 'percentage': _js_round(hits / count * 100)}
+        for category, (count, hits) in sorted(categories.items()) if count
+    ]
+    category_stats.sort(key=lambda stats: -stats['total'])
+    return {
+        'totalAnswered': int(total),
+        'correctAnswers': int(correct),
+        'incorrectAnswers': int(total - correct),
+        'averageTimeSpent': _js_round(time_sum / total) if total else 0,
+        'categoryStats': category_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollup incremental das estatísticas por usuário")
+    parser.add_argument('batches', nargs='*', help="exports de user_answers (.csv ou .parquet), em ordem")
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH)
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    parser.add_argument('--rebuild', action='store_true', help="ignorar o snapshot atual e refazer dos lotes")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="linhas por bloco")
+    parser.add_argument('--user', help="mostrar as estatísticas deste usuário")
+    parser.add_argument('--challenge-type', help="filtrar --user por tipo de desafio")
+    args = parser.parse_args()
+
+    if args.batches or args.rebuild:
+        start = time.perf_counter()
+        try:
+            applied, skipped, rows = update_snapshot(args.batches, args.snapshot, args.manifest, args.rebuild,
+                                                     args.chunk_size)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+        print(f"📥 {len(applied)} lotes aplicados ({rows:,} respostas, {rows / elapsed if elapsed else 0:,.0f}/s), "
+              f"{len(skipped)} já aplicados")
+        for path in skipped:
+            print(f"  ⏭️  {path}")
+        print(f"💾 Snapshot: {args.snapshot}")
+
+    if args.user:
+        if not os.path.exists(args.snapshot):
+            print(f"❌ Snapshot {args.snapshot} não encontrado")
+            sys.exit(1)
+        snapshot = pd.read_csv(args.snapshot, dtype={column: str for column in KEY_COLUMNS}, keep_default_na=False)
+        stats = stats_from_rows(user_rows(snapshot, args.user), args.challenge_type)
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+    elif not args.batches and not args.rebuild:
+        parser.print_usage()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import time
+from itertools import islice
+
+from openpyxl import load_workbook
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def peak_memory_mb():
+    """Peak RSS of the current process in MB (None when unavailable)"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class XlsxRowStream:
+    """Stream the rows of an .xlsx sheet with openpyxl read-only mode.
+
+    Rows come out as plain tuples (or dicts keyed by the header) in chunks of
+    chunk_size, so only one chunk is held in memory at a time. Fully empty rows
+    are skipped. on_chunk(chunk, columns, rows), when given, sees every chunk
+    before it is yielded, with the 1-based sheet row number of each of its
+    rows (e.g. to collect validation features on the way).
+    """
+
+    def __init__(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE, sheet_name=None, on_chunk=None):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.sheet_name = sheet_name
+        self.on_chunk = on_chunk
+        self.columns = []
+        self.rows_read = 0
+        self.elapsed = 0.0
+
+    def chunks(self):
+        """Yield lists of up to chunk_size row tuples, header excluded"""
+        start = time.perf_counter()
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[self.sheet_name] if self.sheet_name else workbook.worksheets[0]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, ())
+            self.columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+            width = len(self.columns)
+            # Número da linha na planilha (o cabeçalho é a linha 1), contando as linhas vazias
+            sheet_row = 2
+
+            while True:
+                batch = list(islice(rows, self.chunk_size))
+                if not batch:
+                    break
+                # Linhas vazias saem depois do teste de fim: um bloco só de linhas vazias não encerra a leitura
+                kept = [(number, row) for number, row in enumerate(batch, sheet_row)
+                        if any(value is not None for value in row)]
+                sheet_row += len(batch)
+                if not kept:
+                    continue
+                chunk = [tuple(row[:width]) + (None,) * (width - len(row)) for _, row in kept]
+                self.rows_read += len(chunk)
+                self.elapsed = time.perf_counter() - start
+                if self.on_chunk is not None:
+                    self.on_chunk(chunk, self.columns, [number for number, _ in kept])
+                yield chunk
+        finally:
+            workbook.close()
+            self.elapsed = time.perf_counter() - start
+
+    def records(self):
+        """Yield each row as a dict keyed by column name"""
+        for chunk in self.chunks():
+            columns = self.columns
+            for values in chunk:
+                yield dict(zip(columns, values))
+
+    def groups(self, id_column='ObjectQuestionId'):
+        """Yield (question_id, rows) once all option rows of a question have been seen.
+
+        Exports list the option rows of a question contiguously, so a question is
+        complete as soon as the id changes. An id that shows up again later is
+        yielded as a new group and must be merged by the caller.
+        """
+        current_id = None
+        current_rows = []
+        for record in self.records():
+            question_id = record.get(id_column)
+            if current_rows and question_id != current_id:
+                yield current_id, current_rows
+                current_rows = []
+            current_id = question_id
+            current_rows.append(record)
+        if current_rows:
+            yield current_id, current_rows
+
+    def report(self):
+        """Print rows/sec and peak memory for the stream"""
+        rate = self.rows_read / self.elapsed if self.elapsed else 0
+        peak = peak_memory_mb()
+        peak_info = f", pico de memória {peak:.0f} MB" if peak is not None else ""
+        print(f"⚡ Streaming: {self.rows_read} linhas em {self.elapsed:.2f}s ({rate:.0f} linhas/s){peak_info}")